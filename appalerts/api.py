@@ -1,8 +1,15 @@
 """Backend API for the appalerts app"""
 
+from django.core.cache import cache
+
 from djangoplugins.models import Plugin
 
-from appalerts.models import AppAlert, ALERT_LEVELS
+from appalerts.models import AppAlert, ALERT_LEVELS, PLUGIN_CACHE_KEY
+
+
+# Local constants
+BULK_BATCH_SIZE = 500
+PLUGIN_CACHE_TIMEOUT = 300
 
 
 class AppAlertAPI:
@@ -17,6 +24,80 @@ class AppAlertAPI:
         """
         return AppAlert
 
+    @classmethod
+    def get_alert_count(cls, user):
+        """
+        Return count of active alerts for a user. The count is cached if
+        APPALERTS_COUNT_CACHE_TIMEOUT is set.
+
+        :param user: User object
+        :return: Integer
+        """
+        return AppAlert.objects.get_active_count(user)
+
+    @classmethod
+    def get_plugin(cls, app_name):
+        """
+        Return Plugin object for an app.
+
+        :param app_name: Name of app plugin (string)
+        :raise: ValueError if the plugin is not found
+        :return: Plugin object or None for projectroles
+        """
+        if app_name == 'projectroles':
+            return None
+        try:
+            return Plugin.objects.get(name=app_name)
+        except Plugin.DoesNotExist:
+            raise ValueError('Plugin not found with name: {}'.format(app_name))
+
+    @classmethod
+    def get_plugin_id(cls, app_name):
+        """
+        Return Plugin ID for an app. The ID is cached for
+        PLUGIN_CACHE_TIMEOUT seconds and cleared on plugin changes.
+
+        :param app_name: Name of app plugin (string)
+        :raise: ValueError if the plugin is not found
+        :return: Integer or None for projectroles
+        """
+        if app_name == 'projectroles':
+            return None
+        key = PLUGIN_CACHE_KEY.format(app_name)
+        plugin_id = cache.get(key)
+        if plugin_id is None:
+            plugin_id = (
+                Plugin.objects.filter(name=app_name)
+                .values_list('pk', flat=True)
+                .first()
+            )
+            if plugin_id is None:
+                raise ValueError(
+                    'Plugin not found with name: {}'.format(app_name)
+                )
+            cache.set(key, plugin_id, PLUGIN_CACHE_TIMEOUT)
+        return plugin_id
+
+    @classmethod
+    def clear_plugin_cache(cls, app_name):
+        """
+        Clear cached Plugin ID for an app. Called automatically when Plugin
+        objects are saved or deleted.
+
+        :param app_name: Name of app plugin (string)
+        """
+        cache.delete(PLUGIN_CACHE_KEY.format(app_name))
+
+    @classmethod
+    def _validate_level(cls, level):
+        """Raise ValueError if level is invalid"""
+        if level not in ALERT_LEVELS:
+            raise ValueError(
+                'Invalid level "{}", accepted values: {}'.format(
+                    level, ', '.join(ALERT_LEVELS)
+                )
+            )
+
     @classmethod
     def add_alert(
         cls,
@@ -41,24 +122,10 @@ class AppAlertAPI:
         :raise: ValueError if the plugin is not found or the level is invalid
         :return: AppAlert object
         """
-        app_plugin = None  # None = projectroles
-        if app_name != 'projectroles':
-            try:
-                app_plugin = Plugin.objects.get(name=app_name)
-            except Plugin.DoesNotExist:
-                raise ValueError(
-                    'Plugin not found with name: {}'.format(app_name)
-                )
-
-        if level not in ALERT_LEVELS:
-            raise ValueError(
-                'Invalid level "{}", accepted values: {}'.format(
-                    level, ', '.join(ALERT_LEVELS)
-                )
-            )
-
+        app_plugin_id = cls.get_plugin_id(app_name)
+        cls._validate_level(level)
         return AppAlert.objects.create(
-            app_plugin=app_plugin,
+            app_plugin_id=app_plugin_id,
             alert_name=alert_name,
             user=user,
             message=message,
@@ -66,3 +133,67 @@ class AppAlertAPI:
             url=url,
             project=project,
         )
+
+    @classmethod
+    def add_alerts(
+        cls,
+        app_name,
+        alert_name,
+        users,
+        message,
+        level='INFO',
+        url=None,
+        project=None,
+    ):
+        """
+        Create an identical AppAlert for multiple users in bulk.
+
+        :param app_name: Name of app plugin which creates the alert (string)
+        :param alert_name: Internal alert name string
+        :param users: List or QuerySet of User objects receiving the alert
+        :param message: Message string (can contain HTML)
+        :param level: Alert level string (INFO, SUCCESS, WARNING or DANGER)
+        :param url: URL for following up on alert (string, optional)
+        :param project: Project the alert belongs to (Project object, optional)
+        :raise: ValueError if the plugin is not found or the level is invalid
+        :return: List of AppAlert objects
+        """
+        app_plugin_id = cls.get_plugin_id(app_name)
+        cls._validate_level(level)
+        alerts = AppAlert.objects.bulk_create(
+            [
+                AppAlert(
+                    app_plugin_id=app_plugin_id,
+                    alert_name=alert_name,
+                    user=user,
+                    message=message,
+                    level=level,
+                    url=url,
+                    project=project,
+                )
+                for user in users
+            ],
+            batch_size=BULK_BATCH_SIZE,
+        )
+        AppAlert.objects.clear_active_counts([a.user_id for a in alerts])
+        return alerts
+
+    @classmethod
+    def dismiss_alerts(cls, user, alert_uuids=None, project=None):
+        """
+        Dismiss active alerts for a user with a single query.
+
+        :param user: User object
+        :param alert_uuids: Limit to alerts with these UUIDs (list, optional)
+        :param project: Limit to alerts in project (Project object, optional)
+        :return: Number of dismissed alerts (int)
+        """
+        alerts = AppAlert.objects.filter(user=user, active=True)
+        if alert_uuids is not None:
+            alerts = alerts.filter(sodar_uuid__in=alert_uuids)
+        if project:
+            alerts = alerts.filter(project=project)
+        count = alerts.update(active=False)
+        if count:
+            AppAlert.objects.clear_active_count(user.pk)
+        return count
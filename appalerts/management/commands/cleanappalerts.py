@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+# Projectroles dependency
+from projectroles.management.logging import ManagementCommandLogger
+
+from appalerts.models import AppAlert
+
+
+logger = ManagementCommandLogger(__name__)
+
+
+# Local constants
+START_MSG = 'Deleting old inactive app alerts..'
+END_MSG = 'OK'
+DEFAULT_DAYS = 90
+DEFAULT_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Deletes inactive app alerts older than the given age. Defaults to the '
+        'APPALERTS_CLEANUP_DAYS setting.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-d',
+            '--days',
+            dest='days',
+            type=int,
+            required=False,
+            default=None,
+            help='Delete inactive alerts older than this many days',
+        )
+        parser.add_argument(
+            '-b',
+            '--batch-size',
+            dest='batch_size',
+            type=int,
+            required=False,
+            default=DEFAULT_BATCH_SIZE,
+            help='Number of alerts to delete per query',
+        )
+
+    def handle(self, *args, **options):
+        logger.info(START_MSG)
+        days = options.get('days')
+        if days is None:
+            days = getattr(settings, 'APPALERTS_CLEANUP_DAYS', DEFAULT_DAYS)
+        batch_size = options['batch_size']
+        alerts = (
+            AppAlert.objects.filter(
+                active=False,
+                date_created__lt=timezone.now() - timedelta(days=days),
+            )
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        count = 0
+        while True:
+            pks = list(alerts[:batch_size])
+            if not pks:
+                break
+            # Inactive alerts do not affect cached counts, skip signals
+            AppAlert.objects.filter(pk__in=pks)._raw_delete(AppAlert.objects.db)
+            count += len(pks)
+        logger.info(
+            'Deleted {} inactive alert{}'.format(
+                count, 's' if count != 1 else ''
+            )
+        )
+        logger.info(END_MSG)
@@ -2,9 +2,11 @@
 
 import uuid
 
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
 from djangoplugins.models import Plugin
 
 # Projectroles dependency
@@ -18,6 +20,55 @@ AUTH_USER_MODEL = getattr(settings, 'AUTH_USER_MODEL', 'auth.User')
 # Local constants
 ALERT_LEVELS = ['INFO', 'SUCCESS', 'WARNING', 'DANGER']
 ALERT_LEVEL_CHOICES = [(a, a.capitalize()) for a in ALERT_LEVELS]
+COUNT_CACHE_KEY = 'appalerts_count_{}'
+PLUGIN_CACHE_KEY = 'appalerts_plugin_id_{}'
+COUNT_CACHE_TIMEOUT = 0  # Disabled by default
+
+
+class AppAlertManager(models.Manager):
+    """Manager for custom table-level AppAlert queries"""
+
+    def get_active_count(self, user):
+        """
+        Return count of active alerts for user. If
+        APPALERTS_COUNT_CACHE_TIMEOUT is set, the count is cached until alerts
+        for the user are changed. This requires a cache backend shared between
+        server processes.
+
+        :param user: User object
+        :return: Integer
+        """
+        timeout = getattr(
+            settings, 'APPALERTS_COUNT_CACHE_TIMEOUT', COUNT_CACHE_TIMEOUT
+        )
+        if not timeout:
+            return self.filter(user=user, active=True).count()
+        key = COUNT_CACHE_KEY.format(user.pk)
+        count = cache.get(key)
+        if count is None:
+            count = self.filter(user=user, active=True).count()
+            cache.set(key, count, timeout)
+        return count
+
+    def clear_active_count(self, user_pk):
+        """
+        Clear cached active alert count for user. Call this after updating
+        alerts without save(), e.g. with QuerySet.update().
+
+        :param user_pk: User primary key
+        """
+        self.clear_active_counts([user_pk])
+
+    def clear_active_counts(self, user_pks):
+        """
+        Clear cached active alert counts for multiple users.
+
+        :param user_pks: List of user primary keys
+        """
+        keys = [COUNT_CACHE_KEY.format(pk) for pk in set(user_pks)]
+        cache.delete_many(keys)
+        # Clear again after commit in case the count was cached in between
+        transaction.on_commit(lambda: cache.delete_many(keys))
 
 
 class AppAlert(models.Model):
@@ -91,6 +142,9 @@ class AppAlert(models.Model):
         default=uuid.uuid4, unique=True, help_text='Alert SODAR UUID'
     )
 
+    # Set manager for custom queries
+    objects = AppAlertManager()
+
     def __str__(self):
         return '{} / {} / {}'.format(
             self.app_plugin.name if self.app_plugin else 'projectroles',
@@ -111,6 +165,12 @@ class AppAlert(models.Model):
         """Custom validation for AppAlert"""
         self._validate_level()
         super().save(*args, **kwargs)
+        AppAlert.objects.clear_active_count(self.user_id)
+
+    def delete(self, *args, **kwargs):
+        ret = super().delete(*args, **kwargs)
+        AppAlert.objects.clear_active_count(self.user_id)
+        return ret
 
     def _validate_level(self):
         """Validate level"""
@@ -120,3 +180,15 @@ class AppAlert(models.Model):
                     self.level, ', '.join(ALERT_LEVELS)
                 )
             )
+
+
+# Cache invalidation signals ---------------------------------------------------
+
+
+def handle_plugin_change(sender, instance, **kwargs):
+    """Signal for clearing cached plugin ID on plugin changes"""
+    cache.delete(PLUGIN_CACHE_KEY.format(instance.name))
+
+
+post_save.connect(handle_plugin_change, sender=Plugin)
+post_delete.connect(handle_plugin_change, sender=Plugin)
@@ -1,3 +1,15 @@
+// Update alert badge with alert count
+var updateAlertBadge = function (count) {
+  var alertBadge = $(document).find('#sodar-app-alert-badge');
+  alertBadge.find('#sodar-app-alert-count').html(count);
+  var legend = alertBadge.find('#sodar-app-alert-legend');
+  if (count > 0) {
+      alertBadge.show();
+      if (count === 1) legend.html('alert');
+      else legend.html('alerts');
+  } else alertBadge.fadeOut(250);
+};
+
 // Update alert status
 var updateAlertStatus = function () {
   var alertNav = $(document).find('#sodar-app-alert-nav');
@@ -8,28 +20,53 @@ var updateAlertStatus = function () {
           method: 'GET',
           dataType: 'json'
     }).done(function (data) {
-      var alertBadge = alertNav.find('#sodar-app-alert-badge');
-      alertBadge.find('#sodar-app-alert-count').html(data['alerts']);
-      var legend = alertBadge.find('#sodar-app-alert-legend');
-      if (data['alerts'] > 0) {
-          $(document).find('#sodar-app-alert-badge').show();
-          if (data['alerts'] === 1) legend.html('alert');
-          else legend.html('alerts');
-      } else $(document).find('#sodar-app-alert-badge').fadeOut(250);
+      updateAlertBadge(data['alerts']);
     });
   }
 };
 
+// Poll alert status in fixed intervals
+var pollAlertStatus = function (alertInterval) {
+    setInterval(function () {
+        updateAlertStatus();
+    }, alertInterval * 1000);
+};
+
+// Minimum delay between long polling requests in milliseconds
+var alertWaitMinDelay = 1000;
+
+// Wait for alert status changes with long polling, fall back to fixed
+// interval polling on failure
+var waitAlertStatus = function (waitUrl, count, alertInterval) {
+    var startTime = Date.now();
+    $.ajax({
+        url: waitUrl,
+        method: 'GET',
+        dataType: 'json',
+        data: {count: count}
+    }).done(function (data) {
+        if (data['alerts'] !== count) updateAlertBadge(data['alerts']);
+        // Avoid a tight request loop if the server returns immediately
+        var delay = Math.max(0, alertWaitMinDelay - (Date.now() - startTime));
+        setTimeout(function () {
+            waitAlertStatus(waitUrl, data['alerts'], alertInterval);
+        }, delay);
+    }).fail(function () {
+        pollAlertStatus(alertInterval);
+    });
+};
+
 $(document).ready(function () {
     // Set up alert updating
     var alertNav = $(document).find('#sodar-app-alert-nav');
-    if (alertNav) {
-        var alertInterval = $(document).find(
-            '#sodar-app-alert-nav').attr('data-interval');
-        // Update user alerts
-        setInterval(function () {
-            updateAlertStatus();
-        }, alertInterval * 1000);
+    if (alertNav.length) {
+        var alertInterval = alertNav.attr('data-interval');
+        var waitUrl = alertNav.attr('data-status-wait-url');
+        if (waitUrl) {
+            var count = parseInt(
+                alertNav.find('#sodar-app-alert-count').html());
+            waitAlertStatus(waitUrl, count, alertInterval);
+        } else pollAlertStatus(alertInterval);
     }
 
     // Handle alert dismissal
@@ -1,5 +1,6 @@
 """Backend API tests for the appalerts app"""
 
+from django.core.cache import cache
 from django.forms.models import model_to_dict
 from django.urls import reverse
 
@@ -8,10 +9,10 @@ from test_plus.test import TestCase
 
 # Projectroles dependency
 from projectroles.models import SODAR_CONSTANTS
-from projectroles.plugins import get_backend_api
+from projectroles.plugins import change_plugin_status, get_backend_api
 from projectroles.tests.test_models import ProjectMixin
 
-from appalerts.models import AppAlert
+from appalerts.models import AppAlert, PLUGIN_CACHE_KEY
 from appalerts.tests.test_models import (
     AppAlertMixin,
     ALERT_NAME,
@@ -28,6 +29,7 @@ class TestAppAlertAPI(AppAlertMixin, ProjectMixin, TestCase):
     """Base class for appalerts backend API testing"""
 
     def setUp(self):
+        cache.clear()
         # Create user
         self.user = self.make_user('user')
         self.project = self._make_project(
@@ -44,6 +46,56 @@ class TestAppAlertAPI(AppAlertMixin, ProjectMixin, TestCase):
         """Test get_model()"""
         self.assertEqual(self.app_alerts.get_model(), AppAlert)
 
+    def test_get_alert_count(self):
+        """Test get_alert_count()"""
+        self.assertEqual(self.app_alerts.get_alert_count(self.user), 0)
+        self._make_app_alert(user=self.user)
+        self.assertEqual(self.app_alerts.get_alert_count(self.user), 1)
+
+    def test_get_plugin(self):
+        """Test get_plugin()"""
+        self.assertEqual(
+            self.app_alerts.get_plugin('filesfolders'),
+            Plugin.objects.get(name='filesfolders'),
+        )
+        self.assertIsNone(self.app_alerts.get_plugin('projectroles'))
+
+    def test_get_plugin_id(self):
+        """Test get_plugin_id()"""
+        plugin = Plugin.objects.get(name='filesfolders')
+        self.assertEqual(
+            self.app_alerts.get_plugin_id('filesfolders'), plugin.pk
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.app_alerts.get_plugin_id('filesfolders'), plugin.pk
+            )
+
+    def test_get_plugin_id_invalid(self):
+        """Test get_plugin_id() with an invalid plugin name"""
+        with self.assertRaises(ValueError):
+            self.app_alerts.get_plugin_id('Not a valid plugin name')
+
+    def test_get_plugin_id_status_change(self):
+        """Test get_plugin_id() cache clearing on plugin status change"""
+        plugin = Plugin.objects.get(name='filesfolders')
+        self.app_alerts.get_plugin_id('filesfolders')
+        change_plugin_status('filesfolders', plugin.status)
+        self.assertIsNone(cache.get(PLUGIN_CACHE_KEY.format('filesfolders')))
+
+    def test_get_plugin_id_recreate(self):
+        """Test get_plugin_id() after deleting and recreating plugin"""
+        plugin = Plugin.objects.get(name='filesfolders')
+        old_pk = plugin.pk
+        self.app_alerts.get_plugin_id('filesfolders')
+        plugin.delete()
+        plugin.pk = None
+        plugin.save()
+        self.assertNotEqual(plugin.pk, old_pk)
+        self.assertEqual(
+            self.app_alerts.get_plugin_id('filesfolders'), plugin.pk
+        )
+
     def test_add_alert(self):
         """Test alert addition with a plugin"""
         self.assertEqual(AppAlert.objects.count(), 0)
@@ -112,3 +164,66 @@ class TestAppAlertAPI(AppAlertMixin, ProjectMixin, TestCase):
                 url=self.project_url,
                 project=self.project,
             )
+
+    def test_add_alerts(self):
+        """Test adding alerts for multiple users"""
+        user2 = self.make_user('user2')
+        self.app_alerts.get_plugin_id('filesfolders')  # Cache plugin ID
+        self.app_alerts.get_alert_count(self.user)
+        with self.assertNumQueries(1):
+            alerts = self.app_alerts.add_alerts(
+                app_name='filesfolders',
+                alert_name=ALERT_NAME,
+                users=[self.user, user2],
+                message=ALERT_MSG,
+                level=ALERT_LEVEL,
+                url=self.project_url,
+                project=self.project,
+            )
+        self.assertEqual(len(alerts), 2)
+        self.assertEqual(AppAlert.objects.count(), 2)
+        self.assertEqual(
+            AppAlert.objects.filter(
+                user=user2, app_plugin__name='filesfolders'
+            ).count(),
+            1,
+        )
+        self.assertEqual(self.app_alerts.get_alert_count(self.user), 1)
+
+    def test_add_alerts_invalid_level(self):
+        """Test adding alerts for multiple users with an invalid level"""
+        with self.assertRaises(ValueError):
+            self.app_alerts.add_alerts(
+                app_name='filesfolders',
+                alert_name=ALERT_NAME,
+                users=[self.user],
+                message=ALERT_MSG,
+                level='Not a valid level',
+            )
+        self.assertEqual(AppAlert.objects.count(), 0)
+
+    def test_dismiss_alerts(self):
+        """Test dismissing all alerts of a user"""
+        user2 = self.make_user('user2')
+        self._make_app_alert(user=self.user)
+        self._make_app_alert(user=self.user)
+        self._make_app_alert(user=user2)
+        self.assertEqual(self.app_alerts.get_alert_count(self.user), 2)
+        self.assertEqual(self.app_alerts.dismiss_alerts(self.user), 2)
+        self.assertEqual(self.app_alerts.get_alert_count(self.user), 0)
+        self.assertEqual(self.app_alerts.get_alert_count(user2), 1)
+
+    def test_dismiss_alerts_uuid(self):
+        """Test dismissing alerts by UUID"""
+        alert = self._make_app_alert(user=self.user)
+        alert2 = self._make_app_alert(user=self.user)
+        self.assertEqual(
+            self.app_alerts.dismiss_alerts(
+                self.user, alert_uuids=[alert.sodar_uuid]
+            ),
+            1,
+        )
+        alert.refresh_from_db()
+        alert2.refresh_from_db()
+        self.assertEqual(alert.active, False)
+        self.assertEqual(alert2.active, True)
@@ -1,6 +1,12 @@
 """Model tests for the appalerts app"""
 
+from datetime import timedelta
+
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
 from django.forms.models import model_to_dict
 from django.urls import reverse
 
@@ -11,7 +17,7 @@ from test_plus.test import TestCase
 from projectroles.models import SODAR_CONSTANTS
 from projectroles.tests.test_models import ProjectMixin
 
-from appalerts.models import AppAlert
+from appalerts.models import AppAlert, COUNT_CACHE_KEY
 
 
 # SODAR constants
@@ -170,3 +176,91 @@ class TestAppAlert(AppAlertMixin, ProjectMixin, TestCase):
                 url=self.project_url,
                 project=self.project,
             )
+
+
+class TestAppAlertManager(AppAlertMixin, TestCase):
+    """Tests for AppAlertManager"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = self.make_user()
+        self.alert = self._make_app_alert(user=self.user)
+
+    def test_get_active_count(self):
+        """Test get_active_count()"""
+        self._make_app_alert(user=self.user, active=False)
+        self.assertEqual(AppAlert.objects.get_active_count(self.user), 1)
+
+    def test_get_active_count_no_cache(self):
+        """Test get_active_count() with caching disabled by default"""
+        AppAlert.objects.get_active_count(self.user)
+        with self.assertNumQueries(1):
+            self.assertEqual(AppAlert.objects.get_active_count(self.user), 1)
+        self.assertIsNone(cache.get(COUNT_CACHE_KEY.format(self.user.pk)))
+
+    @override_settings(APPALERTS_COUNT_CACHE_TIMEOUT=300)
+    def test_get_active_count_cached(self):
+        """Test get_active_count() with cached count"""
+        AppAlert.objects.get_active_count(self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(AppAlert.objects.get_active_count(self.user), 1)
+
+    @override_settings(APPALERTS_COUNT_CACHE_TIMEOUT=300)
+    def test_get_active_count_create(self):
+        """Test get_active_count() after creating an alert"""
+        AppAlert.objects.get_active_count(self.user)
+        self._make_app_alert(user=self.user)
+        self.assertEqual(AppAlert.objects.get_active_count(self.user), 2)
+
+    @override_settings(APPALERTS_COUNT_CACHE_TIMEOUT=300)
+    def test_get_active_count_dismiss(self):
+        """Test get_active_count() after dismissing an alert"""
+        AppAlert.objects.get_active_count(self.user)
+        self.alert.active = False
+        self.alert.save()
+        self.assertEqual(AppAlert.objects.get_active_count(self.user), 0)
+
+    @override_settings(APPALERTS_COUNT_CACHE_TIMEOUT=300)
+    def test_get_active_count_delete(self):
+        """Test get_active_count() after deleting an alert"""
+        AppAlert.objects.get_active_count(self.user)
+        self.alert.delete()
+        self.assertEqual(AppAlert.objects.get_active_count(self.user), 0)
+
+    @override_settings(APPALERTS_COUNT_CACHE_TIMEOUT=300)
+    def test_clear_active_count(self):
+        """Test clear_active_count() after updating alerts"""
+        AppAlert.objects.get_active_count(self.user)
+        AppAlert.objects.filter(user=self.user).update(active=False)
+        AppAlert.objects.clear_active_count(self.user.pk)
+        self.assertEqual(AppAlert.objects.get_active_count(self.user), 0)
+
+
+class TestCleanAppAlertsCommand(AppAlertMixin, TestCase):
+    """Tests for the cleanappalerts management command"""
+
+    def setUp(self):
+        self.user = self.make_user()
+        self.alert = self._make_app_alert(user=self.user)
+        self.alert_old = self._make_app_alert(user=self.user)
+        self.alert_inactive = self._make_app_alert(user=self.user, active=False)
+        self.alert_inactive_old = self._make_app_alert(
+            user=self.user, active=False
+        )
+        AppAlert.objects.filter(
+            pk__in=[self.alert_old.pk, self.alert_inactive_old.pk]
+        ).update(date_created=timezone.now() - timedelta(days=10))
+
+    def test_command(self):
+        """Test deleting old inactive alerts"""
+        call_command('cleanappalerts', days=5, batch_size=1)
+        self.assertEqual(
+            sorted(AppAlert.objects.values_list('pk', flat=True)),
+            [self.alert.pk, self.alert_old.pk, self.alert_inactive.pk],
+        )
+
+    @override_settings(APPALERTS_CLEANUP_DAYS=20)
+    def test_command_settings(self):
+        """Test command with age from settings"""
+        call_command('cleanappalerts')
+        self.assertEqual(AppAlert.objects.count(), 4)
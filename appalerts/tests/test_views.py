@@ -1,9 +1,14 @@
 """View tests for the appalerts app"""
 
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse
 
 from test_plus.test import TestCase
 
+from appalerts.models import AppAlert
 from appalerts.tests.test_models import AppAlertMixin
 
 
@@ -11,6 +16,7 @@ class TestViewsBase(AppAlertMixin, TestCase):
     """Base class for appalerts view testing"""
 
     def setUp(self):
+        cache.clear()
         # Create users
         self.superuser = self.make_user('superuser')
         self.superuser.is_superuser = True
@@ -120,6 +126,96 @@ class TestAppAlertStatusAjaxView(TestViewsBase):
         self.assertEqual(response.data['alerts'], 0)
 
 
+@override_settings(
+    APPALERTS_STATUS_WAIT=True,
+    APPALERTS_STATUS_WAIT_TIMEOUT=0,
+    APPALERTS_STATUS_WAIT_POLL=0,
+    APPALERTS_COUNT_CACHE_TIMEOUT=300,
+)
+class TestAppAlertStatusWaitAjaxView(TestViewsBase):
+    """Tests for the alert status long polling ajax view"""
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('appalerts:ajax_status_wait')
+
+    def test_get_changed(self):
+        """Test GET with changed alert count"""
+        with self.login(self.regular_user):
+            response = self.client.get(self.url, {'count': 0})
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['alerts'], 1)
+
+    def test_get_unchanged(self):
+        """Test GET with unchanged alert count"""
+        with self.login(self.regular_user):
+            response = self.client.get(self.url, {'count': 1})
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['alerts'], 1)
+
+    def test_get_invalid_count(self):
+        """Test GET with invalid count"""
+        with self.login(self.regular_user):
+            response = self.client.get(self.url, {'count': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(
+        APPALERTS_STATUS_WAIT=False, APPALERTS_STATUS_WAIT_TIMEOUT=60
+    )
+    def test_get_wait_disabled(self):
+        """Test GET with long polling disabled"""
+        with self.login(self.regular_user):
+            with patch('appalerts.views_ajax.time.sleep') as mock_sleep:
+                response = self.client.get(self.url, {'count': 1})
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['alerts'], 1)
+        mock_sleep.assert_not_called()
+
+    @override_settings(
+        APPALERTS_COUNT_CACHE_TIMEOUT=0, APPALERTS_STATUS_WAIT_TIMEOUT=60
+    )
+    def test_get_count_cache_disabled(self):
+        """Test GET with count caching disabled"""
+        with self.login(self.regular_user):
+            with patch('appalerts.views_ajax.time.sleep') as mock_sleep:
+                response = self.client.get(self.url, {'count': 1})
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['alerts'], 1)
+        mock_sleep.assert_not_called()
+
+    @override_settings(APPALERTS_STATUS_WAIT_TIMEOUT=60)
+    def test_get_wait_cached(self):
+        """Test GET with unchanged count polling only the cached count"""
+        with self.login(self.regular_user):
+            with patch('appalerts.views_ajax.time') as mock_time, patch.object(
+                AppAlert.objects,
+                'get_active_count',
+                wraps=AppAlert.objects.get_active_count,
+            ) as mock_count:
+                mock_time.monotonic.side_effect = [0, 0, 0, 100]
+                response = self.client.get(self.url, {'count': 1})
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['alerts'], 1)
+        self.assertEqual(mock_time.sleep.call_count, 2)
+        self.assertEqual(mock_count.call_count, 1)
+
+    @override_settings(APPALERTS_STATUS_WAIT_TIMEOUT=60)
+    def test_get_wait_changed(self):
+        """Test GET with alert count changed while waiting"""
+
+        def _add_alert(poll):
+            self._make_app_alert(user=self.regular_user, url=reverse('home'))
+
+        with self.login(self.regular_user):
+            with patch(
+                'appalerts.views_ajax.time.sleep', side_effect=_add_alert
+            ) as mock_sleep:
+                response = self.client.get(self.url, {'count': 1})
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['alerts'], 2)
+        self.assertEqual(mock_sleep.call_count, 1)
+
+
 class TestAppAlertDismissAjaxView(TestViewsBase):
     """Tests for the alert dismissal ajax view"""
 
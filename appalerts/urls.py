@@ -20,6 +20,11 @@ urlpatterns = [
         view=views_ajax.AppAlertStatusAjaxView.as_view(),
         name='ajax_status',
     ),
+    url(
+        regex=r'^ajax/status/wait$',
+        view=views_ajax.AppAlertStatusWaitAjaxView.as_view(),
+        name='ajax_status_wait',
+    ),
     url(
         regex=r'^ajax/dismiss/(?P<appalert>[0-9a-f-]+)$',
         view=views_ajax.AppAlertDismissAjaxView.as_view(),
@@ -1,11 +1,22 @@
 """Ajax API views for the appalerts app"""
 
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
 from rest_framework.response import Response
 
 # Projectroles dependency
 from projectroles.views_ajax import SODARBaseAjaxView
 
-from appalerts.models import AppAlert
+from appalerts.api import AppAlertAPI
+from appalerts.models import AppAlert, COUNT_CACHE_KEY
+
+
+# Local constants
+DEFAULT_WAIT_TIMEOUT = 5
+DEFAULT_WAIT_POLL = 1
 
 
 class AppAlertStatusAjaxView(SODARBaseAjaxView):
@@ -18,15 +29,54 @@ class AppAlertStatusAjaxView(SODARBaseAjaxView):
         if not request.user or request.user.is_anonymous:
             return Response({'detail': 'Anonymous access denied'}, status=401)
         return Response(
-            {
-                'alerts': AppAlert.objects.filter(
-                    user=request.user, active=True
-                ).count()
-            },
+            {'alerts': AppAlert.objects.get_active_count(request.user)},
             status=200,
         )
 
 
+class AppAlertStatusWaitAjaxView(SODARBaseAjaxView):
+    """
+    Long polling view to get app alert status for user. Returns once the
+    alert count differs from the count given in the "count" query parameter,
+    or the current count after APPALERTS_STATUS_WAIT_TIMEOUT seconds. Each
+    waiting request occupies a server worker, so waiting is only done if
+    APPALERTS_STATUS_WAIT is enabled. While waiting, only the cached count is
+    polled, so waiting also requires APPALERTS_COUNT_CACHE_TIMEOUT to be set.
+    """
+
+    permission_required = 'appalerts.view_alerts'
+
+    def get(self, request, **kwargs):
+        # HACK: Manually refuse access to anonymous as this view is an exception
+        if not request.user or request.user.is_anonymous:
+            return Response({'detail': 'Anonymous access denied'}, status=401)
+        try:
+            prev_count = int(request.GET.get('count', -1))
+        except ValueError:
+            return Response({'detail': 'Invalid count'}, status=400)
+        if not getattr(settings, 'APPALERTS_STATUS_WAIT', False) or not getattr(
+            settings, 'APPALERTS_COUNT_CACHE_TIMEOUT', 0
+        ):
+            timeout = 0
+        else:
+            timeout = getattr(
+                settings, 'APPALERTS_STATUS_WAIT_TIMEOUT', DEFAULT_WAIT_TIMEOUT
+            )
+        poll = getattr(
+            settings, 'APPALERTS_STATUS_WAIT_POLL', DEFAULT_WAIT_POLL
+        )
+        end_time = time.monotonic() + timeout
+        key = COUNT_CACHE_KEY.format(request.user.pk)
+        count = AppAlert.objects.get_active_count(request.user)
+        while count == prev_count and time.monotonic() < end_time:
+            time.sleep(poll)
+            # Only query the database once the cached count has been cleared
+            count = cache.get(key)
+            if count is None:
+                count = AppAlert.objects.get_active_count(request.user)
+        return Response({'alerts': count}, status=200)
+
+
 class AppAlertDismissAjaxView(SODARBaseAjaxView):
     """View to handle app alert dismissal in UI"""
 
@@ -36,12 +86,7 @@ class AppAlertDismissAjaxView(SODARBaseAjaxView):
         # HACK: Manually refuse access to anonymous as this view is an exception
         if not request.user or request.user.is_anonymous:
             return Response({'detail': 'Anonymous access denied'}, status=401)
-        alerts = AppAlert.objects.filter(user=request.user, active=True)
-        if kwargs.get('appalert'):
-            alerts = alerts.filter(sodar_uuid=kwargs['appalert'])
-        if not alerts:
+        alert_uuids = [kwargs['appalert']] if kwargs.get('appalert') else None
+        if not AppAlertAPI.dismiss_alerts(request.user, alert_uuids):
             return Response({'detail': 'Not found'}, status=404)
-        for alert in alerts:
-            alert.active = False
-            alert.save()
         return Response({'detail': 'OK'}, status=200)
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+# Projectroles dependency
+from projectroles.management.logging import ManagementCommandLogger
+
+from bgjobs.models import BackgroundJobLogEntry
+
+
+logger = ManagementCommandLogger(__name__)
+
+
+# Local constants
+START_MSG = 'Trimming background job log entries..'
+END_MSG = 'OK'
+
+
+class Command(BaseCommand):
+    help = (
+        'Deletes background job log entries according to the retention '
+        'policy. Defaults to the BGJOBS_LOG_RETENTION_DAYS and '
+        'BGJOBS_LOG_MAX_ENTRIES settings.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-d',
+            '--days',
+            dest='days',
+            type=int,
+            required=False,
+            default=None,
+            help='Delete entries older than this many days (0 = no limit)',
+        )
+        parser.add_argument(
+            '-m',
+            '--max-entries',
+            dest='max_entries',
+            type=int,
+            required=False,
+            default=None,
+            help='Maximum number of entries to keep per job (0 = no limit)',
+        )
+
+    def handle(self, *args, **options):
+        logger.info(START_MSG)
+        count = BackgroundJobLogEntry.objects.trim(
+            max_age=options.get('days'),
+            max_entries=options.get('max_entries'),
+        )
+        logger.info(
+            'Deleted {} log entr{}'.format(count, 'ies' if count != 1 else 'y')
+        )
+        logger.info(END_MSG)
@@ -0,0 +1,110 @@
+import sys
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+# Projectroles dependency
+from projectroles.management.logging import ManagementCommandLogger
+from projectroles.models import Project
+
+from bgjobs.models import BackgroundJob, JOB_STATE_CHOICES
+from bgjobs.runner import ACTIVE_STATES
+
+
+logger = ManagementCommandLogger(__name__)
+User = get_user_model()
+
+
+# Local constants
+START_MSG = 'Deleting background jobs..'
+END_MSG = 'OK'
+
+
+class Command(BaseCommand):
+    help = (
+        'Deletes background jobs and their log entries in batches. By default '
+        'all finished jobs are deleted.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-p',
+            '--project',
+            dest='project',
+            required=False,
+            help='Only delete jobs in project with this UUID',
+        )
+        parser.add_argument(
+            '-u',
+            '--user',
+            dest='user',
+            required=False,
+            help='Only delete jobs of user with this username',
+        )
+        parser.add_argument(
+            '-d',
+            '--days',
+            dest='days',
+            type=int,
+            required=False,
+            default=0,
+            help='Only delete jobs not modified in this many days',
+        )
+        parser.add_argument(
+            '-s',
+            '--status',
+            dest='status',
+            action='append',
+            choices=[c[0] for c in JOB_STATE_CHOICES],
+            required=False,
+            help='Only delete jobs with this status (can be given multiple '
+            'times, default: finished jobs)',
+        )
+        parser.add_argument(
+            '-b',
+            '--batch-size',
+            dest='batch_size',
+            type=int,
+            required=False,
+            default=None,
+            help='Number of rows to delete per query',
+        )
+
+    def handle(self, *args, **options):
+        logger.info(START_MSG)
+        jobs = BackgroundJob.objects.all()
+        if options.get('project'):
+            project = Project.objects.filter(
+                sodar_uuid=options['project']
+            ).first()
+            if not project:
+                logger.error('Project not found: {}'.format(options['project']))
+                sys.exit(1)
+            jobs = jobs.filter(project=project)
+        if options.get('user'):
+            user = User.objects.filter(username=options['user']).first()
+            if not user:
+                logger.error('User not found: {}'.format(options['user']))
+                sys.exit(1)
+            jobs = jobs.filter(user=user)
+        if options.get('days'):
+            jobs = jobs.filter(
+                date_modified__lt=timezone.now()
+                - timedelta(days=options['days'])
+            )
+        if options.get('status'):
+            jobs = jobs.filter(status__in=options['status'])
+        else:
+            jobs = jobs.exclude(status__in=ACTIVE_STATES)
+        count = BackgroundJob.objects.delete_bulk(
+            jobs, batch_size=options.get('batch_size')
+        )
+        logger.info(
+            'Deleted {} background job{}'.format(
+                count, 's' if count != 1 else ''
+            )
+        )
+        logger.info(END_MSG)
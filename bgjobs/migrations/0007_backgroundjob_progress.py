@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-19 06:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bgjobs', '0006_auto_20200526_1657'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backgroundjob',
+            name='progress',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Job progress in percent'),
+        ),
+    ]
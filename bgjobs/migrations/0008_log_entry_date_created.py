@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-19 06:54
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bgjobs', '0007_backgroundjob_progress'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='backgroundjoblogentry',
+            options={'ordering': ['date_created', 'pk']},
+        ),
+        migrations.AlterField(
+            model_name='backgroundjoblogentry',
+            name='date_created',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, help_text='DateTime of creation'),
+        ),
+    ]
@@ -12,10 +12,15 @@ helper functions for applying state changes and adding log messages.
 """
 
 import contextlib
+import logging
+import time
 import uuid as uuid_object
 
+from datetime import timedelta
+
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
 # Projectroles dependency
 from projectroles.models import Project
@@ -52,6 +57,66 @@ JOB_STATE_CHOICES = (
     ('failed', 'failed'),
 )
 
+#: Mapping from Python logging levels to log entry levels
+LOGGING_LEVELS = {
+    logging.DEBUG: LOG_LEVEL_DEBUG,
+    logging.INFO: LOG_LEVEL_INFO,
+    logging.WARNING: LOG_LEVEL_WARNING,
+    logging.ERROR: LOG_LEVEL_ERROR,
+    logging.CRITICAL: LOG_LEVEL_ERROR,
+}
+
+
+class BackgroundJobManager(models.Manager):
+    """Manager for custom table-level BackgroundJob queries"""
+
+    def delete_bulk(self, jobs=None, batch_size=None):
+        """
+        Delete jobs and their log entries in bounded batches without loading
+        the objects into memory or sending delete signals. Objects in other
+        models referring to the jobs are deleted through the ORM.
+
+        :param jobs: BackgroundJob QuerySet (optional, defaults to all jobs)
+        :param batch_size: Number of rows to delete per query (int, optional)
+        :return: Number of deleted jobs (int)
+        """
+        if jobs is None:
+            jobs = self.all()
+        batch_size = batch_size or getattr(
+            settings, 'BGJOBS_DELETE_BATCH_SIZE', 1000
+        )
+        jobs = jobs.order_by('pk').values_list('pk', flat=True)
+        entries = BackgroundJobLogEntry.objects.order_by('pk')
+        other_rels = [
+            r
+            for r in self.model._meta.related_objects
+            if r.related_model is not BackgroundJobLogEntry
+        ]
+        deleted = 0
+        while True:
+            job_pks = list(jobs[:batch_size])
+            if not job_pks:
+                break
+            with transaction.atomic(using=self.db):
+                while True:
+                    entry_pks = list(
+                        entries.filter(job__in=job_pks).values_list(
+                            'pk', flat=True
+                        )[:batch_size]
+                    )
+                    if not entry_pks:
+                        break
+                    BackgroundJobLogEntry.objects.filter(
+                        pk__in=entry_pks
+                    )._raw_delete(self.db)
+                job_batch = self.filter(pk__in=job_pks)
+                if other_rels:
+                    job_batch.delete()
+                else:
+                    job_batch._raw_delete(self.db)
+            deleted += len(job_pks)
+        return deleted
+
 
 class BackgroundJob(models.Model):
     """Common background job information."""
@@ -94,6 +159,13 @@ class BackgroundJob(models.Model):
     status = models.CharField(
         max_length=50, choices=JOB_STATE_CHOICES, default=JOB_STATE_INITIAL
     )
+    #: Job progress in percent
+    progress = models.PositiveSmallIntegerField(
+        default=0, help_text='Job progress in percent'
+    )
+
+    # Set manager for custom queries
+    objects = BackgroundJobManager()
 
     class Meta:
         ordering = ["-date_created"]
@@ -106,19 +178,112 @@ class BackgroundJob(models.Model):
         return '(generic job)'
 
     def add_log_entry(self, message, level=LOG_LEVEL_INFO):
-        """Add and return a new BackgroundJobLogEntry."""
+        """
+        Add and return a new BackgroundJobLogEntry. If log entries are being
+        buffered, the entry is saved when the buffer is flushed.
+        """
+        log_buffer = getattr(self, '_log_buffer', None)
+        if log_buffer:
+            return log_buffer.add_entry(message, level)
         return self.log_entries.create(level=level, message=message)
 
+    @contextlib.contextmanager
+    def buffer_log(self, buffer_size=None, flush_interval=None):
+        """
+        Return a context manager buffering log entries added with
+        add_log_entry(). The buffer is flushed on size or time thresholds and
+        when exiting the context.
+
+        :param buffer_size: Number of entries to buffer (int, optional)
+        :param flush_interval: Maximum time between flushes in seconds
+                               (int, optional)
+        :return: BackgroundJobLogHandler object
+        """
+        handler = BackgroundJobLogHandler(self, buffer_size, flush_interval)
+        self._log_buffer = handler
+        try:
+            yield handler
+        finally:
+            self._log_buffer = None
+            handler.close()
+
+    def set_status(self, status, message=None, level=LOG_LEVEL_INFO):
+        """
+        Update job status with a single query and optionally add a log entry.
+
+        :param status: Job status (string)
+        :param message: Log entry message (string, optional)
+        :param level: Log entry level (string)
+        """
+        self.status = status
+        self.date_modified = timezone.now()
+        BackgroundJob.objects.filter(pk=self.pk).update(
+            status=self.status, date_modified=self.date_modified
+        )
+        if message:
+            self.add_log_entry(message, level=level)
+
+    def set_progress(self, done, total=100):
+        """
+        Update job progress without saving other fields.
+
+        :param done: Number of completed steps (int)
+        :param total: Total number of steps (int, default=100)
+        """
+        self.progress = min(int(done * 100 / total), 100) if total else 100
+        BackgroundJob.objects.filter(pk=self.pk).update(progress=self.progress)
+
     def __str__(self):
         return self.name
 
 
+class BackgroundJobLogEntryManager(models.Manager):
+    """Manager for custom table-level BackgroundJobLogEntry queries"""
+
+    def trim(self, max_age=None, max_entries=None):
+        """
+        Delete log entries according to the retention policy. If not given,
+        the values are read from the BGJOBS_LOG_RETENTION_DAYS and
+        BGJOBS_LOG_MAX_ENTRIES settings. A value of 0 disables the limit.
+
+        :param max_age: Maximum age of entries in days (int, optional)
+        :param max_entries: Maximum number of entries per job (int, optional)
+        :return: Number of deleted entries (int)
+        """
+        if max_age is None:
+            max_age = getattr(settings, 'BGJOBS_LOG_RETENTION_DAYS', 0)
+        if max_entries is None:
+            max_entries = getattr(settings, 'BGJOBS_LOG_MAX_ENTRIES', 0)
+        deleted = 0
+        if max_age:
+            deleted += self.filter(
+                date_created__lt=timezone.now() - timedelta(days=max_age)
+            ).delete()[0]
+        if max_entries:
+            job_pks = (
+                self.order_by()
+                .values('job')
+                .annotate(count=models.Count('pk'))
+                .filter(count__gt=max_entries)
+                .values_list('job', flat=True)
+            )
+            for job_pk in job_pks:
+                # Keep the most recent entries
+                keep_pk = (
+                    self.filter(job=job_pk)
+                    .order_by('-date_created', '-pk')
+                    .values_list('pk', flat=True)[max_entries - 1]
+                )
+                deleted += self.filter(job=job_pk, pk__lt=keep_pk).delete()[0]
+        return deleted
+
+
 class BackgroundJobLogEntry(models.Model):
     """Log entry for background job"""
 
     #: Creation time of log entry
     date_created = models.DateTimeField(
-        auto_now_add=True, help_text='DateTime of creation'
+        default=timezone.now, editable=False, help_text='DateTime of creation'
     )
 
     #: The BackgroundJob that the log entry is for
@@ -136,8 +301,82 @@ class BackgroundJobLogEntry(models.Model):
     #: The message contained by the log entry
     message = models.TextField(help_text="Log level's message")
 
+    # Set manager for custom queries
+    objects = BackgroundJobLogEntryManager()
+
     class Meta:
-        ordering = ['date_created']
+        ordering = ['date_created', 'pk']
+
+
+class BackgroundJobLogHandler(logging.Handler):
+    """
+    Logging handler saving records as log entries of a BackgroundJob. Entries
+    are buffered and saved with bulk_create() once the buffer size or flush
+    interval is exceeded, as well as when flushing or closing the handler.
+    """
+
+    def __init__(self, job, buffer_size=None, flush_interval=None):
+        """
+        Initialize the handler.
+
+        :param job: BackgroundJob object
+        :param buffer_size: Number of entries to buffer (int, optional)
+        :param flush_interval: Maximum time between flushes in seconds
+                               (int, optional)
+        """
+        super().__init__()
+        self.job = job
+        self.buffer_size = buffer_size or getattr(
+            settings, 'BGJOBS_LOG_BUFFER_SIZE', 100
+        )
+        self.flush_interval = flush_interval or getattr(
+            settings, 'BGJOBS_LOG_FLUSH_INTERVAL', 5
+        )
+        self.buffer = []
+        self._last_flush = time.monotonic()
+
+    def add_entry(self, message, level=LOG_LEVEL_INFO):
+        """
+        Add a log entry to the buffer.
+
+        :param message: Log message (string)
+        :param level: Log entry level (string)
+        :return: Unsaved BackgroundJobLogEntry object
+        """
+        entry = BackgroundJobLogEntry(
+            job=self.job, level=level, message=message
+        )
+        with self.lock:
+            self.buffer.append(entry)
+            do_flush = (
+                len(self.buffer) >= self.buffer_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if do_flush:
+            self.flush()
+        return entry
+
+    def emit(self, record):
+        try:
+            self.add_entry(
+                self.format(record),
+                LOGGING_LEVELS.get(record.levelno, LOG_LEVEL_INFO),
+            )
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        """Save buffered entries"""
+        with self.lock:
+            entries = self.buffer
+            self.buffer = []
+            self._last_flush = time.monotonic()
+        if entries:
+            BackgroundJobLogEntry.objects.bulk_create(entries)
+
+    def close(self):
+        self.flush()
+        super().close()
 
 
 class JobModelMessageMixin:
@@ -167,23 +406,17 @@ class JobModelMessageMixin:
 
     def mark_start(self):
         """Mark the export job as started."""
-        self.bg_job.status = JOB_STATE_RUNNING
-        self.bg_job.add_log_entry('%s started' % self.task_desc)
-        self.bg_job.save()
+        self.bg_job.set_status(JOB_STATE_RUNNING, '%s started' % self.task_desc)
 
     def mark_error(self, msg):
         """Mark the export job as complete successfully."""
-        self.bg_job.status = JOB_STATE_FAILED
-        self.bg_job.add_log_entry(
-            '{} file failed: {}'.format(self.task_desc, msg)
+        self.bg_job.set_status(
+            JOB_STATE_FAILED, '{} file failed: {}'.format(self.task_desc, msg)
         )
-        self.bg_job.save()
 
     def mark_success(self):
         """Mark the export job as complete successfully."""
-        self.bg_job.status = JOB_STATE_DONE
-        self.bg_job.add_log_entry('%s succeeded' % self.task_desc)
-        self.bg_job.save()
+        self.bg_job.set_status(JOB_STATE_DONE, '%s succeeded' % self.task_desc)
 
     def add_log_entry(self, *args, **kwargs):
         """Add a log entry through the related BackgroundJob."""
@@ -44,7 +44,19 @@ class ProjectAppPlugin(ProjectAppPluginPoint):
     plugin_ordering = 100
 
     #: Names of plugin specific Django settings to display in siteinfo
-    info_settings = ['BGJOBS_PAGINATION']
+    info_settings = [
+        'BGJOBS_PAGINATION',
+        'BGJOBS_RUNNER',
+        'BGJOBS_LOCAL_WORKERS',
+        'BGJOBS_MAX_PROJECT_JOBS',
+        'BGJOBS_MAX_USER_JOBS',
+        'BGJOBS_LOG_BUFFER_SIZE',
+        'BGJOBS_LOG_FLUSH_INTERVAL',
+        'BGJOBS_LOG_PAGINATION',
+        'BGJOBS_LOG_RETENTION_DAYS',
+        'BGJOBS_LOG_MAX_ENTRIES',
+        'BGJOBS_DELETE_BATCH_SIZE',
+    ]
 
 
 class BackgroundJobsPluginPoint(PluginPoint):
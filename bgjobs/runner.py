@@ -0,0 +1,222 @@
+"""
+Background job runner for the bgjobs app.
+
+Job types are registered with the register_job_type() decorator. Registered
+jobs are submitted with submit_job(), which creates a BackgroundJob object and
+dispatches the job to the Celery app, a local process pool or runs it in the
+current process, depending on the BGJOBS_RUNNER setting.
+
+Register job types in the tasks module of your app, so they are also available
+in Celery worker processes.
+"""
+
+import django
+import logging
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils.module_loading import autodiscover_modules
+
+# Projectroles dependency
+from projectroles.models import Project
+
+from bgjobs.models import (
+    BackgroundJob,
+    JOB_STATE_DONE,
+    JOB_STATE_FAILED,
+    JOB_STATE_INITIAL,
+    JOB_STATE_RUNNING,
+    LOG_LEVEL_ERROR,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+# Local constants
+RUNNER_CELERY = 'celery'
+RUNNER_LOCAL = 'local'
+RUNNER_SYNC = 'sync'
+ACTIVE_STATES = [JOB_STATE_INITIAL, JOB_STATE_RUNNING]
+
+# Registered job functions by job type
+_job_types = {}
+# Local process pool, created on first use
+_local_pool = None
+
+
+class JobTypeException(Exception):
+    """Exception raised for unknown or duplicate job types"""
+
+
+class JobLimitException(Exception):
+    """Exception raised if a concurrency limit prevents submitting a job"""
+
+
+def register_job_type(job_type):
+    """
+    Decorator for registering a function as a background job type. The
+    function is called with the BackgroundJob object as the first argument,
+    followed by the keyword arguments given to submit_job().
+
+    :param job_type: Job type (string)
+    :raise: JobTypeException if job type is already registered
+    """
+
+    def decorator(func):
+        existing = _job_types.get(job_type)
+        if existing and existing is not func:
+            raise JobTypeException(
+                'Job type already registered: {}'.format(job_type)
+            )
+        _job_types[job_type] = func
+        return func
+
+    return decorator
+
+
+def get_job_types():
+    """
+    Return registered job types.
+
+    :return: Dict of job functions by job type
+    """
+    return dict(_job_types)
+
+
+def check_limits(project, user):
+    """
+    Check per-project and per-user limits for active jobs. The project and
+    user rows are locked for the limits in use, so this must be called in the
+    same transaction in which the job is created.
+
+    :param project: Project object or None
+    :param user: User object
+    :raise: JobLimitException if a limit has been reached
+    """
+    project_limit = getattr(settings, 'BGJOBS_MAX_PROJECT_JOBS', 0)
+    user_limit = getattr(settings, 'BGJOBS_MAX_USER_JOBS', 0)
+    active = BackgroundJob.objects.filter(status__in=ACTIVE_STATES)
+    # Lock rows so concurrent submits can't both pass the checks before
+    # either job has been created
+    if project and project_limit:
+        Project.objects.select_for_update().filter(pk=project.pk).first()
+    if user_limit:
+        get_user_model().objects.select_for_update().filter(pk=user.pk).first()
+    if (
+        project
+        and project_limit
+        and active.filter(project=project).count() >= project_limit
+    ):
+        raise JobLimitException(
+            'Limit of {} active background jobs reached for project'.format(
+                project_limit
+            )
+        )
+    if user_limit and active.filter(user=user).count() >= user_limit:
+        raise JobLimitException(
+            'Limit of {} active background jobs reached for user'.format(
+                user_limit
+            )
+        )
+
+
+def submit_job(job_type, user, name, project=None, description='', **kwargs):
+    """
+    Create a BackgroundJob and dispatch it for execution once the current
+    transaction is committed.
+
+    :param job_type: Registered job type (string)
+    :param user: User object initiating the job
+    :param name: Human-readable name for the job (string)
+    :param project: Project object or None for global jobs
+    :param description: Job description (string, optional)
+    :param kwargs: JSON serializable keyword arguments for the job function
+    :return: BackgroundJob object
+    :raise: JobTypeException if job type is not registered
+    :raise: JobLimitException if a concurrency limit has been reached
+    """
+    if job_type not in _job_types:
+        raise JobTypeException('Unknown job type: {}'.format(job_type))
+    with transaction.atomic():
+        check_limits(project, user)
+        job = BackgroundJob.objects.create(
+            project=project,
+            user=user,
+            job_type=job_type,
+            name=name,
+            description=description,
+        )
+    transaction.on_commit(lambda: dispatch_job(str(job.sodar_uuid), kwargs))
+    return job
+
+
+def dispatch_job(job_uuid, kwargs):
+    """
+    Dispatch a created job for execution according to the BGJOBS_RUNNER
+    setting. The local process pool is used if Celery is selected but no
+    broker has been configured.
+
+    :param job_uuid: BackgroundJob UUID (string)
+    :param kwargs: Keyword arguments for the job function (dict)
+    """
+    runner = getattr(settings, 'BGJOBS_RUNNER', RUNNER_CELERY)
+    if runner == RUNNER_CELERY and getattr(settings, 'CELERY_BROKER_URL', None):
+        from bgjobs.tasks import run_job_task
+
+        run_job_task.delay(job_uuid, kwargs)
+    elif runner == RUNNER_SYNC:
+        run_job(job_uuid, kwargs)
+    else:
+        _get_local_pool().submit(run_job, job_uuid, kwargs)
+
+
+def run_job(job_uuid, kwargs):
+    """
+    Run a job and update its state. Called by the dispatched worker. Log
+    entries added during the job are buffered and saved in bulk.
+
+    :param job_uuid: BackgroundJob UUID (string)
+    :param kwargs: Keyword arguments for the job function (dict)
+    """
+    job = BackgroundJob.objects.get(sodar_uuid=job_uuid)
+    if job.job_type not in _job_types:
+        autodiscover_modules('tasks')  # Load job types in worker processes
+    func = _job_types.get(job.job_type)
+    with job.buffer_log():
+        job.set_status(JOB_STATE_RUNNING, 'Job started')
+        try:
+            if not func:
+                raise JobTypeException(
+                    'Unknown job type: {}'.format(job.job_type)
+                )
+            func(job, **kwargs)
+        except Exception as ex:
+            logger.error('Background job {} failed: {}'.format(job_uuid, ex))
+            job.add_log_entry(
+                'Job failed: {}'.format(ex), level=LOG_LEVEL_ERROR
+            )
+            job.status = JOB_STATE_FAILED
+        else:
+            job.add_log_entry('Job succeeded')
+            job.status = JOB_STATE_DONE
+            job.progress = 100
+    job.save(update_fields=['status', 'progress', 'date_modified'])
+
+
+def _get_local_pool():
+    """Return local process pool, creating it if needed"""
+    global _local_pool
+    if _local_pool is None:
+        # Spawn workers so they don't share database connections with the
+        # parent process
+        _local_pool = ProcessPoolExecutor(
+            max_workers=getattr(settings, 'BGJOBS_LOCAL_WORKERS', 2),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup,
+        )
+    return _local_pool
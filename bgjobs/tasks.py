@@ -0,0 +1,40 @@
+"""Celery tasks for the bgjobs app"""
+
+from celery import shared_task
+
+from bgjobs.models import BackgroundJob
+from bgjobs.runner import register_job_type, run_job, ACTIVE_STATES
+
+
+# Local constants
+DELETE_JOBS_JOB_TYPE = 'bgjobs.delete_jobs'
+
+
+@shared_task
+def run_job_task(job_uuid, kwargs):
+    """
+    Run a background job submitted with bgjobs.runner.submit_job().
+
+    :param job_uuid: BackgroundJob UUID (string)
+    :param kwargs: Keyword arguments for the job function (dict)
+    """
+    run_job(job_uuid, kwargs)
+
+
+@register_job_type(DELETE_JOBS_JOB_TYPE)
+def delete_jobs(job, project_uuid=None, user_uuid=None):
+    """
+    Background job for deleting jobs and their log entries in bulk. Active
+    jobs, including the running job itself, are not deleted.
+
+    :param job: BackgroundJob object
+    :param project_uuid: Limit to project with this UUID (string, optional)
+    :param user_uuid: Limit to user with this UUID (string, optional)
+    """
+    jobs = BackgroundJob.objects.exclude(status__in=ACTIVE_STATES)
+    if project_uuid:
+        jobs = jobs.filter(project__sodar_uuid=project_uuid)
+    if user_uuid:
+        jobs = jobs.filter(user__sodar_uuid=user_uuid)
+    count = BackgroundJob.objects.delete_bulk(jobs)
+    job.add_log_entry('Deleted {} background jobs'.format(count))
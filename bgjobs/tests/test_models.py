@@ -0,0 +1,237 @@
+"""Tests for models in the bgjobs app"""
+
+import logging
+
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from test_plus.test import TestCase
+
+# Projectroles dependency
+from projectroles.models import SODAR_CONSTANTS
+from projectroles.tests.test_models import ProjectMixin
+
+from bgjobs.models import (
+    BackgroundJob,
+    BackgroundJobLogEntry,
+    BackgroundJobLogHandler,
+    JobModelMessageMixin,
+    JOB_STATE_DONE,
+    JOB_STATE_RUNNING,
+    LOG_LEVEL_ERROR,
+    LOG_LEVEL_INFO,
+)
+
+
+# SODAR constants
+PROJECT_TYPE_PROJECT = SODAR_CONSTANTS['PROJECT_TYPE_PROJECT']
+
+
+class BackgroundJobMixin:
+    """Helper mixin for BackgroundJob creation"""
+
+    @classmethod
+    def _make_job(cls, project, user, name='Test job'):
+        return BackgroundJob.objects.create(
+            project=project, user=user, job_type='bgjobs.test', name=name
+        )
+
+
+class TestBackgroundJobBase(BackgroundJobMixin, ProjectMixin, TestCase):
+    """Base class for bgjobs model tests"""
+
+    def setUp(self):
+        self.user = self.make_user('user')
+        self.project = self._make_project(
+            'TestProject', PROJECT_TYPE_PROJECT, None
+        )
+        self.job = self._make_job(self.project, self.user)
+
+
+class TestBackgroundJob(TestBackgroundJobBase):
+    """Tests for the BackgroundJob model"""
+
+    def test_add_log_entry(self):
+        """Test add_log_entry() without buffering"""
+        entry = self.job.add_log_entry('Test')
+        self.assertIsNotNone(entry.pk)
+        self.assertEqual(self.job.log_entries.count(), 1)
+
+    def test_buffer_log(self):
+        """Test add_log_entry() with buffering"""
+        with self.job.buffer_log(buffer_size=10):
+            for i in range(5):
+                self.job.add_log_entry('Entry {}'.format(i))
+            self.assertEqual(self.job.log_entries.count(), 0)
+        self.assertEqual(
+            list(self.job.log_entries.values_list('message', flat=True)),
+            ['Entry {}'.format(i) for i in range(5)],
+        )
+
+    def test_buffer_log_size(self):
+        """Test flushing buffered entries on buffer size"""
+        with self.job.buffer_log(buffer_size=3):
+            with self.assertNumQueries(1):
+                for i in range(3):
+                    self.job.add_log_entry('Entry {}'.format(i))
+            self.assertEqual(self.job.log_entries.count(), 3)
+            self.job.add_log_entry('Entry 3')
+            self.assertEqual(self.job.log_entries.count(), 3)
+        self.assertEqual(self.job.log_entries.count(), 4)
+
+    def test_buffer_log_exception(self):
+        """Test flushing buffered entries on exception"""
+        with self.assertRaises(ValueError):
+            with self.job.buffer_log():
+                self.job.add_log_entry('Entry')
+                raise ValueError('Test')
+        self.assertEqual(self.job.log_entries.count(), 1)
+
+    def test_set_status(self):
+        """Test set_status()"""
+        with self.assertNumQueries(2):
+            self.job.set_status(JOB_STATE_RUNNING, 'Started')
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, JOB_STATE_RUNNING)
+        self.assertEqual(self.job.log_entries.first().message, 'Started')
+
+
+class TestBackgroundJobLogHandler(TestBackgroundJobBase):
+    """Tests for BackgroundJobLogHandler"""
+
+    def setUp(self):
+        super().setUp()
+        self.logger = logging.getLogger('bgjobs.tests.job')
+        self.logger.setLevel(logging.INFO)
+        self.handler = BackgroundJobLogHandler(self.job, buffer_size=10)
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+
+    def test_emit(self):
+        """Test logging to job log entries"""
+        self.logger.info('Info message')
+        self.logger.error('Error message')
+        self.assertEqual(self.job.log_entries.count(), 0)
+        self.handler.close()
+        self.assertEqual(
+            list(self.job.log_entries.values_list('level', 'message')),
+            [
+                (LOG_LEVEL_INFO, 'Info message'),
+                (LOG_LEVEL_ERROR, 'Error message'),
+            ],
+        )
+
+
+class TestJobModelMessageMixin(TestBackgroundJobBase):
+    """Tests for JobModelMessageMixin"""
+
+    class TestJob(JobModelMessageMixin):
+        task_desc = 'Test task'
+
+        def __init__(self, bg_job):
+            self.bg_job = bg_job
+
+    def test_marks(self):
+        """Test marks() with successful job"""
+        test_job = self.TestJob(self.job)
+        with test_job.marks():
+            pass
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, JOB_STATE_DONE)
+        self.assertEqual(
+            list(self.job.log_entries.values_list('message', flat=True)),
+            ['Test task started', 'Test task succeeded'],
+        )
+
+
+class TestBackgroundJobLogEntryManager(TestBackgroundJobBase):
+    """Tests for BackgroundJobLogEntryManager"""
+
+    def setUp(self):
+        super().setUp()
+        self.job2 = self._make_job(self.project, self.user, 'Test job 2')
+        for i in range(5):
+            self.job.add_log_entry('Entry {}'.format(i))
+        self.job2.add_log_entry('Entry')
+
+    def test_trim_max_entries(self):
+        """Test trim() with max_entries"""
+        self.assertEqual(
+            BackgroundJobLogEntry.objects.trim(max_age=0, max_entries=2), 3
+        )
+        self.assertEqual(
+            list(self.job.log_entries.values_list('message', flat=True)),
+            ['Entry 3', 'Entry 4'],
+        )
+        self.assertEqual(self.job2.log_entries.count(), 1)
+
+    def test_trim_max_age(self):
+        """Test trim() with max_age"""
+        self.job.log_entries.update(
+            date_created=timezone.now() - timedelta(days=10)
+        )
+        self.assertEqual(
+            BackgroundJobLogEntry.objects.trim(max_age=5, max_entries=0), 5
+        )
+        self.assertEqual(self.job.log_entries.count(), 0)
+        self.assertEqual(self.job2.log_entries.count(), 1)
+
+    def test_trim_no_limit(self):
+        """Test trim() without limits"""
+        self.assertEqual(
+            BackgroundJobLogEntry.objects.trim(max_age=0, max_entries=0), 0
+        )
+        self.assertEqual(BackgroundJobLogEntry.objects.count(), 6)
+
+    @override_settings(BGJOBS_LOG_MAX_ENTRIES=1)
+    def test_command(self):
+        """Test cleanbgjoblogs management command with settings"""
+        call_command('cleanbgjoblogs')
+        self.assertEqual(self.job.log_entries.count(), 1)
+        self.assertEqual(self.job.log_entries.first().message, 'Entry 4')
+
+
+class TestBackgroundJobManager(TestBackgroundJobBase):
+    """Tests for BackgroundJobManager"""
+
+    def setUp(self):
+        super().setUp()
+        self.user2 = self.make_user('user2')
+        self.job2 = self._make_job(self.project, self.user2, 'Test job 2')
+        for i in range(5):
+            self.job.add_log_entry('Entry {}'.format(i))
+            self.job2.add_log_entry('Entry {}'.format(i))
+
+    def test_delete_bulk(self):
+        """Test delete_bulk() with all jobs"""
+        self.assertEqual(BackgroundJob.objects.delete_bulk(batch_size=2), 2)
+        self.assertEqual(BackgroundJob.objects.count(), 0)
+        self.assertEqual(BackgroundJobLogEntry.objects.count(), 0)
+
+    def test_delete_bulk_filter(self):
+        """Test delete_bulk() with filtered jobs"""
+        self.assertEqual(
+            BackgroundJob.objects.delete_bulk(
+                BackgroundJob.objects.filter(user=self.user), batch_size=2
+            ),
+            1,
+        )
+        self.assertEqual(list(BackgroundJob.objects.all()), [self.job2])
+        self.assertEqual(BackgroundJobLogEntry.objects.count(), 5)
+
+    def test_command(self):
+        """Test deletebgjobs management command"""
+        self.job.set_status(JOB_STATE_DONE)
+        self.job2.set_status(JOB_STATE_RUNNING)
+        call_command('deletebgjobs')
+        self.assertEqual(list(BackgroundJob.objects.all()), [self.job2])
+
+    def test_command_user(self):
+        """Test deletebgjobs management command with user and status"""
+        call_command('deletebgjobs', user='user2', status=['initial'])
+        self.assertEqual(list(BackgroundJob.objects.all()), [self.job])
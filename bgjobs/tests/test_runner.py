@@ -0,0 +1,191 @@
+"""Tests for the job runner in the bgjobs app"""
+
+from django.test import override_settings
+
+from test_plus.test import TestCase
+
+# Projectroles dependency
+from projectroles.models import SODAR_CONSTANTS
+from projectroles.tests.test_models import ProjectMixin
+
+from bgjobs.models import (
+    BackgroundJob,
+    JOB_STATE_DONE,
+    JOB_STATE_FAILED,
+    JOB_STATE_INITIAL,
+    JOB_STATE_RUNNING,
+)
+from bgjobs.tasks import DELETE_JOBS_JOB_TYPE
+from bgjobs.runner import (
+    get_job_types,
+    register_job_type,
+    submit_job,
+    JobLimitException,
+    JobTypeException,
+)
+
+
+# SODAR constants
+PROJECT_TYPE_PROJECT = SODAR_CONSTANTS['PROJECT_TYPE_PROJECT']
+
+# Local constants
+JOB_TYPE = 'bgjobs.test_job'
+JOB_TYPE_FAIL = 'bgjobs.test_job_fail'
+
+
+@register_job_type(JOB_TYPE)
+def run_test_job(job, steps=1):
+    for i in range(steps):
+        job.set_progress(i + 1, steps)
+        job.add_log_entry('Step {}'.format(i + 1))
+
+
+@register_job_type(JOB_TYPE_FAIL)
+def run_test_job_fail(job):
+    raise Exception('Test failure')
+
+
+class TestRunner(ProjectMixin, TestCase):
+    """Tests for the bgjobs job runner"""
+
+    def setUp(self):
+        self.user = self.make_user('user')
+        self.project = self._make_project(
+            'TestProject', PROJECT_TYPE_PROJECT, None
+        )
+
+    def _submit(self, job_type=JOB_TYPE, **kwargs):
+        """Submit job and run on_commit callbacks"""
+        with self.captureOnCommitCallbacks(execute=True):
+            job = submit_job(
+                job_type, self.user, 'Test job', project=self.project, **kwargs
+            )
+        job.refresh_from_db()
+        return job
+
+    def test_register(self):
+        """Test job type registration"""
+        self.assertEqual(get_job_types()[JOB_TYPE], run_test_job)
+
+    def test_register_duplicate(self):
+        """Test registering a different function for a job type"""
+        with self.assertRaises(JobTypeException):
+            register_job_type(JOB_TYPE)(run_test_job_fail)
+
+    def test_submit(self):
+        """Test submitting and running a job"""
+        job = self._submit(steps=4)
+        self.assertEqual(job.job_type, JOB_TYPE)
+        self.assertEqual(job.project, self.project)
+        self.assertEqual(job.status, JOB_STATE_DONE)
+        self.assertEqual(job.progress, 100)
+        self.assertEqual(
+            list(job.log_entries.values_list('message', flat=True)),
+            ['Job started', 'Step 1', 'Step 2', 'Step 3', 'Step 4']
+            + ['Job succeeded'],
+        )
+
+    def test_submit_fail(self):
+        """Test submitting a failing job"""
+        job = self._submit(JOB_TYPE_FAIL)
+        self.assertEqual(job.status, JOB_STATE_FAILED)
+        self.assertEqual(
+            job.log_entries.last().message, 'Job failed: Test failure'
+        )
+
+    def test_submit_unknown(self):
+        """Test submitting an unknown job type"""
+        with self.assertRaises(JobTypeException):
+            self._submit('bgjobs.unknown')
+        self.assertEqual(BackgroundJob.objects.count(), 0)
+
+    def test_set_progress(self):
+        """Test set_progress()"""
+        job = BackgroundJob.objects.create(
+            project=self.project, user=self.user, job_type=JOB_TYPE, name='Job'
+        )
+        job.set_progress(1, 3)
+        job.refresh_from_db()
+        self.assertEqual(job.progress, 33)
+
+    @override_settings(BGJOBS_MAX_PROJECT_JOBS=1)
+    def test_submit_project_limit(self):
+        """Test submitting with per-project limit reached"""
+        BackgroundJob.objects.create(
+            project=self.project,
+            user=self.make_user('user2'),
+            job_type=JOB_TYPE,
+            name='Job',
+            status=JOB_STATE_INITIAL,
+        )
+        with self.assertRaises(JobLimitException):
+            self._submit()
+        self.assertEqual(BackgroundJob.objects.count(), 1)
+
+    @override_settings(BGJOBS_MAX_USER_JOBS=1)
+    def test_submit_user_limit(self):
+        """Test submitting with per-user limit reached"""
+        BackgroundJob.objects.create(
+            project=None,
+            user=self.user,
+            job_type=JOB_TYPE,
+            name='Job',
+            status=JOB_STATE_INITIAL,
+        )
+        with self.assertRaises(JobLimitException):
+            self._submit()
+
+    @override_settings(BGJOBS_MAX_USER_JOBS=1)
+    def test_submit_user_limit_done(self):
+        """Test submitting with per-user limit and finished jobs"""
+        BackgroundJob.objects.create(
+            project=None,
+            user=self.user,
+            job_type=JOB_TYPE,
+            name='Job',
+            status=JOB_STATE_DONE,
+        )
+        job = self._submit()
+        self.assertEqual(job.status, JOB_STATE_DONE)
+
+    def test_delete_jobs(self):
+        """Test running the job for deleting jobs"""
+        old_job = BackgroundJob.objects.create(
+            project=self.project,
+            user=self.user,
+            job_type=JOB_TYPE,
+            name='Old',
+            status=JOB_STATE_DONE,
+        )
+        old_job.add_log_entry('Entry')
+        job = self._submit(
+            DELETE_JOBS_JOB_TYPE, project_uuid=str(self.project.sodar_uuid)
+        )
+        self.assertEqual(job.status, JOB_STATE_DONE)
+        self.assertEqual(list(BackgroundJob.objects.all()), [job])
+
+    def test_delete_jobs_active(self):
+        """Test running the job for deleting jobs with an active job"""
+        old_job = BackgroundJob.objects.create(
+            project=self.project,
+            user=self.user,
+            job_type=JOB_TYPE,
+            name='Old',
+            status=JOB_STATE_DONE,
+        )
+        active_job = BackgroundJob.objects.create(
+            project=self.project,
+            user=self.user,
+            job_type=JOB_TYPE,
+            name='Active',
+            status=JOB_STATE_RUNNING,
+        )
+        job = self._submit(
+            DELETE_JOBS_JOB_TYPE, project_uuid=str(self.project.sodar_uuid)
+        )
+        self.assertEqual(job.status, JOB_STATE_DONE)
+        self.assertFalse(BackgroundJob.objects.filter(pk=old_job.pk).exists())
+        self.assertEqual(
+            sorted(BackgroundJob.objects.values_list('pk', flat=True)),
+            sorted([job.pk, active_job.pk]),
+        )
@@ -0,0 +1,71 @@
+"""Ajax API view tests for the bgjobs app"""
+
+from django.test import override_settings
+from django.urls import reverse
+
+# Projectroles dependency
+from projectroles.tests.test_models import (
+    ProjectMixin,
+    RoleAssignmentMixin,
+)
+from projectroles.tests.test_views import (
+    TestViewsBase,
+    PROJECT_TYPE_PROJECT,
+)
+
+from bgjobs.tests.test_models import BackgroundJobMixin
+
+
+class TestBackgroundJobLogAjaxView(
+    ProjectMixin, RoleAssignmentMixin, BackgroundJobMixin, TestViewsBase
+):
+    """Tests for BackgroundJobLogAjaxView"""
+
+    def setUp(self):
+        super().setUp()
+        self.project = self._make_project(
+            'TestProject', PROJECT_TYPE_PROJECT, None
+        )
+        self.owner_as = self._make_assignment(
+            self.project, self.user, self.role_owner
+        )
+        self.job = self._make_job(self.project, self.user)
+        for i in range(5):
+            self.job.add_log_entry('Entry {}'.format(i))
+        self.url = reverse(
+            'bgjobs:ajax_log', kwargs={'backgroundjob': self.job.sodar_uuid}
+        )
+
+    @override_settings(BGJOBS_LOG_PAGINATION=2)
+    def test_get(self):
+        """Test log entry retrieval"""
+        with self.login(self.user):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(response.data['page'], 1)
+        self.assertEqual(response.data['pages'], 3)
+        self.assertEqual(
+            [e['message'] for e in response.data['entries']],
+            ['Entry 0', 'Entry 1'],
+        )
+
+    @override_settings(BGJOBS_LOG_PAGINATION=2)
+    def test_get_page(self):
+        """Test log entry retrieval with page number"""
+        with self.login(self.user):
+            response = self.client.get(self.url, {'page': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [e['message'] for e in response.data['entries']], ['Entry 4']
+        )
+
+    def test_get_invalid_page(self):
+        """Test log entry retrieval with invalid page numbers"""
+        with self.login(self.user):
+            self.assertEqual(
+                self.client.get(self.url, {'page': 'x'}).status_code, 400
+            )
+            self.assertEqual(
+                self.client.get(self.url, {'page': 2}).status_code, 404
+            )
@@ -5,12 +5,12 @@ Note that the job detail view is implemented
 """
 
 from django.conf.urls import url
-from bgjobs import views
+from bgjobs import views, views_ajax
 
 app_name = 'bgjobs'
 
 
-urlpatterns = [
+urls_ui = [
     # List jobs that the user has access to
     url(
         regex=r'^(?P<project>[0-9a-f-]+)/list$',
@@ -36,3 +36,15 @@ urlpatterns = [
         name='site_list',
     ),
 ]
+
+# Ajax API views
+urls_ajax = [
+    # Retrieve a page of log entries for a job
+    url(
+        regex=r'^ajax/log/(?P<backgroundjob>[0-9a-f-]+)$',
+        view=views_ajax.BackgroundJobLogAjaxView.as_view(),
+        name='ajax_log',
+    ),
+]
+
+urlpatterns = urls_ui + urls_ajax
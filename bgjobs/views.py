@@ -86,9 +86,9 @@ class BackgroundJobClearViewBase(
             filter_kwargs['user'] = self.request.user
 
         try:
-            bg_jobs = BackgroundJob.objects.filter(**filter_kwargs)
-            bg_job_count = bg_jobs.count()
-            bg_jobs.delete()
+            bg_job_count = BackgroundJob.objects.delete_bulk(
+                BackgroundJob.objects.filter(**filter_kwargs)
+            )
 
             timeline = get_backend_api('timeline_backend')
             if timeline:
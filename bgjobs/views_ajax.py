@@ -0,0 +1,63 @@
+"""Ajax API views for the bgjobs app"""
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.utils.timezone import localtime
+
+from rest_framework.response import Response
+
+# Projectroles dependency
+from projectroles.views_ajax import SODARBaseProjectAjaxView
+
+from bgjobs.models import BackgroundJob
+
+
+# Local constants
+DEFAULT_LOG_PAGINATION = 100
+
+
+class BackgroundJobLogAjaxView(SODARBaseProjectAjaxView):
+    """
+    Ajax view for retrieving a page of log entries for a background job.
+
+    Query parameters:
+
+    - ``page``: Page number, starting from 1 (int, optional)
+    """
+
+    permission_required = 'bgjobs.view_data'
+
+    def get(self, request, *args, **kwargs):
+        job = BackgroundJob.objects.filter(
+            sodar_uuid=self.kwargs['backgroundjob']
+        ).first()
+        if not job:
+            return Response({'detail': 'Job not found'}, status=404)
+        paginator = Paginator(
+            job.log_entries.only('date_created', 'level', 'message'),
+            getattr(settings, 'BGJOBS_LOG_PAGINATION', DEFAULT_LOG_PAGINATION),
+        )
+        try:
+            page = paginator.page(request.GET.get('page', 1))
+        except PageNotAnInteger:
+            return Response({'detail': 'Invalid page number'}, status=400)
+        except EmptyPage:
+            return Response({'detail': 'Page not found'}, status=404)
+        ret = {
+            'status': job.status,
+            'progress': job.progress,
+            'count': paginator.count,
+            'page': page.number,
+            'pages': paginator.num_pages,
+            'entries': [
+                {
+                    'date_created': localtime(e.date_created).strftime(
+                        '%Y-%m-%d %H:%M:%S'
+                    ),
+                    'level': e.level,
+                    'message': e.message,
+                }
+                for e in page.object_list
+            ],
+        }
+        return Response(ret, status=200)
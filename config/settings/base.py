@@ -317,12 +317,15 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework.authentication.BasicAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-        'knox.auth.TokenAuthentication',
+        'tokens.auth.CachedTokenAuthentication',
     )
 }
 
 # Knox settings
 TOKEN_TTL = None
+# Cache timeout for verified tokens in seconds, 0 to disable caching
+# NOTE: Only enable with a cache backend shared between server processes
+TOKENS_AUTH_CACHE_TIMEOUT = env.int('TOKENS_AUTH_CACHE_TIMEOUT', 0)
 
 # Settings for HTTP AuthBasic
 BASICAUTH_REALM = 'Log in with user@DOMAIN and your password.'
@@ -567,6 +570,8 @@ ENABLED_BACKEND_PLUGINS = env.list(
 SODAR_API_DEFAULT_VERSION = '0.1'
 SODAR_API_ALLOWED_VERSIONS = [SODAR_API_DEFAULT_VERSION]
 SODAR_API_MEDIA_TYPE = 'application/your.application+json'
+SODAR_API_PAGE_SIZE = env.int('SODAR_API_PAGE_SIZE', 100)
+SODAR_API_MAX_PAGE_SIZE = env.int('SODAR_API_MAX_PAGE_SIZE', 1000)
 SODAR_API_DEFAULT_HOST = env.url(
     'SODAR_API_DEFAULT_HOST', 'http://0.0.0.0:8000'
 )
@@ -600,10 +605,17 @@ PROJECTROLES_SEND_EMAIL = env.bool('PROJECTROLES_SEND_EMAIL', False)
 PROJECTROLES_EMAIL_SENDER_REPLY = env.bool(
     'PROJECTROLES_EMAIL_SENDER_REPLY', False
 )
+# Email dispatch: "sync", "commit" (after transaction), "celery" or "locmem"
+PROJECTROLES_EMAIL_QUEUE = env.str('PROJECTROLES_EMAIL_QUEUE', 'sync')
+PROJECTROLES_EMAIL_RETRIES = env.int('PROJECTROLES_EMAIL_RETRIES', 2)
+PROJECTROLES_EMAIL_RETRY_DELAY = env.int('PROJECTROLES_EMAIL_RETRY_DELAY', 1)
 # Custom header and footer
 PROJECTROLES_EMAIL_HEADER = env.str('PROJECTROLES_EMAIL_HEADER', None)
 PROJECTROLES_EMAIL_FOOTER = env.str('PROJECTROLES_EMAIL_FOOTER', None)
 
+# Project modify side effects: "sync", "commit" (after transaction) or "celery"
+PROJECTROLES_MODIFY_PIPELINE = env.str('PROJECTROLES_MODIFY_PIPELINE', 'sync')
+
 PROJECTROLES_ENABLE_SEARCH = env.bool('PROJECTROLES_ENABLE_SEARCH', True)
 
 # Optional projectroles settings
@@ -616,6 +628,8 @@ PROJECTROLES_SIDEBAR_ICON_SIZE = env.int('PROJECTROLES_SIDEBAR_ICON_SIZE', 36)
 # PROJECTROLES_KIOSK_MODE = env.bool('PROJECTROLES_KIOSK_MODE', False)
 
 PROJECTROLES_HIDE_APP_LINKS = env.list('PROJECTROLES_HIDE_APP_LINKS', None, [])
+# Cache timeout in seconds for app visibility (0 = disable caching)
+PROJECTROLES_APP_CACHE_TIMEOUT = env.int('PROJECTROLES_APP_CACHE_TIMEOUT', 300)
 
 # Set limit for delegate roles per project (if 0, no limit is applied)
 PROJECTROLES_DELEGATE_LIMIT = env.int('PROJECTROLES_DELEGATE_LIMIT', 1)
@@ -649,6 +663,20 @@ if PROJECTROLES_ENABLE_PROFILING:
 
 # Bgjobs app settings
 BGJOBS_PAGINATION = env.int('BGJOBS_PAGINATION', 15)
+# Job runner: "celery", "local" (process pool) or "sync" (in current process)
+BGJOBS_RUNNER = env.str('BGJOBS_RUNNER', 'celery')
+BGJOBS_LOCAL_WORKERS = env.int('BGJOBS_LOCAL_WORKERS', 2)
+# Limits for active jobs, 0 for no limit
+BGJOBS_MAX_PROJECT_JOBS = env.int('BGJOBS_MAX_PROJECT_JOBS', 0)
+BGJOBS_MAX_USER_JOBS = env.int('BGJOBS_MAX_USER_JOBS', 0)
+# Job log entry buffering and retention, 0 for no retention limit
+BGJOBS_LOG_BUFFER_SIZE = env.int('BGJOBS_LOG_BUFFER_SIZE', 100)
+BGJOBS_LOG_FLUSH_INTERVAL = env.int('BGJOBS_LOG_FLUSH_INTERVAL', 5)
+BGJOBS_LOG_PAGINATION = env.int('BGJOBS_LOG_PAGINATION', 100)
+BGJOBS_LOG_RETENTION_DAYS = env.int('BGJOBS_LOG_RETENTION_DAYS', 0)
+BGJOBS_LOG_MAX_ENTRIES = env.int('BGJOBS_LOG_MAX_ENTRIES', 0)
+# Number of rows to delete per query when clearing jobs
+BGJOBS_DELETE_BATCH_SIZE = env.int('BGJOBS_DELETE_BATCH_SIZE', 1000)
 
 
 # Timeline app settings
@@ -666,6 +694,8 @@ FILESFOLDERS_SERVE_AS_ATTACHMENT = env.bool(
 FILESFOLDERS_LINK_BAD_REQUEST_MSG = env.str(
     'FILESFOLDERS_LINK_BAD_REQUEST_MSG', 'Invalid request'
 )
+# Extract archives of this size or larger in a background job (0 = disabled)
+FILESFOLDERS_BG_ARCHIVE_SIZE = env.int('FILESFOLDERS_BG_ARCHIVE_SIZE', 0)
 # Custom project list column example
 FILESFOLDERS_SHOW_LIST_COLUMNS = env.bool(
     'FILESFOLDERS_SHOW_LIST_COLUMNS', True
@@ -678,11 +708,25 @@ ADMINALERTS_PAGINATION = env.int('ADMINALERTS_PAGINATION', 15)
 
 # Appalerts app settings
 APPALERTS_STATUS_INTERVAL = env.int('APPALERTS_STATUS_INTERVAL', 5)
+# Long polling for status updates, polling in intervals is used as fallback
+APPALERTS_STATUS_WAIT = env.bool('APPALERTS_STATUS_WAIT', False)
+APPALERTS_STATUS_WAIT_TIMEOUT = env.int('APPALERTS_STATUS_WAIT_TIMEOUT', 5)
+# Alert count caching requires a cache backend shared between processes
+APPALERTS_COUNT_CACHE_TIMEOUT = env.int('APPALERTS_COUNT_CACHE_TIMEOUT', 0)
+# Age in days for deleting inactive alerts with cleanappalerts
+APPALERTS_CLEANUP_DAYS = env.int('APPALERTS_CLEANUP_DAYS', 90)
 
 
 # Taskflow backend settings
 TASKFLOW_SODAR_SECRET = env.str('TASKFLOW_SODAR_SECRET', 'CHANGE ME!')
 TASKFLOW_TEST_MODE = False  # Important! Disallow cleanup() command by default
+TASKFLOW_BACKEND_CONNECT_TIMEOUT = env.int(
+    'TASKFLOW_BACKEND_CONNECT_TIMEOUT', 5
+)
+TASKFLOW_BACKEND_READ_TIMEOUT = env.int('TASKFLOW_BACKEND_READ_TIMEOUT', 300)
+TASKFLOW_BACKEND_RETRIES = env.int('TASKFLOW_BACKEND_RETRIES', 3)
+TASKFLOW_BACKEND_BACKOFF = env.float('TASKFLOW_BACKEND_BACKOFF', 0.5)
+TASKFLOW_BACKEND_POOL_SIZE = env.int('TASKFLOW_BACKEND_POOL_SIZE', 10)
 
 
 # SODAR constants
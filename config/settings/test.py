@@ -102,6 +102,7 @@ PROJECTROLES_SIDEBAR_ICON_SIZE = 36
 
 # Bgjobs app settings
 BGJOBS_PAGINATION = 15
+BGJOBS_RUNNER = 'sync'
 
 # Timeline app settings
 TIMELINE_PAGINATION = 15
@@ -114,6 +115,7 @@ FILESFOLDERS_MAX_UPLOAD_SIZE = 10485760
 FILESFOLDERS_MAX_ARCHIVE_SIZE = 52428800
 FILESFOLDERS_SERVE_AS_ATTACHMENT = False
 FILESFOLDERS_LINK_BAD_REQUEST_MSG = 'Invalid request'
+FILESFOLDERS_BG_ARCHIVE_SIZE = 0
 FILESFOLDERS_SHOW_LIST_COLUMNS = True
 
 # UI test settings
@@ -0,0 +1,370 @@
+"""Zip archive extraction for the filesfolders app"""
+
+import base64
+import time
+
+from tempfile import SpooledTemporaryFile
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED
+
+from django.core.files import File as DjangoFile
+from django.db import transaction
+from django.db.models import Q
+
+# Projectroles dependency
+from projectroles.plugins import get_backend_api
+from projectroles.utils import build_secret
+
+from db_file_storage.storage import DatabaseFileStorage
+
+from filesfolders.utils import get_folder_paths
+from filesfolders.models import (
+    File,
+    FileData,
+    Folder,
+    FILE_DATA_PATH,
+    TEMP_ARCHIVE_PREFIX,
+)
+
+
+# Local constants
+APP_NAME = 'filesfolders'
+ARCHIVE_CHUNK_SIZE = 64 * 1024
+ARCHIVE_SPOOL_SIZE = 1024 * 1024
+ARCHIVE_FILE_BATCH_SIZE = 50
+ARCHIVE_FETCH_SIZE = 10
+# Must be divisible by 4 for decoding base64 data in chunks
+ARCHIVE_B64_CHUNK_SIZE = 4 * 16 * 1024
+
+
+def get_b64_size(data):
+    """
+    Return decoded size of base64 encoded data without decoding it.
+
+    :param data: Base64 encoded data (string or bytes)
+    :return: Size in bytes (int)
+    """
+    padding = 0
+    if data[-2:] in ('==', b'=='):
+        padding = 2
+    elif data[-1:] in ('=', b'='):
+        padding = 1
+    return len(data) // 4 * 3 - padding
+
+
+def get_subtree_folders(project, folder=None):
+    """
+    Return a folder and all folders under it in a single query.
+
+    :param project: Project object
+    :param folder: Folder object or None for all folders in project
+    :return: QuerySet of Folder objects
+    """
+    folders = Folder.objects.filter(project=project)
+    if folder:
+        folders = folders.filter(
+            Q(pk=folder.pk)
+            | Q(tree_path__startswith=folder.get_child_tree_path())
+        )
+    return folders
+
+
+def store_archive(archive):
+    """
+    Store an uploaded archive in the database for background extraction. The
+    archive is not deduplicated, so it can be released independently of files.
+
+    :param archive: Uploaded archive (File object)
+    :return: Name of the archive in storage (string)
+    """
+    return DatabaseFileStorage().save(
+        '{}/{}{}'.format(FILE_DATA_PATH, TEMP_ARCHIVE_PREFIX, archive.name),
+        archive,
+    )
+
+
+def open_archive(archive_name):
+    """
+    Open an archive stored with store_archive().
+
+    :param archive_name: Name of the archive in storage (string)
+    :return: ContentFile object
+    """
+    return DatabaseFileStorage().open(archive_name)
+
+
+class ArchiveExtractor:
+    """
+    Extract files and folders from a Zip archive into a project.
+
+    Archive members are read in chunks, existing folders are cached by path
+    and new objects are created in bulk.
+    """
+
+    def __init__(self, archive, project, folder, user):
+        """
+        Initialize the extractor.
+
+        :param archive: Zip archive (file-like object)
+        :param project: Project object
+        :param folder: Folder object to extract into or None for root
+        :param user: User object set as owner of extracted objects
+        :raise: BadZipFile if the archive can not be read
+        """
+        self.zip_file = ZipFile(archive)
+        self.project = project
+        self.folder = folder
+        self.user = user
+        self.members = [f for f in self.zip_file.infolist() if not f.is_dir()]
+        self.new_folders = []
+        self.new_files = []
+        self._folder_cache = None
+        self._base_path = None
+
+    @classmethod
+    def _split_path(cls, member):
+        """Return folder path tuple and file name for archive member"""
+        split = member.filename.split('/')
+        return tuple(split[:-1]), split[-1]
+
+    def _init_folder_cache(self):
+        """Cache existing target folder and subfolders by path"""
+        if self._folder_cache is not None:
+            return
+        folders = get_subtree_folders(self.project, self.folder)
+        paths = get_folder_paths(folders)
+        self._folder_cache = {paths[f.pk]: f for f in folders}
+        self._base_path = paths[self.folder.pk] if self.folder else ()
+        self._folder_cache[self._base_path] = self.folder
+
+    def _read_member(self, member):
+        """Read archive member in chunks into a spooled temporary file"""
+        tmp_file = SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_SIZE)
+        with self.zip_file.open(member) as src:
+            while True:
+                chunk = src.read(ARCHIVE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                tmp_file.write(chunk)
+        tmp_file.seek(0)
+        return tmp_file
+
+    def _create_folders(self):
+        """Create missing folders in bulk, one depth level at a time"""
+        paths = set()
+        for m in self.members:
+            dir_path = self._split_path(m)[0]
+            for i in range(1, len(dir_path) + 1):
+                paths.add(self._base_path + dir_path[:i])
+        for depth in sorted(set(len(p) for p in paths)):
+            new_folders = {
+                p: Folder(
+                    name=p[-1],
+                    project=self.project,
+                    folder=self._folder_cache[p[:-1]],
+                    owner=self.user,
+                )
+                for p in sorted(paths)
+                if len(p) == depth and p not in self._folder_cache
+            }
+            if not new_folders:
+                continue
+            for f in new_folders.values():
+                f.tree_path = f.build_tree_path()
+            Folder.objects.bulk_create(new_folders.values())
+            # Retrieve created folders to ensure primary keys are set
+            created = {
+                f.sodar_uuid: f
+                for f in Folder.objects.filter(
+                    sodar_uuid__in=[f.sodar_uuid for f in new_folders.values()]
+                )
+            }
+            for p, f in new_folders.items():
+                self._folder_cache[p] = created[f.sodar_uuid]
+                self.new_folders.append(created[f.sodar_uuid])
+
+    def get_conflicts(self):
+        """
+        Return archive paths of files which already exist in the project.
+
+        :return: List of strings
+        """
+        self._init_folder_cache()
+        existing = set(
+            File.objects.filter(project=self.project).values_list(
+                'folder', 'name'
+            )
+        )
+        ret = []
+        for m in self.members:
+            dir_path, file_name = self._split_path(m)
+            path = self._base_path + dir_path
+            if path not in self._folder_cache:
+                continue
+            folder = self._folder_cache[path]
+            if (folder.pk if folder else None, file_name) in existing:
+                ret.append(m.filename)
+        return ret
+
+    def extract(self, progress=None):
+        """
+        Extract archive contents into the project.
+
+        :param progress: Optional callback receiving the number of extracted
+                         files and the total file count
+        :return: List of new Folder objects, list of new File objects
+        """
+        self._init_folder_cache()
+        total = len(self.members)
+        with transaction.atomic():
+            self._create_folders()
+            for i in range(0, total, ARCHIVE_FILE_BATCH_SIZE):
+                batch = []
+                for m in self.members[i : i + ARCHIVE_FILE_BATCH_SIZE]:
+                    dir_path, file_name = self._split_path(m)
+                    new_file = File(
+                        name=file_name,
+                        project=self.project,
+                        folder=self._folder_cache[self._base_path + dir_path],
+                        owner=self.user,
+                        secret=build_secret(),
+                    )
+                    with self._read_member(m) as tmp_file:
+                        content = DjangoFile(tmp_file, name=file_name)
+                        new_file.file = content
+                        new_file.set_file_info()
+                        new_file.file.save(file_name, content, save=False)
+                    batch.append(new_file)
+                File.objects.bulk_create(batch)
+                self.new_files += batch
+                if progress:
+                    progress(len(self.new_files), total)
+        return self.new_folders, self.new_files
+
+    def add_timeline_event(self, archive_name):
+        """
+        Add a single timeline event summarizing the extraction.
+
+        :param archive_name: Name of the extracted archive (string)
+        """
+        timeline = get_backend_api('timeline_backend')
+        if not timeline:
+            return
+        timeline.add_event(
+            project=self.project,
+            app_name=APP_NAME,
+            user=self.user,
+            event_name='archive_extract',
+            description='Extract from archive "{}", create {} folders '
+            'and {} files'.format(
+                archive_name, len(self.new_folders), len(self.new_files)
+            ),
+            extra_data={
+                'new_folders': [f.name for f in self.new_folders],
+                'new_files': [f.name for f in self.new_files],
+            },
+            status_type='OK',
+        )
+
+
+class _ZipStreamBuffer:
+    """Unseekable write buffer for streaming Zip archive output"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        """Return and clear written data"""
+        ret = b''.join(self._chunks)
+        self._chunks = []
+        return ret
+
+
+class ArchiveStreamer:
+    """
+    Stream the files and folders of a project or folder as a Zip archive.
+
+    The folder tree and file list are retrieved in a fixed number of queries.
+    The archive is built on the fly while iterating over the streamer, decoding
+    stored file data in chunks without buffering the whole archive.
+    """
+
+    def __init__(self, project, folder=None):
+        """
+        Initialize the streamer.
+
+        :param project: Project object
+        :param folder: Folder object or None for the whole project
+        """
+        self.project = project
+        self.folder = folder
+        folders = get_subtree_folders(project, folder)
+        paths = get_folder_paths(folders)
+        base_path = paths[folder.pk] if folder else ()
+        #: Archive folder paths by Folder pk
+        self.dir_paths = {
+            pk: '/'.join(p[len(base_path) :])
+            for pk, p in paths.items()
+            if p[: len(base_path)] == base_path and p != base_path
+        }
+        if folder:
+            self.dir_paths[folder.pk] = ''
+        else:
+            self.dir_paths[None] = ''
+        #: Archive file paths by file name in storage
+        self.file_paths = {}
+        #: Number of files in the archive
+        self.file_count = 0
+        files = (
+            File.objects.filter(project=project)
+            .exclude(file='')
+            .exclude(file__isnull=True)
+            .values_list('folder', 'name', 'file')
+        )
+        for folder_pk, name, file_name in files:
+            if folder_pk not in self.dir_paths:
+                continue
+            dir_path = self.dir_paths[folder_pk]
+            self.file_paths.setdefault(file_name, []).append(
+                '{}/{}'.format(dir_path, name) if dir_path else name
+            )
+            self.file_count += 1
+
+    def get_archive_name(self):
+        """Return file name for the archive"""
+        return '{}.zip'.format(
+            self.folder.name if self.folder else self.project.title
+        )
+
+    def __iter__(self):
+        buf = _ZipStreamBuffer()
+        with ZipFile(buf, mode='w', compression=ZIP_DEFLATED) as zip_file:
+            for dir_path in sorted(p for p in self.dir_paths.values() if p):
+                zip_file.writestr(dir_path + '/', b'')
+            yield buf.pop()
+            file_data = (
+                FileData.objects.filter(file_name__in=self.file_paths.keys())
+                .values_list('file_name', 'bytes')
+                .iterator(chunk_size=ARCHIVE_FETCH_SIZE)
+            )
+            for file_name, data in file_data:
+                for path in self.file_paths[file_name]:
+                    # Set file size so zip64 is used for files over 2 GiB
+                    info = ZipInfo(path, date_time=time.localtime()[:6])
+                    info.compress_type = ZIP_DEFLATED
+                    info.file_size = get_b64_size(data)
+                    with zip_file.open(info, mode='w') as dest:
+                        for i in range(0, len(data), ARCHIVE_B64_CHUNK_SIZE):
+                            dest.write(
+                                base64.b64decode(
+                                    data[i : i + ARCHIVE_B64_CHUNK_SIZE]
+                                )
+                            )
+                            yield buf.pop()
+        yield buf.pop()
@@ -1,7 +1,5 @@
 """Forms for the filesfolders app"""
 
-from zipfile import ZipFile
-
 from django import forms
 from django.conf import settings
 from django.template.defaultfilters import filesizeformat
@@ -14,7 +12,9 @@ from projectroles.forms import SODARModelForm
 from projectroles.models import Project
 from projectroles.utils import build_secret
 
+from filesfolders.archive import ArchiveExtractor
 from filesfolders.models import File, Folder, HyperLink
+from filesfolders.utils import get_folder_choices
 
 
 app_settings = AppSettingAPI()
@@ -84,17 +84,15 @@ class FolderForm(FilesfoldersItemForm):
         # Updating
         else:
             # Allow moving folder inside other folders in project
-            folder_choices = [(None, 'root')]
-            folders = Folder.objects.filter(
-                project=self.instance.project.pk
-            ).exclude(pk=self.instance.pk)
-
-            # Exclude everything under current folder
-            folders = [f for f in folders if not f.has_in_path(self.instance)]
-            for f in folders:
-                folder_choices.append((f.sodar_uuid, f.get_path()))
-
-            self.fields['folder'].choices = folder_choices
+            # Exclude current folder and everything under it
+            folders = (
+                Folder.objects.filter(project=self.instance.project.pk)
+                .exclude(pk=self.instance.pk)
+                .exclude(
+                    tree_path__startswith=self.instance.get_child_tree_path()
+                )
+            )
+            self.fields['folder'].choices = get_folder_choices(folders)
             self.initial['folder'] = (
                 self.instance.folder.sodar_uuid
                 if self.instance.folder
@@ -230,10 +228,9 @@ class FileForm(FilesfoldersItemForm):
         # Updating
         else:
             # Allow moving file inside other folders in project
-            folder_choices = [(None, 'root')]
-            for f in Folder.objects.filter(project=self.instance.project.pk):
-                folder_choices.append((f.sodar_uuid, f.get_path()))
-            self.fields['folder'].choices = folder_choices
+            self.fields['folder'].choices = get_folder_choices(
+                Folder.objects.filter(project=self.instance.project.pk)
+            )
             self.initial['folder'] = (
                 self.instance.folder.sodar_uuid
                 if self.instance.folder
@@ -276,40 +273,31 @@ class FileForm(FilesfoldersItemForm):
                 return self.cleaned_data
 
             try:
-                zip_file = ZipFile(file)
+                extractor = ArchiveExtractor(
+                    file, project, folder, self.current_user
+                )
             except Exception as ex:
                 self.add_error('file', 'Unable to open zip file: {}'.format(ex))
                 return self.cleaned_data
 
-            archive_files = [f for f in zip_file.infolist() if not f.is_dir()]
-            if len(archive_files) == 0:
+            if len(extractor.members) == 0:
                 self.add_error(
                     'file', 'Found nothing to extract from zip archive'
                 )
                 return self.cleaned_data
 
-            for f in archive_files:
+            for f in extractor.members:
                 # Ensure file size
                 if not self._check_size(f.file_size, MAX_UPLOAD_SIZE):
                     return self.cleaned_data
-                # Check if any of the files exist
-                path_split = f.filename.split('/')
-                check_folder = folder
-
-                for p in path_split[:-1]:
-                    # Advance in path
-                    check_folder = Folder.objects.filter(
-                        name=p, folder=check_folder
-                    ).first()
-
-                # Once reached the correct path, check if file exists
-                if File.objects.filter(
-                    name=path_split[-1], folder=check_folder
-                ).first():
-                    self.add_error(
-                        'file', 'File already exists: {}'.format(f.filename)
-                    )
-                    return self.cleaned_data
+
+            # Check if any of the files exist
+            conflicts = extractor.get_conflicts()
+            if conflicts:
+                self.add_error(
+                    'file', 'File already exists: {}'.format(conflicts[0])
+                )
+                return self.cleaned_data
 
         # Creation
         if (
@@ -425,10 +413,9 @@ class HyperLinkForm(FilesfoldersItemForm):
         # Updating
         else:
             # Allow moving file inside other folders in project
-            folder_choices = [(None, 'root')]
-            for f in Folder.objects.filter(project=self.instance.project.pk):
-                folder_choices.append((f.sodar_uuid, f.get_path()))
-            self.fields['folder'].choices = folder_choices
+            self.fields['folder'].choices = get_folder_choices(
+                Folder.objects.filter(project=self.instance.project.pk)
+            )
             self.initial['folder'] = (
                 self.instance.folder.sodar_uuid
                 if self.instance.folder
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+
+# Projectroles dependency
+from projectroles.management.logging import ManagementCommandLogger
+
+from filesfolders.models import FileData
+
+
+logger = ManagementCommandLogger(__name__)
+
+
+# Local constants
+START_MSG = 'Checking database for orphaned file data..'
+END_MSG = 'OK'
+
+
+class Command(BaseCommand):
+    help = (
+        'Cleans up stored file data not referred to by any filesfolders file.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-c',
+            '--check',
+            dest='check',
+            required=False,
+            default=False,
+            action='store_true',
+            help='Report orphaned file data without deleting it',
+        )
+
+    def handle(self, *args, **options):
+        logger.info(START_MSG)
+        orphans = FileData.objects.get_orphans()
+        orphan_count = orphans.count()
+        if options.get('check'):
+            logger.info(
+                'Found {} orphaned file data object{}'.format(
+                    orphan_count, 's' if orphan_count != 1 else ''
+                )
+            )
+        elif orphan_count > 0:
+            orphans.delete()
+            logger.info(
+                'Deleted {} orphaned file data object{}'.format(
+                    orphan_count, 's' if orphan_count != 1 else ''
+                )
+            )
+        logger.info(END_MSG)
@@ -0,0 +1,41 @@
+# Generated by Django 3.2.25 on 2026-10-19 06:32
+
+import base64
+import hashlib
+
+from django.db import migrations, models
+import filesfolders.storage
+
+
+def populate_content_hash(apps, schema_editor):
+    """Populate the new content_hash field in the FileData model"""
+    FileData = apps.get_model('filesfolders', 'FileData')
+    for file_data in FileData.objects.filter(content_hash='').iterator():
+        file_data.content_hash = hashlib.sha256(
+            base64.b64decode(file_data.bytes)
+        ).hexdigest()
+        file_data.save(update_fields=['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('filesfolders', '0004_update_uuid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='filedata',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA256 hash of file content for deduplication', max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='file',
+            name='file',
+            field=models.FileField(blank=True, help_text='Uploaded file', null=True, storage=filesfolders.storage.FilesfoldersStorage(), upload_to='filesfolders.FileData/bytes/file_name/content_type'),
+        ),
+        migrations.RunPython(
+            populate_content_hash,
+            reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.25 on 2026-10-19 06:40
+
+from django.db import migrations, models
+
+
+def populate_tree_path(apps, schema_editor):
+    """Populate the new tree_path field in the Folder model"""
+    Folder = apps.get_model('filesfolders', 'Folder')
+    folders = list(Folder.objects.only('pk', 'folder'))
+    parents = {f.pk: f.folder_id for f in folders}
+    paths = {}
+
+    def get_tree_path(pk):
+        if pk not in paths:
+            parent = parents[pk]
+            paths[pk] = (
+                '{}{}/'.format(get_tree_path(parent), parent) if parent else '/'
+            )
+        return paths[pk]
+
+    for f in folders:
+        f.tree_path = get_tree_path(f.pk)
+    Folder.objects.bulk_update(folders, ['tree_path'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('filesfolders', '0005_filedata_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='folder',
+            name='tree_path',
+            field=models.CharField(db_index=True, default='/', editable=False, help_text='Primary keys of parent folders as a path string (auto-generated)', max_length=2048),
+        ),
+        migrations.RunPython(
+            populate_tree_path,
+            reverse_code=migrations.RunPython.noop
+        ),
+    ]
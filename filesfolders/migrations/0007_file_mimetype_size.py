@@ -0,0 +1,42 @@
+# Generated by Django 3.2.25 on 2026-10-19 06:44
+
+import base64
+
+from django.db import migrations, models
+
+
+def populate_file_info(apps, schema_editor):
+    """Populate the new mimetype and size fields in the File model"""
+    File = apps.get_model('filesfolders', 'File')
+    FileData = apps.get_model('filesfolders', 'FileData')
+    file_data = FileData.objects.filter(
+        file_name__in=File.objects.values('file')
+    ).values_list('file_name', 'content_type', 'bytes')
+    for file_name, content_type, data in file_data.iterator(chunk_size=10):
+        File.objects.filter(file=file_name).update(
+            mimetype=content_type, size=len(base64.b64decode(data))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('filesfolders', '0006_folder_tree_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='file',
+            name='mimetype',
+            field=models.CharField(blank=True, editable=False, help_text='Content type of the uploaded file (auto-generated)', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='file',
+            name='size',
+            field=models.BigIntegerField(default=0, editable=False, help_text='Size of the uploaded file in bytes (auto-generated)'),
+        ),
+        migrations.RunPython(
+            populate_file_info,
+            reverse_code=migrations.RunPython.noop
+        ),
+    ]
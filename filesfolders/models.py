@@ -4,13 +4,14 @@ import uuid
 
 from django.conf import settings
 from django.db import models
-from django.db.models import Q
-
-from db_file_storage.model_utils import delete_file, delete_file_if_needed
+from django.db.models import Q, Value
+from django.db.models.functions import Concat, Substr
 
 # Projectroles dependency
 from projectroles.models import Project
 
+from filesfolders.storage import FilesfoldersStorage, get_content_type
+
 
 # Access Django user model
 AUTH_USER_MODEL = getattr(settings, 'AUTH_USER_MODEL', 'auth.User')
@@ -54,6 +55,9 @@ FLAG_CHOICES = [
     (k, FILESFOLDERS_FLAGS[k]['label']) for k in sorted(FILESFOLDERS_FLAGS)
 ]
 
+FILE_DATA_PATH = 'filesfolders.FileData/bytes/file_name/content_type'
+TEMP_ARCHIVE_PREFIX = 'extract_archive_'
+
 
 # Base class -------------------------------------------------------------------
 
@@ -151,6 +155,16 @@ class BaseFilesfoldersClass(models.Model):
 class Folder(BaseFilesfoldersClass):
     """Folder which stores filefolders objects"""
 
+    #: Primary keys of parent folders as a path string (auto-generated)
+    tree_path = models.CharField(
+        max_length=2048,
+        default='/',
+        db_index=True,
+        editable=False,
+        help_text='Primary keys of parent folders as a path string '
+        '(auto-generated)',
+    )
+
     class Meta:
         ordering = ['project', 'name']
         unique_together = ('project', 'folder', 'name')
@@ -170,14 +184,78 @@ class Folder(BaseFilesfoldersClass):
         )
         return 'Folder({})'.format(', '.join(repr(v) for v in values))
 
+    def save(self, *args, **kwargs):
+        """Override save for updating the tree path of folder and children"""
+        old_path = None
+        if not self._state.adding:
+            old_path = (
+                Folder.objects.filter(pk=self.pk)
+                .values_list('tree_path', flat=True)
+                .first()
+            )
+        if self.folder:
+            self.folder.refresh_from_db(fields=['tree_path'])
+        self.tree_path = self.build_tree_path()
+        super().save(*args, **kwargs)
+        # Update children if moved
+        if old_path and old_path != self.tree_path:
+            old_prefix = '{}{}/'.format(old_path, self.pk)
+            Folder.objects.filter(
+                project=self.project, tree_path__startswith=old_prefix
+            ).update(
+                tree_path=Concat(
+                    Value(self.get_child_tree_path()),
+                    Substr('tree_path', len(old_prefix) + 1),
+                )
+            )
+
+    def build_tree_path(self):
+        """
+        Return tree path for the folder based on its parent. Call this to set
+        tree_path if creating folders without calling save().
+
+        :return: String
+        """
+        if not self.folder:
+            return '/'
+        return self.folder.get_child_tree_path()
+
+    def get_child_tree_path(self):
+        """Return tree path for child folders of this folder"""
+        return '{}{}/'.format(self.tree_path, self.pk)
+
+    def get_parent_pks(self):
+        """Return list of parent folder primary keys starting from root"""
+        return [int(pk) for pk in self.tree_path.split('/') if pk]
+
+    def get_parents(self):
+        """
+        Return list of parent folders starting from root in a single query.
+
+        :return: List of Folder objects
+        """
+        pks = self.get_parent_pks()
+        if not pks:
+            return []
+        folders = {f.pk: f for f in Folder.objects.filter(pk__in=pks)}
+        return [folders[pk] for pk in pks]
+
+    def get_children_all(self):
+        """
+        Return all folders under this folder in a single query.
+
+        :return: QuerySet of Folder objects
+        """
+        return Folder.objects.filter(
+            project=self.project,
+            tree_path__startswith=self.get_child_tree_path(),
+        )
+
     def get_path(self):
         """Return full path as str"""
-        if self.folder:
-            ret = self.folder.get_path()
-        else:
-            ret = 'root/'
-        ret += '{}/'.format(self.name)
-        return ret
+        return 'root/{}'.format(
+            ''.join('{}/'.format(f.name) for f in self.get_parents() + [self])
+        )
 
     def is_empty(self):
         """Return True if the folder contains no subfolders, files or links"""
@@ -189,16 +267,47 @@ class Folder(BaseFilesfoldersClass):
 
     def has_in_path(self, folder):
         """Return True if folder exists in this folder's parent path"""
-        if self.folder == folder:
+        if not folder:  # Root is always in path
             return True
-        elif self.folder:
-            return self.folder.has_in_path(folder)
-        return False
+        return folder.pk in self.get_parent_pks()
 
 
 # File -------------------------------------------------------------------------
 
 
+class FileDataManager(models.Manager):
+    """Manager for custom table-level FileData queries"""
+
+    def get_orphans(self):
+        """
+        Return FileData objects not referred to by any File. Archives stored
+        for background extraction are excluded.
+
+        :return: QuerySet of FileData objects
+        """
+        return self.exclude(
+            file_name__in=File.objects.exclude(file='')
+            .exclude(file__isnull=True)
+            .values('file')
+        ).exclude(
+            file_name__startswith='{}/{}'.format(
+                FILE_DATA_PATH, TEMP_ARCHIVE_PREFIX
+            )
+        )
+
+    def release(self, file_name):
+        """
+        Release a reference to stored file data. The data is deleted if no
+        File objects refer to it any longer.
+
+        :param file_name: File name in storage (string)
+        :return: True if data was deleted
+        """
+        if not file_name or File.objects.filter(file=file_name).exists():
+            return False
+        return self.filter(file_name=file_name).delete()[0] > 0
+
+
 class FileData(models.Model):
     """Class for storing actual file data in the Postgres database, needed by
     django-db-file-storage"""
@@ -212,6 +321,17 @@ class FileData(models.Model):
     # Content type
     content_type = models.CharField(max_length=255)
 
+    #: SHA256 hash of file content for deduplication
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        help_text='SHA256 hash of file content for deduplication',
+    )
+
+    # Set manager for custom queries
+    objects = FileDataManager()
+
 
 class FileManager(FilesfoldersManager):
     """Manager for custom table-level File queries"""
@@ -226,14 +346,12 @@ class FileManager(FilesfoldersManager):
         :param mimetype: Mimetype of the readme (default=text/markdown)
         :return: File or None
         """
-        # NOTE: Can't just use get() with file__file__mimetype here
-        readme_files = File.objects.filter(
-            name__istartswith='readme.', project=project_pk, folder=folder_pk
-        )
-        for f in readme_files:
-            if f.file.file.mimetype == mimetype:
-                return f
-        return None
+        return File.objects.filter(
+            name__istartswith='readme.',
+            project=project_pk,
+            folder=folder_pk,
+            mimetype=mimetype,
+        ).first()
 
 
 class File(BaseFilesfoldersClass):
@@ -243,10 +361,26 @@ class File(BaseFilesfoldersClass):
     file = models.FileField(
         blank=True,
         null=True,
-        upload_to='filesfolders.FileData/bytes/file_name/content_type',
+        upload_to=FILE_DATA_PATH,
+        storage=FilesfoldersStorage(),
         help_text='Uploaded file',
     )
 
+    #: Content type of the uploaded file (auto-generated)
+    mimetype = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        help_text='Content type of the uploaded file (auto-generated)',
+    )
+
+    #: Size of the uploaded file in bytes (auto-generated)
+    size = models.BigIntegerField(
+        default=0,
+        editable=False,
+        help_text='Size of the uploaded file in bytes (auto-generated)',
+    )
+
     #: Allow providing a public URL for the file
     public_url = models.BooleanField(
         default=False, help_text='Allow providing a public URL for the file'
@@ -284,14 +418,39 @@ class File(BaseFilesfoldersClass):
         return 'File({})'.format(', '.join(repr(v) for v in values))
 
     def save(self, *args, **kwargs):
-        """Override save for deleting file from database if needed"""
-        delete_file_if_needed(self, 'file')
+        """Override save for setting file info and releasing replaced file
+        data if needed"""
+        old_name = None
+        if self.pk:
+            old_name = (
+                File.objects.filter(pk=self.pk)
+                .values_list('file', flat=True)
+                .first()
+            )
+        self.set_file_info()
         super().save(*args, **kwargs)
+        if old_name and old_name != self.file.name:
+            FileData.objects.release(old_name)
+
+    def set_file_info(self):
+        """
+        Set mimetype and size from a new uploaded file which has not yet been
+        committed to storage. Call this if creating files without calling
+        save().
+        """
+        if not self.file:
+            self.mimetype = ''
+            self.size = 0
+        elif not self.file._committed:
+            self.mimetype = get_content_type(self.file.file)
+            self.size = self.file.size
 
     def delete(self, *args, **kwargs):
-        """Override delete for deleting file from database"""
-        super().delete(*args, **kwargs)
-        delete_file(self, 'file')
+        """Override delete for releasing file data in the database"""
+        file_name = self.file.name
+        ret = super().delete(*args, **kwargs)
+        FileData.objects.release(file_name)
+        return ret
 
 
 class HyperLink(BaseFilesfoldersClass):
@@ -97,6 +97,7 @@ class ProjectAppPlugin(ProjectAppPluginPoint):
 
     #: Names of plugin specific Django settings to display in siteinfo
     info_settings = [
+        'FILESFOLDERS_BG_ARCHIVE_SIZE',
         'FILESFOLDERS_LINK_BAD_REQUEST_MSG',
         'FILESFOLDERS_MAX_ARCHIVE_SIZE',
         'FILESFOLDERS_MAX_UPLOAD_SIZE',
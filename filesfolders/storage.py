@@ -0,0 +1,74 @@
+"""File storage for the filesfolders app"""
+
+import hashlib
+
+from django.utils.deconstruct import deconstructible
+
+from db_file_storage.storage import DatabaseFileStorage
+
+
+# Local constants
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def get_content_hash(content):
+    """
+    Return SHA256 hex digest for the content of a file object.
+
+    :param content: File or ContentFile object
+    :return: String
+    """
+    hasher = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks(chunk_size=HASH_CHUNK_SIZE):
+        hasher.update(chunk)
+    content.seek(0)
+    return hasher.hexdigest()
+
+
+def get_content_type(content):
+    """
+    Return content type for a file object as stored in the database.
+
+    :param content: File or UploadedFile object
+    :return: String
+    """
+    return (
+        getattr(content, 'content_type', None)
+        or getattr(content.file, 'content_type', None)
+        or 'text/plain'
+    )
+
+
+@deconstructible
+class FilesfoldersStorage(DatabaseFileStorage):
+    """
+    Content-addressed database file storage for filesfolders files.
+
+    Identical content with an identical content type is only stored once. If
+    a matching FileData object already exists, its name is returned instead of
+    creating a new object. The data is shared by all File objects referring to
+    it and only deleted once the last reference is released.
+    """
+
+    def _save(self, name, content):
+        storage_attrs = self._get_storage_attributes(name)
+        model_cls = self._get_model_cls(storage_attrs['model_class_path'])
+        filename_field = storage_attrs['filename_field']
+        mimetype_field = storage_attrs['mimetype_field']
+        content_hash = get_content_hash(content)
+        mimetype = get_content_type(content)
+        existing = (
+            model_cls.objects.filter(
+                **{'content_hash': content_hash, mimetype_field: mimetype}
+            )
+            .values_list(filename_field, flat=True)
+            .first()
+        )
+        if existing:
+            return existing
+        new_name = super()._save(name, content)
+        model_cls.objects.filter(**{filename_field: new_name}).update(
+            content_hash=content_hash
+        )
+        return new_name
@@ -0,0 +1,62 @@
+"""Background jobs for the filesfolders app"""
+
+import logging
+
+from django.apps import apps
+
+# Projectroles dependency
+from projectroles.models import Project
+
+from filesfolders.archive import ArchiveExtractor, open_archive
+from filesfolders.models import FileData, Folder, TEMP_ARCHIVE_PREFIX
+
+
+logger = logging.getLogger(__name__)
+
+
+# Local constants
+ARCHIVE_JOB_TYPE = 'filesfolders.extract_archive'
+ARCHIVE_PROGRESS_INTERVAL = 10
+
+
+def extract_archive(job, archive_name, project_uuid, folder_uuid=None):
+    """
+    Extract a stored Zip archive into a project as a background job. Job
+    status is set by the bgjobs job runner. The stored archive is released
+    whether or not the extraction succeeds.
+
+    :param job: BackgroundJob object
+    :param archive_name: Name of the archive in file storage (string)
+    :param project_uuid: Project UUID (string)
+    :param folder_uuid: Target Folder UUID or None for root (string)
+    :raise: Exception if extraction fails
+    """
+
+    def _progress(done, total):
+        if done == total or done % ARCHIVE_PROGRESS_INTERVAL == 0:
+            job.set_progress(done, total)
+            job.add_log_entry('Extracted {}/{} files'.format(done, total))
+
+    try:
+        project = Project.objects.get(sodar_uuid=project_uuid)
+        folder = (
+            Folder.objects.get(sodar_uuid=folder_uuid) if folder_uuid else None
+        )
+        with open_archive(archive_name) as archive:
+            extractor = ArchiveExtractor(archive, project, folder, job.user)
+            conflicts = extractor.get_conflicts()
+            if conflicts:
+                raise Exception('File already exists: {}'.format(conflicts[0]))
+            extractor.extract(progress=_progress)
+        extractor.add_timeline_event(
+            archive_name.split('/')[-1][len(TEMP_ARCHIVE_PREFIX) :]
+        )
+    finally:
+        FileData.objects.release(archive_name)
+
+
+if apps.is_installed('bgjobs'):
+    # Bgjobs dependency
+    from bgjobs.runner import register_job_type
+
+    register_job_type(ARCHIVE_JOB_TYPE)(extract_archive)
@@ -3,7 +3,6 @@
 import logging
 
 from django import template
-from django.conf import settings
 
 # Projectroles dependency
 from projectroles.app_settings import AppSettingAPI
@@ -46,17 +45,7 @@ def allow_public_links(project):
 def get_file_icon(file):
     """Return file icon"""
     ret = 'file-outline'
-    try:
-        mt = file.file.file.mimetype
-    except Exception as ex:
-        if settings.DEBUG:
-            raise ex
-        logger.error(
-            'Exception in accessing file data (UUID={}): {}'.format(
-                file.sodar_uuid, ex
-            )
-        )
-        return ret
+    mt = file.mimetype
     if mt == 'application/pdf':
         ret = 'file-pdf-outline'
     elif (
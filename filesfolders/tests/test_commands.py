@@ -0,0 +1,59 @@
+"""Tests for management commands in the filesfolders app"""
+
+from django.core.management import call_command
+
+from test_plus.test import TestCase
+
+# Projectroles dependency
+from projectroles.models import SODAR_CONSTANTS
+from projectroles.tests.test_models import ProjectMixin
+
+from filesfolders.models import File, FileData
+from filesfolders.tests.test_models import FileMixin
+
+
+# SODAR constants
+PROJECT_TYPE_PROJECT = SODAR_CONSTANTS['PROJECT_TYPE_PROJECT']
+
+# Local constants
+SECRET = '7dqq83clo2iyhg29hifbor56og6911r5'
+
+
+class TestCleanFileData(FileMixin, ProjectMixin, TestCase):
+    """Tests for cleanfiledata command"""
+
+    def setUp(self):
+        self.user_owner = self.make_user('owner')
+        self.project = self._make_project(
+            'TestProject', PROJECT_TYPE_PROJECT, None
+        )
+        self.file = self._make_file(
+            name='file.txt',
+            file_name='file.txt',
+            file_content=bytes('content'.encode('utf-8')),
+            project=self.project,
+            folder=None,
+            owner=self.user_owner,
+            description='',
+            public_url=False,
+            secret=SECRET,
+        )
+
+    def test_command(self):
+        """Test cleanfiledata with no orphaned data"""
+        call_command('cleanfiledata')
+        self.assertEqual(FileData.objects.all().count(), 1)
+
+    def test_command_orphan(self):
+        """Test cleanfiledata with orphaned data"""
+        # Bypass File.delete() to leave data orphaned
+        File.objects.filter(pk=self.file.pk).delete()
+        self.assertEqual(FileData.objects.all().count(), 1)
+        call_command('cleanfiledata')
+        self.assertEqual(FileData.objects.all().count(), 0)
+
+    def test_command_check(self):
+        """Test cleanfiledata with check mode"""
+        File.objects.filter(pk=self.file.pk).delete()
+        call_command('cleanfiledata', check=True)
+        self.assertEqual(FileData.objects.all().count(), 1)
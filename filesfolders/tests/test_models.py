@@ -1,6 +1,7 @@
 """Tests for models in the filesfolders app"""
 
 import base64
+import hashlib
 
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.forms.models import model_to_dict
@@ -246,6 +247,94 @@ class TestFolder(FolderMixin, ProjectMixin, HyperLinkMixin, TestCase):
 
         self.assertEqual(self.folder.has_in_path(subfolder), False)
 
+    def test_tree_path(self):
+        """Test tree_path for created folders"""
+        subfolder = self._make_folder(
+            name='subfolder',
+            project=self.project,
+            folder=self.folder,
+            owner=self.user_owner,
+            description='',
+        )
+        self.assertEqual(self.folder.tree_path, '/')
+        self.assertEqual(subfolder.tree_path, '/{}/'.format(self.folder.pk))
+
+    def test_tree_path_move(self):
+        """Test updating tree_path for children when moving a folder"""
+        subfolder = self._make_folder(
+            name='subfolder',
+            project=self.project,
+            folder=self.folder,
+            owner=self.user_owner,
+            description='',
+        )
+        subfolder2 = self._make_folder(
+            name='subfolder2',
+            project=self.project,
+            folder=subfolder,
+            owner=self.user_owner,
+            description='',
+        )
+        new_folder = self._make_folder(
+            name='new_folder',
+            project=self.project,
+            folder=None,
+            owner=self.user_owner,
+            description='',
+        )
+        subfolder.folder = new_folder
+        subfolder.save()
+        subfolder2.refresh_from_db()
+        self.assertEqual(subfolder.tree_path, '/{}/'.format(new_folder.pk))
+        self.assertEqual(
+            subfolder2.tree_path, '/{}/{}/'.format(new_folder.pk, subfolder.pk)
+        )
+        self.assertEqual(
+            subfolder2.get_path(), 'root/new_folder/subfolder/subfolder2/'
+        )
+        self.assertEqual(subfolder2.has_in_path(self.folder), False)
+
+    def test_get_parents(self):
+        """Test get_parents()"""
+        subfolder = self._make_folder(
+            name='subfolder',
+            project=self.project,
+            folder=self.folder,
+            owner=self.user_owner,
+            description='',
+        )
+        subfolder2 = self._make_folder(
+            name='subfolder2',
+            project=self.project,
+            folder=subfolder,
+            owner=self.user_owner,
+            description='',
+        )
+        self.assertEqual(self.folder.get_parents(), [])
+        with self.assertNumQueries(1):
+            self.assertEqual(subfolder2.get_parents(), [self.folder, subfolder])
+
+    def test_get_children_all(self):
+        """Test get_children_all()"""
+        subfolder = self._make_folder(
+            name='subfolder',
+            project=self.project,
+            folder=self.folder,
+            owner=self.user_owner,
+            description='',
+        )
+        subfolder2 = self._make_folder(
+            name='subfolder2',
+            project=self.project,
+            folder=subfolder,
+            owner=self.user_owner,
+            description='',
+        )
+        self.assertEqual(
+            list(self.folder.get_children_all()), [subfolder, subfolder2]
+        )
+        self.assertEqual(list(subfolder2.get_children_all()), [])
+
 
 class TestFile(FileMixin, FolderMixin, ProjectMixin, TestCase):
     """Tests for model.File"""
@@ -338,6 +427,7 @@ class TestFile(FileMixin, FolderMixin, ProjectMixin, TestCase):
             'content_type/file.txt',
             'content_type': 'text/plain',
             'bytes': base64.b64encode(self.file_content).decode('utf-8'),
+            'content_hash': hashlib.sha256(self.file_content).hexdigest(),
         }
 
         self.assertEqual(model_to_dict(file_data), expected)
@@ -353,6 +443,111 @@ class TestFile(FileMixin, FolderMixin, ProjectMixin, TestCase):
         # Assert postcondition
         self.assertEqual(FileData.objects.all().count(), 0)
 
+    def test_file_dedup(self):
+        """Test identical content is stored only once"""
+        file2 = self._make_file(
+            name='file2.txt',
+            file_name='file2.txt',
+            file_content=self.file_content,
+            project=self.project,
+            folder=None,
+            owner=self.user_owner,
+            description='',
+            public_url=False,
+            secret='yzxrxqvpd7j1ks3rnh69mo47ow1mjrdh',
+        )
+        self.assertEqual(FileData.objects.all().count(), 1)
+        self.assertEqual(file2.file.name, self.file.file.name)
+        self.assertEqual(file2.file.read(), self.file_content)
+
+    def test_file_dedup_content_type(self):
+        """Test identical content with a different content type"""
+        file2 = File(
+            name='file2.md',
+            file=SimpleUploadedFile(
+                'file2.md', self.file_content, content_type='text/markdown'
+            ),
+            project=self.project,
+            folder=None,
+            owner=self.user_owner,
+            secret='yzxrxqvpd7j1ks3rnh69mo47ow1mjrdh',
+        )
+        file2.save()
+        self.assertEqual(FileData.objects.all().count(), 2)
+        self.assertNotEqual(file2.file.name, self.file.file.name)
+
+    def test_file_info(self):
+        """Test mimetype and size set on upload"""
+        self.assertEqual(self.file.mimetype, 'text/plain')
+        self.assertEqual(self.file.size, len(self.file_content))
+
+    def test_file_info_update(self):
+        """Test updating mimetype and size when replacing file"""
+        content = bytes('# Markdown content'.encode('utf-8'))
+        self.file.file = SimpleUploadedFile(
+            'file.md', content, content_type='text/markdown'
+        )
+        self.file.save()
+        self.file.refresh_from_db()
+        self.assertEqual(self.file.mimetype, 'text/markdown')
+        self.assertEqual(self.file.size, len(content))
+
+    def test_get_folder_readme(self):
+        """Test get_folder_readme()"""
+        readme = File(
+            name='README.md',
+            file=SimpleUploadedFile(
+                'README.md', self.file_content, content_type='text/markdown'
+            ),
+            project=self.project,
+            folder=None,
+            owner=self.user_owner,
+            secret='yzxrxqvpd7j1ks3rnh69mo47ow1mjrdh',
+        )
+        readme.save()
+        self.assertEqual(
+            File.objects.get_folder_readme(self.project.pk, None), readme
+        )
+        self.assertIsNone(
+            File.objects.get_folder_readme(
+                self.project.pk, None, mimetype='text/plain'
+            )
+        )
+
+    def test_file_dedup_deletion(self):
+        """Test shared data is only removed after last reference deletion"""
+        file2 = self._make_file(
+            name='file2.txt',
+            file_name='file2.txt',
+            file_content=self.file_content,
+            project=self.project,
+            folder=None,
+            owner=self.user_owner,
+            description='',
+            public_url=False,
+            secret='yzxrxqvpd7j1ks3rnh69mo47ow1mjrdh',
+        )
+        self.file.delete()
+        self.assertEqual(FileData.objects.all().count(), 1)
+        self.assertEqual(file2.file.read(), self.file_content)
+        file2.delete()
+        self.assertEqual(FileData.objects.all().count(), 0)
+
+    def test_file_data_hash(self):
+        """Test content hash is stored for file data"""
+        file_data = FileData.objects.get(file_name=self.file.file.name)
+        self.assertEqual(
+            file_data.content_hash,
+            hashlib.sha256(self.file_content).hexdigest(),
+        )
+
+    def test_file_data_get_orphans(self):
+        """Test FileDataManager get_orphans()"""
+        self.assertEqual(FileData.objects.get_orphans().count(), 0)
+        # Bypass File.delete() to leave data orphaned
+        File.objects.filter(pk=self.file.pk).delete()
+        self.assertEqual(FileData.objects.get_orphans().count(), 1)
+
 
 class TestHyperLink(
     FileMixin, FolderMixin, ProjectMixin, HyperLinkMixin, TestCase
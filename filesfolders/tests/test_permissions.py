@@ -358,6 +358,27 @@ class TestFilePermissions(FileMixin, TestProjectPermissionBase):
         self.assert_response(url, self.user_no_roles, 200)
         self.assert_response(url, self.anonymous, 302)
 
+    def test_archive_serve(self):
+        """Test archive serving for authenticated users"""
+        url = reverse(
+            'filesfolders:archive_serve',
+            kwargs={'project': self.project.sodar_uuid},
+        )
+        good_users = [
+            self.superuser,
+            self.owner_as.user,
+            self.delegate_as.user,
+            self.contributor_as.user,
+            self.guest_as.user,
+        ]
+        bad_users = [self.anonymous, self.user_no_roles]
+        self.assert_response(url, good_users, 200)
+        self.assert_response(url, bad_users, 302)
+        # Test public project
+        self.project.set_public()
+        self.assert_response(url, self.user_no_roles, 200)
+        self.assert_response(url, self.anonymous, 302)
+
     def test_file_serve_public(self):
         """Test public file serving"""
         url = reverse(
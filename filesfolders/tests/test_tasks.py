@@ -0,0 +1,103 @@
+"""Tests for background jobs in the filesfolders app"""
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from test_plus.test import TestCase
+
+# Projectroles dependency
+from projectroles.models import SODAR_CONSTANTS
+from projectroles.tests.test_models import ProjectMixin
+
+# Bgjobs dependency
+from bgjobs.models import JOB_STATE_DONE, JOB_STATE_FAILED
+from bgjobs.runner import get_job_types, submit_job
+
+# Timeline dependency
+from timeline.models import ProjectEvent
+
+from filesfolders.archive import store_archive
+from filesfolders.models import File, FileData, Folder
+from filesfolders.tasks import extract_archive, ARCHIVE_JOB_TYPE
+from filesfolders.tests.test_models import FileMixin
+from filesfolders.tests.test_views import ZIP_PATH
+
+
+# SODAR constants
+PROJECT_TYPE_PROJECT = SODAR_CONSTANTS['PROJECT_TYPE_PROJECT']
+
+
+class TestExtractArchive(FileMixin, ProjectMixin, TestCase):
+    """Tests for the extract_archive background job"""
+
+    def setUp(self):
+        self.user = self.make_user('owner')
+        self.project = self._make_project(
+            'TestProject', PROJECT_TYPE_PROJECT, None
+        )
+        with open(ZIP_PATH, 'rb') as zip_file:
+            self.archive_name = store_archive(
+                SimpleUploadedFile('unpack_test.zip', zip_file.read())
+            )
+
+    def _submit(self):
+        """Submit extraction job and run on_commit callbacks"""
+        with self.captureOnCommitCallbacks(execute=True):
+            job = submit_job(
+                ARCHIVE_JOB_TYPE,
+                self.user,
+                'Extract archive',
+                project=self.project,
+                archive_name=self.archive_name,
+                project_uuid=str(self.project.sodar_uuid),
+            )
+        job.refresh_from_db()
+        return job
+
+    def test_register(self):
+        """Test job type registration"""
+        self.assertEqual(get_job_types()[ARCHIVE_JOB_TYPE], extract_archive)
+
+    def test_extract(self):
+        """Test archive extraction"""
+        self.assertEqual(FileData.objects.all().count(), 1)
+        job = self._submit()
+        self.assertEqual(job.status, JOB_STATE_DONE)
+        self.assertEqual(job.progress, 100)
+        self.assertEqual(File.objects.all().count(), 2)
+        self.assertEqual(Folder.objects.all().count(), 2)
+        self.assertIsNotNone(File.objects.get(name='zip_test2.txt').file.read())
+        # Stored archive should be released
+        self.assertEqual(
+            FileData.objects.filter(file_name=self.archive_name).count(), 0
+        )
+        self.assertEqual(
+            ProjectEvent.objects.filter(event_name='archive_extract').count(),
+            1,
+        )
+
+    def test_extract_existing(self):
+        """Test archive extraction with existing file (should fail)"""
+        folder = Folder.objects.create(
+            name='dir1', project=self.project, owner=self.user
+        )
+        self._make_file(
+            name='zip_test1.txt',
+            file_name='zip_test1.txt',
+            file_content=b'content',
+            project=self.project,
+            folder=folder,
+            owner=self.user,
+            description='',
+            public_url=False,
+            secret='xxxxxxxxx',
+        )
+        job = self._submit()
+        self.assertEqual(job.status, JOB_STATE_FAILED)
+        self.assertEqual(
+            job.log_entries.last().message,
+            'Job failed: File already exists: dir1/zip_test1.txt',
+        )
+        self.assertEqual(File.objects.all().count(), 1)
+        self.assertEqual(
+            FileData.objects.filter(file_name=self.archive_name).count(), 0
+        )
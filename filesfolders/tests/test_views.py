@@ -2,8 +2,13 @@
 
 import os
 
+from io import BytesIO
+from unittest.mock import patch
+from zipfile import ZipFile
+
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import RequestFactory
+from django.test import RequestFactory, override_settings
 from django.urls import reverse
 
 from test_plus.test import TestCase
@@ -13,13 +18,27 @@ from projectroles.models import Role, SODAR_CONSTANTS
 from projectroles.tests.test_models import ProjectMixin, RoleAssignmentMixin
 from projectroles.app_settings import AppSettingAPI
 
-from filesfolders.models import File, Folder, HyperLink
+# Bgjobs dependency
+from bgjobs.models import BackgroundJob
+
+# Timeline dependency
+from timeline.models import ProjectEvent
+
+from filesfolders.models import (
+    File,
+    FileData,
+    Folder,
+    HyperLink,
+    TEMP_ARCHIVE_PREFIX,
+)
+from filesfolders.tasks import ARCHIVE_JOB_TYPE
 from filesfolders.tests.test_models import (
     FolderMixin,
     FileMixin,
     HyperLinkMixin,
 )
 from filesfolders.utils import build_public_url
+from filesfolders.views import README_CACHE_KEY
 
 
 # SODAR constants
@@ -192,6 +211,38 @@ class TestListView(TestViewsBase):
         self.assertEqual(response.context['readme_data'], self.file_content)
         self.assertEqual(response.context['readme_mime'], 'text/plain')
 
+    def test_render_with_readme_md(self):
+        """Test rendering with a cached markdown readme file"""
+        readme_file = File(
+            name='readme.md',
+            file=SimpleUploadedFile(
+                'readme.md', b'# Title', content_type='text/markdown'
+            ),
+            project=self.project,
+            folder=None,
+            owner=self.user,
+            secret='xxxxxxxxx',
+        )
+        readme_file.save()
+        url = reverse(
+            'filesfolders:list', kwargs={'project': self.project.sodar_uuid}
+        )
+        with self.login(self.user):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['readme_name'], 'readme.md')
+        self.assertEqual(response.context['readme_data'], '# Title')
+        self.assertEqual(response.context['readme_html'], '<h1>Title</h1>\n')
+        self.assertEqual(response.context['readme_mime'], 'text/markdown')
+        self.assertIsNotNone(
+            cache.get(
+                README_CACHE_KEY.format(
+                    readme_file.sodar_uuid,
+                    readme_file.date_modified.timestamp(),
+                )
+            )
+        )
+
 
 # File Views -------------------------------------------------------------------
 
@@ -510,6 +561,149 @@ class TestFileCreateView(TestViewsBase):
         self.assertEqual(File.objects.all().count(), 3)
         self.assertEqual(Folder.objects.all().count(), 2)
 
+    def test_unpack_archive_in_folder(self):
+        """Test unpacking a zip file into a folder"""
+        with open(ZIP_PATH, 'rb') as zip_file:
+            post_data = {
+                'name': 'unpack_test.zip',
+                'file': zip_file,
+                'folder': self.folder.sodar_uuid,
+                'description': '',
+                'flag': '',
+                'public_url': False,
+                'unpack_archive': True,
+            }
+            with self.login(self.user):
+                response = self.client.post(
+                    reverse(
+                        'filesfolders:file_create',
+                        kwargs={'folder': self.folder.sodar_uuid},
+                    ),
+                    post_data,
+                )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(File.objects.all().count(), 3)
+        self.assertEqual(Folder.objects.all().count(), 3)
+        new_folder1 = Folder.objects.get(name='dir1')
+        self.assertEqual(new_folder1.folder, self.folder)
+        self.assertEqual(
+            File.objects.get(name='zip_test2.txt').folder.folder, new_folder1
+        )
+
+    def test_unpack_archive_existing_folder(self):
+        """Test unpacking a zip file with an existing folder in path"""
+        ex_folder = self._make_folder(
+            name='dir1',
+            project=self.project,
+            folder=None,
+            owner=self.user,
+            description='',
+        )
+        with open(ZIP_PATH, 'rb') as zip_file:
+            post_data = {
+                'name': 'unpack_test.zip',
+                'file': zip_file,
+                'folder': '',
+                'description': '',
+                'flag': '',
+                'public_url': False,
+                'unpack_archive': True,
+            }
+            with self.login(self.user):
+                response = self.client.post(
+                    reverse(
+                        'filesfolders:file_create',
+                        kwargs={'project': self.project.sodar_uuid},
+                    ),
+                    post_data,
+                )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(File.objects.all().count(), 3)
+        self.assertEqual(Folder.objects.all().count(), 3)
+        self.assertEqual(
+            File.objects.get(name='zip_test1.txt').folder, ex_folder
+        )
+        self.assertEqual(Folder.objects.get(name='dir2').folder, ex_folder)
+
+    @override_settings(FILESFOLDERS_BG_ARCHIVE_SIZE=1)
+    def test_unpack_archive_bg(self):
+        """Test unpacking a zip file in a background job"""
+        self.assertEqual(BackgroundJob.objects.all().count(), 0)
+        with open(ZIP_PATH, 'rb') as zip_file:
+            post_data = {
+                'name': 'unpack_test.zip',
+                'file': zip_file,
+                'folder': '',
+                'description': '',
+                'flag': '',
+                'public_url': False,
+                'unpack_archive': True,
+            }
+            with self.login(self.user):
+                response = self.client.post(
+                    reverse(
+                        'filesfolders:file_create',
+                        kwargs={'project': self.project.sodar_uuid},
+                    ),
+                    post_data,
+                )
+
+        self.assertEqual(response.status_code, 302)
+        # Extraction is run on commit in the job
+        self.assertEqual(File.objects.all().count(), 1)
+        self.assertEqual(BackgroundJob.objects.all().count(), 1)
+        job = BackgroundJob.objects.first()
+        self.assertEqual(job.job_type, ARCHIVE_JOB_TYPE)
+        self.assertEqual(job.project, self.project)
+        self.assertEqual(
+            FileData.objects.filter(
+                file_name__contains=TEMP_ARCHIVE_PREFIX
+            ).count(),
+            1,
+        )
+
+    @override_settings(
+        FILESFOLDERS_BG_ARCHIVE_SIZE=1, BGJOBS_MAX_PROJECT_JOBS=1
+    )
+    def test_unpack_archive_bg_limit(self):
+        """Test unpacking in a background job with job limit reached"""
+        BackgroundJob.objects.create(
+            project=self.project,
+            user=self.user,
+            job_type=ARCHIVE_JOB_TYPE,
+            name='Job',
+        )
+        with open(ZIP_PATH, 'rb') as zip_file:
+            post_data = {
+                'name': 'unpack_test.zip',
+                'file': zip_file,
+                'folder': '',
+                'description': '',
+                'flag': '',
+                'public_url': False,
+                'unpack_archive': True,
+            }
+            with self.login(self.user):
+                response = self.client.post(
+                    reverse(
+                        'filesfolders:file_create',
+                        kwargs={'project': self.project.sodar_uuid},
+                    ),
+                    post_data,
+                )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(BackgroundJob.objects.all().count(), 1)
+        # Stored archive should be rolled back
+        self.assertEqual(
+            FileData.objects.filter(
+                file_name__contains=TEMP_ARCHIVE_PREFIX
+            ).count(),
+            0,
+        )
+
 
 class TestFileUpdateView(TestViewsBase):
     """Tests for the File update view"""
@@ -787,6 +981,126 @@ class TestFileServeView(TestViewsBase):
         self.assertEqual(response.status_code, 404)
 
 
+class TestArchiveServeView(TestViewsBase):
+    """Tests for the archive serving view"""
+
+    def setUp(self):
+        super().setUp()
+        self.subfolder = self._make_folder(
+            name='subfolder',
+            project=self.project,
+            folder=self.folder,
+            owner=self.user,
+            description='',
+        )
+        self.sub_file = self._make_file(
+            name='sub_file.txt',
+            file_name='sub_file.txt',
+            file_content=self.file_content_alt,
+            project=self.project,
+            folder=self.subfolder,
+            owner=self.user,
+            description='',
+            public_url=False,
+            secret='xxxxxxxxx',
+        )
+
+    def _get_zip_file(self, response):
+        return ZipFile(BytesIO(b''.join(response.streaming_content)))
+
+    def test_render(self):
+        """Test rendering of the archive serving view for a project"""
+        with self.login(self.user):
+            response = self.client.get(
+                reverse(
+                    'filesfolders:archive_serve',
+                    kwargs={'project': self.project.sodar_uuid},
+                )
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response['Content-Disposition'],
+            'attachment; filename="{}.zip"'.format(self.project.title),
+        )
+        zip_file = self._get_zip_file(response)
+        self.assertEqual(
+            sorted(zip_file.namelist()),
+            [
+                'file.txt',
+                'folder/',
+                'folder/subfolder/',
+                'folder/subfolder/sub_file.txt',
+            ],
+        )
+        self.assertEqual(zip_file.read('file.txt'), self.file_content)
+        self.assertEqual(
+            zip_file.read('folder/subfolder/sub_file.txt'),
+            self.file_content_alt,
+        )
+        self.assertEqual(
+            ProjectEvent.objects.filter(event_name='archive_serve').count(), 1
+        )
+
+    def test_render_folder(self):
+        """Test rendering of the archive serving view for a folder"""
+        with self.login(self.user):
+            response = self.client.get(
+                reverse(
+                    'filesfolders:archive_serve',
+                    kwargs={'folder': self.folder.sodar_uuid},
+                )
+            )
+        self.assertEqual(response.status_code, 200)
+        zip_file = self._get_zip_file(response)
+        self.assertEqual(
+            sorted(zip_file.namelist()),
+            ['subfolder/', 'subfolder/sub_file.txt'],
+        )
+
+    def test_render_dedup(self):
+        """Test rendering with files sharing stored data"""
+        self._make_file(
+            name='file_copy.txt',
+            file_name='file_copy.txt',
+            file_content=self.file_content,
+            project=self.project,
+            folder=self.folder,
+            owner=self.user,
+            description='',
+            public_url=False,
+            secret='yyyyyyyyy',
+        )
+        with self.login(self.user):
+            response = self.client.get(
+                reverse(
+                    'filesfolders:archive_serve',
+                    kwargs={'project': self.project.sodar_uuid},
+                )
+            )
+        zip_file = self._get_zip_file(response)
+        self.assertEqual(
+            zip_file.read('folder/file_copy.txt'), self.file_content
+        )
+        self.assertEqual(zip_file.read('file.txt'), self.file_content)
+
+    @patch('zipfile.ZIP64_LIMIT', 4)
+    def test_render_zip64(self):
+        """Test rendering with file sizes over zip64 limit"""
+        with self.login(self.user):
+            response = self.client.get(
+                reverse(
+                    'filesfolders:archive_serve',
+                    kwargs={'project': self.project.sodar_uuid},
+                )
+            )
+        zip_file = self._get_zip_file(response)
+        self.assertEqual(zip_file.read('file.txt'), self.file_content)
+        self.assertEqual(
+            zip_file.read('folder/subfolder/sub_file.txt'),
+            self.file_content_alt,
+        )
+
+
 class TestFileServePublicView(TestViewsBase):
     """Tests for the File public serving view"""
 
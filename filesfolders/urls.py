@@ -49,6 +49,16 @@ urls_ui = [
         view=views.FileServePublicView.as_view(),
         name='file_serve_public',
     ),
+    url(
+        regex=r'^archive/(?P<project>[0-9a-f-]+)$',
+        view=views.ArchiveServeView.as_view(),
+        name='archive_serve',
+    ),
+    url(
+        regex=r'^archive/in/(?P<folder>[0-9a-f-]+)$',
+        view=views.ArchiveServeView.as_view(),
+        name='archive_serve',
+    ),
     url(
         regex=r'^link/(?P<file>[0-9a-f-]+)$',
         view=views.FilePublicLinkView.as_view(),
@@ -16,3 +16,45 @@ def build_public_url(file, request):
             kwargs={'secret': file.secret, 'file_name': file.name},
         )
     )
+
+
+def get_folder_paths(folders):
+    """
+    Return paths for folders as tuples of folder names, without querying the
+    database. Folders with a parent not included in the iterable are treated
+    as top level folders.
+
+    :param folders: Iterable of Folder objects
+    :return: Dict of path tuples with Folder primary keys as keys
+    """
+    parents = {f.pk: f.folder_id for f in folders}
+    names = {f.pk: f.name for f in folders}
+    paths = {}
+
+    def _get_path(pk):
+        if pk not in paths:
+            parent_pk = parents[pk]
+            paths[pk] = (
+                _get_path(parent_pk) if parent_pk in parents else ()
+            ) + (names[pk],)
+        return paths[pk]
+
+    for pk in parents:
+        _get_path(pk)
+    return paths
+
+
+def get_folder_choices(folders):
+    """
+    Return form choices for folders with full paths as labels, without
+    querying the database for each folder.
+
+    :param folders: QuerySet or list of Folder objects in a project
+    :return: List of tuples
+    """
+    folders = list(folders)
+    paths = get_folder_paths(folders)
+    return [(None, 'root')] + [
+        (f.sodar_uuid, 'root/{}/'.format('/'.join(paths[f.pk])))
+        for f in folders
+    ]
@@ -1,16 +1,22 @@
 """UI views for the filesfolders app"""
 
 import logging
+import mistune
 
 from wsgiref.util import FileWrapper  # For db files
-from zipfile import ZipFile
 
+from django.apps import apps
 from django.conf import settings
 from django.contrib import messages
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
-from django.core.files.base import ContentFile
 from django.db import transaction
-from django.http import HttpResponse, HttpResponseBadRequest
+from django.db.models import Q
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    StreamingHttpResponse,
+)
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.views.generic import (
@@ -24,15 +30,21 @@ from django.views.generic.edit import ModelFormMixin, DeletionMixin
 
 from db_file_storage.storage import DatabaseFileStorage
 
+from filesfolders.archive import (
+    ArchiveExtractor,
+    ArchiveStreamer,
+    store_archive,
+)
 from filesfolders.forms import FolderForm, FileForm, HyperLinkForm
 from filesfolders.models import Folder, File, FileData, HyperLink
+from filesfolders.tasks import ARCHIVE_JOB_TYPE
 from filesfolders.utils import build_public_url
 
 # Projectroles dependency
 from projectroles.models import Project, SODAR_CONSTANTS
 from projectroles.plugins import get_backend_api
 from projectroles.app_settings import AppSettingAPI
-from projectroles.utils import build_secret, get_display_name
+from projectroles.utils import get_display_name
 from projectroles.views import (
     LoginRequiredMixin,
     LoggedInPermissionMixin,
@@ -54,6 +66,8 @@ TL_OBJ_TYPES = {'Folder': 'folder', 'File': 'file', 'HyperLink': 'hyperlink'}
 DEFAULT_UPDATE_ATTRS = ['name', 'folder', 'description', 'flag']
 LINK_BAD_REQUEST_MSG = settings.FILESFOLDERS_LINK_BAD_REQUEST_MSG
 SERVE_AS_ATTACHMENT = settings.FILESFOLDERS_SERVE_AS_ATTACHMENT
+README_CACHE_KEY = 'filesfolders_readme_{}_{}'
+README_CACHE_TIMEOUT = 24 * 60 * 60
 
 
 # Mixins -----------------------------------------------------------------
@@ -353,6 +367,28 @@ class ProjectFileView(
     permission_required = 'filesfolders.view_data'
     template_name = 'filesfolders/project_files.html'
 
+    @classmethod
+    def _get_readme_data(cls, readme_file):
+        """
+        Return readme data and rendered markdown for a readme file. The result
+        is cached until the file is modified.
+
+        :param readme_file: File object
+        :return: Dict
+        """
+        cache_key = README_CACHE_KEY.format(
+            readme_file.sodar_uuid, readme_file.date_modified.timestamp()
+        )
+        ret = cache.get(cache_key)
+        if ret is not None:
+            return ret
+        ret = {'readme_data': readme_file.file.read()}
+        if readme_file.mimetype == 'text/markdown':
+            ret['readme_data'] = ret['readme_data'].decode('utf-8')
+            ret['readme_html'] = mistune.markdown(ret['readme_data'])
+        cache.set(cache_key, ret, README_CACHE_TIMEOUT)
+        return ret
+
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
         project = self.get_project(self.request, self.kwargs)
@@ -366,28 +402,20 @@ class ProjectFileView(
             ).first()
             if root_folder:
                 context['folder'] = root_folder
-                # Build breadcrumb
-                f = root_folder
-                breadcrumb = [f]
-                while f.folder:
-                    breadcrumb.insert(0, f.folder)
-                    f = f.folder
-                context['folder_breadcrumb'] = breadcrumb
+                context['folder_breadcrumb'] = root_folder.get_parents() + [
+                    root_folder
+                ]
 
         context['folders'] = Folder.objects.filter(
             project=project, folder=root_folder
-        )
+        ).select_related('owner')
         context['files'] = File.objects.filter(
             project=project, folder=root_folder
-        )
+        ).select_related('owner')
         context['links'] = HyperLink.objects.filter(
             project=project, folder=root_folder
-        )
-        folder_pk = (
-            Folder.objects.get(sodar_uuid=self.kwargs['folder']).pk
-            if 'folder' in self.kwargs
-            else None
-        )
+        ).select_related('owner')
+        folder_pk = root_folder.pk if root_folder else None
 
         # Get folder ReadMe
         readme_md = File.objects.get_folder_readme(
@@ -401,15 +429,10 @@ class ProjectFileView(
         if readme_file:
             try:
                 context['readme_name'] = readme_file.name
-                context['readme_mime'] = readme_file.file.file.mimetype
-                if context['readme_mime'] == 'text/markdown':
-                    context['readme_data'] = readme_file.file.read().decode(
-                        'utf-8'
-                    )
-                    if readme_txt:
-                        context['readme_alt'] = readme_txt.name
-                else:
-                    context['readme_data'] = readme_file.file.read()
+                context['readme_mime'] = readme_file.mimetype
+                context.update(self._get_readme_data(readme_file))
+                if readme_md and readme_txt:
+                    context['readme_alt'] = readme_txt.name
             except Exception as ex:
                 if settings.DEBUG:
                     raise ex
@@ -477,8 +500,6 @@ class FileCreateView(ViewActionMixin, BaseCreateView):
 
     def form_valid(self, form):
         """Override form_valid() for zip file unpacking"""
-        timeline = get_backend_api('timeline_backend')
-
         ######################
         # Regular file upload
         ######################
@@ -503,82 +524,57 @@ class FileCreateView(ViewActionMixin, BaseCreateView):
         redirect_url = reverse('filesfolders:list', kwargs=re_kwargs)
 
         try:
-            zip_file = ZipFile(file)
+            extractor = ArchiveExtractor(
+                file, project, folder, self.request.user
+            )
         except Exception as ex:
             messages.error(
                 self.request, 'Unable to extract zip file: {}'.format(ex)
             )
             return redirect(redirect_url)
 
-        new_folders = []
-        new_files = []
-
-        with transaction.atomic():
-            for f in [f for f in zip_file.infolist() if not f.is_dir()]:
-                # Create subfolders if any
-                current_folder = folder
-                for zip_folder in f.filename.split('/')[:-1]:
-                    try:
-                        current_folder = Folder.objects.get(
-                            name=zip_folder,
-                            project=project,
-                            folder=current_folder,
-                        )
-                    except Folder.DoesNotExist:
-                        current_folder = Folder.objects.create(
-                            name=zip_folder,
-                            project=project,
-                            folder=current_folder,
-                            owner=self.request.user,
-                        )
-                        new_folders.append(current_folder)
-
-                # Save file
-                file_name_nopath = f.filename.split('/')[-1]
-                unpacked_file = File(
-                    name=file_name_nopath,
-                    project=project,
-                    folder=current_folder,
-                    owner=self.request.user,
-                    secret=build_secret(),
-                )
-                content_file = ContentFile(zip_file.read(f.filename))
-                unpacked_file.file.save(file_name_nopath, content_file)
-                unpacked_file.save()
-                new_files.append(unpacked_file)
-
-        # Add timeline events
-        for new_folder in new_folders:
-            self._add_item_modify_event(
-                obj=new_folder, request=self.request, view_action='create'
-            )
-
-        for new_file in new_files:
-            self._add_item_modify_event(
-                obj=new_file, request=self.request, view_action='create'
-            )
+        # Extract large archives in a background job if enabled
+        bg_size = getattr(settings, 'FILESFOLDERS_BG_ARCHIVE_SIZE', 0)
+        if bg_size and file.size >= bg_size and apps.is_installed('bgjobs'):
+            # Bgjobs dependency
+            from bgjobs.runner import submit_job, JobLimitException
 
-        if timeline:
-            timeline.add_event(
-                project=project,
-                app_name=APP_NAME,
-                user=self.request.user,
-                event_name='archive_extract',
-                description='Extract from archive "{}", create {} folders '
-                'and {} files'.format(
-                    file.name, len(new_folders), len(new_files)
-                ),
-                extra_data={
-                    'new_folders': [f.name for f in new_folders],
-                    'new_files': [f.name for f in new_files],
-                },
-                status_type='OK',
+            try:
+                with transaction.atomic():
+                    archive_name = store_archive(file)
+                    submit_job(
+                        ARCHIVE_JOB_TYPE,
+                        self.request.user,
+                        'Extract archive "{}"'.format(file.name),
+                        project=project,
+                        description='Extract {} files from archive "{}" '
+                        'into folder "{}"'.format(
+                            len(extractor.members),
+                            file.name,
+                            folder.name if folder else 'root',
+                        ),
+                        archive_name=archive_name,
+                        project_uuid=str(project.sodar_uuid),
+                        folder_uuid=str(folder.sodar_uuid) if folder else None,
+                    )
+            except JobLimitException as ex:
+                messages.error(
+                    self.request, 'Unable to extract zip file: {}'.format(ex)
+                )
+                return redirect(redirect_url)
+            messages.success(
+                self.request,
+                'Extraction of {} files from archive "{}" started as a '
+                'background job.'.format(len(extractor.members), file.name),
             )
+            return redirect(redirect_url)
 
+        extractor.extract()
+        extractor.add_timeline_event(file.name)
         messages.success(
             self.request,
             'Extracted {} files in folder "{}" from archive "{}".'.format(
-                len([f for f in zip_file.infolist() if not f.is_dir()]),
+                len(extractor.members),
                 folder.name if folder else 'root',
                 file.name,
             ),
@@ -657,6 +653,52 @@ class FileServePublicView(FileServeMixin, View):
         return super().get(*args, **kwargs)
 
 
+class ArchiveServeView(
+    LoginRequiredMixin,
+    LoggedInPermissionMixin,
+    ProjectPermissionMixin,
+    View,
+):
+    """View for serving the files of a project or folder as a Zip archive"""
+
+    permission_required = 'filesfolders.view_data'
+
+    def get(self, *args, **kwargs):
+        """GET request to stream the archive as attachment"""
+        timeline = get_backend_api('timeline_backend')
+        project = self.get_project()
+        folder = None
+        if 'folder' in kwargs:
+            folder = Folder.objects.get(sodar_uuid=kwargs['folder'])
+        streamer = ArchiveStreamer(project, folder)
+
+        response = StreamingHttpResponse(
+            streamer, content_type='application/zip'
+        )
+        response['Content-Disposition'] = 'attachment; filename="{}"'.format(
+            streamer.get_archive_name()
+        )
+
+        # Add event in Timeline
+        if timeline:
+            tl_event = timeline.add_event(
+                project=project,
+                app_name=APP_NAME,
+                user=self.request.user,
+                event_name='archive_serve',
+                description='serve archive of {} files from {}'.format(
+                    streamer.file_count,
+                    '{folder}' if folder else 'root',
+                ),
+                extra_data={'file_count': streamer.file_count},
+                classified=True,
+                status_type='INFO',
+            )
+            if folder:
+                tl_event.add_object(folder, 'folder', folder.get_path())
+        return response
+
+
 class FilePublicLinkView(
     LoginRequiredMixin,
     LoggedInPermissionMixin,
@@ -809,28 +851,20 @@ class BatchEditView(
 
         # NOTE: No modifications needed for "delete" action
         if self.batch_action == 'move':
-            # Exclude folders to be moved
-            exclude_list = [
-                x.sodar_uuid for x in self.items if isinstance(x, Folder)
-            ]
-
-            # Exclude folders under folders to be moved
-            for i in self.items:
-                exclude_list += [
-                    x.sodar_uuid
-                    for x in Folder.objects.filter(
-                        project__sodar_uuid=self.project.sodar_uuid
-                    )
-                    if x.has_in_path(i)
-                ]
+            # Exclude folders to be moved and folders under them
+            moved_folders = [x for x in self.items if isinstance(x, Folder)]
+            exclude_list = [x.sodar_uuid for x in moved_folders]
+            exclude_q = Q(sodar_uuid__in=exclude_list)
+            for f in moved_folders:
+                exclude_q |= Q(tree_path__startswith=f.get_child_tree_path())
 
             # Exclude current folder
             if 'folder' in kwargs:
-                exclude_list.append(kwargs['folder'])
+                exclude_q |= Q(sodar_uuid=kwargs['folder'])
 
             folder_choices = Folder.objects.filter(
                 project=self.project
-            ).exclude(sodar_uuid__in=exclude_list)
+            ).exclude(exclude_q)
             context['folder_choices'] = folder_choices
 
             if folder_choices.count() == 0:
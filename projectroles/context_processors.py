@@ -1,6 +1,8 @@
 """Context processors for the projectroles app"""
 
-from projectroles.plugins import get_active_plugins, get_backend_api
+from django.utils.functional import SimpleLazyObject
+
+from projectroles.plugins import get_backend_api, get_user_site_apps
 from projectroles.urls import urlpatterns
 
 
@@ -24,27 +26,24 @@ def urls_processor(request):
 def site_app_processor(request):
     """
     Context processor for providing site apps for the site titlebar dropdown.
+    Evaluated lazily when used in a template.
     """
-    site_apps = get_active_plugins('site_app')
     return {
-        'site_apps': [
-            a
-            for a in site_apps
-            if not a.app_permission or request.user.has_perm(a.app_permission)
-        ],
+        'site_apps': SimpleLazyObject(lambda: get_user_site_apps(request.user))
     }
 
 
 def app_alerts_processor(request):
     """
-    Context processor for checking app alert status.
+    Context processor for checking app alert status. Evaluated lazily when used
+    in a template.
     """
-    if request.user and request.user.is_authenticated:
-        app_alerts = get_backend_api('appalerts_backend')
-        if app_alerts:
-            return {
-                'app_alerts': app_alerts.get_model()
-                .objects.filter(user=request.user, active=True)
-                .count()
-            }
-    return {'app_alerts': 0}
+
+    def _get_alert_count():
+        if request.user and request.user.is_authenticated:
+            app_alerts = get_backend_api('appalerts_backend')
+            if app_alerts:
+                return app_alerts.get_alert_count(request.user)
+        return 0
+
+    return {'app_alerts': SimpleLazyObject(_get_alert_count)}
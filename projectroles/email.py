@@ -2,14 +2,19 @@
 
 import logging
 import re
+import smtplib
+import threading
+import time
 
 from django.conf import settings
 from django.contrib import auth, messages
-from django.core.mail import EmailMessage
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
 from django.urls import reverse
 from django.utils.timezone import localtime
 
 from projectroles.app_settings import AppSettingAPI
+from projectroles.constants import get_sodar_constants
 from projectroles.utils import build_invite_url, get_display_name
 
 
@@ -18,6 +23,10 @@ logger = logging.getLogger(__name__)
 User = auth.get_user_model()
 
 
+# SODAR constants
+SODAR_CONSTANTS = get_sodar_constants()
+PROJECT_TYPE_PROJECT = SODAR_CONSTANTS['PROJECT_TYPE_PROJECT']
+
 # Settings
 SUBJECT_PREFIX = settings.EMAIL_SUBJECT_PREFIX.strip() + ' '
 EMAIL_SENDER = settings.EMAIL_SENDER
@@ -27,6 +36,20 @@ ADMIN_RECIPIENT = settings.ADMINS[0]
 
 # Local constants
 EMAIL_RE = re.compile(r'(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)')
+EMAIL_QUEUE_SYNC = 'sync'
+EMAIL_QUEUE_COMMIT = 'commit'
+EMAIL_QUEUE_CELERY = 'celery'
+EMAIL_QUEUE_LOCMEM = 'locmem'
+LOCMEM_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+TRANSIENT_ERRORS = (
+    smtplib.SMTPServerDisconnected,
+    smtplib.SMTPConnectError,
+    ConnectionError,
+    TimeoutError,
+)
+
+# Active mail queues for the current thread
+_queue_local = threading.local()
 
 
 # Generic Elements -------------------------------------------------------------
@@ -83,6 +106,29 @@ MESSAGE_ROLE_DELETE = r'''
 {issuer} has removed your membership from {project_label} "{project}".
 '''.lstrip()
 
+SUBJECT_ROLE_BATCH = 'Membership changes in {count} {project_label}'
+
+MESSAGE_ROLE_BATCH = r'''
+{issuer} has changed your memberships in {site_title}
+as follows:
+
+{changes}
+'''.lstrip()
+
+MESSAGE_ROLE_BATCH_CREATE = r'''
+- Granted the role of "{role}" in {project_label} "{project}":
+  {project_url}
+'''.lstrip()
+
+MESSAGE_ROLE_BATCH_UPDATE = r'''
+- Changed role in {project_label} "{project}" into "{role}":
+  {project_url}
+'''.lstrip()
+
+MESSAGE_ROLE_BATCH_DELETE = r'''
+- Removed membership from {project_label} "{project}"
+'''.lstrip()
+
 
 # Invite Template --------------------------------------------------------------
 
@@ -344,6 +390,61 @@ def get_role_change_body(
     return body
 
 
+def get_role_batch_subject(changes):
+    """
+    Return role change digest email subject.
+
+    :param changes: List of (change_type, Project, Role or None) tuples
+    :return: String
+    """
+    return SUBJECT_PREFIX + SUBJECT_ROLE_BATCH.format(
+        count=len(changes),
+        project_label=get_display_name(PROJECT_TYPE_PROJECT, plural=True),
+    )
+
+
+def get_role_batch_body(changes, user_name, issuer, request):
+    """
+    Return role change digest email body.
+
+    :param changes: List of (change_type, Project, Role or None) tuples
+    :param user_name: Name of target user
+    :param issuer: User object for issuing user
+    :param request: HTTP request
+    :return: String
+    """
+    templates = {
+        'create': MESSAGE_ROLE_BATCH_CREATE,
+        'update': MESSAGE_ROLE_BATCH_UPDATE,
+        'delete': MESSAGE_ROLE_BATCH_DELETE,
+    }
+    change_lines = ''
+    for change_type, project, role in changes:
+        change_lines += templates[change_type].format(
+            role=role.name if role else '',
+            project=project.title,
+            project_label=get_display_name(project.type),
+            project_url=request.build_absolute_uri(
+                reverse(
+                    'projectroles:detail',
+                    kwargs={'project': project.sodar_uuid},
+                )
+            ),
+        )
+    body = get_email_header(
+        MESSAGE_HEADER.format(recipient=user_name, site_title=SITE_TITLE)
+    )
+    body += MESSAGE_ROLE_BATCH.format(
+        issuer=get_email_user(issuer),
+        site_title=SITE_TITLE,
+        changes=change_lines,
+    )
+    if not issuer.email and not settings.PROJECTROLES_EMAIL_SENDER_REPLY:
+        body += NO_REPLY_NOTE
+    body += get_email_footer()
+    return body
+
+
 def get_user_addr(user):
     """
     Return all the email addresses for a user as a list. Emails set with
@@ -374,41 +475,276 @@ def get_user_addr(user):
     return ret
 
 
-def send_mail(subject, message, recipient_list, request=None, reply_to=None):
+def build_message(subject, message, recipient_list, reply_to=None):
     """
-    Wrapper for send_mail() with logging and error messaging.
+    Return an EmailMessage object with the site sender.
 
     :param subject: Message subject (string)
     :param message: Message body (string)
     :param recipient_list: Recipients of email (list)
-    :param request: Request object (optional)
     :param reply_to: List of emails for the "reply-to" header (optional)
+    :return: EmailMessage object
+    """
+    return EmailMessage(
+        subject=subject,
+        body=message,
+        from_email=EMAIL_SENDER,
+        to=recipient_list,
+        reply_to=reply_to if isinstance(reply_to, list) else [],
+    )
+
+
+def message_to_dict(message):
+    """
+    Return EmailMessage as a JSON serializable dict.
+
+    :param message: EmailMessage object
+    :return: dict
+    """
+    return {
+        'subject': message.subject,
+        'body': message.body,
+        'from_email': message.from_email,
+        'to': message.to,
+        'reply_to': message.reply_to,
+    }
+
+
+def message_from_dict(data):
+    """
+    Return EmailMessage from a dict created with message_to_dict().
+
+    :param data: dict
+    :return: EmailMessage object
+    """
+    return EmailMessage(**data)
+
+
+def is_transient_error(ex):
+    """
+    Return True if exception raised in sending email is a transient failure
+    which may succeed on retry.
+
+    :param ex: Exception object
+    :return: bool
+    """
+    if isinstance(ex, smtplib.SMTPResponseException):
+        return 400 <= ex.smtp_code < 500
+    return isinstance(ex, TRANSIENT_ERRORS)
+
+
+def get_mail_connection():
+    """
+    Return email connection. If PROJECTROLES_EMAIL_QUEUE is set to "locmem",
+    the in-memory backend is used regardless of EMAIL_BACKEND.
+
+    :return: Email backend object
+    """
+    mode = getattr(settings, 'PROJECTROLES_EMAIL_QUEUE', EMAIL_QUEUE_SYNC)
+    return get_connection(
+        backend=LOCMEM_BACKEND if mode == EMAIL_QUEUE_LOCMEM else None,
+        fail_silently=False,
+    )
+
+
+def _send_message(connection, message, retries, retry_delay):
+    """
+    Send a single email message, retrying on transient failures.
+
+    :param connection: Email backend object
+    :param message: EmailMessage object
+    :param retries: Number of retries (int)
+    :param retry_delay: Base delay between retries in seconds (int)
     :return: Amount of sent email (int)
+    :raise: Exception if sending fails
     """
-    try:
-        e = EmailMessage(
-            subject=subject,
-            body=message,
-            from_email=EMAIL_SENDER,
-            to=recipient_list,
-            reply_to=reply_to if isinstance(reply_to, list) else [],
-        )
-        ret = e.send(fail_silently=False)
-        logger.debug(
-            '{} email{} sent to {}'.format(
-                ret, 's' if ret != 1 else '', ', '.join(recipient_list)
+    for attempt in range(retries + 1):
+        try:
+            connection.open()
+            sent = connection.send_messages([message]) or 0
+            logger.debug(
+                '{} email{} sent to {}'.format(
+                    sent, 's' if sent != 1 else '', ', '.join(message.to)
+                )
             )
-        )
-        return ret
+            return sent
+        except Exception as ex:
+            connection.close()
+            if attempt >= retries or not is_transient_error(ex):
+                raise ex
+            logger.warning(
+                'Error sending email, retrying ({}/{}): {}'.format(
+                    attempt + 1, retries, ex
+                )
+            )
+            time.sleep(retry_delay * (attempt + 1))
 
-    except Exception as ex:
-        error_msg = 'Error sending email: {}'.format(str(ex))
+
+def send_messages(email_messages, request=None):
+    """
+    Send email messages over a single connection with logging and error
+    messaging. Sending of each message is retried on transient failures
+    according to the PROJECTROLES_EMAIL_RETRIES and
+    PROJECTROLES_EMAIL_RETRY_DELAY settings. A failure in sending one message
+    does not prevent sending the remaining messages.
+
+    :param email_messages: List of EmailMessage objects
+    :param request: Request object (optional)
+    :return: Amount of sent email (int)
+    """
+
+    def _handle_error(ex, recipients=None):
+        error_msg = 'Error sending email{}: {}'.format(
+            ' to {}'.format(', '.join(recipients)) if recipients else '',
+            str(ex),
+        )
         logger.error(error_msg)
         if DEBUG:
             raise ex
         if request:
-            messages.error(request, error_msg)
+            # Fail silently for requests without messages, e.g. in commands
+            messages.error(request, error_msg, fail_silently=True)
+
+    email_messages = [m for m in email_messages if m.recipients()]
+    if not email_messages:
         return 0
+    retries = getattr(settings, 'PROJECTROLES_EMAIL_RETRIES', 2)
+    retry_delay = getattr(settings, 'PROJECTROLES_EMAIL_RETRY_DELAY', 1)
+    ret = 0
+    try:
+        connection = get_mail_connection()
+    except Exception as ex:
+        _handle_error(ex)
+        return ret
+    try:
+        for m in email_messages:
+            try:
+                ret += _send_message(connection, m, retries, retry_delay)
+            except Exception as ex:
+                _handle_error(ex, m.to)
+    finally:
+        connection.close()
+    return ret
+
+
+def dispatch_messages(email_messages, request=None):
+    """
+    Send email messages according to the PROJECTROLES_EMAIL_QUEUE setting:
+    immediately ("sync" or "locmem"), after the current transaction has been
+    committed ("commit") or in a Celery worker ("celery").
+
+    :param email_messages: List of EmailMessage objects
+    :param request: Request object (optional)
+    :return: Amount of sent or queued email (int)
+    """
+    mode = getattr(settings, 'PROJECTROLES_EMAIL_QUEUE', EMAIL_QUEUE_SYNC)
+    email_messages = [m for m in email_messages if m.recipients()]
+    if not email_messages:
+        return 0
+    if mode == EMAIL_QUEUE_COMMIT:
+        transaction.on_commit(lambda: send_messages(email_messages))
+    elif mode == EMAIL_QUEUE_CELERY:
+        from projectroles.tasks import send_mail_task
+
+        data = [message_to_dict(m) for m in email_messages]
+        transaction.on_commit(lambda: send_mail_task.delay(data))
+    else:
+        return send_messages(email_messages, request)
+    return len(email_messages)
+
+
+def get_mail_queue():
+    """
+    Return the innermost active MailQueue for the current thread.
+
+    :return: MailQueue object or None
+    """
+    queues = getattr(_queue_local, 'queues', None)
+    return queues[-1] if queues else None
+
+
+class MailQueue:
+    """
+    Outbound mail queue. Email sent with send_mail() within the context of a
+    queue is collected and dispatched in a single batch when exiting the
+    context. If queues are nested, messages are passed to the outer queue.
+    """
+
+    def __init__(self, request=None):
+        """
+        Initialize the queue.
+
+        :param request: Request object (optional)
+        """
+        self.request = request
+        self.messages = []
+        #: Amount of sent or queued email after exiting the context
+        self.sent = 0
+
+    def __enter__(self):
+        if not hasattr(_queue_local, 'queues'):
+            _queue_local.queues = []
+        _queue_local.queues.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _queue_local.queues.remove(self)
+        if exc_type is None:
+            self.send()
+
+    def add(self, message):
+        """
+        Add message to the queue.
+
+        :param message: EmailMessage object
+        :return: Amount of queued email (int)
+        """
+        if not message.recipients():
+            return 0
+        self.messages.append(message)
+        return 1
+
+    def send(self):
+        """
+        Dispatch queued messages.
+
+        :return: Amount of sent or queued email (int)
+        """
+        email_messages = self.messages
+        self.messages = []
+        outer_queue = get_mail_queue()
+        if outer_queue:
+            self.sent = sum(outer_queue.add(m) for m in email_messages)
+        else:
+            self.sent = dispatch_messages(email_messages, self.request)
+        return self.sent
+
+
+def send_mail(
+    subject,
+    message,
+    recipient_list,
+    request=None,
+    reply_to=None,
+    use_queue=True,
+):
+    """
+    Wrapper for send_mail() with logging and error messaging. If a MailQueue is
+    active and use_queue is True, the message is added to the queue.
+
+    :param subject: Message subject (string)
+    :param message: Message body (string)
+    :param recipient_list: Recipients of email (list)
+    :param request: Request object (optional)
+    :param reply_to: List of emails for the "reply-to" header (optional)
+    :param use_queue: Add message to active MailQueue (bool, default True)
+    :return: Amount of sent or queued email (int)
+    """
+    e = build_message(subject, message, recipient_list, reply_to)
+    queue = get_mail_queue() if use_queue else None
+    if queue:
+        return queue.add(e)
+    return dispatch_messages([e], request)
 
 
 # Sending functions ------------------------------------------------------------
@@ -443,6 +779,29 @@ def send_role_change_mail(change_type, project, user, role, request):
     )
 
 
+def send_role_batch_mail(changes, user, request):
+    """
+    Send a single email to user summarizing multiple role changes. If only one
+    change is given, a regular role change email is sent.
+
+    :param changes: List of (change_type, Project, Role or None) tuples
+    :param user: User object
+    :param request: HTTP request
+    :return: Amount of sent email (int)
+    """
+    if len(changes) == 1:
+        change_type, project, role = changes[0]
+        return send_role_change_mail(change_type, project, user, role, request)
+    subject = get_role_batch_subject(changes)
+    message = get_role_batch_body(
+        changes, user.get_full_name(), request.user, request
+    )
+    issuer_emails = get_user_addr(request.user)
+    return send_mail(
+        subject, message, get_user_addr(user), request, issuer_emails
+    )
+
+
 def send_invite_mail(invite, request):
     """
     Send an email invitation to user not yet registered in the system.
@@ -465,7 +824,15 @@ def send_invite_mail(invite, request):
     message += get_email_footer()
     subject = get_invite_subject(invite.project)
     issuer_emails = get_user_addr(invite.issuer)
-    return send_mail(subject, message, [invite.email], request, issuer_emails)
+    # Bypass MailQueue so that failed sending can be detected by the caller
+    return send_mail(
+        subject,
+        message,
+        [invite.email],
+        request,
+        issuer_emails,
+        use_queue=False,
+    )
 
 
 def send_accept_note(invite, request, user):
@@ -644,23 +1011,26 @@ def send_generic_mail(
     :return: Amount of mail sent (int)
     """
     subject = SUBJECT_PREFIX + subject_body
-    ret = 0
-
-    for recipient in recipient_list:
-        if isinstance(recipient, User):
-            recp_name = recipient.get_full_name()
-            recp_addr = get_user_addr(recipient)
-        else:
-            recp_name = 'recipient'
-            recp_addr = [recipient]
-
-        message = get_email_header(
-            MESSAGE_HEADER.format(recipient=recp_name, site_title=SITE_TITLE)
-        )
-        message += message_body
-        if not reply_to and not settings.PROJECTROLES_EMAIL_SENDER_REPLY:
-            message += NO_REPLY_NOTE
-        message += get_email_footer()
-        ret += send_mail(subject, message, recp_addr, request, reply_to)
+    queue = MailQueue(request)
+
+    with queue:
+        for recipient in recipient_list:
+            if isinstance(recipient, User):
+                recp_name = recipient.get_full_name()
+                recp_addr = get_user_addr(recipient)
+            else:
+                recp_name = 'recipient'
+                recp_addr = [recipient]
+
+            message = get_email_header(
+                MESSAGE_HEADER.format(
+                    recipient=recp_name, site_title=SITE_TITLE
+                )
+            )
+            message += message_body
+            if not reply_to and not settings.PROJECTROLES_EMAIL_SENDER_REPLY:
+                message += NO_REPLY_NOTE
+            message += get_email_footer()
+            send_mail(subject, message, recp_addr, request, reply_to)
 
-    return ret
+    return queue.sent
@@ -7,6 +7,7 @@ from django import forms
 from django.conf import settings
 from django.contrib import auth
 from django.core.exceptions import ValidationError
+from django.db.models import Q
 from django.urls import reverse
 from django.utils import timezone
 
@@ -104,7 +105,21 @@ class SODARPagedownWidget(PagedownWidget):
         css = {'all': ['projectroles/css/pagedown.css']}
 
 
-# User autocompletion ----------------------------------------------------------
+# Autocompletion ---------------------------------------------------------------
+
+
+class SODARProjectAutocompleteWidget(autocomplete.ModelSelect2):
+    """
+    Custom Select widget for project field autocompletion which uses the
+    Project class sodar_uuid instead of pk.
+    """
+
+    # Override function to use sodar_uuid instead of pk
+    def filter_choices_to_render(self, selected_choices):
+        """Filter out un-selected choices if choices is a QuerySet."""
+        self.choices.queryset = self.choices.queryset.filter(
+            sodar_uuid__in=[c for c in selected_choices if c]
+        )
 
 
 class SODARUserAutocompleteWidget(autocomplete.ModelSelect2):
@@ -238,81 +253,65 @@ class ProjectForm(SODARModelForm):
         ]
 
     @classmethod
-    def _get_parent_choices(cls, instance, user):
+    def _is_root_allowed(cls, instance, user):
         """
-        Return valid choices of parent categories for moving a project.
+        Return True if the instance can be placed in root by user.
 
         :param instance: Project instance being updated
         :param user: Request user
-        :return: List of tuples
+        :return: Boolean
         """
-        ret = []
-        # Add empty choice (root) in cases where valid
-        if (
+        return (
             user.is_superuser
             or not instance.parent
             or (
                 instance.type == PROJECT_TYPE_PROJECT
                 and getattr(settings, 'PROJECTROLES_DISABLE_CATEGORIES', False)
             )
-        ):
-            ret.append((None, EMPTY_CHOICE_LABEL))
+        )
+
+    @classmethod
+    def get_parent_queryset(cls, instance, user):
+        """
+        Return valid parent categories for moving a project. The current parent
+        of the project is always included.
 
+        :param instance: Project instance being updated
+        :param user: Request user
+        :return: QuerySet of Project objects
+        """
         categories = Project.objects.filter(type=PROJECT_TYPE_CATEGORY).exclude(
             pk=instance.pk
         )
+        # If instance is category, exclude children
+        if instance.type == PROJECT_TYPE_CATEGORY:
+            categories = categories.exclude(
+                full_title__startswith=instance.full_title + CAT_DELIMITER
+            )
 
         if not user.is_superuser:
-            categories = categories.filter(
-                roles__in=RoleAssignment.objects.filter(
-                    user=user,
-                    role__name__in=[
-                        PROJECT_ROLE_OWNER,
-                        PROJECT_ROLE_DELEGATE,
-                        PROJECT_ROLE_CONTRIBUTOR,
-                    ],
-                )
+            cat_query = Q(
+                roles__user=user,
+                roles__role__name__in=[
+                    PROJECT_ROLE_OWNER,
+                    PROJECT_ROLE_DELEGATE,
+                    PROJECT_ROLE_CONTRIBUTOR,
+                ],
             )
             # Add categories with inherited ownership
-            role_owner = Role.objects.filter(name=PROJECT_ROLE_OWNER).first()
-            owned_cats = [
-                r.project.full_title + CAT_DELIMITER
-                for r in RoleAssignment.objects.filter(
-                    project__type=PROJECT_TYPE_CATEGORY,
-                    user=user,
-                    role=role_owner,
-                )
-            ]
-            other_categories = Project.objects.filter(
-                type=PROJECT_TYPE_CATEGORY
-            ).exclude(pk__in=categories)
-            categories = list(categories)
-            for c in other_categories:
-                if any(c.full_title.startswith(t) for t in owned_cats):
-                    categories.append(c)
-
-        # If instance is category, exclude children
-        if instance.type == PROJECT_TYPE_CATEGORY:
-            categories = [
-                c
-                for c in categories
-                if (
-                    c.parent != instance
-                    and c not in instance.get_children(flat=True)
-                )
-            ]
-
-        # FIX for #558: Ensure current parent is in choices
-        if (
-            categories
-            and not user.is_superuser
-            and instance.parent
-            and instance.parent not in categories
-        ):
-            categories.append(instance.parent)
-
-        ret += [(c.sodar_uuid, c.full_title) for c in categories]
-        return sorted(ret, key=lambda x: x[1])
+            owned_titles = Project.objects.filter(
+                type=PROJECT_TYPE_CATEGORY,
+                roles__user=user,
+                roles__role__name=PROJECT_ROLE_OWNER,
+            ).values_list('full_title', flat=True)
+            for title in owned_titles:
+                cat_query |= Q(full_title__startswith=title + CAT_DELIMITER)
+            # FIX for #558: Ensure current parent is in choices
+            if instance.parent_id:
+                cat_query |= Q(pk=instance.parent_id)
+            categories = categories.filter(cat_query).distinct()
+
+        return categories.order_by('full_title')
 
     def _set_app_setting_widget(self, app_name, s_field, s_key, s_val):
         """Internal helper for setting app setting widget and value"""
@@ -432,6 +431,34 @@ class ProjectForm(SODARModelForm):
                 # Set label notes
                 self._set_app_setting_notes(s_field, s_val)
 
+    def _init_parent_field(self):
+        """Set up parent field with autocomplete for valid parent categories"""
+        field = self.fields['parent']
+        root_allowed = self._is_root_allowed(self.instance, self.current_user)
+        field.queryset = self.get_parent_queryset(
+            self.instance, self.current_user
+        )
+        field.empty_label = EMPTY_CHOICE_LABEL if root_allowed else None
+        # Hide widget if no valid choices are available
+        other_parents = field.queryset
+        if self.instance.parent_id:
+            other_parents = other_parents.exclude(pk=self.instance.parent_id)
+        if not root_allowed and not other_parents.exists():
+            field.widget = forms.HiddenInput()
+            return
+        field.widget = SODARProjectAutocompleteWidget(
+            url='projectroles:ajax_autocomplete_parent',
+            forward=[
+                dal_forward.Const(str(self.instance.sodar_uuid), 'project')
+            ],
+            attrs={
+                'data-placeholder': EMPTY_CHOICE_LABEL,
+                'data-allow-clear': 'true' if root_allowed else 'false',
+                'data-minimum-input-length': 0,
+            },
+        )
+        field.widget.choices = field.choices
+
     def __init__(self, project=None, current_user=None, *args, **kwargs):
         """Override for form initialization"""
         super().__init__(*args, **kwargs)
@@ -487,12 +514,7 @@ class ProjectForm(SODARModelForm):
 
             # Set valid choices for parent
             if not disable_categories:
-                self.fields['parent'].choices = self._get_parent_choices(
-                    self.instance, self.current_user
-                )
-                # Hide widget if no valid choices are available
-                if len(self.fields['parent'].choices) == 0:
-                    self.fields['parent'].widget = forms.HiddenInput()
+                self._init_parent_field()
                 # Set initial value for parent
                 if self.instance.parent:
                     self.initial['parent'] = self.instance.parent.sodar_uuid
@@ -7,15 +7,15 @@ from django.core.management.base import BaseCommand
 from django.http import HttpRequest
 from django.utils import timezone
 
+from projectroles.email import MailQueue
 from projectroles.management.logging import ManagementCommandLogger
 from projectroles.models import (
     Project,
     Role,
-    RoleAssignment,
     ProjectInvite,
     SODAR_CONSTANTS,
 )
-from projectroles.views import RoleAssignmentModifyMixin, ProjectInviteMixin
+from projectroles.views import RoleAssignmentBatchMixin, ProjectInviteMixin
 from projectroles.utils import get_expiry_date, build_secret
 
 
@@ -38,7 +38,7 @@ class MockRequest(HttpRequest):
         return self.scheme
 
 
-class Command(RoleAssignmentModifyMixin, ProjectInviteMixin, BaseCommand):
+class Command(RoleAssignmentBatchMixin, ProjectInviteMixin, BaseCommand):
     help = 'Batch updates project roles and sends invites'
 
     roles = None
@@ -49,6 +49,7 @@ class Command(RoleAssignmentModifyMixin, ProjectInviteMixin, BaseCommand):
     invite_count = 0
     request = None
     sodar_url = None
+    role_changes = None
 
     def __init__(
         self, stdout=None, stderr=None, no_color=False, sodar_url=None
@@ -69,35 +70,50 @@ class Command(RoleAssignmentModifyMixin, ProjectInviteMixin, BaseCommand):
         request.user = self.issuer
         return request
 
-    def _update_role(self, project, user, role):
-        """Handle role update for an existing user"""
+    def _add_role_change(self, project, user, role):
+        """Add role change for an existing user to be applied in batch"""
         logger.info(
-            'Updating role of user {} to {}..'.format(user.username, role.name)
-        )
-        if user in [a.user for a in project.get_owners(inherited_only=True)]:
-            logger.info('Skipping as user has inherited ownership')
-            return
-
-        role_as = RoleAssignment.objects.filter(
-            project=project, user=user
-        ).first()
-        if role_as and role_as.role == role:
-            logger.info('Skipping as role already exists for user')
-            return
-        elif role_as and role_as.role == self.owner_role:
-            logger.warning(
-                'Skipping as ownership transfer is not permitted here'
+            'Adding role change of user {} to {}..'.format(
+                user.username, role.name
             )
-            return
+        )
+        self.role_changes.append(
+            {'project': project, 'user': user, 'role': role}
+        )
 
-        self.modify_assignment(
-            data={'user': user, 'role': role},
-            request=self.request,
-            project=project,
-            instance=role_as,
-            sodar_url=self.sodar_url,
+    def _apply_role_changes(self):
+        """Validate and apply collected role changes in a single batch"""
+        changes, errors = self.validate_role_batch(
+            self.role_changes, self.issuer
         )
-        self.update_count += 1
+        for i, msg in errors:
+            c = self.role_changes[i]
+            logger.error(
+                'Skipping role of user {} in {} "{}": {}'.format(
+                    c['user'].username,
+                    c['project'].type.lower(),
+                    c['project'].title,
+                    msg,
+                )
+            )
+        for c in [c for c in changes if not c['action']]:
+            logger.info(
+                'Skipping as role already exists for user {} in {} '
+                '"{}"'.format(
+                    c['user'].username,
+                    c['project'].type.lower(),
+                    c['project'].title,
+                )
+            )
+        changes = [c for c in changes if c['action']]
+        logger.info('Applying {} role changes..'.format(len(changes)))
+        try:
+            self.apply_role_batch(changes, self.request, self.sodar_url)
+        except Exception as ex:
+            logger.error('Exception in applying role changes: {}'.format(ex))
+            return len(errors) + len(changes)
+        self.update_count = len(changes)
+        return len(errors)
 
     def _invite_user(self, email, project, role):
         """Create and send user for user not yet in system"""
@@ -148,8 +164,14 @@ class Command(RoleAssignmentModifyMixin, ProjectInviteMixin, BaseCommand):
             )
             return
         user = users.first()
-        del_limit = getattr(settings, 'PROJECTROLES_DELEGATE_LIMIT', 1)
 
+        # Add role change for existing user in the system
+        # NOTE: Validation is done for all role changes in batch
+        if user:
+            self._add_role_change(project, user, role)
+            return
+
+        del_limit = getattr(settings, 'PROJECTROLES_DELEGATE_LIMIT', 1)
         if (
             role == self.del_role
             and del_limit != 0
@@ -167,23 +189,11 @@ class Command(RoleAssignmentModifyMixin, ProjectInviteMixin, BaseCommand):
                 'Issuer lacks perms to update delegates in this project'
             )
 
-        # Update role for existing user in the system
-        if user:
-            try:
-                self._update_role(project, user, role)
-            except Exception as ex:
-                raise Exception(
-                    'Exception raised by _update_role(): ' '{}'.format(ex)
-                )
-
         # Invite user not yet in the system
-        else:
-            try:
-                self._invite_user(email, project, role)
-            except Exception as ex:
-                raise Exception(
-                    'Exception raised by _invite_user(): {}'.format(ex)
-                )
+        try:
+            self._invite_user(email, project, role)
+        except Exception as ex:
+            raise Exception('Exception raised by _invite_user(): {}'.format(ex))
 
     # Command ------------------------------------------------------------------
 
@@ -259,49 +269,62 @@ class Command(RoleAssignmentModifyMixin, ProjectInviteMixin, BaseCommand):
         self.owner_role = self.roles[SODAR_CONSTANTS['PROJECT_ROLE_OWNER']]
         self.del_role = self.roles[SODAR_CONSTANTS['PROJECT_ROLE_DELEGATE']]
         self.request = self._make_request()
+        self.role_changes = []
         project_uuids = list(set([d.split(';')[0] for d in file_data]))
         error_count = 0
 
-        for p_uuid in project_uuids:
-            project = Project.objects.filter(sodar_uuid=p_uuid).first()
-            if not project:
-                logger.error('Project not found with UUID: {}'.format(p_uuid))
-                continue
-            if project.is_remote():
-                logger.error(
-                    'Skipping remote {} "{}" ({})'.format(
-                        project.type.lower(), project.title, project.sodar_uuid
+        # Send email over a single connection once all rows are handled
+        with MailQueue(self.request):
+            for p_uuid in project_uuids:
+                project = Project.objects.filter(sodar_uuid=p_uuid).first()
+                if not project:
+                    logger.error(
+                        'Project not found with UUID: {}'.format(p_uuid)
                     )
-                )
-                continue
-
-            if not self.issuer.has_perm(
-                'projectroles.update_project_members', project
-            ) or not self.issuer.has_perm('projectroles.invite_users', project):
-                logger.error(
-                    'Skipping project, issuer {} lacks perms to update or '
-                    'invite members'.format(self.issuer.username)
-                )
-                continue
+                    continue
+                if project.is_remote():
+                    logger.error(
+                        'Skipping remote {} "{}" ({})'.format(
+                            project.type.lower(),
+                            project.title,
+                            project.sodar_uuid,
+                        )
+                    )
+                    continue
+
+                if not self.issuer.has_perm(
+                    'projectroles.update_project_members', project
+                ) or not self.issuer.has_perm(
+                    'projectroles.invite_users', project
+                ):
+                    logger.error(
+                        'Skipping project, issuer {} lacks perms to update or '
+                        'invite members'.format(self.issuer.username)
+                    )
+                    continue
 
-            logger.info(
-                'Updating roles in {} "{}" ({})..'.format(
-                    project.type.lower(), project.title, project.sodar_uuid
+                logger.info(
+                    'Updating roles in {} "{}" ({})..'.format(
+                        project.type.lower(), project.title, project.sodar_uuid
+                    )
                 )
-            )
 
-            for ds in [
-                d.split(';') for d in file_data if d.split(';')[0] == p_uuid
-            ]:
-                try:
-                    self._handle_list_row(
-                        project=project, role_name=ds[2].strip(), email=ds[1]
-                    )
-                except Exception as ex:
-                    logger.error(ex)
-                    error_count += 1
-                    # if settings.DEBUG:
-                    #     raise ex
+                for ds in [
+                    d.split(';') for d in file_data if d.split(';')[0] == p_uuid
+                ]:
+                    try:
+                        self._handle_list_row(
+                            project=project,
+                            role_name=ds[2].strip(),
+                            email=ds[1],
+                        )
+                    except Exception as ex:
+                        logger.error(ex)
+                        error_count += 1
+                        # if settings.DEBUG:
+                        #     raise ex
+
+            error_count += self._apply_role_changes()
 
         logger.info(
             'Update done: {} invite{} sent, {} role{} updated, '
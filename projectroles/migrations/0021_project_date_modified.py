@@ -0,0 +1,18 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projectroles', '0020_project_has_public_children'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='date_modified',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, help_text='DateTime of last project or role modification (auto-generated)'),
+            preserve_default=False,
+        ),
+    ]
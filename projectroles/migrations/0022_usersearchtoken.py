@@ -0,0 +1,75 @@
+# Generated by Django 3.2.25 on 2026-10-19 07:44
+
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# NOTE: Copied from projectroles.models and projectroles.utils at the time of
+# writing, so later changes to the app code do not alter this migration
+USER_SEARCH_FIELDS = ['username', 'first_name', 'last_name', 'name', 'email']
+SEARCH_TOKEN_MAX_LENGTH = 64
+SEARCH_TOKEN_SPLIT_RE = re.compile(r'[\W_]+')
+
+
+def get_search_tokens(*values):
+    """Return normalized search tokens for strings"""
+    tokens = set()
+    for v in values:
+        if not v:
+            continue
+        v = ''.join(
+            c
+            for c in unicodedata.normalize('NFKD', str(v))
+            if not unicodedata.combining(c)
+        ).casefold()
+        tokens.update(
+            t[:SEARCH_TOKEN_MAX_LENGTH]
+            for t in SEARCH_TOKEN_SPLIT_RE.split(v)
+            if t
+        )
+    return sorted(tokens)
+
+
+def populate_search_tokens(apps, schema_editor):
+    """Populate UserSearchToken objects for existing users"""
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    UserSearchToken = apps.get_model('projectroles', 'UserSearchToken')
+    tokens = []
+    for user in User.objects.all():
+        values = [getattr(user, f, None) for f in USER_SEARCH_FIELDS]
+        tokens += [
+            UserSearchToken(user=user, token=t)
+            for t in get_search_tokens(*values)
+        ]
+    UserSearchToken.objects.bulk_create(tokens)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projectroles', '0021_project_date_modified'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchToken',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(db_index=True, help_text='Normalized search token', max_length=64)),
+                ('user', models.ForeignKey(help_text='User to whom the token belongs', on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['user__username', 'token'],
+                'unique_together': {('user', 'token')},
+            },
+        ),
+        migrations.RunPython(
+            populate_search_tokens,
+            reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -10,14 +10,17 @@ from django.contrib.auth.models import AbstractUser, Group
 from django.contrib.auth.signals import user_logged_in
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.db.models import Q
+from django.db.models import Count, Max, Q
+from django.db.models.signals import post_delete, post_save
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
 from djangoplugins.models import Plugin
 from markupfield.fields import MarkupField
 
 from projectroles.constants import get_sodar_constants
+from projectroles.utils import SEARCH_TOKEN_MAX_LENGTH, get_search_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +43,7 @@ APP_SETTING_VAL_MAXLENGTH = 255
 PROJECT_SEARCH_TYPES = ['project']
 PROJECT_TAG_STARRED = 'STARRED'
 CAT_DELIMITER = ' / '
+USER_SEARCH_FIELDS = ['username', 'first_name', 'last_name', 'name', 'email']
 
 
 # Project ----------------------------------------------------------------------
@@ -70,6 +74,18 @@ class ProjectManager(models.Manager):
 
         return projects.filter(term_query).order_by('full_title')
 
+    def get_modified_state(self):
+        """
+        Return the number of projects and the latest project modification time.
+        Can be used to detect changes in project lists.
+
+        :return: Integer, DateTime or None
+        """
+        ret = self.get_queryset().aggregate(
+            count=Count('pk'), last_modified=Max('date_modified')
+        )
+        return ret['count'], ret['last_modified']
+
 
 class Project(models.Model):
     """
@@ -147,6 +163,13 @@ class Project(models.Model):
         '(auto-generated)',
     )
 
+    #: DateTime of last project or role modification (auto-generated)
+    date_modified = models.DateTimeField(
+        auto_now=True,
+        help_text='DateTime of last project or role modification '
+        '(auto-generated)',
+    )
+
     #: Project SODAR UUID
     sodar_uuid = models.UUIDField(
         default=uuid.uuid4, unique=True, help_text='Project SODAR UUID'
@@ -1107,6 +1130,89 @@ class RemoteProject(models.Model):
         )
 
 
+# UserSearchToken --------------------------------------------------------------
+
+
+class UserSearchTokenManager(models.Manager):
+    """Manager for custom table-level UserSearchToken queries"""
+
+    def update_user(self, user):
+        """
+        Update search tokens for a user.
+
+        :param user: User object
+        """
+        tokens = get_search_tokens(
+            *[getattr(user, f) for f in USER_SEARCH_FIELDS if hasattr(user, f)]
+        )
+        self.filter(user=user).exclude(token__in=tokens).delete()
+        existing = set(self.filter(user=user).values_list('token', flat=True))
+        self.bulk_create(
+            [
+                self.model(user=user, token=t)
+                for t in tokens
+                if t not in existing
+            ]
+        )
+
+    def filter_users(self, queryset, query):
+        """
+        Filter a User queryset by a search query. Each word in the query must
+        match the beginning of a search token of the user. If the query
+        contains no searchable words, no users are returned.
+
+        :param queryset: QuerySet of User objects
+        :param query: Search query (string)
+        :return: QuerySet of User objects
+        """
+        tokens = get_search_tokens(query)
+        if not tokens:
+            return queryset.none()
+        for t in tokens:
+            queryset = queryset.filter(
+                pk__in=self.filter(token__startswith=t).values('user')
+            )
+        return queryset
+
+
+class UserSearchToken(models.Model):
+    """
+    Normalized search token for a user, used for indexed user autocompletion
+    """
+
+    #: User to whom the token belongs
+    user = models.ForeignKey(
+        AUTH_USER_MODEL,
+        null=False,
+        related_name='search_tokens',
+        help_text='User to whom the token belongs',
+        on_delete=models.CASCADE,
+    )
+
+    #: Normalized search token
+    token = models.CharField(
+        max_length=SEARCH_TOKEN_MAX_LENGTH,
+        null=False,
+        blank=False,
+        db_index=True,
+        help_text='Normalized search token',
+    )
+
+    # Set manager for custom queries
+    objects = UserSearchTokenManager()
+
+    class Meta:
+        ordering = ['user__username', 'token']
+        unique_together = ('user', 'token')
+
+    def __str__(self):
+        return '{}: {}'.format(self.user.username, self.token)
+
+    def __repr__(self):
+        values = (self.user.username, self.token)
+        return 'UserSearchToken({})'.format(', '.join(repr(v) for v in values))
+
+
 # Abstract User Model ----------------------------------------------------------
 
 
@@ -1190,5 +1296,64 @@ def assign_user_group(sender, user, **kwargs):
     user.set_group()
 
 
+def handle_user_search_update(sender, instance, update_fields=None, **kwargs):
+    """Signal for updating user search tokens on user changes"""
+    if update_fields and not set(update_fields) & set(USER_SEARCH_FIELDS):
+        return  # Skip e.g. last_login updates
+    UserSearchToken.objects.update_user(instance)
+
+
 user_logged_in.connect(handle_ldap_login)
 user_logged_in.connect(assign_user_group)
+post_save.connect(handle_user_search_update, sender=settings.AUTH_USER_MODEL)
+
+
+# Cache invalidation signals ---------------------------------------------------
+
+
+def handle_plugin_change(sender, instance, **kwargs):
+    """Signal for clearing cached site and project apps on plugin changes"""
+    from projectroles.plugins import (
+        clear_project_app_cache,
+        clear_site_app_cache,
+    )
+
+    clear_site_app_cache()
+    clear_project_app_cache()
+
+
+def handle_user_change(sender, instance, **kwargs):
+    """Signal for clearing cached site apps on user changes"""
+    from projectroles.plugins import clear_site_app_cache
+
+    clear_site_app_cache(instance)
+
+
+def handle_role_change(sender, instance, **kwargs):
+    """Signal for clearing cached site apps on role changes"""
+    from projectroles.plugins import clear_site_app_cache
+
+    if instance.user_id:
+        clear_site_app_cache(instance.user)
+
+
+def handle_project_relation_change(sender, instance, **kwargs):
+    """
+    Signal for updating the project modification time on changes to related
+    objects such as roles
+    """
+    if instance.project_id:
+        Project.objects.filter(pk=instance.project_id).update(
+            date_modified=timezone.now()
+        )
+
+
+post_save.connect(handle_plugin_change, sender=Plugin)
+post_delete.connect(handle_plugin_change, sender=Plugin)
+post_save.connect(handle_user_change, sender=settings.AUTH_USER_MODEL)
+post_save.connect(handle_role_change, sender=RoleAssignment)
+post_delete.connect(handle_role_change, sender=RoleAssignment)
+post_save.connect(handle_project_relation_change, sender=RoleAssignment)
+post_delete.connect(handle_project_relation_change, sender=RoleAssignment)
+post_save.connect(handle_project_relation_change, sender=RemoteProject)
+post_delete.connect(handle_project_relation_change, sender=RemoteProject)
@@ -1,8 +1,19 @@
 """Plugin point definitions and plugin API for apps based on projectroles"""
 
+import uuid
+
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
 from djangoplugins.point import PluginPoint
 
+from projectroles.constants import get_sodar_constants
+
+
+# SODAR constants
+SODAR_CONSTANTS = get_sodar_constants()
+PROJECT_TYPE_PROJECT = SODAR_CONSTANTS['PROJECT_TYPE_PROJECT']
+PROJECT_ROLE_OWNER = SODAR_CONSTANTS['PROJECT_ROLE_OWNER']
 
 # Local costants
 PLUGIN_TYPES = {
@@ -16,6 +27,15 @@ ENABLED = 0
 DISABLED = 1
 REMOVED = 2
 
+SITE_APP_VERSION_KEY = 'projectroles_site_apps'
+SITE_APP_USER_VERSION_KEY = 'projectroles_site_apps_user_{}'
+SITE_APP_CACHE_KEY = 'projectroles_site_apps_{version}_{user_version}'
+PROJECT_APP_VERSION_KEY = 'projectroles_project_apps'
+PROJECT_APP_CACHE_KEY = (
+    'projectroles_project_apps_{project}_{revision}_{role}_{version}'
+)
+APP_CACHE_TIMEOUT = 300
+
 
 # Plugin points ----------------------------------------------------------------
 
@@ -87,6 +107,11 @@ class ProjectAppPluginPoint(PluginPoint):
     # TODO: Implement this in your app plugin (can be None)
     details_title = None
 
+    #: Load the app card for the project details page with Ajax after the
+    #: page has been rendered, recommended for cards with expensive queries
+    # TODO: Override this in your app plugin if needed
+    details_lazy = False
+
     #: Position in plugin ordering
     # TODO: Implement this in your app plugin (must be an integer)
     plugin_ordering = 50
@@ -460,6 +485,158 @@ def get_active_plugins(plugin_type='project_app', custom_order=False):
     return None
 
 
+def _get_app_cache_timeout():
+    """Return timeout in seconds for app visibility caching"""
+    return getattr(
+        settings, 'PROJECTROLES_APP_CACHE_TIMEOUT', APP_CACHE_TIMEOUT
+    )
+
+
+def _get_cache_version(key, timeout):
+    """
+    Return cache version stored under key, setting a new version if not found.
+    The version expires along with the cached data, so invalidations made in
+    another process with a non-shared cache backend take effect after the
+    timeout at the latest.
+    """
+    version = cache.get(key)
+    if not version:
+        version = uuid.uuid4().hex
+        cache.set(key, version, timeout)
+    return version
+
+
+def _get_site_app_user_key(user):
+    """Return site app cache version key for user"""
+    return SITE_APP_USER_VERSION_KEY.format(
+        user.pk if user.is_authenticated else 'anonymous'
+    )
+
+
+def get_user_site_apps(user):
+    """
+    Return active site app plugins visible to a user. The result is cached for
+    PROJECTROLES_APP_CACHE_TIMEOUT seconds, or until site app plugin status or
+    the user's permissions change.
+
+    :param user: User object or AnonymousUser
+    :return: List
+    """
+
+    def _get_visible_apps():
+        return [
+            a
+            for a in get_active_plugins('site_app') or []
+            if not a.app_permission or user.has_perm(a.app_permission)
+        ]
+
+    timeout = _get_app_cache_timeout()
+    if not timeout:
+        return _get_visible_apps()
+    cache_key = SITE_APP_CACHE_KEY.format(
+        version=_get_cache_version(SITE_APP_VERSION_KEY, timeout),
+        user_version=_get_cache_version(_get_site_app_user_key(user), timeout),
+    )
+    names = cache.get(cache_key)
+    if names is None:
+        site_apps = _get_visible_apps()
+        cache.set(cache_key, [a.name for a in site_apps], timeout)
+        return site_apps
+    # Instantiate cached plugins without querying plugin status
+    plugin_classes = {p.name: p for p in SiteAppPluginPoint.plugins}
+    return [plugin_classes[n]() for n in names if n in plugin_classes]
+
+
+def clear_site_app_cache(user=None):
+    """
+    Invalidate cached site app visibility.
+
+    :param user: Invalidate only for this user (User object, optional)
+    """
+    key = _get_site_app_user_key(user) if user else SITE_APP_VERSION_KEY
+    cache.delete(key)
+
+
+def is_project_app_visible(plugin, project, user):
+    """
+    Return True if a project app should be visible for a user in a project.
+
+    :param plugin: ProjectAppPluginPoint object
+    :param project: Project object
+    :param user: User object or AnonymousUser
+    :return: Boolean
+    """
+    if (
+        plugin.name in getattr(settings, 'PROJECTROLES_HIDE_APP_LINKS', [])
+        and not user.is_superuser
+    ):
+        return False
+    return (
+        project.type == PROJECT_TYPE_PROJECT or plugin.category_enable
+    ) and user.has_perm(plugin.app_permission, project)
+
+
+def _get_project_role_key(project, user):
+    """Return role of user in project for project app cache keys"""
+    from projectroles.models import RoleAssignment
+
+    if user.is_superuser:
+        return 'superuser'
+    if not user.is_authenticated:
+        return 'anonymous'
+    roles = dict(
+        RoleAssignment.objects.filter(user=user)
+        .filter(
+            Q(project=project)
+            | Q(
+                project__in=[p.pk for p in project.get_parents()],
+                role__name=PROJECT_ROLE_OWNER,
+            )
+        )
+        .values_list('project', 'role__name')
+    )
+    # Inherited ownership overrides any local role of the user
+    if any(k != project.pk for k in roles):
+        return PROJECT_ROLE_OWNER
+    return roles.get(project.pk, 'none')
+
+
+def get_project_app_plugins(project, user):
+    """
+    Return active project app plugins visible to a user in a project, ordered
+    by plugin_ordering. The result is cached by the user's role in the project
+    and the project modification time for PROJECTROLES_APP_CACHE_TIMEOUT
+    seconds, or until project app plugin status changes.
+
+    :param project: Project object
+    :param user: User object or AnonymousUser
+    :return: List
+    """
+    plugins = get_active_plugins('project_app', custom_order=True) or []
+    timeout = _get_app_cache_timeout()
+    if not timeout:
+        return [p for p in plugins if is_project_app_visible(p, project, user)]
+    version = _get_cache_version(PROJECT_APP_VERSION_KEY, timeout)
+    cache_key = PROJECT_APP_CACHE_KEY.format(
+        project=project.sodar_uuid,
+        revision=project.date_modified.timestamp(),
+        role=_get_project_role_key(project, user).replace(' ', '_'),
+        version=version,
+    )
+    names = cache.get(cache_key)
+    if names is None:
+        names = [
+            p.name for p in plugins if is_project_app_visible(p, project, user)
+        ]
+        cache.set(cache_key, names, timeout)
+    return [p for p in plugins if p.name in names]
+
+
+def clear_project_app_cache():
+    """Invalidate cached project app visibility for all projects"""
+    cache.delete(PROJECT_APP_VERSION_KEY)
+
+
 def change_plugin_status(name, status, plugin_type='app'):
     """
     Change the status of a selected plugin in the database.
@@ -0,0 +1,126 @@
+"""Post-modify pipeline for project creation and update side effects"""
+
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpRequest
+
+
+logger = logging.getLogger(__name__)
+
+
+# Local constants
+PIPELINE_MODE_SYNC = 'sync'
+PIPELINE_MODE_COMMIT = 'commit'
+PIPELINE_MODE_CELERY = 'celery'
+STEP_STATUS_OK = 'OK'
+STEP_STATUS_FAILED = 'FAILED'
+
+
+def get_pipeline_mode():
+    """Return the post-modify pipeline mode set in the Django settings"""
+    return getattr(settings, 'PROJECTROLES_MODIFY_PIPELINE', PIPELINE_MODE_SYNC)
+
+
+class PostModifyPipeline:
+    """
+    Pipeline of steps run after a project has been created or updated, such as
+    plugin update hooks and user notifications. All steps are run regardless
+    of failures in previous steps and the status of each step is recorded. If
+    a timeline event is given, the step results are stored as the final status
+    of the event.
+    """
+
+    def __init__(self, tl_event=None):
+        """
+        Initialize PostModifyPipeline.
+
+        :param tl_event: ProjectEvent object or None
+        """
+        self.tl_event = tl_event
+        self.steps = []
+        self.results = {}
+
+    def add_step(self, name, func, *args, **kwargs):
+        """
+        Add step to the pipeline.
+
+        :param name: Unique step name (string)
+        :param func: Callable to run
+        :param args: Positional arguments for func
+        :param kwargs: Keyword arguments for func
+        """
+        self.steps.append((name, func, args, kwargs))
+
+    def _set_event_status(self):
+        failed = [
+            k for k, v in self.results.items() if v['status'] != STEP_STATUS_OK
+        ]
+        extra_data = {'steps': self.results}
+        if failed:
+            self.tl_event.set_status(
+                'FAILED',
+                'Failed post-modify steps: {}'.format(', '.join(failed)),
+                extra_data=extra_data,
+            )
+        else:
+            self.tl_event.set_status('OK', extra_data=extra_data)
+
+    def run(self):
+        """
+        Run pipeline steps and set timeline event status.
+
+        :return: Dict of step results by step name
+        """
+        for name, func, args, kwargs in self.steps:
+            try:
+                func(*args, **kwargs)
+                self.results[name] = {'status': STEP_STATUS_OK}
+            except Exception as ex:
+                logger.error(
+                    'Exception in post-modify step "{}": {}'.format(name, ex)
+                )
+                self.results[name] = {
+                    'status': STEP_STATUS_FAILED,
+                    'message': str(ex),
+                }
+        if self.tl_event:
+            self._set_event_status()
+        return self.results
+
+    def dispatch(self):
+        """
+        Run pipeline according to the PROJECTROLES_MODIFY_PIPELINE setting:
+        immediately for "sync" or after the current transaction commits for
+        "commit". For "celery", the caller is expected to queue the pipeline
+        data using post_modify_task.
+        """
+        if get_pipeline_mode() == PIPELINE_MODE_SYNC:
+            self.run()
+        else:
+            transaction.on_commit(self.run)
+
+
+class _PipelineMessageStorage(list):
+    """Message storage for PipelineRequest, collecting messages in a list"""
+
+    def add(self, level, message, extra_tags=''):
+        self.append(message)
+
+
+class PipelineRequest(HttpRequest):
+    """
+    Minimal request for running post-modify steps outside of the request
+    initiating the project modification, e.g. in a Celery worker.
+    """
+
+    def __init__(self, user, scheme, host):
+        super().__init__()
+        self.user = user
+        self._scheme = scheme
+        self.META['HTTP_HOST'] = host
+        self._messages = _PipelineMessageStorage()
+
+    def _get_scheme(self):
+        return self._scheme
@@ -1,9 +1,52 @@
 """Functions for project tagging/starring in the projectroles app"""
 # NOTE: This can be expanded to include other types of tags later on
 
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
 from .models import ProjectUserTag, PROJECT_TAG_STARRED
 
 
+# Local constants
+TAG_CACHE_ATTR = '_project_tag_cache'
+
+
+def get_tagged_project_uuids(user, name=PROJECT_TAG_STARRED):
+    """
+    Return UUIDs of projects tagged by a user. The result is retrieved with a
+    single query and cached in the user object, so it is only queried once per
+    request.
+
+    :param user: User object
+    :param name: Tag name (string)
+    :return: Set of UUID objects
+    """
+    if not user.is_authenticated:
+        return set()
+    tag_cache = getattr(user, TAG_CACHE_ATTR, None)
+    if tag_cache is None:
+        tag_cache = {}
+        setattr(user, TAG_CACHE_ATTR, tag_cache)
+    if name not in tag_cache:
+        tag_cache[name] = set(
+            ProjectUserTag.objects.filter(user=user, name=name).values_list(
+                'project__sodar_uuid', flat=True
+            )
+        )
+    return tag_cache[name]
+
+
+def _update_tag_cache(project, user, name, state):
+    """Update tag state in the user object cache if already populated"""
+    tag_cache = getattr(user, TAG_CACHE_ATTR, None)
+    if tag_cache is None or name not in tag_cache:
+        return
+    if state:
+        tag_cache[name].add(project.sodar_uuid)
+    else:
+        tag_cache[name].discard(project.sodar_uuid)
+
+
 def get_tag_state(project, user, name=PROJECT_TAG_STARRED):
     """
     Get current starring status of a project/user.
@@ -13,33 +56,31 @@ def get_tag_state(project, user, name=PROJECT_TAG_STARRED):
     :param name: Tag name (string)
     :return: Boolean
     """
-    if not user.is_authenticated:
-        return False
-
-    try:
-        ProjectUserTag.objects.get(project=project, user=user, name=name)
-        return True
-
-    except ProjectUserTag.DoesNotExist:
+    if not project:
         return False
+    return project.sodar_uuid in get_tagged_project_uuids(user, name)
 
 
 def set_tag_state(project, user, name=PROJECT_TAG_STARRED):
     """
     Set starring status of a project/user to true/false depending on the current
-    status.
+    status. Concurrent calls for the same user are serialized.
 
     :param project: Project object
     :param user: User object
     :param name: Tag name (string)
+    :return: New tag state (boolean)
     """
-    try:
-        tag = ProjectUserTag.objects.get(project=project, user=user, name=name)
-        tag.delete()
-
-    except ProjectUserTag.DoesNotExist:
-        tag = ProjectUserTag(project=project, user=user, name=name)
-        tag.save()
+    with transaction.atomic():
+        # Lock user to avoid creating duplicate tags in concurrent requests
+        get_user_model().objects.select_for_update().filter(pk=user.pk).first()
+        deleted, _ = ProjectUserTag.objects.filter(
+            project=project, user=user, name=name
+        ).delete()
+        if not deleted:
+            ProjectUserTag.objects.create(project=project, user=user, name=name)
+    _update_tag_cache(project, user, name, not deleted)
+    return not deleted
 
 
 def remove_tag(project, user, name=PROJECT_TAG_STARRED):
@@ -50,10 +91,7 @@ def remove_tag(project, user, name=PROJECT_TAG_STARRED):
     :param user: User object
     :param name: Tag name (string)
     """
-    try:
-        ProjectUserTag.objects.get(
-            project=project, user=user, name=name
-        ).delete()
-
-    except ProjectUserTag.DoesNotExist:
-        pass
+    ProjectUserTag.objects.filter(
+        project=project, user=user, name=name
+    ).delete()
+    _update_tag_cache(project, user, name, False)
@@ -501,12 +501,14 @@ class ProjectSerializer(ProjectModifyMixin, SODARModelSerializer):
     def to_representation(self, instance):
         """Override to make sure fields are correctly returned."""
         ret = super().to_representation(instance)
-        parent = ret.get('parent')
-        project = Project.objects.get(
-            title=ret['title'],
-            **{'parent__sodar_uuid': parent} if parent else {},
-        )
-        # TODO: Better way to ensure this?
+        if isinstance(instance, Project):
+            project = instance
+        else:  # Saved data, look up the created project
+            parent = ret.get('parent')
+            project = Project.objects.get(
+                title=ret['title'],
+                **{'parent__sodar_uuid': parent} if parent else {},
+            )
         ret['readme'] = project.readme.raw or ''
         if not ret.get('sodar_uuid'):
             ret['sodar_uuid'] = str(project.sodar_uuid)
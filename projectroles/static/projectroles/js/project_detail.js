@@ -0,0 +1,17 @@
+/* Load lazy app cards on project details page ------------------------------ */
+
+$(document).ready(function () {
+    $('.sodar-pr-app-card-lazy').each(function () {
+        var cardBody = $(this);
+        $.ajax({
+            url: cardBody.attr('data-url'),
+            method: 'GET',
+            dataType: 'json'
+        }).done(function (data) {
+            cardBody.html(data['html']);
+        }).fail(function () {
+            cardBody.attr('class', 'card-body text-center').html(
+                '<p class="text-danger"><em>Unable to load app card</em></p>');
+        });
+    });
+});
@@ -0,0 +1,28 @@
+"""Celery tasks for the projectroles app"""
+
+from celery import shared_task
+
+from projectroles.email import message_from_dict, send_messages
+
+
+@shared_task
+def send_mail_task(messages):
+    """
+    Send email messages queued with PROJECTROLES_EMAIL_QUEUE set to "celery".
+
+    :param messages: List of dicts created with email.message_to_dict()
+    """
+    send_messages([message_from_dict(m) for m in messages])
+
+
+@shared_task
+def post_modify_task(data):
+    """
+    Run project post-modify pipeline with PROJECTROLES_MODIFY_PIPELINE set to
+    "celery".
+
+    :param data: Dict created with ProjectModifyMixin._get_post_modify_data()
+    """
+    from projectroles.views import ProjectModifyMixin
+
+    ProjectModifyMixin.get_post_modify_pipeline_from_data(data).run()
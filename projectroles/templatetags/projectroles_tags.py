@@ -13,7 +13,11 @@ from projectroles.models import (
     SODAR_CONSTANTS,
     PROJECT_TAG_STARRED,
 )
-from projectroles.plugins import get_active_plugins
+from projectroles.plugins import (
+    get_active_plugins,
+    get_project_app_plugins,
+    is_project_app_visible,
+)
 from projectroles.project_tags import get_tag_state
 
 
@@ -96,21 +100,13 @@ def allow_project_creation():
 @register.simple_tag
 def is_app_visible(plugin, project, user):
     """Check if app should be visible for user in a specific project"""
-    can_view_app = user.has_perm(plugin.app_permission, project)
-    app_hidden = False
-    if (
-        hasattr(settings, 'PROJECTROLES_HIDE_APP_LINKS')
-        and plugin.name in settings.PROJECTROLES_HIDE_APP_LINKS
-        and not user.is_superuser
-    ):
-        app_hidden = True
-    if (
-        can_view_app
-        and not app_hidden
-        and (project.type == PROJECT_TYPE_PROJECT or plugin.category_enable)
-    ):
-        return True
-    return False
+    return is_project_app_visible(plugin, project, user)
+
+
+@register.simple_tag
+def get_visible_app_plugins(project, user):
+    """Return project app plugins visible for user in a specific project"""
+    return get_project_app_plugins(project, user)
 
 
 # Template rendering -----------------------------------------------------------
@@ -22,6 +22,8 @@ from projectroles.models import (
     AppSetting,
     SODAR_CONSTANTS,
 )
+from projectroles.plugins import get_backend_api
+from projectroles.tests.test_email import FAILING_BACKEND, FAIL_EMAIL
 from projectroles.tests.test_models import (
     ProjectMixin,
     RoleAssignmentMixin,
@@ -134,6 +136,22 @@ class TestBatchUpdateRoles(
         self.assertEqual(invite.issuer, self.user_owner)
         self.assertEqual(len(mail.outbox), 1)
 
+    @override_settings(EMAIL_BACKEND=FAILING_BACKEND)
+    def test_invite_send_failed(self):
+        """Test inviting with failed email sending"""
+        self._write_file(
+            [str(self.project.sodar_uuid), FAIL_EMAIL, PROJECT_ROLE_GUEST]
+        )
+        self.command.handle(
+            **{'file': self.file.name, 'issuer': self.user_owner.username}
+        )
+        self.assertEqual(len(mail.outbox), 0)
+        timeline = get_backend_api('timeline_backend')
+        tl_event = timeline.get_project_events(self.project).get(
+            event_name='invite_send'
+        )
+        self.assertEqual(tl_event.get_current_status().status_type, 'FAILED')
+
     def test_invite_existing(self):
         """Test inviting a user when they already have an active invite"""
         p_uuid = str(self.project.sodar_uuid)
@@ -284,6 +302,41 @@ class TestBatchUpdateRoles(
         self.assertEqual(role_as.role, self.role_guest)
         self.assertEqual(len(mail.outbox), 1)
 
+    def test_role_add_multi_project(self):
+        """Test adding roles to user in multiple projects"""
+        project2 = self._make_project(
+            'sub_project2', PROJECT_TYPE_PROJECT, self.category
+        )
+        self._make_assignment(project2, self.user_owner, self.role_owner)
+        email = 'new@example.com'
+        user_new = self.make_user('user_new')
+        user_new.email = email
+        user_new.save()
+
+        fd = [
+            [str(self.project.sodar_uuid), email, PROJECT_ROLE_GUEST],
+            [str(project2.sodar_uuid), email, PROJECT_ROLE_CONTRIBUTOR],
+        ]
+        self._write_file(fd)
+        self.command.handle(
+            **{'file': self.file.name, 'issuer': self.user_owner.username}
+        )
+
+        # Assert postconditions
+        self.assertEqual(
+            RoleAssignment.objects.get(
+                project=self.project, user=user_new
+            ).role,
+            self.role_guest,
+        )
+        self.assertEqual(
+            RoleAssignment.objects.get(project=project2, user=user_new).role,
+            self.role_contributor,
+        )
+        self.assertEqual(self.command.update_count, 2)
+        # Changes should be summarized in one email
+        self.assertEqual(len(mail.outbox), 1)
+
     def test_role_update(self):
         """Test updating an existing role for user"""
         p_uuid = str(self.project.sodar_uuid)
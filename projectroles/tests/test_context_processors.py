@@ -0,0 +1,109 @@
+"""Tests for context processors in the projectroles Django app"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, override_settings
+
+from test_plus.test import TestCase
+
+from projectroles.context_processors import (
+    app_alerts_processor,
+    site_app_processor,
+)
+from projectroles.plugins import (
+    change_plugin_status,
+    get_backend_api,
+    DISABLED,
+    SITE_APP_USER_VERSION_KEY,
+)
+
+
+# Local constants
+SITE_APP_NAME = 'adminalerts'
+
+
+class TestContextProcessors(TestCase):
+    """Tests for projectroles context processors"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = self.make_user('user')
+        self.superuser = self.make_user('superuser')
+        self.superuser.is_superuser = True
+        self.superuser.save()
+        self.request = RequestFactory().get('/')
+
+    def _get_site_app_names(self, user):
+        self.request.user = user
+        return [p.name for p in site_app_processor(self.request)['site_apps']]
+
+    def test_site_app_processor(self):
+        """Test site_app_processor()"""
+        self.assertIn(SITE_APP_NAME, self._get_site_app_names(self.superuser))
+        self.assertNotIn(SITE_APP_NAME, self._get_site_app_names(self.user))
+
+    def test_site_app_processor_lazy(self):
+        """Test site_app_processor() evaluating lazily"""
+        self.request.user = self.superuser
+        with self.assertNumQueries(0):
+            site_apps = site_app_processor(self.request)['site_apps']
+        self.assertTrue(len(site_apps) > 0)
+
+    def test_site_app_processor_cached(self):
+        """Test site_app_processor() with cached site apps"""
+        site_apps = self._get_site_app_names(self.superuser)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self._get_site_app_names(self.superuser), site_apps
+            )
+
+    def test_site_app_processor_plugin_status(self):
+        """Test site_app_processor() after changing plugin status"""
+        self._get_site_app_names(self.superuser)
+        change_plugin_status(SITE_APP_NAME, DISABLED, plugin_type='site')
+        self.assertNotIn(
+            SITE_APP_NAME, self._get_site_app_names(self.superuser)
+        )
+
+    def test_site_app_processor_user_update(self):
+        """Test site_app_processor() after updating user permissions"""
+        self._get_site_app_names(self.user)
+        self.user.is_superuser = True
+        self.user.save()
+        self.assertIn(SITE_APP_NAME, self._get_site_app_names(self.user))
+
+    @override_settings(PROJECTROLES_APP_CACHE_TIMEOUT=0)
+    def test_site_app_processor_no_cache(self):
+        """Test site_app_processor() with caching disabled"""
+        self._get_site_app_names(self.user)
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_superuser=True
+        )
+        self.user.refresh_from_db()
+        self.assertIn(SITE_APP_NAME, self._get_site_app_names(self.user))
+
+    def test_site_app_processor_version_expired(self):
+        """Test site_app_processor() after cache version expires"""
+        self._get_site_app_names(self.user)
+        # Update without signals, as if done in another process
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_superuser=True
+        )
+        self.user.refresh_from_db()
+        self.assertNotIn(SITE_APP_NAME, self._get_site_app_names(self.user))
+        # Simulate expiry of the user version key
+        cache.delete(SITE_APP_USER_VERSION_KEY.format(self.user.pk))
+        self.assertIn(SITE_APP_NAME, self._get_site_app_names(self.user))
+
+    def test_app_alerts_processor(self):
+        """Test app_alerts_processor()"""
+        get_backend_api('appalerts_backend').add_alert(
+            app_name='projectroles',
+            alert_name='test_alert',
+            user=self.user,
+            message='Test alert',
+        )
+        self.request.user = self.user
+        with self.assertNumQueries(0):
+            app_alerts = app_alerts_processor(self.request)['app_alerts']
+        self.assertEqual(app_alerts, 1)
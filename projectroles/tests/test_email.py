@@ -1,6 +1,9 @@
 """Tests for email sending in the projectroles Django app"""
 
+import smtplib
+
 from django.core import mail
+from django.core.mail.backends import locmem
 from django.test import override_settings
 from django.urls import reverse
 
@@ -10,10 +13,14 @@ from projectroles.app_settings import AppSettingAPI
 from projectroles.models import Role, SODAR_CONSTANTS
 from projectroles.email import (
     send_role_change_mail,
+    send_role_batch_mail,
     send_generic_mail,
+    send_mail,
     send_project_create_mail,
     get_email_user,
     get_user_addr,
+    get_role_change_subject,
+    MailQueue,
 )
 from projectroles.tests.test_models import ProjectMixin, RoleAssignmentMixin
 
@@ -38,6 +45,55 @@ CUSTOM_FOOTER = 'Custom footer'
 
 USER_ADD_EMAIL = 'user1@example.com'
 USER_ADD_EMAIL2 = 'user2@example.com'
+COUNTING_BACKEND = 'projectroles.tests.test_email.CountingEmailBackend'
+FLAKY_BACKEND = 'projectroles.tests.test_email.FlakyEmailBackend'
+FAILING_BACKEND = 'projectroles.tests.test_email.FailingEmailBackend'
+FAIL_EMAIL = 'fail@example.com'
+SMTP_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+
+
+class CountingEmailBackend(locmem.EmailBackend):
+    """In-memory email backend counting opened connections"""
+
+    open_count = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connected = False
+
+    def open(self):
+        if self.connected:
+            return False
+        self.connected = True
+        CountingEmailBackend.open_count += 1
+        return True
+
+    def close(self):
+        self.connected = False
+
+
+class FlakyEmailBackend(CountingEmailBackend):
+    """In-memory email backend failing a set number of sending attempts"""
+
+    failures = 0
+
+    def send_messages(self, messages):
+        if FlakyEmailBackend.failures > 0:
+            FlakyEmailBackend.failures -= 1
+            raise smtplib.SMTPServerDisconnected('Connection lost')
+        return super().send_messages(messages)
+
+
+class FailingEmailBackend(CountingEmailBackend):
+    """In-memory email backend refusing messages sent to FAIL_EMAIL"""
+
+    def send_messages(self, messages):
+        for m in messages:
+            if FAIL_EMAIL in m.recipients():
+                raise smtplib.SMTPRecipientsRefused(
+                    {FAIL_EMAIL: (550, b'Mailbox unavailable')}
+                )
+        return super().send_messages(messages)
 
 
 class TestEmailSending(ProjectMixin, RoleAssignmentMixin, TestCase):
@@ -99,6 +155,45 @@ class TestEmailSending(ProjectMixin, RoleAssignmentMixin, TestCase):
             self.assertEqual(len(mail.outbox[0].reply_to), 1)
             self.assertEqual(mail.outbox[0].reply_to[0], self.user_owner.email)
 
+    def test_role_batch_mail(self):
+        """Test role change digest mail sending"""
+        project2 = self._make_project(
+            'sub_project2', PROJECT_TYPE_PROJECT, self.category
+        )
+        request = self.factory.get(reverse('home'))
+        request.user = self.user_owner
+        changes = [
+            ('create', self.project, self.role_guest),
+            ('update', project2, self.role_contributor),
+            ('delete', self.category, None),
+        ]
+        email_sent = send_role_batch_mail(changes, self.user, request)
+        self.assertEqual(email_sent, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.user.email])
+        self.assertEqual(mail.outbox[0].reply_to, [self.user_owner.email])
+        self.assertIn('3 projects', mail.outbox[0].subject)
+        for project in [self.project, project2, self.category]:
+            self.assertIn('"{}"'.format(project.title), mail.outbox[0].body)
+        self.assertIn(
+            reverse(
+                'projectroles:detail', kwargs={'project': project2.sodar_uuid}
+            ),
+            mail.outbox[0].body,
+        )
+
+    def test_role_batch_mail_single(self):
+        """Test role change digest mail sending with a single change"""
+        request = self.factory.get(reverse('home'))
+        request.user = self.user_owner
+        changes = [('create', self.project, self.role_guest)]
+        email_sent = send_role_batch_mail(changes, self.user, request)
+        self.assertEqual(email_sent, 1)
+        self.assertEqual(
+            mail.outbox[0].subject,
+            get_role_change_subject('create', self.project),
+        )
+
     def test_role_create_mail_additional(self):
         """Test role creation with additional sender emails"""
         app_settings.set_app_setting(
@@ -438,3 +533,134 @@ class TestEmailSending(ProjectMixin, RoleAssignmentMixin, TestCase):
             get_user_addr(self.user),
             [self.user.email, USER_ADD_EMAIL],
         )
+
+
+@override_settings(PROJECTROLES_EMAIL_RETRY_DELAY=0)
+class TestMailQueue(TestCase):
+    """Tests for MailQueue and batched email sending"""
+
+    def setUp(self):
+        CountingEmailBackend.open_count = 0
+        FlakyEmailBackend.failures = 0
+        self.recipients = ['user{}@example.com'.format(i) for i in range(1, 4)]
+
+    @override_settings(EMAIL_BACKEND=COUNTING_BACKEND)
+    def test_generic_mail_connection(self):
+        """Test send_generic_mail() using a single connection"""
+        email_sent = send_generic_mail(
+            SUBJECT_BODY, MESSAGE_BODY, self.recipients
+        )
+        self.assertEqual(email_sent, 3)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(CountingEmailBackend.open_count, 1)
+
+    @override_settings(EMAIL_BACKEND=COUNTING_BACKEND)
+    def test_queue(self):
+        """Test sending multiple messages in a MailQueue"""
+        with MailQueue() as queue:
+            for r in self.recipients:
+                self.assertEqual(send_mail(SUBJECT_BODY, MESSAGE_BODY, [r]), 1)
+            send_mail(SUBJECT_BODY, MESSAGE_BODY, [])
+            self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(queue.sent, 3)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(CountingEmailBackend.open_count, 1)
+
+    @override_settings(EMAIL_BACKEND=COUNTING_BACKEND)
+    def test_queue_nested(self):
+        """Test nested MailQueue objects"""
+        with MailQueue():
+            send_mail(SUBJECT_BODY, MESSAGE_BODY, self.recipients[:1])
+            send_generic_mail(SUBJECT_BODY, MESSAGE_BODY, self.recipients[1:])
+            self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(CountingEmailBackend.open_count, 1)
+
+    def test_queue_exception(self):
+        """Test MailQueue not sending messages on exception"""
+        with self.assertRaises(ValueError):
+            with MailQueue():
+                send_mail(SUBJECT_BODY, MESSAGE_BODY, self.recipients)
+                raise ValueError('Test')
+        self.assertEqual(len(mail.outbox), 0)
+
+    @override_settings(EMAIL_BACKEND=FLAKY_BACKEND)
+    def test_retry(self):
+        """Test retrying on transient failure"""
+        FlakyEmailBackend.failures = 1
+        email_sent = send_generic_mail(
+            SUBJECT_BODY, MESSAGE_BODY, self.recipients
+        )
+        self.assertEqual(email_sent, 3)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(CountingEmailBackend.open_count, 2)
+
+    @override_settings(
+        EMAIL_BACKEND=FLAKY_BACKEND, PROJECTROLES_EMAIL_RETRIES=1
+    )
+    def test_retry_fail(self):
+        """Test failure after running out of retries"""
+        FlakyEmailBackend.failures = 2
+        email_sent = send_mail(SUBJECT_BODY, MESSAGE_BODY, self.recipients)
+        self.assertEqual(email_sent, 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    @override_settings(EMAIL_BACKEND=FAILING_BACKEND)
+    def test_send_error(self):
+        """Test sending remaining messages after a non-transient failure"""
+        recipients = [self.recipients[0], FAIL_EMAIL, self.recipients[1]]
+        email_sent = send_generic_mail(SUBJECT_BODY, MESSAGE_BODY, recipients)
+        self.assertEqual(email_sent, 2)
+        self.assertEqual(
+            [m.to for m in mail.outbox],
+            [[self.recipients[0]], [self.recipients[1]]],
+        )
+
+    @override_settings(EMAIL_BACKEND=FAILING_BACKEND)
+    def test_queue_send_error(self):
+        """Test sending remaining queued messages after a failure"""
+        with MailQueue() as queue:
+            send_mail(SUBJECT_BODY, MESSAGE_BODY, [FAIL_EMAIL])
+            send_mail(SUBJECT_BODY, MESSAGE_BODY, self.recipients[:1])
+        self.assertEqual(queue.sent, 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(EMAIL_BACKEND=FAILING_BACKEND)
+    def test_queue_bypass(self):
+        """Test sending with use_queue=False in a MailQueue"""
+        with MailQueue() as queue:
+            email_sent = send_mail(
+                SUBJECT_BODY, MESSAGE_BODY, [FAIL_EMAIL], use_queue=False
+            )
+            self.assertEqual(email_sent, 0)
+            email_sent = send_mail(
+                SUBJECT_BODY,
+                MESSAGE_BODY,
+                self.recipients[:1],
+                use_queue=False,
+            )
+            self.assertEqual(email_sent, 1)
+            self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(queue.sent, 0)
+
+    @override_settings(PROJECTROLES_EMAIL_QUEUE='commit')
+    def test_commit(self):
+        """Test sending after transaction commit"""
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            email_sent = send_generic_mail(
+                SUBJECT_BODY, MESSAGE_BODY, self.recipients
+            )
+        self.assertEqual(email_sent, 3)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.assertEqual(len(mail.outbox), 3)
+
+    @override_settings(
+        EMAIL_BACKEND=SMTP_BACKEND, PROJECTROLES_EMAIL_QUEUE='locmem'
+    )
+    def test_locmem(self):
+        """Test sending with the locmem test mode"""
+        email_sent = send_mail(SUBJECT_BODY, MESSAGE_BODY, self.recipients)
+        self.assertEqual(email_sent, 1)
+        self.assertEqual(len(mail.outbox), 1)
@@ -3,6 +3,7 @@
 import uuid
 
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 from django.core.exceptions import ValidationError
 from django.forms.models import model_to_dict
@@ -21,11 +22,15 @@ from projectroles.models import (
     ProjectUserTag,
     RemoteSite,
     RemoteProject,
+    UserSearchToken,
     SODAR_CONSTANTS,
     PROJECT_TAG_STARRED,
 )
 from projectroles.plugins import get_app_plugin
-from projectroles.utils import build_secret
+from projectroles.utils import build_secret, get_search_tokens
+
+
+User = get_user_model()
 
 
 # SODAR constants
@@ -405,6 +410,17 @@ class TestProject(ProjectMixin, TestCase):
         self.project_sub.set_public(True)
         self.assertTrue(self.project_sub.public_guest_access)
 
+    def test_get_modified_state(self):
+        """Test Project.objects.get_modified_state()"""
+        count, last_modified = Project.objects.get_modified_state()
+        self.assertEqual(count, 3)
+        self.assertEqual(last_modified, self.project_top.date_modified)
+        self.project_sub.description = 'Updated'
+        self.project_sub.save()
+        count, last_modified = Project.objects.get_modified_state()
+        self.assertEqual(count, 3)
+        self.assertEqual(last_modified, self.project_sub.date_modified)
+
 
 class TestRole(TestCase):
     def setUp(self):
@@ -511,6 +527,19 @@ class TestRoleAssignment(ProjectMixin, RoleAssignmentMixin, TestCase):
         )
         self.assertEqual(repr(self.assignment_owner), expected)
 
+    def test_date_modified(self):
+        """Test project date_modified update on role changes"""
+        date_modified = self.category_top.date_modified
+        assignment = self._make_assignment(
+            self.category_top, self.user_bob, self.role_guest
+        )
+        self.category_top.refresh_from_db()
+        self.assertGreater(self.category_top.date_modified, date_modified)
+        date_modified = self.category_top.date_modified
+        assignment.delete()
+        self.category_top.refresh_from_db()
+        self.assertGreater(self.category_top.date_modified, date_modified)
+
     def test_validate_user(self):
         """Test user role uniqueness validation: can't add more than one
         role for user in project at once"""
@@ -1362,3 +1391,86 @@ class TestRemoteProject(
         self.remote_project.project = None
         self.remote_project.save()
         self.assertEqual(self.remote_project.get_project(), self.project)
+
+
+class TestUserSearchToken(TestCase):
+    """Tests for UserSearchToken and UserSearchTokenManager"""
+
+    def _get_tokens(self, user):
+        return list(
+            UserSearchToken.objects.filter(user=user).values_list(
+                'token', flat=True
+            )
+        )
+
+    def setUp(self):
+        self.user = self.make_user('user')
+        self.user.name = 'Jöhn Doe-Smith'
+        self.user.email = 'john.doe@example.com'
+        self.user.save()
+        self.user_other = self.make_user('other')
+
+    def test_get_search_tokens(self):
+        """Test get_search_tokens()"""
+        self.assertEqual(
+            get_search_tokens('Jöhn Doe-Smith', 'JOHN@Example.com', None, ''),
+            ['com', 'doe', 'example', 'john', 'smith'],
+        )
+
+    def test_create_user(self):
+        """Test search token creation on user save"""
+        self.assertEqual(
+            self._get_tokens(self.user),
+            ['com', 'doe', 'example', 'john', 'smith', 'user'],
+        )
+
+    def test_update_user(self):
+        """Test updating search tokens on user save"""
+        self.user.name = 'Jane Doe'
+        self.user.save()
+        self.assertEqual(
+            self._get_tokens(self.user),
+            ['com', 'doe', 'example', 'jane', 'john', 'user'],
+        )
+
+    def test_update_user_other_fields(self):
+        """Test saving user with update_fields not containing search fields"""
+        UserSearchToken.objects.filter(user=self.user).delete()
+        self.user.last_login = timezone.now()
+        self.user.save(update_fields=['last_login'])
+        self.assertEqual(self._get_tokens(self.user), [])
+
+    def test_delete_user(self):
+        """Test search token deletion on user deletion"""
+        self.user.delete()
+        self.assertEqual(
+            UserSearchToken.objects.filter(token='john').count(), 0
+        )
+
+    def test_filter_users(self):
+        """Test filter_users()"""
+        qs = UserSearchToken.objects.filter_users(User.objects.all(), 'john sm')
+        self.assertEqual(list(qs), [self.user])
+
+    def test_filter_users_accents(self):
+        """Test filter_users() with accents and case in query"""
+        qs = UserSearchToken.objects.filter_users(User.objects.all(), 'JÖH')
+        self.assertEqual(list(qs), [self.user])
+
+    def test_filter_users_email(self):
+        """Test filter_users() with email address"""
+        qs = UserSearchToken.objects.filter_users(
+            User.objects.all(), 'john.doe@example'
+        )
+        self.assertEqual(list(qs), [self.user])
+
+    def test_filter_users_no_match(self):
+        """Test filter_users() with query not matching token prefixes"""
+        qs = UserSearchToken.objects.filter_users(User.objects.all(), 'ohn')
+        self.assertEqual(qs.count(), 0)
+
+    def test_filter_users_no_tokens(self):
+        """Test filter_users() with query containing no searchable words"""
+        for query in ['@', '.', ' _ ']:
+            qs = UserSearchToken.objects.filter_users(User.objects.all(), query)
+            self.assertEqual(qs.count(), 0)
@@ -173,6 +173,36 @@ class TestProjectViews(TestProjectPermissionBase):
         self.project.set_public()
         self.assert_response(url, self.user_no_roles, 200, method='POST')
 
+    def test_app_details_ajax(self):
+        """Test permissions for ProjectAppDetailsAjaxView"""
+        url = reverse(
+            'projectroles:ajax_app_details',
+            kwargs={'project': self.project.sodar_uuid, 'plugin': 'timeline'},
+        )
+        good_users = [
+            self.superuser,
+            self.owner_as.user,
+            self.delegate_as.user,
+            self.contributor_as.user,
+            self.guest_as.user,
+        ]
+        bad_users = [self.anonymous, self.user_no_roles]
+        self.assert_response(url, good_users, 200)
+        self.assert_response(url, bad_users, 403)
+        # Test public project
+        self.project.set_public()
+        self.assert_response(url, self.user_no_roles, 200)
+
+    @override_settings(PROJECTROLES_ALLOW_ANONYMOUS=True)
+    def test_app_details_ajax_anon(self):
+        """Test permissions for ProjectAppDetailsAjaxView with anonymous access"""
+        url = reverse(
+            'projectroles:ajax_app_details',
+            kwargs={'project': self.project.sodar_uuid, 'plugin': 'timeline'},
+        )
+        self.project.set_public()
+        self.assert_response(url, self.anonymous, 200)
+
     @override_settings(PROJECTROLES_ALLOW_ANONYMOUS=True)
     def test_starring_ajax_anon(self):
         """Test permissions for project starring Ajax view with anonymous access"""
@@ -213,6 +243,20 @@ class TestProjectViews(TestProjectPermissionBase):
         self.project.set_public()
         self.assert_response(url, self.anonymous, 401, method='POST')
 
+    def test_parent_autocomplete_ajax(self):
+        """Test ProjectParentAutocompleteAjaxView access"""
+        url = reverse('projectroles:ajax_autocomplete_parent')
+        good_users = [
+            self.superuser,
+            self.owner_as.user,
+            self.delegate_as.user,
+            self.contributor_as.user,
+            self.guest_as.user,
+            self.user_no_roles,
+        ]
+        self.assert_response(url, good_users, 200)
+        self.assert_response(url, self.anonymous, 403)
+
     @override_settings(PROJECTROLES_ALLOW_LOCAL_USERS=True)
     def test_user_autocomplete_ajax(self):
         """Test UserAutocompleteAjaxView access"""
@@ -953,6 +953,61 @@ class TestAPIPermissions(TestCoreProjectAPIPermissionBase):
         self.project.set_public()
         self.assert_response_api(url, self.anonymous, 401, method='POST')
 
+    def test_role_batch(self):
+        """Test permissions for RoleAssignmentBatchAPIView"""
+        assign_user = self.make_user('assign_user')
+        url = reverse('projectroles:api_role_batch')
+        post_data = {
+            'roles': [
+                {
+                    'project': str(self.project.sodar_uuid),
+                    'user': str(assign_user.sodar_uuid),
+                    'role': SODAR_CONSTANTS['PROJECT_ROLE_CONTRIBUTOR'],
+                }
+            ]
+        }
+        good_users = [
+            self.superuser,
+            self.owner_as_cat.user,
+            self.owner_as.user,
+            self.delegate_as.user,
+        ]
+        # NOTE: Project permissions are validated for each change
+        bad_users = [
+            self.contributor_as.user,
+            self.guest_as.user,
+            self.user_no_roles,
+        ]
+
+        def _cleanup():
+            RoleAssignment.objects.filter(
+                project=self.project, user=assign_user
+            ).delete()
+
+        self.assert_response_api(
+            url,
+            good_users,
+            200,
+            method='POST',
+            data=post_data,
+            cleanup_method=_cleanup,
+        )
+        self.assert_response_api(
+            url, bad_users, 400, method='POST', data=post_data
+        )
+        self.assert_response_api(
+            url, self.anonymous, 401, method='POST', data=post_data
+        )
+        self.assert_response_api(
+            url,
+            good_users,
+            200,
+            method='POST',
+            data=post_data,
+            knox=True,
+            cleanup_method=_cleanup,
+        )
+
     def test_user_list(self):
         """Test permissions for UserListAPIView"""
         url = reverse('projectroles:api_user_list')
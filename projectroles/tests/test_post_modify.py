@@ -0,0 +1,137 @@
+"""Tests for the post-modify pipeline in the projectroles Django app"""
+
+from django.contrib import messages
+from django.contrib.messages import get_messages
+from django.test import override_settings
+
+from test_plus.test import TestCase
+
+from projectroles.models import SODAR_CONSTANTS
+from projectroles.plugins import get_backend_api
+from projectroles.post_modify import (
+    PostModifyPipeline,
+    PipelineRequest,
+    STEP_STATUS_OK,
+    STEP_STATUS_FAILED,
+)
+from projectroles.tests.test_models import ProjectMixin
+
+
+# SODAR constants
+PROJECT_TYPE_PROJECT = SODAR_CONSTANTS['PROJECT_TYPE_PROJECT']
+
+# Local constants
+EXCEPTION_MSG = 'Step failed'
+
+
+class TestPostModifyPipeline(ProjectMixin, TestCase):
+    """Tests for PostModifyPipeline"""
+
+    def _add_result(self, value):
+        self.output.append(value)
+
+    def _raise_exception(self):
+        raise Exception(EXCEPTION_MSG)
+
+    def setUp(self):
+        self.user = self.make_user('user')
+        self.project = self._make_project(
+            'TestProject', PROJECT_TYPE_PROJECT, None
+        )
+        timeline = get_backend_api('timeline_backend')
+        self.tl_event = timeline.add_event(
+            project=self.project,
+            app_name='projectroles',
+            user=self.user,
+            event_name='project_update',
+            description='update project',
+            status_type='INIT',
+        )
+        self.output = []
+
+    def test_run(self):
+        """Test running pipeline"""
+        pipeline = PostModifyPipeline(self.tl_event)
+        pipeline.add_step('step1', self._add_result, 1)
+        pipeline.add_step('step2', self._add_result, value=2)
+        results = pipeline.run()
+        self.assertEqual(self.output, [1, 2])
+        expected = {
+            'step1': {'status': STEP_STATUS_OK},
+            'step2': {'status': STEP_STATUS_OK},
+        }
+        self.assertEqual(results, expected)
+        status = self.tl_event.get_current_status()
+        self.assertEqual(status.status_type, 'OK')
+        self.assertEqual(status.extra_data, {'steps': expected})
+
+    def test_run_failed_step(self):
+        """Test running pipeline with a failing step"""
+        pipeline = PostModifyPipeline(self.tl_event)
+        pipeline.add_step('step1', self._raise_exception)
+        pipeline.add_step('step2', self._add_result, 2)
+        results = pipeline.run()
+        self.assertEqual(self.output, [2])  # Following steps should be run
+        self.assertEqual(
+            results['step1'],
+            {'status': STEP_STATUS_FAILED, 'message': EXCEPTION_MSG},
+        )
+        self.assertEqual(results['step2'], {'status': STEP_STATUS_OK})
+        status = self.tl_event.get_current_status()
+        self.assertEqual(status.status_type, 'FAILED')
+        self.assertIn('step1', status.description)
+        self.assertNotIn('step2', status.description)
+        self.assertEqual(status.extra_data, {'steps': results})
+
+    def test_run_no_event(self):
+        """Test running pipeline without timeline event"""
+        pipeline = PostModifyPipeline()
+        pipeline.add_step('step1', self._add_result, 1)
+        self.assertEqual(pipeline.run(), {'step1': {'status': STEP_STATUS_OK}})
+        self.assertEqual(self.output, [1])
+
+    def test_dispatch(self):
+        """Test dispatching pipeline in sync mode"""
+        pipeline = PostModifyPipeline()
+        pipeline.add_step('step1', self._add_result, 1)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            pipeline.dispatch()
+        self.assertEqual(len(callbacks), 0)
+        self.assertEqual(self.output, [1])
+
+    @override_settings(PROJECTROLES_MODIFY_PIPELINE='commit')
+    def test_dispatch_commit(self):
+        """Test dispatching pipeline in commit mode"""
+        pipeline = PostModifyPipeline(self.tl_event)
+        pipeline.add_step('step1', self._add_result, 1)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            pipeline.dispatch()
+        self.assertEqual(self.output, [])
+        self.assertEqual(self.tl_event.get_current_status().status_type, 'INIT')
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.assertEqual(self.output, [1])
+        self.assertEqual(self.tl_event.get_current_status().status_type, 'OK')
+
+
+class TestPipelineRequest(TestCase):
+    """Tests for PipelineRequest"""
+
+    def setUp(self):
+        self.user = self.make_user('user')
+
+    def test_init(self):
+        """Test PipelineRequest initialization"""
+        request = PipelineRequest(self.user, 'https', 'testserver')
+        self.assertEqual(request.user, self.user)
+        self.assertEqual(request.scheme, 'https')
+        self.assertEqual(
+            request.build_absolute_uri('/project/'),
+            'https://testserver/project/',
+        )
+
+    def test_messages(self):
+        """Test adding messages to PipelineRequest"""
+        request = PipelineRequest(self.user, 'https', 'testserver')
+        messages.error(request, 'Error message')
+        self.assertEqual(list(get_messages(request)), ['Error message'])
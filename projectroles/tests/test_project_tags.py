@@ -0,0 +1,90 @@
+"""Tests for project tagging in the projectroles Django app"""
+
+from django.contrib.auth.models import AnonymousUser
+
+from test_plus.test import TestCase
+
+from projectroles.models import (
+    ProjectUserTag,
+    SODAR_CONSTANTS,
+    PROJECT_TAG_STARRED,
+)
+from projectroles.project_tags import (
+    get_tagged_project_uuids,
+    get_tag_state,
+    set_tag_state,
+    remove_tag,
+)
+from projectroles.tests.test_models import ProjectMixin, ProjectUserTagMixin
+
+
+# SODAR constants
+PROJECT_TYPE_PROJECT = SODAR_CONSTANTS['PROJECT_TYPE_PROJECT']
+
+# Local constants
+TAG_NAME_OTHER = 'OTHER'
+
+
+class TestProjectTags(ProjectMixin, ProjectUserTagMixin, TestCase):
+    """Tests for project tagging functions"""
+
+    def setUp(self):
+        self.user = self.make_user('user')
+        self.project = self._make_project(
+            'TestProject', PROJECT_TYPE_PROJECT, None
+        )
+        self.project2 = self._make_project(
+            'TestProject2', PROJECT_TYPE_PROJECT, None
+        )
+
+    def test_get_tagged_project_uuids(self):
+        """Test get_tagged_project_uuids()"""
+        self._make_tag(self.project, self.user, PROJECT_TAG_STARRED)
+        self._make_tag(self.project2, self.user, TAG_NAME_OTHER)
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                get_tagged_project_uuids(self.user), {self.project.sodar_uuid}
+            )
+            # Result should be cached
+            self.assertEqual(
+                get_tagged_project_uuids(self.user), {self.project.sodar_uuid}
+            )
+
+    def test_get_tagged_project_uuids_anon(self):
+        """Test get_tagged_project_uuids() with anonymous user"""
+        with self.assertNumQueries(0):
+            self.assertEqual(get_tagged_project_uuids(AnonymousUser()), set())
+
+    def test_get_tag_state(self):
+        """Test get_tag_state()"""
+        self._make_tag(self.project, self.user, PROJECT_TAG_STARRED)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_tag_state(self.project, self.user), True)
+            self.assertEqual(get_tag_state(self.project2, self.user), False)
+
+    def test_set_tag_state(self):
+        """Test set_tag_state()"""
+        self.assertEqual(get_tag_state(self.project, self.user), False)
+        self.assertEqual(set_tag_state(self.project, self.user), True)
+        self.assertEqual(ProjectUserTag.objects.count(), 1)
+        # Cached state should be updated
+        with self.assertNumQueries(0):
+            self.assertEqual(get_tag_state(self.project, self.user), True)
+
+    def test_set_tag_state_unset(self):
+        """Test set_tag_state() with existing tag"""
+        self._make_tag(self.project, self.user, PROJECT_TAG_STARRED)
+        self.assertEqual(get_tag_state(self.project, self.user), True)
+        self.assertEqual(set_tag_state(self.project, self.user), False)
+        self.assertEqual(ProjectUserTag.objects.count(), 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_tag_state(self.project, self.user), False)
+
+    def test_remove_tag(self):
+        """Test remove_tag()"""
+        self._make_tag(self.project, self.user, PROJECT_TAG_STARRED)
+        self.assertEqual(get_tag_state(self.project, self.user), True)
+        remove_tag(self.project, self.user)
+        self.assertEqual(ProjectUserTag.objects.count(), 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_tag_state(self.project, self.user), False)
@@ -23,7 +23,11 @@ from projectroles.models import (
     RemoteSite,
     AppSetting,
 )
-from projectroles.plugins import get_app_plugin, get_active_plugins
+from projectroles.plugins import (
+    get_app_plugin,
+    get_active_plugins,
+    _get_project_role_key,
+)
 from projectroles.project_tags import set_tag_state
 from projectroles.templatetags import (
     projectroles_common_tags as c_tags,
@@ -511,6 +515,103 @@ class TestProjectrolesTemplateTags(TestTemplateTagsBase):
             tags.is_app_visible(app_plugin, self.project, superuser), True
         )
 
+    def test_get_visible_app_plugins(self):
+        """Test get_visible_app_plugins()"""
+        expected = [
+            p.name
+            for p in get_active_plugins(custom_order=True)
+            if tags.is_app_visible(p, self.project, self.user)
+        ]
+        self.assertIn('filesfolders', expected)
+        self.assertEqual(
+            [
+                p.name
+                for p in tags.get_visible_app_plugins(self.project, self.user)
+            ],
+            expected,
+        )
+
+    def test_get_visible_app_plugins_category(self):
+        """Test get_visible_app_plugins() with a category"""
+        names = [
+            p.name
+            for p in tags.get_visible_app_plugins(self.category, self.user)
+        ]
+        self.assertNotIn('filesfolders', names)
+        self.assertIn('timeline', names)
+
+    def test_get_visible_app_plugins_cache(self):
+        """Test get_visible_app_plugins() caching"""
+        tags.get_visible_app_plugins(self.project, self.user)
+        with self.settings(PROJECTROLES_HIDE_APP_LINKS=['filesfolders']):
+            # Cached result should be returned
+            names = [
+                p.name
+                for p in tags.get_visible_app_plugins(self.project, self.user)
+            ]
+            self.assertIn('filesfolders', names)
+            # Project update should invalidate the cache
+            self.project.save()
+            names = [
+                p.name
+                for p in tags.get_visible_app_plugins(self.project, self.user)
+            ]
+            self.assertNotIn('filesfolders', names)
+
+    @override_settings(PROJECTROLES_APP_CACHE_TIMEOUT=0)
+    def test_get_visible_app_plugins_no_cache(self):
+        """Test get_visible_app_plugins() with caching disabled"""
+        tags.get_visible_app_plugins(self.project, self.user)
+        with self.settings(PROJECTROLES_HIDE_APP_LINKS=['filesfolders']):
+            names = [
+                p.name
+                for p in tags.get_visible_app_plugins(self.project, self.user)
+            ]
+            self.assertNotIn('filesfolders', names)
+
+    def test_get_visible_app_plugins_role(self):
+        """Test get_visible_app_plugins() caching for users with different roles"""
+        user_no_roles = self.make_user('user_no_roles')
+        self.assertNotEqual(
+            tags.get_visible_app_plugins(self.project, self.user), []
+        )
+        self.assertEqual(
+            tags.get_visible_app_plugins(self.project, user_no_roles), []
+        )
+
+    def test_get_visible_app_plugins_inherited_owner(self):
+        """Test get_visible_app_plugins() for delegate with inherited owner role"""
+        user_delegate = self.make_user('user_delegate')
+        role_delegate, _ = Role.objects.get_or_create(
+            name=PROJECT_ROLE_DELEGATE
+        )
+        sub_category = self._make_project(
+            'SubCategory', PROJECT_TYPE_CATEGORY, self.category
+        )
+        self._make_assignment(sub_category, self.user, self.role_owner)
+        project = self._make_project(
+            'SubProject', PROJECT_TYPE_PROJECT, sub_category
+        )
+        self._make_assignment(project, self.user, self.role_owner)
+        self._make_assignment(project, user_delegate, role_delegate)
+        self.assertEqual(
+            _get_project_role_key(project, user_delegate),
+            PROJECT_ROLE_DELEGATE,
+        )
+        sub_category.get_owner().delete()
+        self._make_assignment(sub_category, user_delegate, self.role_owner)
+        # Inherited owner role should take precedence over local role
+        self.assertEqual(
+            _get_project_role_key(project, user_delegate), PROJECT_ROLE_OWNER
+        )
+        self.assertEqual(
+            [
+                p.name
+                for p in tags.get_visible_app_plugins(project, user_delegate)
+            ],
+            [p.name for p in tags.get_visible_app_plugins(project, self.user)],
+        )
+
     def test_is_inherited_owner(self):
         """Test is_inherited_owner()"""
         owner_cat = self.make_user('user_cat_owner')
@@ -1,21 +1,29 @@
 """UI view tests for the projectroles app"""
 
 import json
+import uuid
+
+from unittest.mock import MagicMock, patch
 from urllib.parse import urlencode
 
 from django.contrib import auth
 from django.contrib.messages import get_messages
 from django.core import mail
+from django.db import models
 from django.forms import HiddenInput
 from django.forms.models import model_to_dict
-from django.test import override_settings
+from django.test import RequestFactory, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
 from test_plus.test import TestCase
 
 from projectroles.app_settings import AppSettingAPI
-from projectroles.forms import EMPTY_CHOICE_LABEL
+from projectroles.forms import (
+    EMPTY_CHOICE_LABEL,
+    ProjectForm,
+    SODARProjectAutocompleteWidget,
+)
 from projectroles.models import (
     Project,
     Role,
@@ -23,12 +31,16 @@ from projectroles.models import (
     ProjectInvite,
     RemoteSite,
     RemoteProject,
+    ProjectUserTag,
     SODAR_CONSTANTS,
+    PROJECT_TAG_STARRED,
 )
 from projectroles.plugins import (
     get_backend_api,
     get_active_plugins,
 )
+from projectroles.post_modify import STEP_STATUS_OK
+from projectroles.tasks import post_modify_task
 from projectroles.utils import (
     build_secret,
     get_display_name,
@@ -42,6 +54,7 @@ from projectroles.tests.test_models import (
     RemoteProjectMixin,
     AppSettingMixin,
     RemoteTargetMixin,
+    ProjectUserTagMixin,
 )
 from projectroles.views import (
     MSG_PROJECT_WELCOME,
@@ -51,6 +64,9 @@ from projectroles.views import (
     MSG_INVITE_LOGGED_IN_ACCEPT,
     MSG_INVITE_USER_NOT_EQUAL,
     MSG_INVITE_USER_EXISTS,
+    ProjectAccessMixin,
+    RoleAssignmentBatchMixin,
+    get_project_model_map,
 )
 
 
@@ -131,6 +147,120 @@ class TestViewsBase(TestCase):
         self.user.save()
 
 
+class ProjectOneToOneTestModel(models.Model):
+    """Unmanaged test model with a one-to-one project relation"""
+
+    sodar_uuid = models.UUIDField(default=uuid.uuid4, unique=True)
+    # NOTE: DO_NOTHING to skip the missing table in project deletion
+    project = models.OneToOneField(
+        Project, related_name='+', on_delete=models.DO_NOTHING
+    )
+
+    class Meta:
+        app_label = 'projectroles'
+        managed = False
+
+
+class ProjectPropertyTestModel(models.Model):
+    """Unmanaged test model with a project property"""
+
+    sodar_uuid = models.UUIDField(default=uuid.uuid4, unique=True)
+    project_uuid = models.UUIDField()
+
+    class Meta:
+        app_label = 'projectroles'
+        managed = False
+
+    @property
+    def project(self):
+        return Project.objects.filter(sodar_uuid=self.project_uuid).first()
+
+
+class TestProjectAccessMixin(ProjectMixin, RoleAssignmentMixin, TestViewsBase):
+    """Tests for ProjectAccessMixin"""
+
+    def setUp(self):
+        super().setUp()
+        self.project = self._make_project(
+            'TestProject', PROJECT_TYPE_PROJECT, None
+        )
+        self.owner_as = self._make_assignment(
+            self.project, self.user, self.role_owner
+        )
+        self.mixin = ProjectAccessMixin()
+
+    def test_get_project(self):
+        """Test get_project() with project kwarg"""
+        request = RequestFactory().get('/')
+        kwargs = {'project': str(self.project.sodar_uuid)}
+        with self.assertNumQueries(1):
+            project = self.mixin.get_project(request=request, kwargs=kwargs)
+        self.assertEqual(project, self.project)
+        with self.assertNumQueries(0):
+            project = self.mixin.get_project(request=request, kwargs=kwargs)
+        self.assertEqual(project, self.project)
+
+    def test_get_project_object(self):
+        """Test get_project() with project related object kwarg"""
+        kwargs = {'roleassignment': str(self.owner_as.sodar_uuid)}
+        request = RequestFactory().get(
+            reverse('projectroles:role_update', kwargs=kwargs)
+        )
+        with self.assertNumQueries(1):
+            project = self.mixin.get_project(request=request, kwargs=kwargs)
+        self.assertEqual(project, self.project)
+        with self.assertNumQueries(0):
+            project = self.mixin.get_project(request=request, kwargs=kwargs)
+        self.assertEqual(project, self.project)
+
+    def test_get_project_not_found(self):
+        """Test get_project() with non-existing object"""
+        kwargs = {'roleassignment': '11111111-1111-1111-1111-111111111111'}
+        request = RequestFactory().get(
+            reverse('projectroles:role_update', kwargs=kwargs)
+        )
+        self.assertIsNone(
+            self.mixin.get_project(request=request, kwargs=kwargs)
+        )
+
+    def test_get_project_model_map(self):
+        """Test get_project_model_map()"""
+        model_map = get_project_model_map()
+        self.assertEqual(
+            model_map[('projectroles', 'roleassignment')],
+            (RoleAssignment, True),
+        )
+        self.assertNotIn(('projectroles', 'project'), model_map)
+        self.assertNotIn(('projectroles', 'role'), model_map)
+        self.assertEqual(
+            model_map[('projectroles', 'projectonetoonetestmodel')],
+            (ProjectOneToOneTestModel, True),
+        )
+        self.assertEqual(
+            model_map[('projectroles', 'projectpropertytestmodel')],
+            (ProjectPropertyTestModel, False),
+        )
+
+    def test_get_project_property(self):
+        """Test get_project() with object having a project property"""
+        obj = ProjectPropertyTestModel(project_uuid=self.project.sodar_uuid)
+        kwargs = {'projectpropertytestmodel': str(obj.sodar_uuid)}
+        request = RequestFactory().get(
+            reverse(
+                'projectroles:role_update',
+                kwargs={'roleassignment': str(obj.sodar_uuid)},
+            )
+        )
+        mock_manager = MagicMock()
+        mock_manager.all.return_value.filter.return_value.first.return_value = (
+            obj
+        )
+        with patch.object(ProjectPropertyTestModel, 'objects', mock_manager):
+            project = self.mixin.get_project(request=request, kwargs=kwargs)
+        self.assertEqual(project, self.project)
+        mock_manager.all.return_value.select_related.assert_not_called()
+
+
 # General view tests -----------------------------------------------------------
 
 
@@ -369,6 +499,29 @@ class TestProjectDetailView(ProjectMixin, RoleAssignmentMixin, TestViewsBase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.context['object'].pk, self.project.pk)
 
+    def test_render_lazy_card(self):
+        """Test rendering of project detail view with lazy app card"""
+        with self.login(self.user):
+            response = self.client.get(
+                reverse(
+                    'projectroles:detail',
+                    kwargs={'project': self.project.sodar_uuid},
+                )
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(
+            response,
+            reverse(
+                'projectroles:ajax_app_details',
+                kwargs={
+                    'project': self.project.sodar_uuid,
+                    'plugin': 'timeline',
+                },
+            ),
+        )
+        self.assertNotContains(response, 'sodar-tl-table')
+        self.assertContains(response, 'sodar-ff-details-table')
+
     def test_render_not_found(self):
         """Test rendering of project detail view with invalid UUID"""
         with self.login(self.user):
@@ -716,6 +869,113 @@ class TestProjectCreateView(ProjectMixin, RoleAssignmentMixin, TestViewsBase):
         self.assertEqual(self.app_alert_model.objects.count(), 1)
         self.assertEqual(len(mail.outbox), 1)
 
+    def _get_create_values(self, category, owner):
+        values = {
+            'title': 'TestProject',
+            'type': PROJECT_TYPE_PROJECT,
+            'parent': category.sodar_uuid,
+            'owner': owner.sodar_uuid,
+            'description': 'description',
+            'public_guest_access': False,
+        }
+        values.update(
+            app_settings.get_all_defaults(
+                APP_SETTING_SCOPE_PROJECT, post_safe=True
+            )
+        )
+        return values
+
+    def test_create_project_pipeline_status(self):
+        """Test Project creation post-modify pipeline timeline status"""
+        timeline = get_backend_api('timeline_backend')
+        category = self._make_project(
+            title='TestCategory', type=PROJECT_TYPE_CATEGORY, parent=None
+        )
+        self._make_assignment(category, self.user, self.role_owner)
+        with self.login(self.user):
+            response = self.client.post(
+                reverse(
+                    'projectroles:create',
+                    kwargs={'project': category.sodar_uuid},
+                ),
+                self._get_create_values(category, self.user),
+            )
+        self.assertEqual(response.status_code, 302)
+        project = Project.objects.get(type=PROJECT_TYPE_PROJECT)
+        tl_event = timeline.get_project_events(project).first()
+        status = tl_event.get_current_status()
+        self.assertEqual(status.status_type, 'OK')
+        self.assertEqual(
+            status.extra_data['steps']['notify_users'],
+            {'status': STEP_STATUS_OK},
+        )
+        plugin_names = [
+            p.name for p in get_active_plugins(plugin_type='project_app')
+        ]
+        self.assertEqual(len(status.extra_data['steps']), len(plugin_names) + 1)
+
+    @override_settings(PROJECTROLES_MODIFY_PIPELINE='commit')
+    def test_create_project_pipeline_commit(self):
+        """Test Project creation with post-modify pipeline run on commit"""
+        category = self._make_project(
+            title='TestCategory', type=PROJECT_TYPE_CATEGORY, parent=None
+        )
+        self._make_assignment(category, self.user, self.role_owner)
+        new_user = self.make_user('new_user')
+        self._make_assignment(category, new_user, self.role_contributor)
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            with self.login(self.user):
+                response = self.client.post(
+                    reverse(
+                        'projectroles:create',
+                        kwargs={'project': category.sodar_uuid},
+                    ),
+                    self._get_create_values(category, new_user),
+                )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Project.objects.all().count(), 2)
+        self.assertEqual(self.app_alert_model.objects.count(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.app_alert_model.objects.count(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(PROJECTROLES_MODIFY_PIPELINE='celery')
+    def test_create_project_pipeline_celery(self):
+        """Test Project creation with post-modify pipeline in Celery task"""
+        timeline = get_backend_api('timeline_backend')
+        category = self._make_project(
+            title='TestCategory', type=PROJECT_TYPE_CATEGORY, parent=None
+        )
+        self._make_assignment(category, self.user, self.role_owner)
+        new_user = self.make_user('new_user')
+        self._make_assignment(category, new_user, self.role_contributor)
+
+        with patch.object(post_modify_task, 'delay') as mock_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.login(self.user):
+                    response = self.client.post(
+                        reverse(
+                            'projectroles:create',
+                            kwargs={'project': category.sodar_uuid},
+                        ),
+                        self._get_create_values(category, new_user),
+                    )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(mock_delay.call_count, 1)
+        self.assertEqual(self.app_alert_model.objects.count(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+        # Run task with data serialized as JSON
+        post_modify_task(json.loads(json.dumps(mock_delay.call_args[0][0])))
+        self.assertEqual(self.app_alert_model.objects.count(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        project = Project.objects.get(type=PROJECT_TYPE_PROJECT)
+        tl_event = timeline.get_project_events(project).first()
+        self.assertEqual(tl_event.get_current_status().status_type, 'OK')
+
 
 class TestProjectUpdateView(
     ProjectMixin, RoleAssignmentMixin, RemoteTargetMixin, TestViewsBase
@@ -782,6 +1042,75 @@ class TestProjectUpdateView(
         self.assertEqual(form.initial['parent'], self.category.sodar_uuid)
         self.assertEqual(len(form.fields['parent'].choices), 2)
 
+    def test_render_parent_autocomplete(self):
+        """Test parent field autocomplete widget"""
+        with self.login(self.user):
+            response = self.client.get(
+                reverse(
+                    'projectroles:update',
+                    kwargs={'project': self.project.sodar_uuid},
+                )
+            )
+        self.assertEqual(response.status_code, 200)
+        form = response.context['form']
+        self.assertIsInstance(
+            form.fields['parent'].widget, SODARProjectAutocompleteWidget
+        )
+        self.assertEqual(form.fields['parent'].empty_label, EMPTY_CHOICE_LABEL)
+
+    def test_render_parent_inherited(self):
+        """Test parent choices with inherited category ownership"""
+        user_new = self.make_user('new_user')
+        self.owner_as.user = user_new
+        self.owner_as.save()
+        category2 = self._make_project(
+            'TestCategory2', PROJECT_TYPE_CATEGORY, None
+        )
+        self._make_assignment(category2, user_new, self.role_owner)
+        sub_category = self._make_project(
+            'SubCategory', PROJECT_TYPE_CATEGORY, category2
+        )
+        self._make_assignment(sub_category, self.user, self.role_owner)
+
+        with self.login(user_new):
+            response = self.client.get(
+                reverse(
+                    'projectroles:update',
+                    kwargs={'project': self.project.sodar_uuid},
+                )
+            )
+        self.assertEqual(response.status_code, 200)
+        form = response.context['form']
+        self.assertIsNone(form.fields['parent'].empty_label)
+        self.assertEqual(
+            list(form.fields['parent'].queryset),
+            [self.category, category2, sub_category],
+        )
+
+    def test_get_parent_queryset_category(self):
+        """Test ProjectForm.get_parent_queryset() for a category"""
+        category2 = self._make_project(
+            'TestCategory2', PROJECT_TYPE_CATEGORY, None
+        )
+        sub_category = self._make_project(
+            'SubCategory', PROJECT_TYPE_CATEGORY, self.category
+        )
+        sub_sub_category = self._make_project(
+            'SubSubCategory', PROJECT_TYPE_CATEGORY, sub_category
+        )
+        self.assertEqual(
+            list(ProjectForm.get_parent_queryset(self.category, self.user)),
+            [category2],
+        )
+        self.assertEqual(
+            list(ProjectForm.get_parent_queryset(sub_category, self.user)),
+            [self.category, category2],
+        )
+        self.assertEqual(
+            list(ProjectForm.get_parent_queryset(sub_sub_category, self.user)),
+            [self.category, sub_category, category2],
+        )
+
     def test_update_project(self):
         """Test Project updating"""
         timeline = get_backend_api('timeline_backend')
@@ -881,6 +1210,31 @@ class TestProjectUpdateView(
         self.assertIn('description', tl_event.extra_data)
         self.assertIn('parent', tl_event.extra_data)
 
+    def test_update_project_rollback(self):
+        """Test Project updating rollback on failed local save"""
+        values = model_to_dict(self.project)
+        values['title'] = 'updated title'
+        values['parent'] = self.category.sodar_uuid
+        values['owner'] = self.user.sodar_uuid
+        values.update(
+            app_settings.get_all_settings(project=self.project, post_safe=True)
+        )
+        with patch(
+            'projectroles.views.ProjectModifyMixin._handle_local_save',
+            side_effect=Exception('Save failed'),
+        ):
+            with self.login(self.user):
+                response = self.client.post(
+                    reverse(
+                        'projectroles:update',
+                        kwargs={'project': self.project.sodar_uuid},
+                    ),
+                    values,
+                )
+        self.assertEqual(response.status_code, 302)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.title, 'TestProject')
+
     def test_render_category(self):
         """Test rendering with existing category"""
         with self.login(self.user):
@@ -2760,6 +3114,244 @@ class TestRoleAssignmentDeleteView(
         self.assertEqual(RoleAssignment.objects.all().count(), 3)
 
 
+class TestRoleAssignmentBatchMixin(
+    ProjectMixin, RoleAssignmentMixin, ProjectUserTagMixin, TestViewsBase
+):
+    """Tests for RoleAssignmentBatchMixin"""
+
+    def setUp(self):
+        super().setUp()
+        self.category = self._make_project(
+            'TestCategory', PROJECT_TYPE_CATEGORY, None
+        )
+        self.owner_as_cat = self._make_assignment(
+            self.category, self.user, self.role_owner
+        )
+        self.project = self._make_project(
+            'TestProject', PROJECT_TYPE_PROJECT, self.category
+        )
+        self.owner_as = self._make_assignment(
+            self.project, self.user, self.role_owner
+        )
+        self.project2 = self._make_project(
+            'TestProject2', PROJECT_TYPE_PROJECT, self.category
+        )
+        self.owner_as2 = self._make_assignment(
+            self.project2, self.user, self.role_owner
+        )
+        self.user_new = self.make_user('user_new')
+        self.user_new2 = self.make_user('user_new2')
+        self.mixin = RoleAssignmentBatchMixin()
+        self.request = RequestFactory().get('/')
+        self.request.user = self.user
+        app_alerts = get_backend_api('appalerts_backend')
+        self.app_alert_model = app_alerts.get_model()
+
+    def test_validate(self):
+        """Test validating a batch of valid changes"""
+        role_as = self._make_assignment(
+            self.project, self.user_new2, self.role_guest
+        )
+        self._make_assignment(self.project2, self.user_new2, self.role_guest)
+        changes = [
+            {
+                'project': self.project,
+                'user': self.user_new,
+                'role': self.role_guest,
+            },
+            {
+                'project': self.project,
+                'user': self.user_new2,
+                'role': self.role_contributor,
+            },
+            {'project': self.project2, 'user': self.user_new2, 'role': None},
+            {
+                'project': self.project2,
+                'user': self.user_new,
+                'role': self.role_guest,
+            },
+        ]
+        ret, errors = self.mixin.validate_role_batch(changes, self.user)
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            [c['action'] for c in ret], ['create', 'update', 'delete', 'create']
+        )
+        self.assertEqual(ret[1]['instance'], role_as)
+
+    def test_validate_invalid(self):
+        """Test validating a batch with invalid changes"""
+        user_cat = self.make_user('user_cat')
+        self.owner_as_cat.user = user_cat
+        self.owner_as_cat.save()
+        changes = [
+            {
+                'project': self.project,
+                'user': self.user_new,
+                'role': self.role_guest,
+            },
+            {
+                'project': self.project,
+                'user': self.user_new,
+                'role': self.role_contributor,
+            },
+            {
+                'project': self.project,
+                'user': self.user_new2,
+                'role': self.role_owner,
+            },
+            {
+                'project': self.project,
+                'user': self.user,
+                'role': self.role_guest,
+            },
+            {'project': self.project2, 'user': self.user_new2, 'role': None},
+            {
+                'project': self.project,
+                'user': user_cat,
+                'role': self.role_guest,
+            },
+        ]
+        ret, errors = self.mixin.validate_role_batch(changes, self.user)
+        self.assertEqual([c['user'] for c in ret], [self.user_new])
+        self.assertEqual([e[0] for e in errors], [1, 2, 3, 4, 5])
+
+    def test_validate_no_perms(self):
+        """Test validating without permissions for the project"""
+        self._make_assignment(self.project, self.user_new, self.role_guest)
+        changes = [
+            {
+                'project': self.project,
+                'user': self.user_new2,
+                'role': self.role_guest,
+            }
+        ]
+        ret, errors = self.mixin.validate_role_batch(changes, self.user_new)
+        self.assertEqual(ret, [])
+        self.assertEqual(len(errors), 1)
+
+    def test_validate_existing(self):
+        """Test validating a change which is already in effect"""
+        self._make_assignment(self.project, self.user_new, self.role_guest)
+        changes = [
+            {
+                'project': self.project,
+                'user': self.user_new,
+                'role': self.role_guest,
+            }
+        ]
+        ret, errors = self.mixin.validate_role_batch(changes, self.user)
+        self.assertEqual(errors, [])
+        self.assertIsNone(ret[0]['action'])
+
+    def test_validate_delegate_limit(self):
+        """Test validating delegate changes with limit"""
+        self._make_assignment(self.project, self.user_new, self.role_delegate)
+        changes = [
+            {
+                'project': self.project,
+                'user': self.user_new2,
+                'role': self.role_delegate,
+            }
+        ]
+        ret, errors = self.mixin.validate_role_batch(changes, self.user)
+        self.assertEqual(ret, [])
+        self.assertEqual(len(errors), 1)
+        # Replace delegate in the same batch
+        changes.append(
+            {
+                'project': self.project,
+                'user': self.user_new,
+                'role': self.role_guest,
+            }
+        )
+        ret, errors = self.mixin.validate_role_batch(changes, self.user)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(ret), 2)
+
+    def test_apply(self):
+        """Test applying a batch of changes"""
+        timeline = get_backend_api('timeline_backend')
+        role_as = self._make_assignment(
+            self.project, self.user_new2, self.role_guest
+        )
+        self._make_assignment(self.project2, self.user_new2, self.role_guest)
+        self._make_tag(self.project2, self.user_new2, PROJECT_TAG_STARRED)
+        changes = [
+            {
+                'project': self.project,
+                'user': self.user_new,
+                'role': self.role_guest,
+            },
+            {
+                'project': self.project2,
+                'user': self.user_new,
+                'role': self.role_contributor,
+            },
+            {
+                'project': self.project,
+                'user': self.user_new2,
+                'role': self.role_contributor,
+            },
+            {'project': self.project2, 'user': self.user_new2, 'role': None},
+        ]
+        changes, errors = self.mixin.validate_role_batch(changes, self.user)
+        self.assertEqual(errors, [])
+        with self.captureOnCommitCallbacks(execute=True):
+            ret = self.mixin.apply_role_batch(changes, self.request)
+
+        self.assertEqual(len(ret), 3)
+        self.assertEqual(
+            RoleAssignment.objects.get(
+                project=self.project, user=self.user_new
+            ).role,
+            self.role_guest,
+        )
+        self.assertEqual(
+            RoleAssignment.objects.get(
+                project=self.project2, user=self.user_new
+            ).role,
+            self.role_contributor,
+        )
+        role_as.refresh_from_db()
+        self.assertEqual(role_as.role, self.role_contributor)
+        self.assertIsNone(
+            RoleAssignment.objects.filter(
+                project=self.project2, user=self.user_new2
+            ).first()
+        )
+        self.assertEqual(ProjectUserTag.objects.count(), 0)
+
+        # One timeline event per project
+        for project, count in [(self.project, 2), (self.project2, 2)]:
+            events = timeline.get_project_events(project).filter(
+                event_name='role_batch_update'
+            )
+            self.assertEqual(events.count(), 1)
+            self.assertEqual(len(events[0].extra_data['changes']), count)
+            self.assertEqual(events[0].get_current_status().status_type, 'OK')
+        self.assertEqual(self.app_alert_model.objects.count(), 4)
+        # One email per user
+        self.assertEqual(len(mail.outbox), 2)
+        body = [m for m in mail.outbox if self.user_new.email in m.to][0].body
+        self.assertIn(self.project.title, body)
+        self.assertIn(self.project2.title, body)
+
+    def test_apply_empty(self):
+        """Test applying a batch with no effective changes"""
+        self._make_assignment(self.project, self.user_new, self.role_guest)
+        changes = [
+            {
+                'project': self.project,
+                'user': self.user_new,
+                'role': self.role_guest,
+            }
+        ]
+        changes, errors = self.mixin.validate_role_batch(changes, self.user)
+        self.assertEqual(self.mixin.apply_role_batch(changes, self.request), [])
+        self.assertEqual(self.app_alert_model.objects.count(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+
 class TestRoleAssignmentOwnerTransferView(
     ProjectMixin, RoleAssignmentMixin, TestViewsBase
 ):
@@ -20,7 +20,9 @@ from projectroles.tests.test_views import (
 from projectroles.views_ajax import INHERITED_OWNER_INFO
 
 
-class TestProjectListAjaxView(ProjectMixin, RoleAssignmentMixin, TestViewsBase):
+class TestProjectListAjaxView(
+    ProjectMixin, RoleAssignmentMixin, ProjectUserTagMixin, TestViewsBase
+):
     """Tests for ProjectListAjaxView"""
 
     def setUp(self):
@@ -131,6 +133,19 @@ class TestProjectListAjaxView(ProjectMixin, RoleAssignmentMixin, TestViewsBase):
         self.assertEqual(response.data['projects'], [])
         self.assertIsNotNone(response.data['messages'].get('no_projects'))
 
+    def test_get_not_modified(self):
+        """Test project list retrieval with If-None-Match"""
+        url = reverse('projectroles:ajax_project_list')
+        with self.login(self.user):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            etag = response['ETag']
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self._make_tag(self.project, self.user, PROJECT_TAG_STARRED)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+
     def test_get_project_parent(self):
         """Test project list retrieval with project as parent (should fail)"""
         with self.login(self.user):
@@ -379,3 +394,220 @@ class TestProjectStarringAjaxView(
 
         self.assertEqual(ProjectUserTag.objects.all().count(), 0)
         self.assertEqual(response.status_code, 200)
+
+
+class TestProjectParentAutocompleteAjaxView(
+    ProjectMixin, RoleAssignmentMixin, TestViewsBase
+):
+    """Tests for ProjectParentAutocompleteAjaxView"""
+
+    def setUp(self):
+        super().setUp()
+        self.category = self._make_project(
+            'TestCategory', PROJECT_TYPE_CATEGORY, None
+        )
+        self._make_assignment(self.category, self.user, self.role_owner)
+        self.category2 = self._make_project(
+            'TestCategory2', PROJECT_TYPE_CATEGORY, None
+        )
+        self._make_assignment(self.category2, self.user, self.role_owner)
+        self.project = self._make_project(
+            'TestProject', PROJECT_TYPE_PROJECT, self.category
+        )
+        self._make_assignment(self.project, self.user, self.role_owner)
+        self.url = reverse('projectroles:ajax_autocomplete_parent')
+
+    def _get_forward(self, project):
+        return json.dumps({'project': str(project.sodar_uuid)})
+
+    def test_get(self):
+        """Test parent category autocompletion"""
+        with self.login(self.user):
+            response = self.client.get(
+                self.url, {'forward': self._get_forward(self.project)}
+            )
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(
+            [r['id'] for r in data['results']],
+            [str(self.category.sodar_uuid), str(self.category2.sodar_uuid)],
+        )
+        self.assertEqual(data['results'][0]['text'], self.category.full_title)
+
+    def test_get_query(self):
+        """Test parent category autocompletion with a query"""
+        with self.login(self.user):
+            response = self.client.get(
+                self.url,
+                {'forward': self._get_forward(self.project), 'q': 'gory2'},
+            )
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(
+            [r['id'] for r in data['results']],
+            [str(self.category2.sodar_uuid)],
+        )
+
+    def test_get_no_perms(self):
+        """Test parent category autocompletion without project permission"""
+        user_new = self.make_user('user_new')
+        with self.login(user_new):
+            response = self.client.get(
+                self.url, {'forward': self._get_forward(self.project)}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['results'], [])
+
+
+@override_settings(PROJECTROLES_ALLOW_LOCAL_USERS=True)
+class TestUserAutocompleteAjaxView(
+    ProjectMixin, RoleAssignmentMixin, TestViewsBase
+):
+    """Tests for UserAutocompleteAjaxView"""
+
+    def _get_ids(self, response):
+        return [r['id'] for r in json.loads(response.content)['results']]
+
+    def setUp(self):
+        super().setUp()
+        self.user.name = 'Super User'
+        self.user.save()
+        self.category = self._make_project(
+            'TestCategory', PROJECT_TYPE_CATEGORY, None
+        )
+        self._make_assignment(self.category, self.user, self.role_owner)
+        self.project = self._make_project(
+            'TestProject', PROJECT_TYPE_PROJECT, self.category
+        )
+        self.user_owner = self.make_user('owner')
+        self.user_owner.name = 'Project Owner'
+        self.user_owner.save()
+        self._make_assignment(self.project, self.user_owner, self.role_owner)
+        self.user_new = self.make_user('new')
+        self.user_new.name = 'New User'
+        self.user_new.email = 'new@example.org'
+        self.user_new.save()
+        self.url = reverse('projectroles:ajax_autocomplete_user')
+
+    def _get_forward(self, scope):
+        return json.dumps(
+            {'project': str(self.project.sodar_uuid), 'scope': scope}
+        )
+
+    def test_get(self):
+        """Test user autocompletion"""
+        with self.login(self.user):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self._get_ids(response),
+            [
+                str(self.user_new.sodar_uuid),
+                str(self.user_owner.sodar_uuid),
+                str(self.user.sodar_uuid),
+            ],
+        )
+
+    def test_get_query(self):
+        """Test user autocompletion with a query"""
+        with self.login(self.user):
+            response = self.client.get(self.url, {'q': 'proj OWN'})
+        self.assertEqual(
+            self._get_ids(response), [str(self.user_owner.sodar_uuid)]
+        )
+
+    def test_get_query_email(self):
+        """Test user autocompletion with an email domain query"""
+        with self.login(self.user):
+            response = self.client.get(self.url, {'q': 'example.org'})
+        self.assertEqual(
+            self._get_ids(response), [str(self.user_new.sodar_uuid)]
+        )
+
+    def test_get_scope_project(self):
+        """Test user autocompletion with project scope"""
+        with self.login(self.user):
+            response = self.client.get(
+                self.url, {'forward': self._get_forward('project')}
+            )
+        self.assertEqual(
+            self._get_ids(response),
+            [str(self.user_owner.sodar_uuid), str(self.user.sodar_uuid)],
+        )
+
+    def test_get_scope_project_exclude(self):
+        """Test user autocompletion with project exclude scope"""
+        with self.login(self.user):
+            response = self.client.get(
+                self.url, {'forward': self._get_forward('project_exclude')}
+            )
+        self.assertEqual(
+            self._get_ids(response), [str(self.user_new.sodar_uuid)]
+        )
+
+    def test_get_scope_project_invalid(self):
+        """Test user autocompletion with invalid project UUID"""
+        forward = json.dumps(
+            {
+                'project': '11111111-1111-1111-1111-111111111111',
+                'scope': 'project',
+            }
+        )
+        with self.login(self.user):
+            response = self.client.get(self.url, {'forward': forward})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._get_ids(response), [])
+
+    def test_get_paginate(self):
+        """Test user autocompletion result pagination"""
+        for i in range(12):
+            self.make_user('user{}'.format(i))
+        with self.login(self.user):
+            response = self.client.get(self.url, {'q': 'user'})
+        data = json.loads(response.content)
+        self.assertEqual(len(data['results']), 10)
+        self.assertEqual(data['pagination']['more'], True)
+
+
+class TestProjectAppDetailsAjaxView(
+    ProjectMixin, RoleAssignmentMixin, TestViewsBase
+):
+    """Tests for ProjectAppDetailsAjaxView"""
+
+    def setUp(self):
+        super().setUp()
+        self.category = self._make_project(
+            'TestCategory', PROJECT_TYPE_CATEGORY, None
+        )
+        self._make_assignment(self.category, self.user, self.role_owner)
+        self.project = self._make_project(
+            'TestProject', PROJECT_TYPE_PROJECT, self.category
+        )
+        self._make_assignment(self.project, self.user, self.role_owner)
+
+    def _get_url(self, project, plugin):
+        return reverse(
+            'projectroles:ajax_app_details',
+            kwargs={'project': project.sodar_uuid, 'plugin': plugin},
+        )
+
+    def test_get(self):
+        """Test app card retrieval"""
+        with self.login(self.user):
+            response = self.client.get(self._get_url(self.project, 'timeline'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('sodar-tl-table', json.loads(response.content)['html'])
+
+    def test_get_invalid_plugin(self):
+        """Test app card retrieval with invalid plugin name"""
+        with self.login(self.user):
+            response = self.client.get(self._get_url(self.project, 'invalid'))
+        self.assertEqual(response.status_code, 404)
+
+    def test_get_category(self):
+        """Test app card retrieval for app not enabled in categories"""
+        with self.login(self.user):
+            response = self.client.get(
+                self._get_url(self.category, 'filesfolders')
+            )
+        self.assertEqual(response.status_code, 404)
@@ -5,8 +5,10 @@ import pytz
 
 from django.conf import settings
 from django.core import mail
+from django.db import connection
 from django.forms.models import model_to_dict
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
@@ -212,6 +214,21 @@ class SODARAPIViewTestMixin:
 
         return req_method(url, **req_kwargs)
 
+    def get_query_count(self, url, **kwargs):
+        """
+        Perform a HTTP request with Knox token auth and return the number of
+        database queries executed.
+
+        :param url: URL for the request
+        :param kwargs: Keyword arguments for request_knox()
+        :return: Integer
+        """
+        self.request_knox(url, **kwargs)  # Exclude token caching from count
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.request_knox(url, **kwargs)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
 
 class TestAPIViewsBase(
     ProjectMixin, RoleAssignmentMixin, SODARAPIViewTestMixin, APITestCase
@@ -331,6 +348,71 @@ class TestProjectListAPIView(TestCoreAPIViewsBase):
         ]
         self.assertEqual(response_data, expected)
 
+    def test_get_query_count(self):
+        """Test ProjectListAPIView get() query count with more projects"""
+        url = reverse('projectroles:api_project_list')
+        query_count = self.get_query_count(url)
+        user_new = self.make_user('user_new')
+        for i in range(3):
+            project = self._make_project(
+                'NewProject{}'.format(i), PROJECT_TYPE_PROJECT, self.category
+            )
+            self._make_assignment(project, self.user, self.role_owner)
+            self._make_assignment(project, user_new, self.role_guest)
+        self.assertEqual(self.get_query_count(url), query_count)
+
+    def test_get_pagination(self):
+        """Test ProjectListAPIView get() with pagination"""
+        url = reverse('projectroles:api_project_list') + '?page_size=1'
+        response = self.request_knox(url)
+
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.content)
+        self.assertIsNone(response_data['previous'])
+        self.assertEqual(len(response_data['results']), 1)
+        self.assertEqual(
+            response_data['results'][0]['sodar_uuid'],
+            str(self.category.sodar_uuid),
+        )
+
+        response = self.request_knox(response_data['next'])
+
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.content)
+        self.assertIsNone(response_data['next'])
+        self.assertEqual(len(response_data['results']), 1)
+        self.assertEqual(
+            response_data['results'][0]['sodar_uuid'],
+            str(self.project.sodar_uuid),
+        )
+
+    def test_get_not_modified(self):
+        """Test ProjectListAPIView get() with If-None-Match"""
+        url = reverse('projectroles:api_project_list')
+        response = self.request_knox(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.request_knox(url, header={'HTTP_IF_NONE_MATCH': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+        self._make_project('NewProject', PROJECT_TYPE_PROJECT, self.category)
+        response = self.request_knox(url, header={'HTTP_IF_NONE_MATCH': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_get_not_modified_user_update(self):
+        """Test ProjectListAPIView get() with If-None-Match and user update"""
+        url = reverse('projectroles:api_project_list')
+        etag = self.request_knox(url)['ETag']
+        self.user.email = 'updated@example.com'
+        self.user.save()
+        response = self.request_knox(url, header={'HTTP_IF_NONE_MATCH': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
     def test_get_no_roles(self):
         """Test ProjectListAPIView get() without roles"""
         user_no_roles = self.make_user('user_no_roles')
@@ -435,6 +517,65 @@ class TestProjectRetrieveAPIView(AppSettingMixin, TestCoreAPIViewsBase):
         response = self.request_knox(url)
         self.assertEqual(response.status_code, 404)
 
+    def test_get_not_modified(self):
+        """Test ProjectRetrieveAPIView get() with If-None-Match"""
+        url = reverse(
+            'projectroles:api_project_retrieve',
+            kwargs={'project': self.project.sodar_uuid},
+        )
+        response = self.request_knox(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.request_knox(url, header={'HTTP_IF_NONE_MATCH': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        user_new = self.make_user('user_new')
+        self._make_assignment(self.project, user_new, self.role_guest)
+        response = self.request_knox(url, header={'HTTP_IF_NONE_MATCH': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.content)['roles']), 2)
+
+    def test_get_not_modified_user_update(self):
+        """Test ProjectRetrieveAPIView get() with If-None-Match and user update"""
+        url = reverse(
+            'projectroles:api_project_retrieve',
+            kwargs={'project': self.project.sodar_uuid},
+        )
+        etag = self.request_knox(url)['ETag']
+        self.user.name = 'Updated Name'
+        self.user.save()
+        response = self.request_knox(url, header={'HTTP_IF_NONE_MATCH': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('Updated Name', response.content.decode('utf-8'))
+
+    def test_get_no_last_modified(self):
+        """Test ProjectRetrieveAPIView get() without Last-Modified header"""
+        url = reverse(
+            'projectroles:api_project_retrieve',
+            kwargs={'project': self.project.sodar_uuid},
+        )
+        response = self.request_knox(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_get_not_modified_no_perms(self):
+        """Test ProjectRetrieveAPIView get() with If-None-Match and no perms"""
+        url = reverse(
+            'projectroles:api_project_retrieve',
+            kwargs={'project': self.project.sodar_uuid},
+        )
+        etag = self.request_knox(url)['ETag']
+        user_no_roles = self.make_user('user_no_roles')
+        response = self.request_knox(
+            url,
+            token=self.get_token(user_no_roles),
+            header={'HTTP_IF_NONE_MATCH': etag},
+        )
+        self.assertEqual(response.status_code, 403)
+
 
 class TestProjectCreateAPIView(
     RemoteSiteMixin, RemoteProjectMixin, TestCoreAPIViewsBase
@@ -1857,6 +1998,253 @@ class TestRoleAssignmentOwnerTransferAPIView(
         self.assertEqual(self.project.get_owner().user, self.user)
 
 
+class TestRoleAssignmentBatchAPIView(
+    RemoteSiteMixin, RemoteProjectMixin, TestCoreAPIViewsBase
+):
+    """Tests for RoleAssignmentBatchAPIView"""
+
+    def setUp(self):
+        super().setUp()
+        self.project2 = self._make_project(
+            'TestProject2', PROJECT_TYPE_PROJECT, self.category
+        )
+        self.owner_as2 = self._make_assignment(
+            self.project2, self.user, self.role_owner
+        )
+        self.assign_user = self.make_user('assign_user')
+        self.assign_user2 = self.make_user('assign_user2')
+        self.url = reverse('projectroles:api_role_batch')
+
+    def test_post(self):
+        """Test batch role creation, updating and deletion"""
+        self._make_assignment(self.project, self.assign_user2, self.role_guest)
+        self._make_assignment(self.project2, self.assign_user2, self.role_guest)
+        post_data = {
+            'roles': [
+                {
+                    'project': str(self.project.sodar_uuid),
+                    'user': str(self.assign_user.sodar_uuid),
+                    'role': PROJECT_ROLE_CONTRIBUTOR,
+                },
+                {
+                    'project': str(self.project2.sodar_uuid),
+                    'user': str(self.assign_user.sodar_uuid),
+                    'role': PROJECT_ROLE_GUEST,
+                },
+                {
+                    'project': str(self.project.sodar_uuid),
+                    'user': str(self.assign_user2.sodar_uuid),
+                    'role': PROJECT_ROLE_CONTRIBUTOR,
+                },
+                {
+                    'project': str(self.project2.sodar_uuid),
+                    'user': str(self.assign_user2.sodar_uuid),
+                    'role': None,
+                },
+            ]
+        }
+        response = self.request_knox(self.url, method='POST', data=post_data)
+
+        self.assertEqual(response.status_code, 200, msg=response.content)
+        self.assertEqual(
+            json.loads(response.content),
+            {'created': 2, 'updated': 1, 'deleted': 1},
+        )
+        self.assertEqual(
+            RoleAssignment.objects.get(
+                project=self.project, user=self.assign_user
+            ).role,
+            self.role_contributor,
+        )
+        self.assertEqual(
+            RoleAssignment.objects.get(
+                project=self.project2, user=self.assign_user
+            ).role,
+            self.role_guest,
+        )
+        self.assertEqual(
+            RoleAssignment.objects.get(
+                project=self.project, user=self.assign_user2
+            ).role,
+            self.role_contributor,
+        )
+        self.assertIsNone(
+            RoleAssignment.objects.filter(
+                project=self.project2, user=self.assign_user2
+            ).first()
+        )
+        # One email per user
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_post_invalid(self):
+        """Test batch update with invalid changes (should fail)"""
+        post_data = {
+            'roles': [
+                {
+                    'project': str(self.project.sodar_uuid),
+                    'user': str(self.assign_user.sodar_uuid),
+                    'role': PROJECT_ROLE_CONTRIBUTOR,
+                },
+                {
+                    'project': str(self.project.sodar_uuid),
+                    'user': str(self.assign_user2.sodar_uuid),
+                    'role': PROJECT_ROLE_OWNER,
+                },
+                {
+                    'project': str(self.project2.sodar_uuid),
+                    'user': str(self.assign_user2.sodar_uuid),
+                    'role': None,
+                },
+                {
+                    'project': 'invalid',
+                    'user': str(self.assign_user2.sodar_uuid),
+                    'role': PROJECT_ROLE_GUEST,
+                },
+                {
+                    'project': str(self.project.sodar_uuid),
+                    'user': str(self.assign_user2.sodar_uuid),
+                    'role': 'Invalid role',
+                },
+            ]
+        }
+        response = self.request_knox(self.url, method='POST', data=post_data)
+
+        self.assertEqual(response.status_code, 400, msg=response.content)
+        errors = json.loads(response.content)['roles']
+        self.assertEqual(sorted(errors.keys()), ['1', '2', '3', '4'])
+        # No changes should be applied
+        self.assertEqual(
+            RoleAssignment.objects.filter(user=self.assign_user).count(), 0
+        )
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_post_no_roles(self):
+        """Test batch update without roles field (should fail)"""
+        response = self.request_knox(self.url, method='POST', data={})
+        self.assertEqual(response.status_code, 400, msg=response.content)
+
+    def test_post_existing(self):
+        """Test batch update with an existing role"""
+        self._make_assignment(
+            self.project, self.assign_user, self.role_contributor
+        )
+        post_data = {
+            'roles': [
+                {
+                    'project': str(self.project.sodar_uuid),
+                    'user': str(self.assign_user.sodar_uuid),
+                    'role': PROJECT_ROLE_CONTRIBUTOR,
+                },
+            ]
+        }
+        response = self.request_knox(self.url, method='POST', data=post_data)
+        self.assertEqual(response.status_code, 200, msg=response.content)
+        self.assertEqual(
+            json.loads(response.content),
+            {'created': 0, 'updated': 0, 'deleted': 0},
+        )
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_post_no_perms(self):
+        """Test batch update without project permissions (should fail)"""
+        user_no_perms = self.make_user('user_no_perms')
+        self._make_assignment(
+            self.project, user_no_perms, self.role_contributor
+        )
+        post_data = {
+            'roles': [
+                {
+                    'project': str(self.project.sodar_uuid),
+                    'user': str(self.assign_user.sodar_uuid),
+                    'role': PROJECT_ROLE_GUEST,
+                },
+            ]
+        }
+        response = self.request_knox(
+            self.url,
+            method='POST',
+            data=post_data,
+            token=self.get_token(user_no_perms),
+        )
+        self.assertEqual(response.status_code, 400, msg=response.content)
+        self.assertEqual(
+            RoleAssignment.objects.filter(user=self.assign_user).count(), 0
+        )
+        # Error should not reveal the project exists
+        self.assertEqual(
+            json.loads(response.content)['roles']['0'],
+            views_api.PROJECT_NOT_FOUND_MSG.format(self.project.sodar_uuid),
+        )
+
+    def test_post_invalid_types(self):
+        """Test batch update with non-string values (should fail)"""
+        post_data = {
+            'roles': [
+                {
+                    'project': str(self.project.sodar_uuid),
+                    'user': str(self.assign_user.sodar_uuid),
+                    'role': [PROJECT_ROLE_GUEST],
+                },
+                {
+                    'project': {'uuid': str(self.project.sodar_uuid)},
+                    'user': str(self.assign_user.sodar_uuid),
+                    'role': PROJECT_ROLE_GUEST,
+                },
+                {
+                    'project': str(self.project.sodar_uuid),
+                    'user': 1,
+                    'role': PROJECT_ROLE_GUEST,
+                },
+                {
+                    'project': str(self.project.sodar_uuid),
+                    'user': str(self.assign_user2.sodar_uuid),
+                    'role': PROJECT_ROLE_GUEST,
+                },
+            ]
+        }
+        response = self.request_knox(self.url, method='POST', data=post_data)
+        self.assertEqual(response.status_code, 400, msg=response.content)
+        self.assertEqual(
+            json.loads(response.content)['roles'],
+            {
+                '0': 'Field "role" must be a string',
+                '1': 'Field "project" must be a string',
+                '2': 'Field "user" must be a string',
+            },
+        )
+        self.assertEqual(
+            RoleAssignment.objects.filter(user=self.assign_user2).count(), 0
+        )
+
+    @override_settings(PROJECTROLES_SITE_MODE=SITE_MODE_TARGET)
+    def test_post_remote(self):
+        """Test batch update for a remote project (should fail)"""
+        remote_site = self._make_site(
+            name=REMOTE_SITE_NAME,
+            url=REMOTE_SITE_URL,
+            mode=SITE_MODE_SOURCE,
+            description=REMOTE_SITE_DESC,
+            secret=REMOTE_SITE_SECRET,
+        )
+        self._make_remote_project(
+            project_uuid=self.project.sodar_uuid,
+            project=self.project,
+            site=remote_site,
+            level=SODAR_CONSTANTS['REMOTE_LEVEL_READ_ROLES'],
+        )
+        post_data = {
+            'roles': [
+                {
+                    'project': str(self.project.sodar_uuid),
+                    'user': str(self.assign_user.sodar_uuid),
+                    'role': PROJECT_ROLE_GUEST,
+                },
+            ]
+        }
+        response = self.request_knox(self.url, method='POST', data=post_data)
+        self.assertEqual(response.status_code, 400, msg=response.content)
+
+
 class TestProjectInviteListAPIView(ProjectInviteMixin, TestCoreAPIViewsBase):
     """Tests for ProjectInviteListAPIView"""
 
@@ -1917,6 +2305,45 @@ class TestProjectInviteListAPIView(ProjectInviteMixin, TestCoreAPIViewsBase):
         ]
         self.assertEqual(response_data, expected)
 
+    def test_get_query_count(self):
+        """Test ProjectInviteListAPIView get() query count"""
+        url = reverse(
+            'projectroles:api_invite_list',
+            kwargs={'project': self.project.sodar_uuid},
+        )
+        token = self.get_token(self.user)
+        query_count = self.get_query_count(url, token=token)
+        for i in range(3):
+            self._make_invite(
+                email='new_invite{}@example.com'.format(i),
+                project=self.project,
+                role=self.role_guest,
+                issuer=self.make_user('issuer{}'.format(i)),
+                message='',
+                secret=build_secret(),
+            )
+        self.assertEqual(self.get_query_count(url, token=token), query_count)
+
+    def test_get_pagination(self):
+        """Test ProjectInviteListAPIView get() with pagination"""
+        url = (
+            reverse(
+                'projectroles:api_invite_list',
+                kwargs={'project': self.project.sodar_uuid},
+            )
+            + '?page_size=1'
+        )
+        response = self.request_knox(url, token=self.get_token(self.user))
+
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.content)
+        self.assertEqual(len(response_data['results']), 1)
+        self.assertEqual(
+            response_data['results'][0]['sodar_uuid'],
+            str(self.invite.sodar_uuid),
+        )
+        self.assertIsNotNone(response_data['next'])
+
     def test_get_inactive(self):
         """Test get() with an inactive invite"""
         self.invite.active = False
@@ -2392,6 +2819,38 @@ class TestUserListAPIView(TestCoreAPIViewsBase):
         ]
         self.assertEqual(response_data, expected)
 
+    def test_get_query_count(self):
+        """Test UserListAPIView get() query count"""
+        url = reverse('projectroles:api_user_list')
+        token = self.get_token(self.domain_user)
+        query_count = self.get_query_count(url, token=token)
+        for i in range(3):
+            self.make_user('new_user{}'.format(i))
+        self.assertEqual(self.get_query_count(url, token=token), query_count)
+
+    def test_get_pagination(self):
+        """Test UserListAPIView get() with pagination"""
+        url = reverse('projectroles:api_user_list') + '?page_size=1'
+        response = self.request_knox(url)
+
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.content)
+        self.assertEqual(len(response_data['results']), 1)
+        self.assertEqual(
+            response_data['results'][0]['sodar_uuid'],
+            str(self.user.sodar_uuid),
+        )
+
+        response = self.request_knox(response_data['next'])
+
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.content)
+        self.assertIsNone(response_data['next'])
+        self.assertEqual(
+            response_data['results'][0]['sodar_uuid'],
+            str(self.domain_user.sodar_uuid),
+        )
+
 
 class TestCurrentUserRetrieveAPIView(TestCoreAPIViewsBase):
     """Tests for CurrentUserRetrieveAPIView"""
@@ -2431,6 +2890,26 @@ class TestCurrentUserRetrieveAPIView(TestCoreAPIViewsBase):
         }
         self.assertEqual(response_data, expected)
 
+    def test_get_not_modified(self):
+        """Test CurrentUserRetrieveAPIView get() with If-None-Match"""
+        url = reverse('projectroles:api_user_current')
+        token = self.get_token(self.domain_user)
+        response = self.request_knox(url, token=token)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.request_knox(
+            url, token=token, header={'HTTP_IF_NONE_MATCH': etag}
+        )
+        self.assertEqual(response.status_code, 304)
+
+        self.domain_user.name = 'Updated Name'
+        self.domain_user.save()
+        response = self.request_knox(
+            url, token=token, header={'HTTP_IF_NONE_MATCH': etag}
+        )
+        self.assertEqual(response.status_code, 200)
+
 
 class TestAPIVersioning(TestCoreAPIViewsBase):
     """Tests for REST API view versioning using ProjectRetrieveAPIView"""
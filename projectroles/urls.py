@@ -162,6 +162,11 @@ urls_ajax = [
         view=views_ajax.ProjectStarringAjaxView.as_view(),
         name='ajax_star',
     ),
+    url(
+        regex=r'^ajax/details/(?P<project>[0-9a-f-]+)/(?P<plugin>[\w-]+)$',
+        view=views_ajax.ProjectAppDetailsAjaxView.as_view(),
+        name='ajax_app_details',
+    ),
     url(
         r'^ajax/autocomplete/user$',
         view=views_ajax.UserAutocompleteAjaxView.as_view(),
@@ -174,6 +179,11 @@ urls_ajax = [
         ),
         name='ajax_autocomplete_user_redirect',
     ),
+    url(
+        r'^ajax/autocomplete/parent$',
+        view=views_ajax.ProjectParentAutocompleteAjaxView.as_view(),
+        name='ajax_autocomplete_parent',
+    ),
 ]
 
 # REST API views
@@ -218,6 +228,11 @@ urls_api = [
         view=views_api.RoleAssignmentOwnerTransferAPIView.as_view(),
         name='api_role_owner_transfer',
     ),
+    url(
+        regex=r'^api/roles/batch$',
+        view=views_api.RoleAssignmentBatchAPIView.as_view(),
+        name='api_role_batch',
+    ),
     url(
         regex=r'^api/invites/list/(?P<project>[0-9a-f-]+)$',
         view=views_api.ProjectInviteListAPIView.as_view(),
@@ -1,5 +1,7 @@
 import random
+import re
 import string
+import unicodedata
 
 from django.conf import settings
 from django.urls import reverse
@@ -15,6 +17,10 @@ INVITE_EXPIRY_DAYS = settings.PROJECTROLES_INVITE_EXPIRY_DAYS
 # SODAR constants
 SODAR_CONSTANTS = get_sodar_constants()
 
+# Local constants
+SEARCH_TOKEN_MAX_LENGTH = 64
+SEARCH_TOKEN_SPLIT_RE = re.compile(r'[\W_]+')
+
 
 def get_display_name(key, title=False, count=1, plural=False):
     """
@@ -49,6 +55,32 @@ def get_user_display_name(user, inc_user=False):
     return user.username
 
 
+def get_search_tokens(*values):
+    """
+    Return normalized search tokens for strings. The strings are split into
+    words on non-alphanumeric characters, converted to lower case and stripped
+    of accents. Tokens are truncated to SEARCH_TOKEN_MAX_LENGTH.
+
+    :param values: Strings to tokenize (None and empty values are ignored)
+    :return: Sorted list of unique tokens (strings)
+    """
+    tokens = set()
+    for v in values:
+        if not v:
+            continue
+        v = ''.join(
+            c
+            for c in unicodedata.normalize('NFKD', str(v))
+            if not unicodedata.combining(c)
+        ).casefold()
+        tokens.update(
+            t[:SEARCH_TOKEN_MAX_LENGTH]
+            for t in SEARCH_TOKEN_SPLIT_RE.split(v)
+            if t
+        )
+    return sorted(tokens)
+
+
 def build_secret(length=SECRET_LENGTH):
     """
     Return secret string for e.g. public URLs.
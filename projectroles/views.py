@@ -15,7 +15,7 @@ from django.contrib import auth, messages
 from django.contrib.auth.mixins import AccessMixin
 from django.core.exceptions import ImproperlyConfigured
 from django.db import transaction
-from django.db.models import QuerySet
+from django.db.models import Q, QuerySet
 from django.http import Http404
 from django.shortcuts import redirect
 from django.urls import resolve, reverse, reverse_lazy
@@ -51,14 +51,22 @@ from projectroles.models import (
     ProjectInvite,
     RemoteSite,
     RemoteProject,
+    ProjectUserTag,
     SODAR_CONSTANTS,
     PROJECT_TAG_STARRED,
 )
 from projectroles.plugins import (
+    clear_site_app_cache,
     get_active_plugins,
     get_app_plugin,
     get_backend_api,
 )
+from projectroles.post_modify import (
+    PIPELINE_MODE_CELERY,
+    PostModifyPipeline,
+    PipelineRequest,
+    get_pipeline_mode,
+)
 from projectroles.project_tags import get_tag_state, remove_tag
 from projectroles.remote_projects import RemoteProjectAPI
 from projectroles.utils import get_expiry_date, get_display_name
@@ -119,6 +127,9 @@ MSG_INVITE_USER_EXISTS = (
 )
 ALERT_MSG_ROLE_CREATE = 'Membership granted with the role of "{role}".'
 ALERT_MSG_ROLE_UPDATE = 'Member role changed to "{role}".'
+ALERT_MSG_ROLE_DELETE = (
+    'Your membership in this {project_type} has been removed.'
+)
 
 
 # General mixins ---------------------------------------------------------------
@@ -173,8 +184,52 @@ class LoggedInPermissionMixin(PermissionRequiredMixin):
             return redirect_to_login(self.request.get_full_path())
 
 
+# Models with a project relation for ProjectAccessMixin, built on first use
+_project_model_map = None
+
+
+def get_project_model_map():
+    """
+    Return models which can be used to look up a project in
+    ProjectAccessMixin. These include models with a "project" attribute,
+    either a relation field or a property, or a get_project() method. The map
+    is built on the first call and reused for subsequent calls.
+
+    :return: Dict of {(app_label, model_name): (model, select_project)}
+    """
+    global _project_model_map
+    if _project_model_map is None:
+        ret = {}
+        for model in apps.get_models():
+            field_names = [f.name for f in model._meta.get_fields()]
+            if 'sodar_uuid' not in field_names:
+                continue
+            project_field = (
+                model._meta.get_field('project')
+                if 'project' in field_names
+                else None
+            )
+            # Only join foreign key and one-to-one relations in the query
+            select_project = bool(
+                project_field
+                and (project_field.many_to_one or project_field.one_to_one)
+            )
+            if hasattr(model, 'project') or callable(
+                getattr(model, 'get_project', None)
+            ):
+                ret[(model._meta.app_label, model._meta.model_name)] = (
+                    model,
+                    select_project,
+                )
+        _project_model_map = ret
+    return _project_model_map
+
+
 class ProjectAccessMixin:
-    """Mixin for providing access to a Project object from request kwargs"""
+    """
+    Mixin for providing access to a Project object from request kwargs. The
+    project is resolved once per request and cached in the request object.
+    """
 
     #: Model class to use for projects. Can be overridden by e.g. a proxy model
     project_class = Project
@@ -195,6 +250,24 @@ class ProjectAccessMixin:
         if kwargs is None:
             raise ImproperlyConfigured('View kwargs are not accessible')
 
+        # Return cached project if already resolved for this request
+        # NOTE: Cache is stored in the HttpRequest also wrapped by DRF requests
+        http_request = getattr(request, '_request', request)
+        cache_key = (self.project_class, tuple(sorted(kwargs.items())))
+        project_cache = getattr(http_request, '_project_cache', None)
+        if project_cache and cache_key in project_cache:
+            return project_cache[cache_key]
+
+        project = self._get_project(request, kwargs)
+        if project:
+            if project_cache is None:
+                project_cache = {}
+                http_request._project_cache = project_cache
+            project_cache[cache_key] = project
+        return project
+
+    def _get_project(self, request, kwargs):
+        """Resolve project from request and kwargs without caching"""
         # Project class object
         if 'project' in kwargs:
             return self.project_class.objects.filter(
@@ -205,34 +278,37 @@ class ProjectAccessMixin:
         if not request:
             raise ImproperlyConfigured('Current HTTP request is not accessible')
 
+        model_map = get_project_model_map()
         model = None
+        select_project = False
         uuid_kwarg = None
+        app_name = None
 
         for k, v in kwargs.items():
-            if re.match(r'[0-9a-f-]+', v):
-                try:
-                    app_name = resolve(request.path).app_name
+            if re.match(r'[0-9a-f-]+', str(v)):
+                if app_name is None:
+                    match = getattr(request, 'resolver_match', None)
+                    app_name = (match or resolve(request.path)).app_name
                     if app_name.find('.') != -1:
                         app_name = app_name.split('.')[0]
-                    model = apps.get_model(app_name, k)
+                model_info = model_map.get((app_name, k.lower()))
+                if model_info:
+                    model, select_project = model_info
                     uuid_kwarg = k
                     break
-                except LookupError:
-                    pass
         if not model:
             return None
 
-        try:
-            obj = model.objects.get(sodar_uuid=kwargs[uuid_kwarg])
-            if hasattr(obj, 'project'):
-                return obj.project
-            # Some objects may have a get_project() func instead of foreignkey
-            elif hasattr(obj, 'get_project') and callable(
-                getattr(obj, 'get_project', None)
-            ):
-                return obj.get_project()
-        except model.DoesNotExist:
+        qs = model.objects.all()
+        if select_project:
+            qs = qs.select_related('project')
+        obj = qs.filter(sodar_uuid=kwargs[uuid_kwarg]).first()
+        if not obj:
             return None
+        if hasattr(obj, 'project'):
+            return obj.project
+        # Some objects may have a get_project() func instead of foreignkey
+        return obj.get_project()
 
 
 class ProjectPermissionMixin(PermissionRequiredMixin, ProjectAccessMixin):
@@ -1104,12 +1180,143 @@ class ProjectModifyMixin:
                 if SEND_EMAIL:
                     email.send_project_move_mail(project, request)
 
+    @classmethod
+    def get_post_modify_pipeline(
+        cls,
+        project,
+        action,
+        owner,
+        old_data,
+        old_parent,
+        request,
+        tl_event=None,
+        update_public=False,
+    ):
+        """
+        Return pipeline of steps to be run after a project has been created or
+        updated.
+
+        :param project: Project object
+        :param action: "create" or "update" (string)
+        :param owner: User object for project owner
+        :param old_data: Dict of old project data (empty if creating)
+        :param old_parent: Old parent Project object if moved, else None
+        :param request: Request initiating the action
+        :param tl_event: ProjectEvent object or None
+        :param update_public: Update has_public_children for parents (bool)
+        :return: PostModifyPipeline object
+        """
+        pipeline = PostModifyPipeline(tl_event)
+        # Call for additional actions for project update in plugins
+        # NOTE: This is a WIP feature to be altered/expanded in a later release
+        for p in get_active_plugins(plugin_type='project_app'):
+            pipeline.add_step(
+                'handle_project_update_{}'.format(p.name),
+                p.handle_project_update,
+                project,
+                old_data,
+            )
+        if update_public:
+            pipeline.add_step(
+                'update_public_children', project._update_public_children
+            )
+        pipeline.add_step(
+            'notify_users',
+            cls._notify_users,
+            project,
+            action,
+            owner,
+            old_data,
+            old_parent,
+            request,
+        )
+        return pipeline
+
+    @classmethod
+    def _get_post_modify_data(
+        cls,
+        project,
+        action,
+        owner,
+        old_data,
+        old_parent,
+        request,
+        tl_event,
+        update_public,
+    ):
+        """Return serializable post-modify pipeline data for a Celery task"""
+        if old_data:
+            old_data = dict(old_data)
+            if old_data['parent']:
+                old_data['parent'] = str(old_data['parent'].sodar_uuid)
+            old_data['owner'] = str(old_data['owner'].sodar_uuid)
+        return {
+            'project': str(project.sodar_uuid),
+            'action': action,
+            'owner': str(owner.sodar_uuid),
+            'old_data': old_data,
+            'old_parent': str(old_parent.sodar_uuid) if old_parent else None,
+            'user': str(request.user.sodar_uuid),
+            'scheme': request.scheme,
+            'host': request.get_host(),
+            'tl_event': str(tl_event.sodar_uuid) if tl_event else None,
+            'update_public': update_public,
+        }
+
+    @classmethod
+    def get_post_modify_pipeline_from_data(cls, data):
+        """
+        Return post-modify pipeline from data serialized for a Celery task.
+
+        :param data: Dict created with _get_post_modify_data()
+        :return: PostModifyPipeline object
+        """
+        old_data = data['old_data']
+        if old_data:
+            if old_data['parent']:
+                old_data['parent'] = Project.objects.get(
+                    sodar_uuid=old_data['parent']
+                )
+            old_data['owner'] = User.objects.get(sodar_uuid=old_data['owner'])
+        old_parent = (
+            Project.objects.get(sodar_uuid=data['old_parent'])
+            if data['old_parent']
+            else None
+        )
+        tl_event = None
+        timeline = get_backend_api('timeline_backend')
+        if timeline and data['tl_event']:
+            ProjectEvent, _ = timeline.get_models()
+            tl_event = ProjectEvent.objects.filter(
+                sodar_uuid=data['tl_event']
+            ).first()
+        request = PipelineRequest(
+            User.objects.get(sodar_uuid=data['user']),
+            data['scheme'],
+            data['host'],
+        )
+        return cls.get_post_modify_pipeline(
+            Project.objects.get(sodar_uuid=data['project']),
+            data['action'],
+            User.objects.get(sodar_uuid=data['owner']),
+            old_data,
+            old_parent,
+            request,
+            tl_event,
+            data['update_public'],
+        )
+
     def modify_project(self, data, request, instance=None):
         """
         Create or update a Project, either locally or using the SODAR Taskflow.
         This method should be called either in form_valid() in a Django form
         view or save() in a DRF serializer.
 
+        Local modifications are done in a single transaction, so in the
+        "commit" pipeline mode, post-modify steps are run once all changes have
+        been committed. Taskflow modifications can not be wrapped in a
+        transaction, as SODAR Taskflow updates the project via API calls.
+
         :param data: Cleaned data from a form or serializer
         :param request: Request initiating the action
         :param instance: Existing Project object or None
@@ -1117,7 +1324,17 @@ class ProjectModifyMixin:
         :raise: FlowSubmitException if SODAR Taskflow submission fails
         :return: Created or updated Project object
         """
-        taskflow = get_backend_api('taskflow')
+        use_taskflow = bool(
+            get_backend_api('taskflow')
+            and data.get('type') == PROJECT_TYPE_PROJECT
+        )
+        if use_taskflow:
+            return self._modify_project(data, request, instance, use_taskflow)
+        with transaction.atomic():
+            return self._modify_project(data, request, instance, use_taskflow)
+
+    def _modify_project(self, data, request, instance, use_taskflow):
+        """Create or update a Project, see modify_project()"""
         action = 'update' if instance else 'create'
         old_data = {}
         old_project = None
@@ -1151,12 +1368,6 @@ class ProjectModifyMixin:
                 public_guest_access=data.get('public_guest_access') or False,
             )
 
-        use_taskflow = (
-            True
-            if taskflow and data.get('type') == PROJECT_TYPE_PROJECT
-            else False
-        )
-
         if action == 'create':
             project.submit_status = (
                 SUBMIT_STATUS_PENDING_TASKFLOW
@@ -1214,37 +1425,39 @@ class ProjectModifyMixin:
             project.submit_status = SUBMIT_STATUS_OK
             project.save()
 
-        # Call for additional actions for project update in plugins
-        # NOTE: This is a WIP feature to be altered/expanded in a later release
-        app_plugins = get_active_plugins(plugin_type='project_app')
-        for p in app_plugins:
-            try:
-                p.handle_project_update(project, old_data)
-            except Exception as ex:
-                logger.error(
-                    'Exception when calling handle_project_update() for app '
-                    'plugin "{}": {}'.format(p.name, ex)
-                )
-
         # If public access was updated, update has_public_children for parents
-        if (
+        update_public = bool(
             old_project
             and project.parent
             and old_project.public_guest_access != project.public_guest_access
-        ):
-            try:
-                project._update_public_children()
-            except Exception as ex:
-                logger.error(
-                    'Exception in updating has_public_children(): {}'.format(ex)
-                )
-
-        # Once all is done, update timeline event, create alerts and emails
-        if tl_event:
-            tl_event.set_status('OK')
-        self._notify_users(
-            project, action, owner, old_data, old_parent, request
         )
+        # Once all is done, run plugin updates, update timeline event and
+        # create alerts and emails in the post-modify pipeline
+        if get_pipeline_mode() == PIPELINE_MODE_CELERY:
+            from projectroles.tasks import post_modify_task
+
+            data = self._get_post_modify_data(
+                project,
+                action,
+                owner,
+                old_data,
+                old_parent,
+                request,
+                tl_event,
+                update_public,
+            )
+            transaction.on_commit(lambda: post_modify_task.delay(data))
+        else:
+            self.get_post_modify_pipeline(
+                project,
+                action,
+                owner,
+                old_data,
+                old_parent,
+                request,
+                tl_event,
+                update_public,
+            ).dispatch()
         return project
 
 
@@ -1664,8 +1877,8 @@ class RoleAssignmentDeleteMixin:
                 app_name=APP_NAME,
                 alert_name='role_delete',
                 user=user,
-                message='Your membership in this {} has been removed.'.format(
-                    get_display_name(project.type)
+                message=ALERT_MSG_ROLE_DELETE.format(
+                    project_type=get_display_name(project.type)
                 ),
                 project=project,
             )
@@ -1675,6 +1888,316 @@ class RoleAssignmentDeleteMixin:
         return instance
 
 
+class RoleAssignmentBatchMixin:
+    """
+    Mixin for creating, updating and deleting multiple RoleAssignment objects
+    in a single batch in API views and management commands
+    """
+
+    @classmethod
+    def _get_batch_delegate_counts(cls, changes, existing):
+        """Return delegate counts per project after valid delegate removals"""
+        counts = {}
+        for c in changes:
+            p = c['project']
+            if p.pk not in counts:
+                counts[p.pk] = p.get_delegates(exclude_inherited=True).count()
+            role_as = existing.get((p.pk, c['user'].pk))
+            if (
+                role_as
+                and role_as.role.name == PROJECT_ROLE_DELEGATE
+                and (not c['role'] or c['role'].name != PROJECT_ROLE_DELEGATE)
+            ):
+                counts[p.pk] -= 1
+        return counts
+
+    def validate_role_batch(self, changes, issuer):
+        """
+        Validate a batch of role changes. All changes are validated before any
+        of them are applied. Changes which are already in effect are returned
+        with the action set to None.
+
+        :param changes: List of dicts with the keys "project" (Project object),
+                        "user" (User object) and "role" (Role object or None
+                        for deleting the role)
+        :param issuer: User object for the user issuing the changes
+        :return: Tuple of (list of change dicts with "action" and "instance"
+                 added, list of (change index, error message) tuples)
+        """
+        del_limit = getattr(settings, 'PROJECTROLES_DELEGATE_LIMIT', 1)
+        projects = {c['project'].pk: c['project'] for c in changes}
+        existing = {
+            (a.project_id, a.user_id): a
+            for a in RoleAssignment.objects.filter(
+                project__in=projects.keys(),
+                user__in=set(c['user'].pk for c in changes),
+            ).select_related('role')
+        }
+        del_counts = self._get_batch_delegate_counts(changes, existing)
+        inherited_owners = {}
+        seen = set()
+        ret = []
+        errors = []
+
+        for i, c in enumerate(changes):
+            project = c['project']
+            user = c['user']
+            role = c['role']
+            role_as = existing.get((project.pk, user.pk))
+            c = dict(c, action=None, instance=role_as)
+            key = (project.pk, user.pk)
+            error = None
+
+            if project.pk not in inherited_owners:
+                inherited_owners[project.pk] = [
+                    a.user for a in project.get_owners(inherited_only=True)
+                ]
+            if key in seen:
+                error = 'Multiple changes for user in project'
+            elif project.is_remote():
+                error = 'Modification of remote projects is not allowed'
+            elif not issuer.has_perm(
+                'projectroles.update_project_members', project
+            ):
+                error = 'Issuer lacks permission to update members'
+            elif role and role.name == PROJECT_ROLE_OWNER:
+                error = (
+                    'Ownership transfer not permitted in this operation, use '
+                    'the ownership transfer view or API endpoint'
+                )
+            elif role_as and role_as.role.name == PROJECT_ROLE_OWNER:
+                error = 'Owner role can not be modified in this operation'
+            elif not role and not role_as:
+                error = 'User has no role in project'
+            elif not role_as and user in inherited_owners[project.pk]:
+                error = 'User has inherited ownership in project'
+            elif (
+                (role and role.name == PROJECT_ROLE_DELEGATE)
+                or (role_as and role_as.role.name == PROJECT_ROLE_DELEGATE)
+            ) and not issuer.has_perm(
+                'projectroles.update_project_delegate', project
+            ):
+                error = 'Issuer lacks permission to update delegates'
+            elif (
+                role
+                and role.name == PROJECT_ROLE_DELEGATE
+                and (not role_as or role_as.role != role)
+                and del_limit != 0
+            ):
+                if del_counts[project.pk] >= del_limit:
+                    error = 'Delegate limit of {} has been reached'.format(
+                        del_limit
+                    )
+                else:
+                    del_counts[project.pk] += 1
+
+            seen.add(key)
+            if error:
+                errors.append((i, error))
+                continue
+            if not role:
+                c['action'] = 'delete'
+            elif not role_as:
+                c['action'] = 'create'
+            elif role_as.role != role:
+                c['action'] = 'update'
+            ret.append(c)
+        return ret, errors
+
+    @classmethod
+    def _create_batch_timeline_events(cls, project_changes, request):
+        """Create one timeline event for the changes in each project"""
+        timeline = get_backend_api('timeline_backend')
+        if not timeline:
+            return {}
+        ret = {}
+        for project, p_changes in project_changes.values():
+            ret[project.pk] = timeline.add_event(
+                project=project,
+                app_name=APP_NAME,
+                user=request.user,
+                event_name='role_batch_update',
+                description='update {} role{} in batch'.format(
+                    len(p_changes), 's' if len(p_changes) != 1 else ''
+                ),
+                extra_data={
+                    'changes': [
+                        {
+                            'user': c['user'].username,
+                            'action': c['action'],
+                            'role': c['role'].name if c['role'] else None,
+                        }
+                        for c in p_changes
+                    ]
+                },
+            )
+        return ret
+
+    @classmethod
+    def _submit_batch_taskflow(
+        cls, project_changes, tl_events, request, sodar_url=None
+    ):
+        """Submit one taskflow flow per project for memberships in iRODS"""
+        taskflow = get_backend_api('taskflow')
+        if not taskflow:
+            return
+        flows = []
+        for project, p_changes in project_changes.values():
+            if not taskflow.use_taskflow(project):
+                continue
+            flow_data = {'roles_add': [], 'roles_delete': []}
+            for c in p_changes:
+                if c['action'] == 'update':
+                    continue  # Update does not affect access in iRODS
+                k = 'roles_add' if c['action'] == 'create' else 'roles_delete'
+                flow_data[k].append(
+                    {
+                        'project_uuid': str(project.sodar_uuid),
+                        'username': c['user'].username,
+                    }
+                )
+            if not flow_data['roles_add'] and not flow_data['roles_delete']:
+                continue
+            tl_event = tl_events.get(project.pk)
+            if tl_event:
+                tl_event.set_status('SUBMIT')
+            flows.append(
+                {
+                    'project_uuid': project.sodar_uuid,
+                    'flow_name': 'role_update_irods_batch',
+                    'flow_data': flow_data,
+                    'timeline_uuid': tl_event.sodar_uuid if tl_event else None,
+                }
+            )
+        try:
+            taskflow.submit_batch(flows, request=request, sodar_url=sodar_url)
+        except taskflow.FlowSubmitException as ex:
+            for tl_event in tl_events.values():
+                tl_event.set_status('FAILED', str(ex))
+            raise ex
+
+    @classmethod
+    def _save_batch(cls, changes):
+        """Save role changes to the database in bulk in a single transaction"""
+        created = []
+        updated = []
+        deleted = []
+        for c in changes:
+            if c['action'] == 'create':
+                created.append(
+                    RoleAssignment(
+                        project=c['project'], user=c['user'], role=c['role']
+                    )
+                )
+            elif c['action'] == 'update':
+                c['instance'].role = c['role']
+                updated.append(c['instance'])
+            else:
+                deleted.append(c['instance'])
+
+        with transaction.atomic():
+            RoleAssignment.objects.bulk_create(created)
+            RoleAssignment.objects.bulk_update(updated, ['role'])
+            if deleted:
+                RoleAssignment.objects.filter(
+                    pk__in=[a.pk for a in deleted]
+                ).delete()
+                # Remove project stars from users
+                tag_query = Q()
+                for a in deleted:
+                    tag_query |= Q(project=a.project_id, user=a.user_id)
+                ProjectUserTag.objects.filter(
+                    tag_query, name=PROJECT_TAG_STARRED
+                ).delete()
+            # Signals are not sent for bulk_create() and bulk_update()
+            Project.objects.filter(
+                pk__in=set(a.project_id for a in created + updated)
+            ).update(date_modified=timezone.now())
+        for user in set(c['user'] for c in changes if c['action'] != 'delete'):
+            clear_site_app_cache(user)
+        return created + updated
+
+    @classmethod
+    def _notify_batch_users(cls, changes, request):
+        """Create alerts in bulk and send one email per user"""
+        app_alerts = get_backend_api('appalerts_backend')
+        changes = [c for c in changes if c['user'] != request.user]
+        if app_alerts:
+            alert_users = {}
+            for c in changes:
+                k = (c['action'], c['project'], c['role'])
+                alert_users.setdefault(k, []).append(c['user'])
+            for (action, project, role), users in alert_users.items():
+                if action == 'delete':
+                    message = ALERT_MSG_ROLE_DELETE.format(
+                        project_type=get_display_name(project.type)
+                    )
+                    url = None
+                else:
+                    alert_msg = (
+                        ALERT_MSG_ROLE_CREATE
+                        if action == 'create'
+                        else ALERT_MSG_ROLE_UPDATE
+                    )
+                    message = alert_msg.format(
+                        project=project.title, role=role.name
+                    )
+                    url = reverse(
+                        'projectroles:detail',
+                        kwargs={'project': project.sodar_uuid},
+                    )
+                app_alerts.add_alerts(
+                    app_name=APP_NAME,
+                    alert_name='role_' + action,
+                    users=users,
+                    message=message,
+                    url=url,
+                    project=project,
+                )
+        if SEND_EMAIL:
+            user_changes = {}
+            for c in changes:
+                user_changes.setdefault(c['user'], []).append(
+                    (c['action'], c['project'], c['role'])
+                )
+            with email.MailQueue(request):
+                for user, u_changes in user_changes.items():
+                    email.send_role_batch_mail(u_changes, user, request)
+
+    def apply_role_batch(self, changes, request, sodar_url=None):
+        """
+        Apply a batch of role changes validated with validate_role_batch().
+        One timeline event is created and one SODAR Taskflow flow submitted per
+        project. Database changes are written in bulk in a single transaction.
+        Alerts are created in bulk and each user receives one email.
+
+        :param changes: List of change dicts returned by validate_role_batch()
+        :param request: Request initiating the action
+        :param sodar_url: SODAR callback URL for taskflow (string, optional)
+        :raise: FlowSubmitException if SODAR Taskflow submission fails
+        :return: List of created and updated RoleAssignment objects
+        """
+        changes = [c for c in changes if c['action']]
+        if not changes:
+            return []
+        project_changes = {}
+        for c in changes:
+            project_changes.setdefault(c['project'].pk, (c['project'], []))[
+                1
+            ].append(c)
+
+        tl_events = self._create_batch_timeline_events(project_changes, request)
+        # NOTE: May raise an exception which needs to be handled in caller
+        self._submit_batch_taskflow(
+            project_changes, tl_events, request, sodar_url
+        )
+        ret = self._save_batch(changes)
+        for tl_event in tl_events.values():
+            tl_event.set_status('OK')
+        self._notify_batch_users(changes, request)
+        return ret
+
+
 class RoleAssignmentCreateView(
     LoginRequiredMixin,
     ProjectModifyPermissionMixin,
@@ -1804,10 +2327,13 @@ class RoleAssignmentOwnerTransferMixin:
 
         # Handle inherited owner roles for categories if taskflow is enabled
         if taskflow and project.type == PROJECT_TYPE_CATEGORY:
+            subtree = taskflow.get_subtree(project)
             flow_data = {
-                'roles_add': taskflow.get_inherited_roles(project, new_owner),
+                'roles_add': taskflow.get_inherited_roles(
+                    project, new_owner, subtree=subtree
+                ),
                 'roles_delete': taskflow.get_inherited_roles(
-                    project, old_owner_as.user
+                    project, old_owner_as.user, subtree=subtree
                 ),
             }
             # Submit taskflow (Requires SODAR Taskflow v0.4.0+)
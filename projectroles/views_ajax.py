@@ -6,8 +6,9 @@ from dal import autocomplete
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import EmailValidator
-from django.db.models import Q
+from django.db.models import Count, Max, Q
 from django.http import JsonResponse, HttpResponseForbidden
+from django.template.loader import render_to_string
 from django.urls import reverse
 
 from rest_framework.authentication import SessionAuthentication
@@ -22,19 +23,28 @@ from projectroles.models import (
     Role,
     RoleAssignment,
     ProjectUserTag,
+    UserSearchToken,
     PROJECT_TAG_STARRED,
     SODAR_CONSTANTS,
     CAT_DELIMITER,
 )
-from projectroles.plugins import get_active_plugins, get_backend_api
-from projectroles.project_tags import get_tag_state, set_tag_state
+from projectroles.plugins import (
+    get_active_plugins,
+    get_backend_api,
+    get_project_app_plugins,
+)
+from projectroles.forms import ProjectForm
+from projectroles.project_tags import get_tagged_project_uuids, set_tag_state
 from projectroles.utils import get_display_name
 from projectroles.views import (
     ProjectAccessMixin,
     APP_NAME,
     User,
 )
-from projectroles.views_api import SODARAPIProjectPermission
+from projectroles.views_api import (
+    SODARAPIConditionalMixin,
+    SODARAPIProjectPermission,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -102,7 +112,7 @@ class SODARBaseProjectAjaxView(ProjectAccessMixin, SODARBaseAjaxView):
 # Projectroles Ajax Views ------------------------------------------------------
 
 
-class ProjectListAjaxView(SODARBaseAjaxView):
+class ProjectListAjaxView(SODARAPIConditionalMixin, SODARBaseAjaxView):
     """View to retrieve project list entries from the client"""
 
     allow_anonymous = True
@@ -162,7 +172,28 @@ class ProjectListAjaxView(SODARBaseAjaxView):
         # Sort by full title
         return sorted(ret, key=lambda x: x.full_title)
 
+    def get_etag_data(self):
+        user = self.request.user
+        ret = [
+            user.pk,
+            user.is_superuser,
+            self.request.GET.get('parent'),
+            *Project.objects.get_modified_state(),
+        ]
+        if user.is_authenticated:
+            ret += (
+                ProjectUserTag.objects.filter(
+                    user=user, name=PROJECT_TAG_STARRED
+                )
+                .aggregate(count=Count('pk'), last_pk=Max('pk'))
+                .values()
+            )
+        return ret
+
     def get(self, request, *args, **kwargs):
+        response = self.get_not_modified_response(request)
+        if response:
+            return response
         parent_uuid = request.GET.get('parent', None)
         parent = (
             Project.objects.get(sodar_uuid=parent_uuid) if parent_uuid else None
@@ -177,14 +208,7 @@ class ProjectListAjaxView(SODARBaseAjaxView):
             )
 
         project_list = self._get_project_list(request.user, parent)
-        starred_projects = []
-        if request.user.is_authenticated:
-            starred_projects = [
-                t.project
-                for t in ProjectUserTag.objects.filter(
-                    user=request.user, name=PROJECT_TAG_STARRED
-                )
-            ]
+        starred_projects = get_tagged_project_uuids(request.user)
         full_title_idx = len(parent.full_title) + 3 if parent else 0
 
         ret = {
@@ -196,7 +220,7 @@ class ProjectListAjaxView(SODARBaseAjaxView):
                     'public_guest_access': p.public_guest_access,
                     'remote': p.is_remote(),
                     'revoked': p.is_revoked(),
-                    'starred': p in starred_projects,
+                    'starred': p.sodar_uuid in starred_projects,
                     'depth': p.get_depth(),
                     'uuid': str(p.sodar_uuid),
                 }
@@ -225,7 +249,7 @@ class ProjectListAjaxView(SODARBaseAjaxView):
                 np_msg = 'have been created.'
             ret['messages']['no_projects'] = np_prefix + np_msg
 
-        return Response(ret, status=200)
+        return self.set_conditional_headers(Response(ret, status=200))
 
 
 class ProjectListColumnAjaxView(SODARBaseAjaxView):
@@ -365,10 +389,8 @@ class ProjectStarringAjaxView(SODARBaseProjectAjaxView):
         user = request.user
         timeline = get_backend_api('timeline_backend')
 
-        tag_state = get_tag_state(project, user)
-        action_str = '{}star'.format('un' if tag_state else '')
-
-        set_tag_state(project, user, PROJECT_TAG_STARRED)
+        tag_state = set_tag_state(project, user, PROJECT_TAG_STARRED)
+        action_str = '{}star'.format('' if tag_state else 'un')
 
         # Add event in Timeline
         if timeline:
@@ -382,7 +404,36 @@ class ProjectStarringAjaxView(SODARBaseProjectAjaxView):
                 status_type='INFO',
             )
 
-        return Response(0 if tag_state else 1, status=200)
+        return Response(1 if tag_state else 0, status=200)
+
+
+class ProjectAppDetailsAjaxView(SODARBaseProjectAjaxView):
+    """
+    View to retrieve a project app card for the project details page, for app
+    plugins with details_lazy enabled
+    """
+
+    allow_anonymous = True
+    permission_required = 'projectroles.view_project'
+
+    def get(self, request, *args, **kwargs):
+        project = self.get_project()
+        plugin = next(
+            (
+                p
+                for p in get_project_app_plugins(project, request.user)
+                if p.name == kwargs['plugin']
+            ),
+            None,
+        )
+        if not plugin or not plugin.details_template:
+            return Response({'detail': 'App not found'}, status=404)
+        html = render_to_string(
+            plugin.details_template,
+            {'project': project, 'plugin': plugin},
+            request=request,
+        )
+        return Response({'html': html}, status=200)
 
 
 class UserAutocompleteAjaxView(autocomplete.Select2QuerySetView):
@@ -411,12 +462,19 @@ class UserAutocompleteAjaxView(autocomplete.Select2QuerySetView):
             project = Project.objects.filter(sodar_uuid=project_uuid).first()
 
             # If user has no permission for the project, return None
-            if not self.request.user.has_perm(
+            if not project or not self.request.user.has_perm(
                 'projectroles.view_project', project
             ):
                 return User.objects.none()
 
-            project_users = [a.user.pk for a in project.get_all_roles()]
+            # Query project users as a subquery, including inherited owners
+            project_users = RoleAssignment.objects.filter(
+                Q(project=project)
+                | Q(
+                    project__in=[p.pk for p in project.get_parents()],
+                    role__name=PROJECT_ROLE_OWNER,
+                )
+            ).values('user')
 
             if scope == 'project':  # Limit choices to current project users
                 qs = User.objects.filter(pk__in=project_users)
@@ -440,17 +498,11 @@ class UserAutocompleteAjaxView(autocomplete.Select2QuerySetView):
         if exclude_uuids:
             qs = qs.exclude(sodar_uuid__in=exclude_uuids)
 
-        # Finally, filter by query
+        # Finally, filter by query using indexed search tokens
         if self.q:
-            qs = qs.filter(
-                Q(username__icontains=self.q)
-                | Q(first_name__icontains=self.q)
-                | Q(last_name__icontains=self.q)
-                | Q(name__icontains=self.q)
-                | Q(email__icontains=self.q)
-            )
+            qs = UserSearchToken.objects.filter_users(qs, self.q)
 
-        return qs.order_by('name')
+        return qs.order_by('name', 'username')
 
     def get_result_label(self, user):
         """Display options with name, username and email address"""
@@ -472,6 +524,42 @@ class UserAutocompleteAjaxView(autocomplete.Select2QuerySetView):
         return super().get(request, *args, **kwargs)
 
 
+class ProjectParentAutocompleteAjaxView(autocomplete.Select2QuerySetView):
+    """Parent category autocompletion widget view for project updating"""
+
+    def get_queryset(self):
+        """
+        Get a Project queryset of valid parent categories for
+        SODARProjectAutocompleteWidget.
+
+        Required values in self.forwarded:
+        - "project": UUID of project being updated
+        """
+        project = Project.objects.filter(
+            sodar_uuid=self.forwarded.get('project')
+        ).first()
+        if not project or not self.request.user.has_perm(
+            'projectroles.update_project', project
+        ):
+            return Project.objects.none()
+        qs = ProjectForm.get_parent_queryset(project, self.request.user)
+        if self.q:
+            qs = qs.filter(full_title__icontains=self.q)
+        return qs
+
+    def get_result_label(self, project):
+        return project.full_title
+
+    def get_result_value(self, project):
+        """Use sodar_uuid in the Project model instead of pk"""
+        return str(project.sodar_uuid)
+
+    def get(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return HttpResponseForbidden()
+        return super().get(request, *args, **kwargs)
+
+
 class UserAutocompleteRedirectAjaxView(UserAutocompleteAjaxView):
     """
     SODARUserRedirectWidget view (user autocompletion) redirecting to
@@ -1,12 +1,17 @@
 """REST API views for the projectroles app"""
 
+import hashlib
 import re
+import uuid
 from ipaddress import ip_address, ip_network
 
 from django.conf import settings
 from django.contrib import auth
 from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Prefetch
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 
 from rest_framework import serializers
 from rest_framework.exceptions import (
@@ -14,6 +19,7 @@ from rest_framework.exceptions import (
     NotFound,
     PermissionDenied,
 )
+from rest_framework.pagination import CursorPagination
 from rest_framework.generics import (
     CreateAPIView,
     ListAPIView,
@@ -51,6 +57,7 @@ from projectroles.serializers import (
 )
 from projectroles.views import (
     ProjectAccessMixin,
+    RoleAssignmentBatchMixin,
     RoleAssignmentDeleteMixin,
     RoleAssignmentOwnerTransferMixin,
     ProjectInviteMixin,
@@ -80,6 +87,8 @@ SODAR_API_DEFAULT_VERSION = getattr(
 SODAR_API_ALLOWED_VERSIONS = getattr(
     settings, 'SODAR_API_ALLOWED_VERSIONS', [SODAR_API_DEFAULT_VERSION]
 )
+SODAR_API_PAGE_SIZE = getattr(settings, 'SODAR_API_PAGE_SIZE', 100)
+SODAR_API_MAX_PAGE_SIZE = getattr(settings, 'SODAR_API_MAX_PAGE_SIZE', 1000)
 CORE_API_MEDIA_TYPE = 'application/vnd.bihealth.sodar-core+json'
 CORE_API_DEFAULT_VERSION = re.match(
     r'^([0-9.]+)(?:[+|\-][\S]+)?$', core_version
@@ -112,6 +121,7 @@ CORE_API_ALLOWED_VERSIONS = [
 INVALID_PROJECT_TYPE_MSG = (
     'Project type "{project_type}" not allowed for this API view'
 )
+PROJECT_NOT_FOUND_MSG = 'Project not found or access denied: {}'
 
 
 # Permission / Versioning / Renderer Classes -----------------------------------
@@ -232,6 +242,29 @@ class SODARAPIRenderer(JSONRenderer):
     media_type = SODAR_API_MEDIA_TYPE
 
 
+class SODARAPICursorPagination(CursorPagination):
+    """
+    Opt-in cursor pagination for SODAR API list views.
+
+    Results are only paginated if the cursor or page_size query parameter is
+    set in the request. Otherwise the full list is returned as before, to
+    retain compatibility with existing API versions.
+    """
+
+    ordering = 'pk'
+    page_size = SODAR_API_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = SODAR_API_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (
+            self.cursor_query_param not in request.query_params
+            and self.page_size_query_param not in request.query_params
+        ):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
 # Base API View Mixins ---------------------------------------------------------
 
 
@@ -255,6 +288,94 @@ class SODARAPIBaseProjectMixin(ProjectAccessMixin, SODARAPIBaseMixin):
     project_type = None
 
 
+class SODARAPIConditionalMixin:
+    """
+    Mixin for conditional GET support in API and Ajax views. Returns the ETag
+    and Last-Modified headers and responds with 304 Not Modified without
+    building the response data, if the If-None-Match or If-Modified-Since
+    header of the request matches.
+
+    Implement get_etag_data() and/or get_last_modified() in the view. If the
+    view overrides get(), call get_not_modified_response() and
+    set_conditional_headers() in the overriding method.
+    """
+
+    def get_etag_data(self):
+        """
+        Return data from which the ETag for the request is computed. The data
+        must change whenever the response changes.
+
+        :return: List or None
+        """
+        return None
+
+    def get_last_modified(self):
+        """
+        Return the last modification time of the response data.
+
+        :return: DateTime or None
+        """
+        return None
+
+    def _get_conditional_values(self):
+        if not hasattr(self, '_conditional_values'):
+            etag = None
+            etag_data = self.get_etag_data()
+            if etag_data is not None:
+                etag_data = [
+                    self.__class__.__name__,
+                    getattr(self.request, 'version', None),
+                ] + list(etag_data)
+                etag = quote_etag(
+                    hashlib.md5(str(etag_data).encode('utf-8')).hexdigest()
+                )
+            last_modified = self.get_last_modified()
+            if last_modified:
+                last_modified = int(last_modified.timestamp())
+            self._conditional_values = etag, last_modified
+        return self._conditional_values
+
+    def get_not_modified_response(self, request):
+        """
+        Return a 304 Not Modified response if the request conditions match.
+
+        :param request: Request object
+        :return: HttpResponseNotModified or None
+        """
+        etag, last_modified = self._get_conditional_values()
+        if not etag and not last_modified:
+            return None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response:
+            return self.set_conditional_headers(response)
+
+    def set_conditional_headers(self, response):
+        """
+        Set ETag and Last-Modified headers for a successful response.
+
+        :param response: Response object
+        :return: Response object
+        """
+        if response.status_code not in [200, 304]:
+            return response
+        etag, last_modified = self._get_conditional_values()
+        if etag:
+            response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def get(self, request, *args, **kwargs):
+        response = self.get_not_modified_response(request)
+        if response:
+            return response
+        return self.set_conditional_headers(
+            super().get(request, *args, **kwargs)
+        )
+
+
 class APIProjectContextMixin(ProjectAccessMixin):
     """
     Mixin to provide project context and queryset for generic API views. Can
@@ -373,10 +494,41 @@ class ProjectCreatePermission(ProjectAccessMixin, BasePermission):
         return request.user.has_perm('projectroles.create_project', parent)
 
 
+class ProjectRoleETagMixin:
+    """
+    Mixin for including role assignments and member user details in the ETag
+    of views returning projects with nested roles.
+    """
+
+    @classmethod
+    def get_role_etag_data(cls, projects):
+        """
+        Return role assignment and member user data for projects. User details
+        are included as users have no modification time to compare.
+
+        :param projects: Project QuerySet or list of Project objects
+        :return: List
+        """
+        return list(
+            RoleAssignment.objects.filter(project__in=projects)
+            .order_by('pk')
+            .values_list(
+                'sodar_uuid',
+                'role__name',
+                'user__sodar_uuid',
+                'user__username',
+                'user__name',
+                'user__email',
+            )
+        )
+
+
 # API Views --------------------------------------------------------------------
 
 
-class ProjectListAPIView(ListAPIView):
+class ProjectListAPIView(
+    ProjectRoleETagMixin, SODARAPIConditionalMixin, ListAPIView
+):
     """
     List all projects and categories for which the requesting user has access.
 
@@ -387,6 +539,7 @@ class ProjectListAPIView(ListAPIView):
     **Returns:** List of project details (see ``ProjectRetrieveAPIView``)
     """
 
+    pagination_class = SODARAPICursorPagination
     permission_classes = [IsAuthenticated]
     renderer_classes = [CoreAPIRenderer]
     serializer_class = ProjectSerializer
@@ -397,7 +550,19 @@ class ProjectListAPIView(ListAPIView):
         Override get_queryset() to return projects of type PROJECT for which the
         requesting user has access.
         """
-        qs = Project.objects.filter(submit_status='OK').order_by('pk')
+        qs = (
+            Project.objects.filter(submit_status='OK')
+            .select_related('parent')
+            .prefetch_related(
+                Prefetch(
+                    'roles',
+                    queryset=RoleAssignment.objects.select_related(
+                        'role', 'user'
+                    ),
+                )
+            )
+            .order_by('pk')
+        )
 
         if self.request.user.is_superuser:
             return qs
@@ -406,9 +571,22 @@ class ProjectListAPIView(ListAPIView):
             roles__in=RoleAssignment.objects.filter(user=self.request.user)
         )
 
+    def get_etag_data(self):
+        return [
+            self.request.user.pk,
+            self.request.user.is_superuser,
+            *Project.objects.get_modified_state(),
+            sorted(self.request.query_params.items()),
+            self.get_role_etag_data(self.get_queryset().values('pk')),
+        ]
+
 
 class ProjectRetrieveAPIView(
-    ProjectQuerysetMixin, CoreAPIGenericProjectMixin, RetrieveAPIView
+    ProjectQuerysetMixin,
+    ProjectRoleETagMixin,
+    SODARAPIConditionalMixin,
+    CoreAPIGenericProjectMixin,
+    RetrieveAPIView,
 ):
     """
     Retrieve a project or category by its UUID.
@@ -433,6 +611,20 @@ class ProjectRetrieveAPIView(
     permission_required = 'projectroles.view_project'
     serializer_class = ProjectSerializer
 
+    def get_object(self):
+        """Override get_object() to only query for the project once"""
+        if not hasattr(self, '_project'):
+            self._project = super().get_object()
+        return self._project
+
+    def get_etag_data(self):
+        project = self.get_object()
+        return [
+            project.sodar_uuid,
+            project.date_modified,
+            self.get_role_etag_data([project]),
+        ]
+
 
 class ProjectCreateAPIView(ProjectAccessMixin, CreateAPIView):
     """
@@ -671,6 +863,139 @@ class RoleAssignmentOwnerTransferAPIView(
         )
 
 
+class RoleAssignmentBatchAPIView(
+    RoleAssignmentBatchMixin, CoreAPIBaseMixin, APIView
+):
+    """
+    Create, update and delete multiple role assignments in one or more
+    projects in a single batch.
+
+    All changes are validated before applying any of them. If any of the
+    changes are invalid, no changes are applied and the errors are returned
+    with the index of each invalid change. The same error is returned for
+    projects which do not exist and projects for which the user lacks member
+    update permission. Changes already in effect are ignored. Owner roles can
+    not be modified with this view.
+
+    **URL:** ``/project/api/roles/batch``
+
+    **Methods:** ``POST``
+
+    **Parameters:**
+
+    - ``roles``: List of role changes (list of dicts), each containing:
+
+      - ``project``: Project UUID (string)
+      - ``user``: User UUID (string)
+      - ``role``: Desired role for user (string, e.g. "project contributor"),
+        or ``null`` for deleting the role of the user
+
+    **Returns:**
+
+    - ``created``: Number of created role assignments (int)
+    - ``updated``: Number of updated role assignments (int)
+    - ``deleted``: Number of deleted role assignments (int)
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @classmethod
+    def _get_objects(cls, model, field, values):
+        """Return dict of objects matching valid UUID or name values"""
+        if field == 'sodar_uuid':
+            valid = []
+            for v in values:
+                try:
+                    valid.append(uuid.UUID(str(v)))
+                except ValueError:
+                    continue
+            values = valid
+        return {
+            str(getattr(o, field)): o
+            for o in model.objects.filter(**{field + '__in': values})
+        }
+
+    def _get_changes(self, data, issuer):
+        """Return role change dicts and errors for request data"""
+        if not isinstance(data, list) or not all(
+            isinstance(d, dict) for d in data
+        ):
+            raise serializers.ValidationError(
+                'Field "roles" must be a list of objects'
+            )
+        errors = {}
+        for i, d in enumerate(data):
+            for field in ['project', 'user', 'role']:
+                if d.get(field) is not None and not isinstance(d[field], str):
+                    errors[i] = 'Field "{}" must be a string'.format(field)
+                    break
+        valid_data = [d for i, d in enumerate(data) if i not in errors]
+        projects = self._get_objects(
+            Project, 'sodar_uuid', [d.get('project') for d in valid_data]
+        )
+        users = self._get_objects(
+            User, 'sodar_uuid', [d.get('user') for d in valid_data]
+        )
+        roles = self._get_objects(
+            Role, 'name', [d['role'] for d in valid_data if d.get('role')]
+        )
+        access = {}
+        changes = []
+        for i, d in enumerate(data):
+            if i in errors:
+                continue
+            project = projects.get(str(d.get('project')))
+            user = users.get(str(d.get('user')))
+            role = roles.get(d['role']) if d.get('role') else None
+            if project and project.pk not in access:
+                access[project.pk] = issuer.has_perm(
+                    'projectroles.update_project_members', project
+                )
+            # Return the same error for projects without access, so existing
+            # project UUIDs can not be found out by trying
+            if not project or not access[project.pk]:
+                errors[i] = PROJECT_NOT_FOUND_MSG.format(d.get('project'))
+            elif not user:
+                errors[i] = 'User not found: {}'.format(d.get('user'))
+            elif d.get('role') and not role:
+                errors[i] = 'Unknown role: "{}"'.format(d['role'])
+            else:
+                changes.append(
+                    (i, {'project': project, 'user': user, 'role': role})
+                )
+        return changes, errors
+
+    def post(self, request, *args, **kwargs):
+        """Handle role batch update in a POST request"""
+        if 'roles' not in request.data:
+            raise serializers.ValidationError('Field "roles" must be present')
+        changes, errors = self._get_changes(request.data['roles'], request.user)
+        valid_changes, batch_errors = self.validate_role_batch(
+            [c for _, c in changes], request.user
+        )
+        for i, msg in batch_errors:
+            errors[changes[i][0]] = msg
+        if errors:
+            raise serializers.ValidationError(
+                {'roles': {str(k): v for k, v in sorted(errors.items())}}
+            )
+
+        try:
+            self.apply_role_batch(valid_changes, request)
+        except Exception as ex:
+            raise APIException('Unable to update roles: {}'.format(ex))
+
+        actions = [c['action'] for c in valid_changes]
+        return Response(
+            {
+                'created': actions.count('create'),
+                'updated': actions.count('update'),
+                'deleted': actions.count('delete'),
+            },
+            status=200,
+        )
+
+
 class ProjectInviteAPIMixin:
     """Validation helpers for project invite modification via API"""
 
@@ -705,13 +1030,18 @@ class ProjectInviteListAPIView(CoreAPIBaseProjectMixin, ListAPIView):
 
     # lookup_field = 'project__sodar_uuid'
     # lookup_url_kwarg = 'projectinvite'
+    pagination_class = SODARAPICursorPagination
     permission_required = 'projectroles.invite_users'
     serializer_class = ProjectInviteSerializer
 
     def get_queryset(self):
-        return ProjectInvite.objects.filter(
-            project=self.get_project(), active=True
-        ).order_by('pk')
+        return (
+            ProjectInvite.objects.filter(
+                project=self.get_project(), active=True
+            )
+            .select_related('project', 'role', 'issuer')
+            .order_by('pk')
+        )
 
 
 class ProjectInviteCreateAPIView(CoreAPIGenericProjectMixin, CreateAPIView):
@@ -813,6 +1143,7 @@ class UserListAPIView(CoreAPIBaseMixin, ListAPIView):
     """
 
     lookup_field = 'project__sodar_uuid'
+    pagination_class = SODARAPICursorPagination
     permission_classes = [IsAuthenticated]
     serializer_class = SODARUserSerializer
 
@@ -829,7 +1160,9 @@ class UserListAPIView(CoreAPIBaseMixin, ListAPIView):
         return qs.exclude(groups__name=SODAR_CONSTANTS['SYSTEM_USER_GROUP'])
 
 
-class CurrentUserRetrieveAPIView(CoreAPIBaseMixin, RetrieveAPIView):
+class CurrentUserRetrieveAPIView(
+    SODARAPIConditionalMixin, CoreAPIBaseMixin, RetrieveAPIView
+):
     """
     Return information on the user making the request.
 
@@ -853,6 +1186,10 @@ class CurrentUserRetrieveAPIView(CoreAPIBaseMixin, RetrieveAPIView):
     def get_object(self):
         return self.request.user
 
+    def get_etag_data(self):
+        user = self.request.user
+        return [user.username, user.name, user.email, user.sodar_uuid]
+
 
 # TODO: Update this for new API base classes
 class RemoteProjectGetAPIView(CoreAPIBaseMixin, APIView):
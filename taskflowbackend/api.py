@@ -2,23 +2,67 @@
 
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from uuid import UUID
 
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 
 # Projectroles dependency
-from projectroles.models import RoleAssignment, SODAR_CONSTANTS
+from projectroles.models import Project, RoleAssignment, SODAR_CONSTANTS
 
 
 logger = logging.getLogger(__name__)
 
 # SODAR constants
+PROJECT_TYPE_CATEGORY = SODAR_CONSTANTS['PROJECT_TYPE_CATEGORY']
 PROJECT_TYPE_PROJECT = SODAR_CONSTANTS['PROJECT_TYPE_PROJECT']
+PROJECT_ROLE_OWNER = SODAR_CONSTANTS['PROJECT_ROLE_OWNER']
+SUBMIT_STATUS_OK = SODAR_CONSTANTS['SUBMIT_STATUS_OK']
 
 # Local constants
 HEADERS = {'Content-Type': 'application/json'}
 
+# Pooled HTTP sessions by connection settings
+_sessions = {}
+
+
+def get_session():
+    """
+    Return a pooled HTTP session for SODAR Taskflow requests. Failed
+    connections are retried with backoff. Flow submissions are not
+    idempotent, so requests which have reached the service or a proxy are
+    never resent, including ones returning an error status.
+
+    :return: Session object
+    """
+    retries = getattr(settings, 'TASKFLOW_BACKEND_RETRIES', 3)
+    backoff = getattr(settings, 'TASKFLOW_BACKEND_BACKOFF', 0.5)
+    pool_size = getattr(settings, 'TASKFLOW_BACKEND_POOL_SIZE', 10)
+    key = (retries, backoff, pool_size)
+    if key not in _sessions:
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=0,
+            backoff_factor=backoff,
+            allowed_methods=frozenset(['POST']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _sessions[key] = session
+    return _sessions[key]
+
 
 class TaskflowAPI:
     """SODAR Taskflow API to be used by Django apps"""
@@ -38,6 +82,10 @@ class TaskflowAPI:
             getattr(settings, 'TASKFLOW_BACKEND_HOST', ''),
             getattr(settings, 'TASKFLOW_BACKEND_PORT', ''),
         )
+        self.timeout = (
+            getattr(settings, 'TASKFLOW_BACKEND_CONNECT_TIMEOUT', 5),
+            getattr(settings, 'TASKFLOW_BACKEND_READ_TIMEOUT', 300),
+        )
 
     def submit(
         self,
@@ -66,9 +114,101 @@ class TaskflowAPI:
         :return: Boolean
         :raise: FlowSubmitException if submission fails
         """
+        data = self._get_submit_data(
+            project_uuid=project_uuid,
+            flow_name=flow_name,
+            flow_data=flow_data,
+            request=request,
+            targets=targets,
+            request_mode=request_mode,
+            timeline_uuid=timeline_uuid,
+            force_fail=force_fail,
+            sodar_url=sodar_url,
+        )
+        logger.debug('Submit data: {}'.format(data))
+        response = self._post('/submit', data, flow_name)
+
+        if response.status_code == 200 and bool(response.text) is True:
+            logger.debug('Submit OK')
+            return True
+
+        else:
+            logger.error('Submit failed: {}'.format(response.text))
+            raise self.FlowSubmitException(
+                self.get_error_msg(flow_name, response.text)
+            )
+
+    def submit_batch(
+        self,
+        flows,
+        request=None,
+        targets=None,
+        request_mode='sync',
+        sodar_url=None,
+    ):
+        """
+        Submit multiple taskflows in a single request. The flows are executed
+        in the given order by SODAR Taskflow.
+
+        :param flows: List of dicts with the keys "project_uuid", "flow_name",
+                      "flow_data" and optionally "timeline_uuid" and
+                      "force_fail"
+        :param request: Request object (optional)
+        :param targets: Names of backends to sync with (list)
+        :param request_mode: "sync" or "async"
+        :param sodar_url: URL of SODAR server (optional, for testing)
+        :return: Boolean
+        :raise: FlowSubmitException if submission fails
+        """
+        if not flows:
+            return True
+        data = {
+            'flows': [
+                self._get_submit_data(
+                    project_uuid=f['project_uuid'],
+                    flow_name=f['flow_name'],
+                    flow_data=f['flow_data'],
+                    request=request,
+                    targets=targets,
+                    request_mode=request_mode,
+                    timeline_uuid=f.get('timeline_uuid'),
+                    force_fail=f.get('force_fail', False),
+                    sodar_url=sodar_url,
+                )
+                for f in flows
+            ]
+        }
+        flow_names = ', '.join(sorted(set(f['flow_name'] for f in flows)))
+        logger.debug(
+            'Submit batch of {} flows: {}'.format(len(flows), flow_names)
+        )
+        response = self._post('/submit_batch', data, flow_names)
+
+        if response.status_code == 200 and bool(response.text) is True:
+            logger.debug('Batch submit OK')
+            return True
+
+        else:
+            logger.error('Batch submit failed: {}'.format(response.text))
+            raise self.FlowSubmitException(
+                self.get_error_msg(flow_names, response.text)
+            )
+
+    def _get_submit_data(
+        self,
+        project_uuid,
+        flow_name,
+        flow_data,
+        request=None,
+        targets=None,
+        request_mode='sync',
+        timeline_uuid=None,
+        force_fail=False,
+        sodar_url=None,
+    ):
+        """Return data for a single flow submission"""
         if not targets:
             targets = settings.TASKFLOW_TARGETS
-        url = self.taskflow_url + '/submit'
 
         # Format UUIDs in flow_data
         for k, v in flow_data.items():
@@ -99,18 +239,26 @@ class TaskflowAPI:
                 data['sodar_url'] = request.GET['sodar_url']
             elif hasattr(request, 'data') and request.data.get('sodar_url'):
                 data['sodar_url'] = request.data['sodar_url']
+        return data
 
-        logger.debug('Submit data: {}'.format(data))
-        response = requests.post(url, json=data, headers=HEADERS)
-
-        if response.status_code == 200 and bool(response.text) is True:
-            logger.debug('Submit OK')
-            return True
+    def _post(self, path, data, flow_name):
+        """
+        Post data to SODAR Taskflow using the pooled session.
 
-        else:
-            logger.error('Submit failed: {}'.format(response.text))
+        :param path: URL path (string)
+        :param data: Data to be sent as JSON (dict)
+        :param flow_name: Name of flow(s) for error messages (string)
+        :return: Response object
+        :raise: FlowSubmitException if the request can not be completed
+        """
+        try:
+            return get_session().post(
+                self.taskflow_url + path, json=data, timeout=self.timeout
+            )
+        except requests.exceptions.RequestException as ex:
+            logger.error('Submit request failed: {}'.format(ex))
             raise self.FlowSubmitException(
-                self.get_error_msg(flow_name, response.text)
+                self.get_error_msg(flow_name, str(ex))
             )
 
     def use_taskflow(self, project):
@@ -138,7 +286,10 @@ class TaskflowAPI:
         url = self.taskflow_url + '/cleanup'
         data = {'test_mode': settings.TASKFLOW_TEST_MODE}
 
-        response = requests.post(url, json=data, headers=HEADERS)
+        try:
+            response = get_session().post(url, json=data, timeout=self.timeout)
+        except requests.exceptions.RequestException as ex:
+            raise self.CleanupException(str(ex))
 
         if response.status_code == 200:
             logger.debug('Cleanup OK')
@@ -161,34 +312,67 @@ class TaskflowAPI:
         )
 
     @classmethod
-    def get_inherited_roles(cls, project, user, roles=None):
+    def get_subtree(cls, project):
+        """
+        Return project and all its children in depth-first order with
+        children sorted by title. Uses one query per tree level.
+
+        :param project: Project object
+        :return: List of Project objects
+        """
+        children = {}
+        level = [project]
+        while level:
+            # Only categories can have children
+            level = [p for p in level if p.type == PROJECT_TYPE_CATEGORY]
+            if not level:
+                break
+            level = list(
+                Project.objects.filter(
+                    parent__in=level, submit_status=SUBMIT_STATUS_OK
+                ).order_by('title')
+            )
+            for child in level:
+                children.setdefault(child.parent_id, []).append(child)
+        ret = []
+        stack = [project]
+        while stack:
+            p = stack.pop()
+            ret.append(p)
+            stack += reversed(children.get(p.pk, []))
+        return ret
+
+    @classmethod
+    def get_inherited_roles(cls, project, user, roles=None, subtree=None):
         """
         Return list of inherited owner roles to be used in taskflow sync.
 
         :param project: Project object
         :param user: User object
         :pram roles: Previously collected roles (optional, list or None)
+        :param subtree: Result of get_subtree() for project (optional)
         :return: List of dicts
         """
         if roles is None:
             roles = []
-
+        keys = set((r['project_uuid'], r['username']) for r in roles)
+        if subtree is None:
+            subtree = cls.get_subtree(project)
+        projects = [p for p in subtree if p.type == PROJECT_TYPE_PROJECT]
         # TODO: Remove support for legacy roles in v0.9 (see #506)
-        if (
-            project.type == PROJECT_TYPE_PROJECT
-            and not RoleAssignment.objects.filter(project=project, user=user)
-        ):
-            r = {
-                'project_uuid': str(project.sodar_uuid),
-                'username': user.username,
-            }
-
-            if r not in roles:  # Avoid unnecessary dupes
-                roles.append(r)
-
-        for child in project.get_children():
-            roles = cls.get_inherited_roles(child, user, roles)
+        user_projects = set(
+            RoleAssignment.objects.filter(
+                project__in=projects, user=user
+            ).values_list('project', flat=True)
+        )
 
+        for p in projects:
+            if p.pk in user_projects:
+                continue
+            key = (str(p.sodar_uuid), user.username)
+            if key not in keys:  # Avoid unnecessary dupes
+                keys.add(key)
+                roles.append({'project_uuid': key[0], 'username': key[1]})
         return roles
 
     @classmethod
@@ -201,23 +385,46 @@ class TaskflowAPI:
         :pram roles: Previously collected roles (optional, list or None)
         :return: List of dicts
         """
-
         if roles is None:
             roles = []
-
-        if project.type == PROJECT_TYPE_PROJECT:
-            i_owners = [a.user for a in project.get_owners(inherited_only=True)]
-            all_users = [a.user for a in project.get_all_roles(inherited=False)]
-
-            for u in [u for u in i_owners if u not in all_users]:
-                roles.append(
-                    {
-                        'project_uuid': str(project.sodar_uuid),
-                        'username': u.username,
-                    }
-                )
-
-        for child in project.get_children():
-            roles = cls.get_inherited_users(child, roles)
-
+        keys = set((r['project_uuid'], r['username']) for r in roles)
+        subtree = cls.get_subtree(project)
+        parents = list(project.get_parents())
+
+        # Get owners and all users with roles for projects in one query
+        owners = {}
+        users = {}
+        role_users = RoleAssignment.objects.filter(
+            project__in=parents + subtree
+        ).values_list('project', 'user__username', 'role__name')
+        for p_pk, username, role_name in role_users.order_by('pk'):
+            users.setdefault(p_pk, set()).add(username)
+            if role_name == PROJECT_ROLE_OWNER:
+                owners.setdefault(p_pk, []).append(username)
+
+        # Collect inherited owners top-down
+        inherited = {}
+        root_owners = []
+        for parent in parents:
+            root_owners += [
+                u for u in owners.get(parent.pk, []) if u not in root_owners
+            ]
+        inherited[project.pk] = root_owners
+
+        for p in subtree:
+            if p.pk != project.pk:
+                p_owners = inherited[p.parent_id] + [
+                    u
+                    for u in owners.get(p.parent_id, [])
+                    if u not in inherited[p.parent_id]
+                ]
+                inherited[p.pk] = p_owners
+            if p.type != PROJECT_TYPE_PROJECT:
+                continue
+            for username in inherited[p.pk]:
+                key = (str(p.sodar_uuid), username)
+                if username in users.get(p.pk, set()) or key in keys:
+                    continue
+                keys.add(key)
+                roles.append({'project_uuid': key[0], 'username': username})
         return roles
@@ -1,22 +1,33 @@
+import hashlib
+import json
+import os
 import sys
+import threading
+import uuid
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 # Projectroles dependency
 from projectroles.management.logging import ManagementCommandLogger
-from projectroles.models import Project, Role, SODAR_CONSTANTS
+from projectroles.models import Project, RoleAssignment, SODAR_CONSTANTS
 from projectroles.plugins import get_active_plugins, get_backend_api
 
 
 # SODAR constants
 PROJECT_TYPE_PROJECT = SODAR_CONSTANTS['PROJECT_TYPE_PROJECT']
 PROJECT_TYPE_CATEGORY = SODAR_CONSTANTS['PROJECT_TYPE_CATEGORY']
+PROJECT_ROLE_OWNER = SODAR_CONSTANTS['PROJECT_ROLE_OWNER']
 
-
-TARGETS = settings.TASKFLOW_TARGETS
-TARGETS.remove('sodar')  # Exclude SODAR from sync as data is already here
+# Local constants
+DEFAULT_WORKERS = 4
 
 
 logger = ManagementCommandLogger(__name__)
@@ -26,20 +37,135 @@ User = get_user_model()
 class Command(BaseCommand):
     help = 'Submits missing project data to external storage'
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.taskflow = None
+        self.targets = []
+        self.workers = DEFAULT_WORKERS
+        #: UUIDs of projects to sync as strings, None if syncing all projects
+        self.project_uuids = None
+        self.project_titles = {}
+        self.checkpoint = None
+        self.done_keys = set()
+        self.failed = 0
+        self._lock = threading.Lock()
+
     def add_arguments(self, parser):
-        pass
+        parser.add_argument(
+            '-p',
+            '--project',
+            dest='project',
+            action='append',
+            required=False,
+            help='UUID of project to synchronize (can be given multiple '
+            'times, default: all projects)',
+        )
+        parser.add_argument(
+            '-s',
+            '--since',
+            dest='since',
+            required=False,
+            help='Only synchronize projects with timeline events since date '
+            '(YYYY-MM-DD, requires the timeline backend)',
+        )
+        parser.add_argument(
+            '-w',
+            '--workers',
+            dest='workers',
+            type=int,
+            default=DEFAULT_WORKERS,
+            help='Number of concurrent flow submissions (default: {})'.format(
+                DEFAULT_WORKERS
+            ),
+        )
+        parser.add_argument(
+            '-c',
+            '--checkpoint',
+            dest='checkpoint',
+            required=False,
+            help='Path to checkpoint file for resuming an interrupted run',
+        )
 
-    def _submit_sync(self, app_name, sync_data, raise_exception=False):
-        """Submit flows found in an app's sync_data structure"""
+    @classmethod
+    def _get_item_key(cls, app_name, item):
+        """Return checkpoint key for a sync data item"""
+        data = json.dumps(
+            [
+                app_name,
+                str(item['project_uuid']),
+                item['flow_name'],
+                item['flow_data'],
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
 
-        for item in sync_data:
-            project = Project.objects.get(sodar_uuid=item['project_uuid'])
+    def _load_checkpoint(self):
+        """Load keys of flows completed in a previous run"""
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return
+        with open(self.checkpoint) as f:
+            self.done_keys = set(line.strip() for line in f if line.strip())
+        logger.info(
+            'Resuming from checkpoint "{}" with {} completed flow(s)'.format(
+                self.checkpoint, len(self.done_keys)
+            )
+        )
+
+    def _mark_done(self, key):
+        """Save key of a completed flow in the checkpoint file"""
+        if not self.checkpoint:
+            return
+        with self._lock:
+            with open(self.checkpoint, 'a') as f:
+                f.write(key + '\n')
+            self.done_keys.add(key)
+
+    def _get_projects(self, options):
+        """Return projects to synchronize according to command options"""
+        projects = Project.objects.filter(type=PROJECT_TYPE_PROJECT)
+        if options.get('project'):
+            try:
+                p_uuids = [uuid.UUID(p) for p in options['project']]
+            except ValueError as ex:
+                logger.error('Invalid project UUID: {}'.format(ex))
+                raise CommandError
+            projects = projects.filter(sodar_uuid__in=p_uuids)
+        if options.get('since'):
+            since = parse_date(options['since'])
+            if not since:
+                logger.error(
+                    'Invalid date "{}", expected YYYY-MM-DD'.format(
+                        options['since']
+                    )
+                )
+                raise CommandError
+            timeline = get_backend_api('timeline_backend')
+            if not timeline:
+                logger.error(
+                    'Timeline backend not enabled, unable to use --since'
+                )
+                raise CommandError
+            ProjectEvent, _ = timeline.get_models()
+            projects = projects.filter(
+                pk__in=ProjectEvent.objects.filter(
+                    status_changes__timestamp__gte=timezone.make_aware(
+                        datetime.combine(since, datetime.min.time())
+                    )
+                ).values('project')
+            )
+        return projects
+
+    def _submit_group(self, app_name, items, raise_exception):
+        """Submit flows for a single project in order"""
+        for key, item in items:
             logger.debug(
                 'Syncing flow "{}" by {} for "{}" ({})'.format(
                     item['flow_name'],
                     app_name,
-                    project.title,
-                    project.sodar_uuid,
+                    self.project_titles.get(str(item['project_uuid']), ''),
+                    item['project_uuid'],
                 )
             )
             try:
@@ -47,29 +173,80 @@ class Command(BaseCommand):
                     project_uuid=item['project_uuid'],
                     flow_name=item['flow_name'],
                     flow_data=item['flow_data'],
-                    targets=TARGETS,
+                    targets=self.targets,
                 )
+                self._mark_done(key)
             except self.taskflow.FlowSubmitException as ex:
                 logger.error('Exception raised by flow: {}'.format(ex))
+                with self._lock:
+                    self.failed += 1
                 # If we don't want to continue on failure
                 if raise_exception:
                     raise ex
 
-    def _sync_projects(self):
+    def _submit_sync(self, app_name, sync_data, raise_exception=False):
+        """
+        Submit flows found in an app's sync_data structure. Flows for
+        different projects are submitted concurrently, flows for the same
+        project in the given order.
+        """
+        groups = {}
+        skipped = 0
+        for item in sync_data:
+            p_uuid = item['project_uuid']
+            if (
+                p_uuid is not None
+                and self.project_uuids is not None
+                and str(p_uuid) not in self.project_uuids
+            ):
+                continue
+            key = self._get_item_key(app_name, item)
+            if key in self.done_keys:
+                skipped += 1
+                continue
+            groups.setdefault(str(p_uuid), []).append((key, item))
+        if skipped:
+            logger.info(
+                'Skipping {} flow(s) completed in previous run'.format(skipped)
+            )
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(
+                    self._submit_group, app_name, items, raise_exception
+                )
+                for items in groups.values()
+            ]
+        for future in futures:
+            future.result()  # Raise exception if set in a worker
+
+    def _sync_projects(self, projects):
         """Synchronize projects and roles (must be called first!)"""
         logger.info('Synchronizing project data with taskflow...')
-        logger.info('Target(s) = ' + ', '.join([t for t in TARGETS]))
+        logger.info('Target(s) = ' + ', '.join([t for t in self.targets]))
 
         # Only sync PROJECT type projects as we (currently) don't have any
         # use for CATEGORY projects in taskflow
-        projects = Project.objects.filter(type=PROJECT_TYPE_PROJECT).order_by(
-            'pk'
+        projects = (
+            projects.select_related('parent')
+            .prefetch_related(
+                Prefetch(
+                    'roles',
+                    queryset=RoleAssignment.objects.select_related(
+                        'user', 'role'
+                    ).order_by('pk'),
+                )
+            )
+            .order_by('pk')
         )
         project_sync_data = []
         role_sync_data = []
 
         for project in projects:
-            owner_as = project.get_owner()
+            self.project_titles[str(project.sodar_uuid)] = project.title
+            roles = list(project.roles.all())
+            owner_as = next(
+                (a for a in roles if a.role.name == PROJECT_ROLE_OWNER), None
+            )
             if not owner_as:  # This should not happen unless the db is corrupt
                 logger.error(
                     'No owner assignment for project "{}" ({})'.format(
@@ -106,11 +283,9 @@ class Command(BaseCommand):
                     'flow_data': {'owner_username': owner_as.user.username},
                 }
             )
-            for role_as in project.roles.exclude(
-                role=Role.objects.get(
-                    name=SODAR_CONSTANTS['PROJECT_ROLE_OWNER']
-                )
-            ):
+            for role_as in roles:
+                if role_as.role.name == PROJECT_ROLE_OWNER:
+                    continue
                 role_sync_data.append(
                     {
                         'project_uuid': str(project.sodar_uuid),
@@ -142,45 +317,86 @@ class Command(BaseCommand):
             )
         else:
             logger.info('Retrieving added/removed inherited owners..')
-            ProjectEvent, ProjectEventObjectRef = timeline.get_models()
+            _, ProjectEventObjectRef = timeline.get_models()
 
-            for category in Project.objects.filter(type=PROJECT_TYPE_CATEGORY):
-                # Get roles to add
-                roles_add = self.taskflow.get_inherited_roles(
-                    category, category.get_owner().user, roles_add
+            categories = list(
+                Project.objects.filter(type=PROJECT_TYPE_CATEGORY)
+            )
+            owners = {
+                a.project_id: a.user
+                for a in RoleAssignment.objects.filter(
+                    project__in=categories, role__name=PROJECT_ROLE_OWNER
+                ).select_related('user')
+            }
+            # Get previous owners of all categories
+            prev_owners = {}
+            for project_id, object_uuid, u_name in (
+                ProjectEventObjectRef.objects.filter(
+                    label='prev_owner',
+                    event__project__in=categories,
+                    event__event_name='role_owner_transfer',
                 )
-
-                # Get previous owners to remove
-                tl_users = (
-                    ProjectEventObjectRef.objects.filter(
-                        label='prev_owner',
-                        event__in=ProjectEvent.objects.filter(
-                            project=category, event_name='role_owner_transfer'
-                        ),
+                .values_list('event__project', 'object_uuid', 'name')
+                .distinct()
+            ):
+                prev_owners.setdefault(project_id, set()).add(
+                    (object_uuid, u_name)
+                )
+            prev_users = {
+                u.username: u
+                for u in User.objects.filter(
+                    username__in=set(
+                        n for v in prev_owners.values() for _, n in v
                     )
-                    .exclude(object_uuid=category.get_owner().user.sodar_uuid)
-                    .values_list('name', flat=True)
-                    .distinct()
                 )
+            }
 
-                for u_name in tl_users:
-                    user = User.objects.filter(username=u_name).first()
-                    if not user:
+            for category in categories:
+                owner = owners.get(category.pk)
+                if not owner:
+                    continue
+                subtree = self.taskflow.get_subtree(category)
+                # Get roles to add
+                roles_add = self.taskflow.get_inherited_roles(
+                    category, owner, roles_add, subtree=subtree
+                )
+                # Get previous owners to remove
+                for object_uuid, u_name in sorted(
+                    prev_owners.get(category.pk, []), key=lambda x: x[1]
+                ):
+                    user = prev_users.get(u_name)
+                    if not user or object_uuid == owner.sodar_uuid:
                         continue
                     roles_delete = self.taskflow.get_inherited_roles(
-                        category, user, roles_delete
+                        category, user, roles_delete, subtree=subtree
                     )
 
+        if self.project_uuids is not None:
+            roles_add = [
+                r for r in roles_add if r['project_uuid'] in self.project_uuids
+            ]
+            roles_delete = [
+                r
+                for r in roles_delete
+                if r['project_uuid'] in self.project_uuids
+            ]
+
         if roles_add or roles_delete:
             logger.info('Changes in inherited owners found, synchronizing..')
             try:
-                self.taskflow.submit(
-                    project_uuid=None,
-                    flow_name='role_update_irods_batch',
-                    flow_data={
-                        'roles_add': roles_add,
-                        'roles_delete': roles_delete,
-                    },
+                self._submit_sync(
+                    'projectroles',
+                    [
+                        {
+                            'project_uuid': None,
+                            'flow_name': 'role_update_irods_batch',
+                            'flow_data': {
+                                'roles_add': roles_add,
+                                'roles_delete': roles_delete,
+                            },
+                        }
+                    ],
+                    raise_exception=True,
                 )
             except Exception as ex:
                 logger.error(
@@ -210,13 +426,29 @@ class Command(BaseCommand):
             logger.error('Taskflow backend plugin not available, cancelled!')
             raise CommandError
 
+        # Exclude SODAR from sync as data is already here
+        self.targets = [t for t in settings.TASKFLOW_TARGETS if t != 'sodar']
+        self.workers = max(options.get('workers') or DEFAULT_WORKERS, 1)
+        self.checkpoint = options.get('checkpoint')
+        self._load_checkpoint()
+        projects = self._get_projects(options)
+        if options.get('project') or options.get('since'):
+            self.project_uuids = set(
+                str(u) for u in projects.values_list('sodar_uuid', flat=True)
+            )
+            logger.info(
+                'Synchronizing {} selected project(s)'.format(
+                    len(self.project_uuids)
+                )
+            )
+
         # Projectroles sync
         # NOTE: For projectroles, this is done here as projects must be created
         #       or we can not continue with sync.. Also, removed projects are
         #       NOT deleted automatically (they shouldn't be deleted anyway).
         #       We first set up the projects and exit if syncing them fails.
         try:
-            self._sync_projects()
+            self._sync_projects(projects)
         except Exception as ex:
             logger.error('Exception in project sync: {}'.format(ex))
             logger.error('Project sync failed! Unable to continue, exiting..')
@@ -226,4 +458,13 @@ class Command(BaseCommand):
         self._sync_inherited_owners()
         # App sync
         self._sync_apps()
+
+        if self.checkpoint and not self.failed:
+            if os.path.exists(self.checkpoint):
+                os.remove(self.checkpoint)
+        elif self.checkpoint:
+            logger.warning(
+                '{} flow(s) failed, run again with the same checkpoint file '
+                'to retry'.format(self.failed)
+            )
         logger.info('Project data synchronized.')
@@ -0,0 +1,65 @@
+"""Local SODAR Taskflow stub server for taskflowbackend tests"""
+
+import json
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class TaskflowStubHandler(BaseHTTPRequestHandler):
+    """Request handler recording posted data and returning queued responses"""
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        data = json.loads(self.rfile.read(length).decode('utf-8'))
+        self.server.requests.append((self.path, data))
+        if self.server.responses:
+            status, text = self.server.responses.pop(0)
+        else:
+            status, text = 200, 'ok'
+        body = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep test output clean
+
+
+class TaskflowStubServer:
+    """
+    SODAR Taskflow stub server running in a background thread. Use as a
+    context manager and point TASKFLOW_BACKEND_HOST and TASKFLOW_BACKEND_PORT
+    to the host and port attributes.
+    """
+
+    def __init__(self, responses=None):
+        """
+        Initialize the server.
+
+        :param responses: List of (status_code, text) tuples returned for
+                          requests in order, followed by (200, 'ok')
+        """
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), TaskflowStubHandler)
+        self.server.responses = list(responses or [])
+        self.server.requests = []
+        self.host = 'http://127.0.0.1'
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+
+    @property
+    def requests(self):
+        """Return list of received (path, data) tuples"""
+        return self.server.requests
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
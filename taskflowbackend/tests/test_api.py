@@ -0,0 +1,278 @@
+"""Tests for the API in the taskflowbackend app"""
+
+import uuid
+
+from django.test import override_settings
+
+from test_plus.test import TestCase
+
+# Projectroles dependency
+from projectroles.models import Role, SODAR_CONSTANTS
+from projectroles.tests.test_models import ProjectMixin, RoleAssignmentMixin
+
+from taskflowbackend.api import TaskflowAPI
+from taskflowbackend.tests.stub_server import TaskflowStubServer
+
+
+# SODAR constants
+PROJECT_ROLE_OWNER = SODAR_CONSTANTS['PROJECT_ROLE_OWNER']
+PROJECT_ROLE_CONTRIBUTOR = SODAR_CONSTANTS['PROJECT_ROLE_CONTRIBUTOR']
+PROJECT_TYPE_CATEGORY = SODAR_CONSTANTS['PROJECT_TYPE_CATEGORY']
+PROJECT_TYPE_PROJECT = SODAR_CONSTANTS['PROJECT_TYPE_PROJECT']
+
+# Local constants
+PROJECT_UUID = str(uuid.uuid4())
+TARGETS = ['irods', 'sodar']
+
+
+class TestTaskflowAPIBase(TestCase):
+    """Base class for TaskflowAPI tests against a local stub server"""
+
+    def _start_server(self, responses=None):
+        """Start stub server and point settings to it"""
+        server = TaskflowStubServer(responses)
+        server.__enter__()
+        self.addCleanup(server.__exit__)
+        test_settings = override_settings(
+            TASKFLOW_BACKEND_HOST=server.host,
+            TASKFLOW_BACKEND_PORT=server.port,
+            TASKFLOW_BACKEND_BACKOFF=0,
+        )
+        test_settings.enable()
+        self.addCleanup(test_settings.disable)
+        self.taskflow = TaskflowAPI()
+        return server
+
+
+class TestSubmit(TestTaskflowAPIBase):
+    """Tests for TaskflowAPI.submit()"""
+
+    def test_submit(self):
+        """Test submitting a flow"""
+        server = self._start_server()
+        ret = self.taskflow.submit(
+            project_uuid=PROJECT_UUID,
+            flow_name='project_create',
+            flow_data={'owner_uuid': uuid.UUID(PROJECT_UUID)},
+            targets=TARGETS,
+        )
+        self.assertEqual(ret, True)
+        self.assertEqual(len(server.requests), 1)
+        path, data = server.requests[0]
+        self.assertEqual(path, '/submit')
+        self.assertEqual(data['project_uuid'], PROJECT_UUID)
+        self.assertEqual(data['flow_name'], 'project_create')
+        self.assertEqual(data['flow_data'], {'owner_uuid': PROJECT_UUID})
+        self.assertEqual(data['targets'], TARGETS)
+
+    def test_submit_error(self):
+        """Test submitting a flow with an error returned"""
+        self._start_server([(400, 'Flow failed')])
+        with self.assertRaises(TaskflowAPI.FlowSubmitException):
+            self.taskflow.submit(
+                project_uuid=PROJECT_UUID,
+                flow_name='project_create',
+                flow_data={},
+                targets=TARGETS,
+            )
+
+    def test_submit_no_retry_status(self):
+        """Test submission with unavailable service is not resent"""
+        server = self._start_server([(503, 'Unavailable')])
+        with self.assertRaises(TaskflowAPI.FlowSubmitException):
+            self.taskflow.submit(
+                project_uuid=PROJECT_UUID,
+                flow_name='project_create',
+                flow_data={},
+                targets=TARGETS,
+            )
+        self.assertEqual(len(server.requests), 1)
+
+    def test_submit_no_retry_bad_gateway(self):
+        """Test submission with bad gateway response is not resent"""
+        server = self._start_server([(502, 'Bad gw')])
+        with self.assertRaises(TaskflowAPI.FlowSubmitException):
+            self.taskflow.submit(
+                project_uuid=PROJECT_UUID,
+                flow_name='project_create',
+                flow_data={},
+                targets=TARGETS,
+            )
+        self.assertEqual(len(server.requests), 1)
+
+    def test_submit_no_connection(self):
+        """Test submission with no service available"""
+        server = self._start_server()
+        server.__exit__()
+        with self.assertRaises(TaskflowAPI.FlowSubmitException):
+            self.taskflow.submit(
+                project_uuid=PROJECT_UUID,
+                flow_name='project_create',
+                flow_data={},
+                targets=TARGETS,
+            )
+
+
+class TestSubmitBatch(TestTaskflowAPIBase):
+    """Tests for TaskflowAPI.submit_batch()"""
+
+    def test_submit_batch(self):
+        """Test submitting multiple flows in one request"""
+        server = self._start_server()
+        flows = [
+            {
+                'project_uuid': PROJECT_UUID,
+                'flow_name': 'role_update',
+                'flow_data': {'username': 'user{}'.format(i)},
+            }
+            for i in range(3)
+        ]
+        ret = self.taskflow.submit_batch(flows, targets=TARGETS)
+        self.assertEqual(ret, True)
+        self.assertEqual(len(server.requests), 1)
+        path, data = server.requests[0]
+        self.assertEqual(path, '/submit_batch')
+        self.assertEqual(len(data['flows']), 3)
+        self.assertEqual(
+            [f['flow_data']['username'] for f in data['flows']],
+            ['user0', 'user1', 'user2'],
+        )
+        self.assertEqual(data['flows'][0]['targets'], TARGETS)
+
+    def test_submit_batch_empty(self):
+        """Test submitting an empty batch"""
+        server = self._start_server()
+        self.assertEqual(self.taskflow.submit_batch([]), True)
+        self.assertEqual(len(server.requests), 0)
+
+    def test_submit_batch_error(self):
+        """Test submitting a batch with an error returned"""
+        self._start_server([(400, 'Flow failed')])
+        flows = [
+            {
+                'project_uuid': PROJECT_UUID,
+                'flow_name': 'role_update',
+                'flow_data': {},
+            }
+        ]
+        with self.assertRaises(TaskflowAPI.FlowSubmitException):
+            self.taskflow.submit_batch(flows, targets=TARGETS)
+
+
+class TestInheritedRoles(ProjectMixin, RoleAssignmentMixin, TestCase):
+    """Tests for inherited role computation in TaskflowAPI"""
+
+    def setUp(self):
+        role_owner = Role.objects.get_or_create(name=PROJECT_ROLE_OWNER)[0]
+        role_contrib = Role.objects.get_or_create(
+            name=PROJECT_ROLE_CONTRIBUTOR
+        )[0]
+        self.user_cat = self.make_user('user_cat')
+        self.user_sub = self.make_user('user_sub')
+        self.user_a = self.make_user('user_a')
+        self.user_b = self.make_user('user_b')
+        # Category with a subcategory and a project
+        self.category = self._make_project(
+            'TestCategory', PROJECT_TYPE_CATEGORY, None
+        )
+        self._make_assignment(self.category, self.user_cat, role_owner)
+        self.sub_category = self._make_project(
+            'SubCategory', PROJECT_TYPE_CATEGORY, self.category
+        )
+        self._make_assignment(self.sub_category, self.user_sub, role_owner)
+        self.project_a = self._make_project(
+            'ProjectA', PROJECT_TYPE_PROJECT, self.category
+        )
+        self._make_assignment(self.project_a, self.user_a, role_owner)
+        # Project in subcategory with category owner as contributor
+        self.project_b = self._make_project(
+            'ProjectB', PROJECT_TYPE_PROJECT, self.sub_category
+        )
+        self._make_assignment(self.project_b, self.user_b, role_owner)
+        self._make_assignment(self.project_b, self.user_cat, role_contrib)
+
+    def test_get_subtree(self):
+        """Test get_subtree()"""
+        self.assertEqual(
+            TaskflowAPI.get_subtree(self.category),
+            [
+                self.category,
+                self.project_a,
+                self.sub_category,
+                self.project_b,
+            ],
+        )
+
+    def test_get_inherited_roles(self):
+        """Test get_inherited_roles()"""
+        roles = TaskflowAPI.get_inherited_roles(self.category, self.user_cat)
+        self.assertEqual(
+            roles,
+            [
+                {
+                    'project_uuid': str(self.project_a.sodar_uuid),
+                    'username': self.user_cat.username,
+                }
+            ],
+        )
+
+    def test_get_inherited_roles_dupes(self):
+        """Test get_inherited_roles() with previously collected roles"""
+        roles = TaskflowAPI.get_inherited_roles(self.category, self.user_sub)
+        roles = TaskflowAPI.get_inherited_roles(
+            self.sub_category, self.user_sub, roles
+        )
+        self.assertEqual(len(roles), 2)
+
+    def test_get_inherited_roles_subtree(self):
+        """Test get_inherited_roles() with precomputed subtree"""
+        subtree = TaskflowAPI.get_subtree(self.category)
+        # Only the role query should be run
+        with self.assertNumQueries(1):
+            roles = TaskflowAPI.get_inherited_roles(
+                self.category, self.user_cat, subtree=subtree
+            )
+        self.assertEqual(
+            roles, TaskflowAPI.get_inherited_roles(self.category, self.user_cat)
+        )
+
+    def test_get_inherited_users(self):
+        """Test get_inherited_users()"""
+        roles = TaskflowAPI.get_inherited_users(self.category)
+        self.assertEqual(
+            roles,
+            [
+                {
+                    'project_uuid': str(self.project_a.sodar_uuid),
+                    'username': self.user_cat.username,
+                },
+                {
+                    'project_uuid': str(self.project_b.sodar_uuid),
+                    'username': self.user_sub.username,
+                },
+            ],
+        )
+
+    def test_get_inherited_users_subtree(self):
+        """Test get_inherited_users() for a subcategory"""
+        roles = TaskflowAPI.get_inherited_users(self.sub_category)
+        self.assertEqual(
+            roles,
+            [
+                {
+                    'project_uuid': str(self.project_b.sodar_uuid),
+                    'username': self.user_sub.username,
+                }
+            ],
+        )
+
+    def test_get_inherited_users_queries(self):
+        """Test get_inherited_users() query count with more projects"""
+        with self.assertNumQueries(3):
+            TaskflowAPI.get_inherited_users(self.category)
+        for i in range(5):
+            self._make_project(
+                'Project{}'.format(i), PROJECT_TYPE_PROJECT, self.sub_category
+            )
+        with self.assertNumQueries(3):
+            TaskflowAPI.get_inherited_users(self.category)
@@ -0,0 +1,202 @@
+"""Tests for management commands in the taskflowbackend app"""
+
+import os
+
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from test_plus.test import TestCase
+
+# Projectroles dependency
+from projectroles.models import Role, SODAR_CONSTANTS
+from projectroles.plugins import get_backend_api
+from projectroles.tests.test_models import ProjectMixin, RoleAssignmentMixin
+
+from taskflowbackend.tests.stub_server import TaskflowStubServer
+
+
+# SODAR constants
+PROJECT_ROLE_OWNER = SODAR_CONSTANTS['PROJECT_ROLE_OWNER']
+PROJECT_ROLE_CONTRIBUTOR = SODAR_CONSTANTS['PROJECT_ROLE_CONTRIBUTOR']
+PROJECT_TYPE_CATEGORY = SODAR_CONSTANTS['PROJECT_TYPE_CATEGORY']
+PROJECT_TYPE_PROJECT = SODAR_CONSTANTS['PROJECT_TYPE_PROJECT']
+
+# Local constants
+ENABLED_BACKEND_PLUGINS = ['timeline_backend', 'taskflow']
+
+
+class TestSyncTaskflow(ProjectMixin, RoleAssignmentMixin, TestCase):
+    """Tests for the synctaskflow command"""
+
+    def _start_server(self, responses=None):
+        """Start stub server and point settings to it"""
+        server = TaskflowStubServer(responses)
+        server.__enter__()
+        self.addCleanup(server.__exit__)
+        test_settings = override_settings(
+            ENABLED_BACKEND_PLUGINS=ENABLED_BACKEND_PLUGINS,
+            TASKFLOW_TARGETS=['irods', 'sodar'],
+            TASKFLOW_BACKEND_HOST=server.host,
+            TASKFLOW_BACKEND_PORT=server.port,
+            TASKFLOW_BACKEND_RETRIES=0,
+        )
+        test_settings.enable()
+        self.addCleanup(test_settings.disable)
+        return server
+
+    @classmethod
+    def _get_flows(cls, server, flow_name):
+        """Return submitted data for flows by name"""
+        return [d for _, d in server.requests if d['flow_name'] == flow_name]
+
+    def setUp(self):
+        self.role_owner = Role.objects.get_or_create(name=PROJECT_ROLE_OWNER)[0]
+        self.role_contributor = Role.objects.get_or_create(
+            name=PROJECT_ROLE_CONTRIBUTOR
+        )[0]
+        self.user = self.make_user('owner')
+        self.user_contrib = self.make_user('contributor')
+        self.category = self._make_project(
+            'TestCategory', PROJECT_TYPE_CATEGORY, None
+        )
+        self._make_assignment(self.category, self.user, self.role_owner)
+        self.project = self._make_project(
+            'TestProject', PROJECT_TYPE_PROJECT, self.category
+        )
+        self._make_assignment(self.project, self.user, self.role_owner)
+        self._make_assignment(
+            self.project, self.user_contrib, self.role_contributor
+        )
+        self.project2 = self._make_project(
+            'TestProject2', PROJECT_TYPE_PROJECT, self.category
+        )
+        self._make_assignment(self.project2, self.user, self.role_owner)
+
+    def test_sync(self):
+        """Test syncing all projects"""
+        server = self._start_server()
+        call_command('synctaskflow')
+        create_flows = self._get_flows(server, 'project_create')
+        self.assertEqual(
+            sorted(d['project_uuid'] for d in create_flows),
+            sorted(
+                [str(self.project.sodar_uuid), str(self.project2.sodar_uuid)]
+            ),
+        )
+        self.assertEqual(create_flows[0]['targets'], ['irods'])
+        self.assertEqual(
+            len(self._get_flows(server, 'role_sync_delete_all')), 2
+        )
+        update_flows = self._get_flows(server, 'role_update')
+        self.assertEqual(len(update_flows), 1)
+        self.assertEqual(
+            update_flows[0]['flow_data']['username'],
+            self.user_contrib.username,
+        )
+
+    def test_sync_role_order(self):
+        """Test role flows for a project are submitted in order"""
+        server = self._start_server()
+        call_command('synctaskflow', workers=1)
+        names = [
+            d['flow_name']
+            for _, d in server.requests
+            if d['project_uuid'] == str(self.project.sodar_uuid)
+        ]
+        self.assertEqual(
+            names, ['project_create', 'role_sync_delete_all', 'role_update']
+        )
+
+    def test_sync_project(self):
+        """Test syncing a single project"""
+        server = self._start_server()
+        call_command('synctaskflow', project=[str(self.project.sodar_uuid)])
+        self.assertEqual(
+            set(d['project_uuid'] for _, d in server.requests),
+            {str(self.project.sodar_uuid)},
+        )
+
+    def test_sync_since(self):
+        """Test syncing projects with no timeline events since date"""
+        server = self._start_server()
+        call_command('synctaskflow', since='2000-01-01')
+        self.assertEqual(len(server.requests), 0)
+
+    def test_sync_checkpoint(self):
+        """Test resuming an interrupted sync with a checkpoint file"""
+        server = self._start_server()
+        with TemporaryDirectory() as tmp_dir:
+            checkpoint = os.path.join(tmp_dir, 'checkpoint')
+            call_command('synctaskflow', checkpoint=checkpoint, workers=1)
+            self.assertFalse(os.path.exists(checkpoint))
+            request_count = len(server.requests)
+            self.assertGreater(request_count, 0)
+
+            # Fail role update, checkpoint should be kept for resuming
+            server.server.responses = [(200, 'ok')] * 2 + [(400, 'Failed')]
+            call_command(
+                'synctaskflow',
+                project=[str(self.project.sodar_uuid)],
+                checkpoint=checkpoint,
+                workers=1,
+            )
+            self.assertTrue(os.path.exists(checkpoint))
+            server.requests.clear()
+            call_command(
+                'synctaskflow',
+                project=[str(self.project.sodar_uuid)],
+                checkpoint=checkpoint,
+                workers=1,
+            )
+            self.assertEqual(
+                [d['flow_name'] for _, d in server.requests], ['role_update']
+            )
+            self.assertFalse(os.path.exists(checkpoint))
+
+    def test_sync_inherited_owners(self):
+        """Test syncing previous inherited owners of categories"""
+        user_prev = self.make_user('prev_owner')
+        category2 = self._make_project(
+            'TestCategory2', PROJECT_TYPE_CATEGORY, None
+        )
+        self._make_assignment(category2, self.user_contrib, self.role_owner)
+        project3 = self._make_project(
+            'TestProject3', PROJECT_TYPE_PROJECT, category2
+        )
+        self._make_assignment(project3, self.user, self.role_owner)
+        timeline = get_backend_api('timeline_backend')
+        tl_event = timeline.add_event(
+            project=self.category,
+            app_name='projectroles',
+            user=self.user,
+            event_name='role_owner_transfer',
+            description='transfer ownership',
+        )
+        tl_event.add_object(user_prev, 'prev_owner', user_prev.username)
+        server = self._start_server()
+        call_command('synctaskflow', workers=1)
+        flows = self._get_flows(server, 'role_update_irods_batch')
+        self.assertEqual(len(flows), 1)
+        self.assertEqual(
+            flows[0]['flow_data']['roles_add'],
+            [
+                {
+                    'project_uuid': str(project3.sodar_uuid),
+                    'username': self.user_contrib.username,
+                }
+            ],
+        )
+        self.assertEqual(
+            sorted(
+                r['project_uuid'] for r in flows[0]['flow_data']['roles_delete']
+            ),
+            sorted(
+                [str(self.project.sodar_uuid), str(self.project2.sodar_uuid)]
+            ),
+        )
+        self.assertEqual(
+            set(r['username'] for r in flows[0]['flow_data']['roles_delete']),
+            {user_prev.username},
+        )
@@ -53,6 +53,9 @@ class ProjectAppPlugin(ProjectAppPluginPoint):
     #: App card title for the project details page
     details_title = 'Timeline Overview'
 
+    #: Load the app card for the project details page with Ajax
+    details_lazy = True
+
     #: Position in plugin ordering
     plugin_ordering = 40
 
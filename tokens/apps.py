@@ -3,3 +3,12 @@ from django.apps import AppConfig
 
 class TokensConfig(AppConfig):
     name = 'tokens'
+
+    def ready(self):
+        """Connect signal for removing deleted tokens from the cache"""
+        from django.db.models.signals import post_delete
+        from knox.models import AuthToken
+
+        from tokens.auth import handle_token_delete
+
+        post_delete.connect(handle_token_delete, sender=AuthToken)
@@ -0,0 +1,133 @@
+"""Authentication classes for the tokens app"""
+
+import hashlib
+
+from hmac import compare_digest
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+
+from knox.auth import TokenAuthentication
+from knox.models import AuthToken
+from knox.settings import CONSTANTS, knox_settings
+from rest_framework import exceptions
+
+
+User = get_user_model()
+
+
+# Local constants
+CACHE_KEY_PREFIX = 'tokens_auth_'
+CACHE_TIMEOUT_DEFAULT = 0  # Disabled by default
+
+
+def get_cache_key(token_key):
+    """
+    Return cache key for a token.
+
+    :param token_key: Token key, the first characters of the token (string)
+    :return: String
+    """
+    return CACHE_KEY_PREFIX + token_key
+
+
+def clear_token_cache(auth_token):
+    """
+    Remove an authentication token from the cache.
+
+    :param auth_token: AuthToken object
+    """
+    cache.delete(get_cache_key(auth_token.token_key))
+
+
+def handle_token_delete(sender, instance, **kwargs):
+    """Signal for removing deleted tokens from the cache"""
+    clear_token_cache(instance)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Knox token authentication which caches verified tokens, so that repeated
+    requests with the same token do not need to look up and verify the token
+    in the database.
+
+    Caching is enabled by setting TOKENS_AUTH_CACHE_TIMEOUT, the timeout is
+    capped at the token expiry time. Deleted tokens are removed from the cache.
+    Caching is disabled if TOKENS_AUTH_CACHE_TIMEOUT is 0 (default) or the knox
+    AUTO_REFRESH setting is enabled.
+
+    Deleted tokens are only removed from the cache of the current process, so
+    caching should only be enabled with a cache backend shared between server
+    processes. With a per-process cache, a deleted token remains valid in other
+    processes until the timeout expires.
+    """
+
+    @classmethod
+    def _get_token_hash(cls, token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _get_cache_timeout(cls):
+        if knox_settings.AUTO_REFRESH:
+            return 0
+        return getattr(
+            settings, 'TOKENS_AUTH_CACHE_TIMEOUT', CACHE_TIMEOUT_DEFAULT
+        )
+
+    def _get_cached_token(self, token):
+        """Return AuthToken object from cache or None if not found"""
+        cache_key = get_cache_key(token[: CONSTANTS.TOKEN_KEY_LENGTH])
+        cached = cache.get(cache_key)
+        if not cached or not compare_digest(
+            cached['hash'], self._get_token_hash(token)
+        ):
+            return None
+        auth_token = AuthToken(**cached['token'])
+        if auth_token.expiry and auth_token.expiry < timezone.now():
+            cache.delete(cache_key)
+            return None  # Expired tokens are cleaned up by the parent class
+        return auth_token
+
+    def _set_cached_token(self, token, auth_token):
+        """Add verified AuthToken object into the cache"""
+        timeout = self._get_cache_timeout()
+        if auth_token.expiry:
+            timeout = min(
+                timeout, (auth_token.expiry - timezone.now()).total_seconds()
+            )
+        if timeout <= 0:
+            return
+        cache.set(
+            get_cache_key(auth_token.token_key),
+            {
+                'hash': self._get_token_hash(token),
+                'token': {
+                    f.attname: getattr(auth_token, f.attname)
+                    for f in AuthToken._meta.concrete_fields
+                },
+            },
+            timeout,
+        )
+
+    def authenticate_credentials(self, token):
+        """
+        Override authenticate_credentials() to return the token from the cache
+        if available.
+        """
+        if not self._get_cache_timeout():
+            return super().authenticate_credentials(token)
+        token_str = token.decode('utf-8')
+        auth_token = self._get_cached_token(token_str)
+        if not auth_token:
+            user, auth_token = super().authenticate_credentials(token)
+            self._set_cached_token(token_str, auth_token)
+            return user, auth_token
+        try:
+            auth_token.user = User.objects.get(pk=auth_token.user_id)
+        except User.DoesNotExist:
+            clear_token_cache(auth_token)
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        return self.validate_user(auth_token)
@@ -0,0 +1,116 @@
+"""Tests for authentication classes in the tokens app"""
+
+import datetime
+
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings
+
+from knox.models import AuthToken
+from knox.settings import knox_settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory
+from test_plus.test import TestCase
+
+from tokens.auth import CachedTokenAuthentication, get_cache_key
+
+
+@override_settings(TOKENS_AUTH_CACHE_TIMEOUT=300)
+class TestCachedTokenAuthentication(TestCase):
+    """Tests for CachedTokenAuthentication"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = self.make_user()
+        self.auth_token, self.token = AuthToken.objects.create(self.user, None)
+        self.auth = CachedTokenAuthentication()
+        self.factory = APIRequestFactory()
+
+    def _authenticate(self, token):
+        request = self.factory.get(
+            '/', HTTP_AUTHORIZATION='Token {}'.format(token)
+        )
+        return self.auth.authenticate(request)
+
+    def test_authenticate(self):
+        """Test authentication with a valid token"""
+        self.assertIsNone(cache.get(get_cache_key(self.auth_token.token_key)))
+        user, auth_token = self._authenticate(self.token)
+        self.assertEqual(user, self.user)
+        self.assertEqual(auth_token, self.auth_token)
+        self.assertIsNotNone(
+            cache.get(get_cache_key(self.auth_token.token_key))
+        )
+
+    def test_authenticate_cached(self):
+        """Test authentication with a cached token"""
+        self._authenticate(self.token)
+        with self.assertNumQueries(1):  # User query only
+            user, auth_token = self._authenticate(self.token)
+        self.assertEqual(user, self.user)
+        self.assertEqual(auth_token, self.auth_token)
+        self.assertEqual(auth_token.user, self.user)
+
+    def test_authenticate_invalid(self):
+        """Test authentication with an invalid token matching a cached key"""
+        self._authenticate(self.token)
+        invalid_token = self.token[:-4] + 'ffff'
+        if invalid_token == self.token:
+            invalid_token = self.token[:-4] + '0000'
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(invalid_token)
+
+    def test_authenticate_deleted(self):
+        """Test authentication with a deleted token"""
+        self._authenticate(self.token)
+        self.auth_token.delete()
+        self.assertIsNone(cache.get(get_cache_key(self.auth_token.token_key)))
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(self.token)
+
+    def test_authenticate_inactive_user(self):
+        """Test authentication with a cached token for an inactive user"""
+        self._authenticate(self.token)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(self.token)
+
+    def test_authenticate_expiry(self):
+        """Test caching a token with expiry"""
+        auth_token, token = AuthToken.objects.create(
+            self.user, datetime.timedelta(hours=1)
+        )
+        self._authenticate(token)
+        self.assertIsNotNone(cache.get(get_cache_key(auth_token.token_key)))
+        # Expired tokens are not returned from the cache
+        cache_key = get_cache_key(auth_token.token_key)
+        cached = cache.get(cache_key)
+        cached['token']['expiry'] -= datetime.timedelta(hours=2)
+        cache.set(cache_key, cached)
+        self.assertIsNone(self.auth._get_cached_token(token))
+        self.assertIsNone(cache.get(cache_key))
+
+    def test_authenticate_auto_refresh(self):
+        """Test authentication with AUTO_REFRESH enabled"""
+        with patch.object(knox_settings, 'AUTO_REFRESH', True, create=True):
+            user, _ = self._authenticate(self.token)
+        self.assertEqual(user, self.user)
+        self.assertIsNone(cache.get(get_cache_key(self.auth_token.token_key)))
+
+    @override_settings(TOKENS_AUTH_CACHE_TIMEOUT=0)
+    def test_authenticate_disabled(self):
+        """Test authentication with caching disabled"""
+        user, _ = self._authenticate(self.token)
+        self.assertEqual(user, self.user)
+        self.assertIsNone(cache.get(get_cache_key(self.auth_token.token_key)))
+
+    @override_settings()
+    def test_authenticate_default(self):
+        """Test authentication without TOKENS_AUTH_CACHE_TIMEOUT set"""
+        del settings.TOKENS_AUTH_CACHE_TIMEOUT
+        user, _ = self._authenticate(self.token)
+        self.assertEqual(user, self.user)
+        self.assertIsNone(cache.get(get_cache_key(self.auth_token.token_key)))
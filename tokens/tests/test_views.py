@@ -1,12 +1,14 @@
 """UI view tests for the tokens app"""
 
 from django.contrib.messages import get_messages
+from django.core.cache import cache
 from django.urls import reverse
 
 from knox.models import AuthToken
 
 from test_plus.test import TestCase
 
+from tokens.auth import get_cache_key
 from tokens.views import TOKEN_CREATE_MSG, TOKEN_DELETE_MSG
 
 
@@ -100,3 +102,12 @@ class TestUserTokenDeleteView(TestCase):
             list(get_messages(response.wsgi_request))[0].message,
             TOKEN_DELETE_MSG,
         )
+
+    def test_post_cached(self):
+        """Test deletion of a cached token"""
+        cache_key = get_cache_key(self.token.token_key)
+        cache.set(cache_key, {'hash': '', 'token': {}})
+        with self.login(self.user):
+            self.post('tokens:delete', pk=self.token.pk)
+        self.assertEqual(AuthToken.objects.count(), 0)
+        self.assertIsNone(cache.get(cache_key))